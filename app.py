@@ -11,8 +11,15 @@ from openpyxl.workbook.defined_name import DefinedName
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.formatting.rule import FormulaRule
 import io
+import os
+import sys
 import difflib
 
+# Synergy blocks and master questions (webapp/framework.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "webapp"))
+from keyword_matcher import KeywordMatcher
+from framework import SYNERGY_BLOCKS, MASTER_QUESTIONS, BLOCK_NAMES, BLOCK_INDEX, BUSINESS_BLOCKS, TECH_BLOCKS, match_question
+
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="APM Strategy Generator", page_icon="📊", layout="wide")
 
@@ -21,31 +28,7 @@ st.markdown("**McKinsey-Style Portfolio Analysis Engine**")
 st.markdown("Upload your completed `Application Questionnaire` to automatically generate the Strategic Assessment, Dashboard, and Roadmap.")
 
 # --- CONFIG DATA ---
-synergy_blocks = {
-    "Strategic Fit": {"Type": "Business", "Weight": 30, "Defs": {1: "Completely misaligned", 2: "Partially aligned", 3: "Neutral", 4: "Well-aligned", 5: "Strategic driver"}},
-    "Business Efficiency": {"Type": "Business", "Weight": 30, "Defs": {1: "Manual", 2: "Low efficiency", 3: "Average", 4: "High", 5: "Optimized"}},
-    "User Value": {"Type": "Business", "Weight": 20, "Defs": {1: "Rejected", 2: "Low satisfaction", 3: "Acceptable", 4: "Good", 5: "Delightful"}},
-    "Financial Value": {"Type": "Business", "Weight": 20, "Defs": {1: "Negative", 2: "Poor", 3: "Neutral", 4: "Positive", 5: "Exceptional"}},
-    "Architecture": {"Type": "Tech", "Weight": 30, "Defs": {1: "Obsolete", 2: "Aging", 3: "Stable", 4: "Modern", 5: "Future-proof"}},
-    "Operational Risk": {"Type": "Tech", "Weight": 30, "Defs": {1: "Critical", 2: "High", 3: "Managed", 4: "Low", 5: "Fortified"}},
-    "Maintainability": {"Type": "Tech", "Weight": 25, "Defs": {1: "Impossible", 2: "Hard", 3: "Standard", 4: "Good", 5: "Excellent"}},
-    "Support Quality": {"Type": "Tech", "Weight": 15, "Defs": {1: "Non-existent", 2: "Reactive", 3: "Defined", 4: "Proactive", 5: "World-class"}}
-}
-
-MASTER_QUESTIONS = {
-    "Strategic Fit": ["What is the name of the application?", "What is the primary business purpose of the application?", "Which OPCOs use the application?", "Which utility domain(s) is the application used for? (Electric, Gas, or Both)", "Which Business Unit(s) use or own the application?", "Is the application IT-owned, business-owned, or jointly governed?", "Is this application considered business-critical, important, or supportive? Provide an explanation of the statement", "Does the application align with the current and future Mobility strategy?", "Are there important capabilities missing that limit business effectiveness?", "Is the application expected to be used in the next 3–5 years?", "Are there planned upgrades, migrations, or replacements?", "Could this application be replaced or consolidated with another platform?"],
-    "Business Efficiency": ["What key business processes does the application support?", "What core functionalities does the application provide?", "Are any processes partially supported or handled outside the application (manual workarounds, spreadsheets, etc.)?", "Does the application overlap functionally with other systems?", "Could this application absorb business processes currently supported by another platform or executed through manual workarounds? If yes, which processes and which platform(s)"],
-    "User Value": ["Which user roles or personas use the application (e.g., field technician, dispatcher, supervisor)?", "How many active users does the application have (daily/monthly)?", "Is application usage growing, stable, or declining?", "Is usage mandatory or optional for users?", "What is the overall level of user satisfaction?", "Are there known usability or mobility experience issues?"],
-    "Financial Value": ["What business value does the application deliver today?", "What would be the business impact if the application were unavailable?", "What are the main cost components (licenses, infrastructure, support)?, and what is the total cost of ownership?", "Is the cost reasonable compared to the business value delivered?", "Are there upcoming license renewals or contract milestones?", "Are there opportunities for cost reduction through consolidation or modernization?"],
-    "Architecture": ["Is the application a custom-built solution or a market (COTS/SaaS) product?", "What platforms does the application run on (mobile OS, web, backend)?", "What technologies, frameworks, or programming languages are used?", "What version of the application is currently deployed?", "Is the application deployed on-premises, in the cloud, or in a hybrid model?", "If cloud-based, which hyperscaler or cloud provider is used (e.g., AWS, Azure, GCP)?", "Which systems does the application integrate with?", "Are integrations real-time, batch-based, or manual?", "What limits future evolution or innovation?"],
-    "Operational Risk": ["Does the application support regulatory and compliance requirements?", "How critical are these integrations to business operations?", "What type of data does the application create, consume, or update?", "Are there known integration or data quality issues?", "Does the application handle sensitive, personal, or regulated data?", "Is the application governed by corporate security and IT policies?", "Is identity and access management (IAM) integrated with corporate IAM solutions?", "Are security controls (authentication, authorization, logging) centrally managed or application-specific?", "Are there known security risks, audit findings, or compliance gaps?"],
-    "Maintainability": ["How complex is ongoing maintenance and support?", "How frequently are incidents or defects reported?", "How easy is it to implement enhancements or changes?", "What are the main business challenges with the application?", "What are the main technical challenges or limitations?", "Are there scalability, performance, or reliability concerns?", "Are stakeholders requesting changes or replacement?"],
-    "Support Quality": ["Is vendor or technology support still available and active?", "Who provides application support (internal IT, vendor, third party)?", "Is the application proactively monitored (e.g., APM, Dynatrace), or is downtime primarily reported by users?", "Are alerts integrated with ITSM tools (e.g., ServiceNow) for auto-ticketing, or are they email-based/manual?"]
-}
-
-ALL_QUESTIONS_FLAT = []
-for k, q_list in MASTER_QUESTIONS.items():
-    ALL_QUESTIONS_FLAT.extend(q_list)
+synergy_blocks = SYNERGY_BLOCKS
 
 MANUAL_APPS_DATA = {
     "Kaffa": {
@@ -108,6 +91,28 @@ KEYWORDS = {
     "low": ["manual", "legacy", "obsolete", "error", "poor", "risk", "unsupported", "silo", "redundant", "costly", "one person", "custom built", "unknown", "no", "scripts", "gaps", "bad architecture", "custom", "na"]
 }
 
+# Expanded Categories
+GROUP_CATEGORIES = {
+    "Task Management / User Alignment": ["task", "schedule", "track", "assign", "user", "alignment", "collab", "arcos", "jums", "switching", "ppe"],
+    "Maintenance & Asset Mgmt": ["maintain", "asset", "work order", "inspection", "repair", "lifecycle", "bentley", "cimplicity", "cathodic", "poleforeman", "esosr"],
+    "Grid Operations / Engineering": ["scada", "dms", "oms", "real-time", "grid", "voltage", "design", "model", "calculate", "engineer", "kaffa", "scal", "dsd"],
+    "Document / Info Management": ["document", "file", "map", "drawing", "view", "repository", "knowledge", "projectwise", "mapping"],
+    "Corporate / Administrative": ["finance", "hr", "legal", "compliance", "security", "supply chain", "admin", "erp", "sap"]
+}
+
+# Detailed Avangrid Chain
+CHAIN_STAGES = {
+    "Generation (Renewables)": ["generation", "renewable", "wind", "solar", "hydro", "offshore", "onshore", "plant", "turbine", "energy source", "production"],
+    "Transmission (Transport)": ["transmission", "high voltage", "substation", "interconnection", "control center", "ecc", "tcc", "line", "relay", "protection"],
+    "Distribution (Delivery)": ["distribution", "medium voltage", "low voltage", "ami", "smart grid", "meter", "outage", "oms", "dms", "scada", "field", "pole", "circuit"],
+    "Customer Solutions": ["customer", "billing", "crm", "call center", "service", "payment", "meter to cash", "der", "ev charging", "portal", "account"],
+    "Corporate / Shared Services": ["finance", "hr", "legal", "compliance", "security", "supply chain", "admin", "it", "procurement", "cybersecurity", "ehs"]
+}
+
+# Keyword sets compiled once (Aho–Corasick): each text is scanned once for all of their keywords
+CATEGORY_MATCHER = KeywordMatcher({"groups": GROUP_CATEGORIES, "chain": CHAIN_STAGES})
+ANSWER_MATCHER = KeywordMatcher({"tone": KEYWORDS, "flags": {"security": ["security", "iam"], "no": ["no"]}})
+
 MANUAL_LAYOUT = {"PoleForeman": 'l', "Aspen OneLiner": 'b', "SCAL-360 N": 'r', "Mapping Computers": 't', "Mapping Computer": 't', "Standard Tracking": 'b', "ARCOS": 't', "Cathodic": 'r', "Bentley View": 'l', "Bentley - ProjectWise": 'r'} 
 
 # --- HELPERS ---
@@ -129,15 +134,16 @@ def evaluate_answer_text(text):
     if not text or len(text.strip()) < 2: return 0
     t = text.lower()
     score = 3
-    pos_hits = sum(1 for w in KEYWORDS["high"] if w in t)
-    neg_hits = sum(1 for w in KEYWORDS["low"] if w in t)
     if "no" == t.strip(): return 1
     if "yes" == t.strip(): return 4
+    hits = ANSWER_MATCHER.scan(t)
+    pos_hits = hits["tone"]["high"]
+    neg_hits = hits["tone"]["low"]
     if pos_hits > neg_hits: score = 4
     if pos_hits > 2 and neg_hits == 0: score = 5
     if neg_hits > pos_hits: score = 2
     if neg_hits > 1: score = 1
-    if ("security" in t or "iam" in t) and "no" in t: score = 1
+    if hits["flags"]["security"] and hits["flags"]["no"]: score = 1
     return score
 
 def smart_wrap(text, limit=12):
@@ -214,9 +220,9 @@ def parse_wb(wb):
             if not q_str and not a_str: continue
 
             # Robust Match: 0.75 cutoff
-            match = difflib.get_close_matches(q_str, ALL_QUESTIONS_FLAT, n=1, cutoff=0.75)
+            match = match_question(q_str, cutoff=0.75)
             if match:
-                current_q = match[0]
+                current_q = match
                 if a_str: current_answers[current_q] = {"a": a_str, "s": s_val}
             else:
                 if current_q and not q_str.endswith("?"):
@@ -286,57 +292,17 @@ def generate_report(wb, apps):
     # 2. Copy Reference Tabs from v52 Template (WITH IMAGES)
     template_path = "/Users/gustavohenriquecastellano/Downloads/Gerador Excel Avandrig/Avangrid_Application_Portfolio_Management_v52.xlsx"
     try:
-        from openpyxl import load_workbook
-        from openpyxl.drawing.image import Image as OpenpyxlImage
-        from copy import copy
-        wb_template = load_workbook(template_path)
-        
+        from xlsx_template import get_compiled_template
+        # Parsed once per process (again only when the file changes), replayed into each report
+        template = get_compiled_template(template_path)
+        if template is None:
+            raise FileNotFoundError(template_path)
+
         # Copy Index, Methodology, Introduction tabs
         for idx, tab_name in enumerate(["Index", "Introduction", "Methodology"]):
-            if tab_name in wb_template.sheetnames:
-                source_ws = wb_template[tab_name]
-                
-                # Create new sheet at specific position
-                target_ws = wb.create_sheet(tab_name, idx)
-                
-                # Copy all cells and styles
-                for row in source_ws.iter_rows():
-                    for cell in row:
-                        target_cell = target_ws[cell.coordinate]
-                        target_cell.value = cell.value
-                        if cell.has_style:
-                            target_cell.font = copy(cell.font)
-                            target_cell.border = copy(cell.border)
-                            target_cell.fill = copy(cell.fill)
-                            target_cell.number_format = copy(cell.number_format)
-                            target_cell.protection = copy(cell.protection)
-                            target_cell.alignment = copy(cell.alignment)
-                
-                # Copy merged cells
-                for merged_cell_range in source_ws.merged_cells.ranges:
-                    target_ws.merge_cells(str(merged_cell_range))
-                
-                # Copy column dimensions
-                for col_letter, col_dim in source_ws.column_dimensions.items():
-                    target_ws.column_dimensions[col_letter].width = col_dim.width
-                
-                # Copy row dimensions
-                for row_num, row_dim in source_ws.row_dimensions.items():
-                    target_ws.row_dimensions[row_num].height = row_dim.height
-                
-                # Copy images (if any)
-                try:
-                    if hasattr(source_ws, '_images'):
-                        for img in source_ws._images:
-                            # Create a new image from the same image data
-                            from openpyxl.drawing.image import Image as XLImage
-                            new_image = XLImage(img.ref)
-                            # Copy the anchor position
-                            if hasattr(img, 'anchor'):
-                                new_image.anchor = img.anchor
-                            target_ws.add_image(new_image)
-                except Exception as img_err:
-                    st.warning(f"Could not copy images from {tab_name}: {img_err}")
+            if tab_name in template:
+                # Create new sheet at specific position, then replay cells, styles, merges, dimensions and images
+                template[tab_name].replay(wb.create_sheet(tab_name, idx))
         
         # Now delete the temporary first sheet
         if all_sheets[0] in wb.sheetnames:
@@ -349,14 +315,14 @@ def generate_report(wb, apps):
         st.code(traceback.format_exc())
 
     C_PRIM, C_SEC, C_NEU, C_W = 'E87722', '0066B3', '444444', 'FFFFFF'
-    ordered_keys = ["Strategic Fit", "Business Efficiency", "User Value", "Financial Value", "Architecture", "Operational Risk", "Maintainability", "Support Quality"]
+    ordered_keys = BLOCK_NAMES
 
     # 2. Calculator
     ws_calc = wb.create_sheet("Calculator"); ws_calc.freeze_panes = "B4"
     ws_calc.column_dimensions['A'].width = 30
     ws_calc.cell(1,1).value="Application Name"; style(ws_calc.cell(1,1), bold=True, bg=C_NEU, color=C_W)
     ws_calc.cell(2,1).value="Weight"; style(ws_calc.cell(2,1), italic=True, align='right')
-    col=2; biz_blocks=[b for b,v in synergy_blocks.items() if v["Type"]=="Business"]; tech_blocks=[b for b,v in synergy_blocks.items() if v["Type"]=="Tech"]
+    col=2; biz_blocks=BUSINESS_BLOCKS; tech_blocks=TECH_BLOCKS
     for b_list, color in [(biz_blocks, C_PRIM), (tech_blocks, C_SEC)]:
         for b in b_list:
             c = ws_calc.cell(1, col); c.value=b; style(c, bold=True, bg=color, color=C_W, wrap=True); ws_calc.cell(2, col).value = synergy_blocks[b]["Weight"]; col += 1
@@ -369,7 +335,7 @@ def generate_report(wb, apps):
         if i < len(apps): app = apps[i]; ws_calc.cell(r,1).value = app["safe_name"] 
         style(ws_calc.cell(r,1), align='left', bg='FAFAFA'); cc = 2
         for b in biz_blocks + tech_blocks:
-            b_idx = ordered_keys.index(b); fixed_row = 4 + b_idx; ws_calc.cell(r,cc).value = f'=IF($A{r}="","",IFERROR(INDIRECT("\'"&$A{r}&"\'!$B${fixed_row}"),0))'; style(ws_calc.cell(r,cc), bg='FAFAFA'); cc += 1
+            b_idx = BLOCK_INDEX[b]; fixed_row = 4 + b_idx; ws_calc.cell(r,cc).value = f'=IF($A{r}="","",IFERROR(INDIRECT("\'"&$A{r}&"\'!$B${fixed_row}"),0))'; style(ws_calc.cell(r,cc), bg='FAFAFA'); cc += 1
         rb_s, rb_e = get_column_letter(2), get_column_letter(1+len(biz_blocks)); rt_s, rt_e = get_column_letter(2+len(biz_blocks)), get_column_letter(1+len(biz_blocks)+len(tech_blocks))
         sum_rb = f"SUM({rb_s}{r}:{rb_e}{r})"; ws_calc.cell(r, c_bvi).value = f'=IF(OR($A{r}="", {sum_rb}=0),NA(),IFERROR(SUMPRODUCT({rb_s}{r}:{rb_e}{r}, ${rb_s}$2:${rb_e}$2)/SUM(${rb_s}$2:${rb_e}$2)*20, 0))'
         sum_rt = f"SUM({rt_s}{r}:{rt_e}{r})"; ws_calc.cell(r, c_thi).value = f'=IF(OR($A{r}="", {sum_rt}=0),NA(),IFERROR(SUMPRODUCT({rt_s}{r}:{rt_e}{r}, ${rt_s}$2:${rt_e}$2)/SUM(${rt_s}$2:${rt_e}$2)*20, 0))'
@@ -440,8 +406,8 @@ def generate_report(wb, apps):
     coord_map = {}; BUCKET = 3 
     for i, app in enumerate(apps):
         r = 4 + i
-        rb = sum(app["blocks"][k]["score"] for k in ordered_keys if "Fit" in k or "Efficiency" in k or "User" in k or "Financial" in k) / 4.0 * 20
-        rt = sum(app["blocks"][k]["score"] for k in ordered_keys if "Architecture" in k or "Risk" in k or "Maintain" in k or "Support" in k) / 4.0 * 20
+        rb = sum(app["blocks"][k]["score"] for k in BUSINESS_BLOCKS) / 4.0 * 20
+        rt = sum(app["blocks"][k]["score"] for k in TECH_BLOCKS) / 4.0 * 20
         rec = "ELIMINATE"
         if rb >= 60 and rt >= 60: rec="EVOLVE"
         elif rb >= 60 and rt < 60: rec="INVEST"
@@ -632,51 +598,37 @@ def generate_report(wb, apps):
     # 7. Generate "Value Chain" Tab
     
     # --- HELPER: KEYWORD SCORING ---
-    def get_category_scores(app_data, keywords_dict):
+    def get_category_scores(app_data):
         # app_data is expected to be the full app object
         # We need to scan answers for context.
-        # Concatenate all answers into big text blob
-        full_text = app_data["safe_name"].lower() + " "
+        # Concatenate all answers into big text blob, scored for groups and chain stages in one scan
+        parts = [app_data["safe_name"]]
         if "answers" in app_data:
             for q, ans_obj in app_data["answers"].items():
                 if isinstance(ans_obj, dict):
-                    full_text += str(ans_obj.get("a", "")).lower() + " "
+                    parts.append(str(ans_obj.get("a", "")))
                 else: 
-                     full_text += str(ans_obj).lower() + " "
-        
-        scores = {}
-        for cat, kws in keywords_dict.items():
-            score = 0
-            for k in kws:
-                if k in full_text: score += 1
-            scores[cat] = score
-        return scores
+                     parts.append(str(ans_obj))
+        return CATEGORY_MATCHER.scan(" ".join(parts))
+
+    category_scores = [get_category_scores(app) for app in apps]
 
     # --- TAB 1: APPLICATION GROUPS (Functional) ---
     ws_groups = wb.create_sheet("Application Groups")
     ws_groups.sheet_properties.tabColor = "0000FF"
     
-    # Expanded Categories
-    GROUP_CATEGORIES = {
-        "Task Management / User Alignment": ["task", "schedule", "track", "assign", "user", "alignment", "collab", "arcos", "jums", "switching", "ppe"],
-        "Maintenance & Asset Mgmt": ["maintain", "asset", "work order", "inspection", "repair", "lifecycle", "bentley", "cimplicity", "cathodic", "poleforeman", "esosr"],
-        "Grid Operations / Engineering": ["scada", "dms", "oms", "real-time", "grid", "voltage", "design", "model", "calculate", "engineer", "kaffa", "scal", "dsd"],
-        "Document / Info Management": ["document", "file", "map", "drawing", "view", "repository", "knowledge", "projectwise", "mapping"],
-        "Corporate / Administrative": ["finance", "hr", "legal", "compliance", "security", "supply chain", "admin", "erp", "sap"]
-    }
-    
     # Assign apps to groups (Multi-select allowed)
     group_data = {k: [] for k in GROUP_CATEGORIES}
     group_data["Uncategorized"] = []
     
-    for app in apps:
-        scores = get_category_scores(app, GROUP_CATEGORIES)
+    for app, app_scores in zip(apps, category_scores):
+        scores = dict(app_scores["groups"])
         # Threshold: >0 matches. If Name matches, big boost.
         
         assigned = False
         # Special check: If name contains category keywords, force assign
-        for cat, kws in GROUP_CATEGORIES.items():
-            if any(k in app["safe_name"].lower() for k in kws):
+        for cat, name_hits in CATEGORY_MATCHER.scan(app["safe_name"])["groups"].items():
+            if name_hits:
                 scores[cat] += 5 # Boost
         
         # Assign to all with score >= 1 (or top N? User said "considering all answers")
@@ -690,8 +642,8 @@ def generate_report(wb, apps):
                  # Rule: Assign if score is high relative to others or absolute high
                  if sc >= 5 or (sc >= 1 and sc >= best_score * 0.5):
                      # Calculate color
-                     rb = sum(app["blocks"][k]["score"] for k in ordered_keys if "Fit" in k or "Efficiency" in k or "User" in k or "Financial" in k) / 4.0 * 20
-                     rt = sum(app["blocks"][k]["score"] for k in ordered_keys if "Architecture" in k or "Risk" in k or "Maintain" in k or "Support" in k) / 4.0 * 20
+                     rb = sum(app["blocks"][k]["score"] for k in BUSINESS_BLOCKS) / 4.0 * 20
+                     rt = sum(app["blocks"][k]["score"] for k in TECH_BLOCKS) / 4.0 * 20
                      bg_c = "FFFFFF"
                      if rb >= 60 and rt >= 60: bg_c="C6EFCE" 
                      elif rb >= 60 and rt < 60: bg_c="FFEB9C"
@@ -702,8 +654,8 @@ def generate_report(wb, apps):
                      assigned = True
         
         if not assigned:
-            rb = sum(app["blocks"][k]["score"] for k in ordered_keys if "Fit" in k or "Efficiency" in k or "User" in k or "Financial" in k) / 4.0 * 20
-            rt = sum(app["blocks"][k]["score"] for k in ordered_keys if "Architecture" in k or "Risk" in k or "Maintain" in k or "Support" in k) / 4.0 * 20
+            rb = sum(app["blocks"][k]["score"] for k in BUSINESS_BLOCKS) / 4.0 * 20
+            rt = sum(app["blocks"][k]["score"] for k in TECH_BLOCKS) / 4.0 * 20
             bg_c = "FFFFFF"
             if rb >= 60 and rt >= 60: bg_c="C6EFCE" 
             elif rb >= 60 and rt < 60: bg_c="FFEB9C"
@@ -749,20 +701,11 @@ def generate_report(wb, apps):
     ws_chain = wb.create_sheet("Value Chain")
     ws_chain.sheet_properties.tabColor = "FF9900" # Orange
     
-    # Detailed Avangrid Chain
-    CHAIN_STAGES = {
-        "Generation (Renewables)": ["generation", "renewable", "wind", "solar", "hydro", "offshore", "onshore", "plant", "turbine", "energy source", "production"],
-        "Transmission (Transport)": ["transmission", "high voltage", "substation", "interconnection", "control center", "ecc", "tcc", "line", "relay", "protection"],
-        "Distribution (Delivery)": ["distribution", "medium voltage", "low voltage", "ami", "smart grid", "meter", "outage", "oms", "dms", "scada", "field", "pole", "circuit"],
-        "Customer Solutions": ["customer", "billing", "crm", "call center", "service", "payment", "meter to cash", "der", "ev charging", "portal", "account"],
-        "Corporate / Shared Services": ["finance", "hr", "legal", "compliance", "security", "supply chain", "admin", "it", "procurement", "cybersecurity", "ehs"]
-    }
-    
     chain_data = {k: [] for k in CHAIN_STAGES}
     chain_data["Cross-Cutting"] = []
     
-    for app in apps:
-        scores = get_category_scores(app, CHAIN_STAGES)
+    for app, app_scores in zip(apps, category_scores):
+        scores = app_scores["chain"]
         best_cat = "Cross-Cutting"
         high_score = 0
         
@@ -772,8 +715,8 @@ def generate_report(wb, apps):
                 best_cat = cat
         
         # Color calculation
-        rb = sum(app["blocks"][k]["score"] for k in ordered_keys if "Fit" in k or "Efficiency" in k or "User" in k or "Financial" in k) / 4.0 * 20
-        rt = sum(app["blocks"][k]["score"] for k in ordered_keys if "Architecture" in k or "Risk" in k or "Maintain" in k or "Support" in k) / 4.0 * 20
+        rb = sum(app["blocks"][k]["score"] for k in BUSINESS_BLOCKS) / 4.0 * 20
+        rt = sum(app["blocks"][k]["score"] for k in TECH_BLOCKS) / 4.0 * 20
         bg_c = "FFFFFF"
         if rb >= 60 and rt >= 60: bg_c="C6EFCE" 
         elif rb >= 60 and rt < 60: bg_c="FFEB9C"
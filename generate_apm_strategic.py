@@ -8,107 +8,19 @@ from openpyxl.drawing.line import LineProperties
 from openpyxl.chart.axis import ChartLines
 from openpyxl.workbook.defined_name import DefinedName
 import os
+import sys
 import shutil
 import math
-import difflib
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.formatting.rule import FormulaRule
 from openpyxl.drawing.image import Image
 
-# --- CONFIG ---
-synergy_blocks = {
-    "Strategic Fit": {"Type": "Business", "Weight": 30, "Defs": {1: "Completely misaligned", 2: "Partially aligned", 3: "Neutral", 4: "Well-aligned", 5: "Strategic driver"}},
-    "Business Efficiency": {"Type": "Business", "Weight": 30, "Defs": {1: "Manual", 2: "Low efficiency", 3: "Average", 4: "High", 5: "Optimized"}},
-    "User Value": {"Type": "Business", "Weight": 20, "Defs": {1: "Rejected", 2: "Low satisfaction", 3: "Acceptable", 4: "Good", 5: "Delightful"}},
-    "Financial Value": {"Type": "Business", "Weight": 20, "Defs": {1: "Negative", 2: "Poor", 3: "Neutral", 4: "Positive", 5: "Exceptional"}},
-    "Architecture": {"Type": "Tech", "Weight": 30, "Defs": {1: "Obsolete", 2: "Aging", 3: "Stable", 4: "Modern", 5: "Future-proof"}},
-    "Operational Risk": {"Type": "Tech", "Weight": 30, "Defs": {1: "Critical", 2: "High", 3: "Managed", 4: "Low", 5: "Fortified"}},
-    "Maintainability": {"Type": "Tech", "Weight": 25, "Defs": {1: "Impossible", 2: "Hard", 3: "Standard", 4: "Good", 5: "Excellent"}},
-    "Support Quality": {"Type": "Tech", "Weight": 15, "Defs": {1: "Non-existent", 2: "Reactive", 3: "Defined", 4: "Proactive", 5: "World-class"}}
-}
+# Synergy blocks and master questions (webapp/framework.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "webapp"))
+from framework import SYNERGY_BLOCKS, MASTER_QUESTIONS, BLOCK_NAMES, BLOCK_INDEX, BUSINESS_BLOCKS, TECH_BLOCKS, match_question
 
-# USER PROVIDED EXACT LIST (Mapped to Blocks)
-MASTER_QUESTIONS = {
-    "Strategic Fit": [
-        "What is the name of the application?",
-        "What is the primary business purpose of the application?",
-        "Which OPCOs use the application?",
-        "Which utility domain(s) is the application used for? (Electric, Gas, or Both)",
-        "Which Business Unit(s) use or own the application?",
-        "Is the application IT-owned, business-owned, or jointly governed?",
-        "Is this application considered business-critical, important, or supportive? Provide an explanation of the statement",
-        "Does the application align with the current and future Mobility strategy?",
-        "Are there important capabilities missing that limit business effectiveness?",
-        "Is the application expected to be used in the next 3–5 years?", 
-        "Are there planned upgrades, migrations, or replacements?", 
-        "Could this application be replaced or consolidated with another platform?"
-    ],
-    "Business Efficiency": [
-        "What key business processes does the application support?",
-        "What core functionalities does the application provide?",
-        "Are any processes partially supported or handled outside the application (manual workarounds, spreadsheets, etc.)?",
-        "Does the application overlap functionally with other systems?",
-        "Could this application absorb business processes currently supported by another platform or executed through manual workarounds? If yes, which processes and which platform(s)"
-    ],
-    "User Value": [
-        "Which user roles or personas use the application (e.g., field technician, dispatcher, supervisor)?",
-        "How many active users does the application have (daily/monthly)?",
-        "Is application usage growing, stable, or declining?",
-        "Is usage mandatory or optional for users?",
-        "What is the overall level of user satisfaction?",
-        "Are there known usability or mobility experience issues?"
-    ],
-    "Financial Value": [
-        "What business value does the application deliver today?",
-        "What would be the business impact if the application were unavailable?",
-        "What are the main cost components (licenses, infrastructure, support)?, and what is the total cost of ownership?",
-        "Is the cost reasonable compared to the business value delivered?",
-        "Are there upcoming license renewals or contract milestones?",
-        "Are there opportunities for cost reduction through consolidation or modernization?"
-    ],
-    "Architecture": [
-        "Is the application a custom-built solution or a market (COTS/SaaS) product?",
-        "What platforms does the application run on (mobile OS, web, backend)?",
-        "What technologies, frameworks, or programming languages are used?",
-        "What version of the application is currently deployed?",
-        "Is the application deployed on-premises, in the cloud, or in a hybrid model?",
-        "If cloud-based, which hyperscaler or cloud provider is used (e.g., AWS, Azure, GCP)?",
-        "Which systems does the application integrate with?",
-        "Are integrations real-time, batch-based, or manual?",
-        "What limits future evolution or innovation?"
-    ],
-    "Operational Risk": [
-        "Does the application support regulatory and compliance requirements?", 
-        "How critical are these integrations to business operations?",
-        "What type of data does the application create, consume, or update?",
-        "Are there known integration or data quality issues?",
-        "Does the application handle sensitive, personal, or regulated data?",
-        "Is the application governed by corporate security and IT policies?",
-        "Is identity and access management (IAM) integrated with corporate IAM solutions?",
-        "Are security controls (authentication, authorization, logging) centrally managed or application-specific?",
-        "Are there known security risks, audit findings, or compliance gaps?"
-    ],
-    "Maintainability": [
-        "How complex is ongoing maintenance and support?",
-        "How frequently are incidents or defects reported?",
-        "How easy is it to implement enhancements or changes?",
-        "What are the main business challenges with the application?",
-        "What are the main technical challenges or limitations?", 
-        "Are there scalability, performance, or reliability concerns?",
-        "Are stakeholders requesting changes or replacement?"
-    ],
-    "Support Quality": [
-        "Is vendor or technology support still available and active?",
-        "Who provides application support (internal IT, vendor, third party)?",
-        "Is the application proactively monitored (e.g., APM, Dynatrace), or is downtime primarily reported by users?",
-        "Are alerts integrated with ITSM tools (e.g., ServiceNow) for auto-ticketing, or are they email-based/manual?"
-    ]
-}
-
-# FLATTEN FOR MATCHING
-ALL_QUESTIONS_FLAT = []
-for k, q_list in MASTER_QUESTIONS.items():
-    ALL_QUESTIONS_FLAT.extend(q_list)
+# --- CONFIG ---
+synergy_blocks = SYNERGY_BLOCKS
 
 MANUAL_LAYOUT = {
     "PoleForeman": 'l', 
@@ -255,10 +167,10 @@ def parse_sheet(wb, sheet_name):
         
         if not q_str and not a_str: continue
 
-        match = difflib.get_close_matches(q_str, ALL_QUESTIONS_FLAT, n=1, cutoff=0.85)
+        match = match_question(q_str, cutoff=0.85)
         
         if match:
-            current_q = match[0]
+            current_q = match
             if a_str: app["answers"][current_q] = {"a": a_str, "s": s_val}
         else:
             if current_q and not q_str.endswith("?"):
@@ -335,7 +247,7 @@ for app in real_apps:
 
 # --- GENERATE TABS ---
 print("Generating Content...")
-ordered_keys = ["Strategic Fit", "Business Efficiency", "User Value", "Financial Value", "Architecture", "Operational Risk", "Maintainability", "Support Quality"]
+ordered_keys = BLOCK_NAMES
 
 def create_app_sheet(wb, app):
     ws = wb.create_sheet(app["safe_name"]); ws.sheet_properties.tabColor = "00B050" if app["is_green"] else "D9D9D9"
@@ -379,7 +291,7 @@ ws_calc = wb.create_sheet("Calculator"); ws_calc.freeze_panes = "B4"
 ws_calc.column_dimensions['A'].width = 30
 ws_calc.cell(1,1).value="Application Name"; style(ws_calc.cell(1,1), bold=True, bg=C_NEU, color=C_W)
 ws_calc.cell(2,1).value="Weight"; style(ws_calc.cell(2,1), italic=True, align='right')
-col=2; biz_blocks=[b for b,v in synergy_blocks.items() if v["Type"]=="Business"]; tech_blocks=[b for b,v in synergy_blocks.items() if v["Type"]=="Tech"]
+col=2; biz_blocks=BUSINESS_BLOCKS; tech_blocks=TECH_BLOCKS
 for b_list, color in [(biz_blocks, C_PRIM), (tech_blocks, C_SEC)]:
     for b in b_list:
         c = ws_calc.cell(1, col); c.value=b; style(c, bold=True, bg=color, color=C_W, wrap=True); ws_calc.cell(2, col).value = synergy_blocks[b]["Weight"]; col += 1
@@ -395,7 +307,7 @@ for i in range(MAX):
         app = real_apps[i]; ws_calc.cell(r,1).value = app["safe_name"] 
     style(ws_calc.cell(r,1), align='left', bg='FAFAFA'); cc = 2
     for b in biz_blocks + tech_blocks:
-        b_idx = ordered_keys.index(b)
+        b_idx = BLOCK_INDEX[b]
         fixed_row = 4 + b_idx
         ws_calc.cell(r,cc).value = f'=IF($A{r}="","",IFERROR(INDIRECT("\'"&$A{r}&"\'!$B${fixed_row}"),0))'
         style(ws_calc.cell(r,cc), bg='FAFAFA'); cc += 1
@@ -429,8 +341,8 @@ colors = {'EVOLVE':('C6EFCE','006100'), 'INVEST':('FFEB9C','9C5700'), 'MAINTAIN'
 coord_map = {}; BUCKET = 3 
 for i, app in enumerate(real_apps):
     r = 4 + i
-    rb = sum(app["blocks"][k]["score"] for k in ordered_keys if "Fit" in k or "Efficiency" in k or "User" in k or "Financial" in k) / 4.0 * 20
-    rt = sum(app["blocks"][k]["score"] for k in ordered_keys if "Architecture" in k or "Risk" in k or "Maintain" in k or "Support" in k) / 4.0 * 20
+    rb = sum(app["blocks"][k]["score"] for k in BUSINESS_BLOCKS) / 4.0 * 20
+    rt = sum(app["blocks"][k]["score"] for k in TECH_BLOCKS) / 4.0 * 20
     rec = "ELIMINATE"
     if rb >= 60 and rt >= 60: rec="EVOLVE"
     elif rb >= 60 and rt < 60: rec="INVEST"
@@ -3,128 +3,32 @@ AI Processing module using OpenAI API
 Handles transcript analysis, score suggestion, insights generation, and Q&A
 """
 
-import os
 import json
+from collections.abc import Mapping
 from typing import Dict, List, Tuple
-from openai import OpenAI
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
 from dotenv import load_dotenv
 import time
 
-load_dotenv()
+from framework import (
+    SYNERGY_BLOCKS, ALL_QUESTIONS, QUESTION_TO_BLOCK, DEFAULT_WEIGHTS, BUSINESS_BLOCKS, TECH_BLOCKS
+)
+from llm_backend import get_backend
 
-# Initialize OpenAI client - support both .env and Streamlit secrets
-def _get_openai_key():
-    key = os.getenv("OPENAI_API_KEY")
-    if key:
-        return key
-    try:
-        import streamlit as st
-        key = st.secrets.get("OPENAI_API_KEY")
-        if key:
-            return key
-    except Exception:
-        pass
-    return None
-
-client = OpenAI(api_key=_get_openai_key())
-
-# Master Questions (from existing system)
-MASTER_QUESTIONS = {
-    "Strategic Fit": [
-        "What is the name of the application?",
-        "What is the primary business purpose of the application?",
-        "Which OPCOs use the application?",
-        "Which utility domain(s) is the application used for? (Electric, Gas, or Both)",
-        "Which Business Unit(s) use or own the application?",
-        "Is the application IT-owned, business-owned, or jointly governed?",
-        "Is this application considered business-critical, important, or supportive? Provide an explanation of the statement",
-        "Does the application align with the current and future Mobility strategy?",
-        "Are there important capabilities missing that limit business effectiveness?",
-        "Is the application expected to be used in the next 3–5 years?",
-        "Are there planned upgrades, migrations, or replacements?",
-        "Could this application be replaced or consolidated with another platform?"
-    ],
-    "Business Efficiency": [
-        "What key business processes does the application support?",
-        "What core functionalities does the application provide?",
-        "Are any processes partially supported or handled outside the application (manual workarounds, spreadsheets, etc.)?",
-        "Does the application overlap functionally with other systems?",
-        "Could this application absorb business processes currently supported by another platform or executed through manual workarounds? If yes, which processes and which platform(s)"
-    ],
-    "User Value": [
-        "Which user roles or personas use the application (e.g., field technician, dispatcher, supervisor)?",
-        "How many active users does the application have (daily/monthly)?",
-        "Is application usage growing, stable, or declining?",
-        "Is usage mandatory or optional for users?",
-        "What is the overall level of user satisfaction?",
-        "Are there known usability or mobility experience issues?"
-    ],
-    "Financial Value": [
-        "What business value does the application deliver today?",
-        "What would be the business impact if the application were unavailable?",
-        "What are the main cost components (licenses, infrastructure, support)?, and what is the total cost of ownership?",
-        "Is the cost reasonable compared to the business value delivered?",
-        "Are there upcoming license renewals or contract milestones?",
-        "Are there opportunities for cost reduction through consolidation or modernization?"
-    ],
-    "Architecture": [
-        "Is the application a custom-built solution or a market (COTS/SaaS) product?",
-        "What platforms does the application run on (mobile OS, web, backend)?",
-        "What technologies, frameworks, or programming languages are used?",
-        "What version of the application is currently deployed?",
-        "Is the application deployed on-premises, in the cloud, or in a hybrid model?",
-        "If cloud-based, which hyperscaler or cloud provider is used (e.g., AWS, Azure, GCP)?",
-        "Which systems does the application integrate with?",
-        "Are integrations real-time, batch-based, or manual?",
-        "What limits future evolution or innovation?"
-    ],
-    "Operational Risk": [
-        "Does the application support regulatory and compliance requirements?",
-        "How critical are these integrations to business operations?",
-        "What type of data does the application create, consume, or update?",
-        "Are there known integration or data quality issues?",
-        "Does the application handle sensitive, personal, or regulated data?",
-        "Is the application governed by corporate security and IT policies?",
-        "Is identity and access management (IAM) integrated with corporate IAM solutions?",
-        "Are security controls (authentication, authorization, logging) centrally managed or application-specific?",
-        "Are there known security risks, audit findings, or compliance gaps?"
-    ],
-    "Maintainability": [
-        "How complex is ongoing maintenance and support?",
-        "How frequently are incidents or defects reported?",
-        "How easy is it to implement enhancements or changes?",
-        "What are the main business challenges with the application?",
-        "What are the main technical challenges or limitations?",
-        "Are there scalability, performance, or reliability concerns?",
-        "Are stakeholders requesting changes or replacement?"
-    ],
-    "Support Quality": [
-        "Is vendor or technology support still available and active?",
-        "Who provides application support (internal IT, vendor, third party)?",
-        "Is the application proactively monitored (e.g., APM, Dynatrace), or is downtime primarily reported by users?",
-        "Are alerts integrated with ITSM tools (e.g., ServiceNow) for auto-ticketing, or are they email-based/manual?"
-    ]
-}
+load_dotenv()
 
-# Synergy Block Definitions
-SYNERGY_BLOCKS = {
-    "Strategic Fit": {"Type": "Business", "Weight": 30},
-    "Business Efficiency": {"Type": "Business", "Weight": 30},
-    "User Value": {"Type": "Business", "Weight": 20},
-    "Financial Value": {"Type": "Business", "Weight": 20},
-    "Architecture": {"Type": "Tech", "Weight": 30},
-    "Operational Risk": {"Type": "Tech", "Weight": 30},
-    "Maintainability": {"Type": "Tech", "Weight": 25},
-    "Support Quality": {"Type": "Tech", "Weight": 15}
-}
+# Questions answered per transcript (prompt fragment, built once)
+_QUESTIONS_JSON = json.dumps(list(ALL_QUESTIONS), indent=2)
 
-def extract_answers_from_transcript(transcript_text: str, application_name: str = None) -> Dict:
+def extract_answers_from_transcript(transcript_text: str, application_name: str = None, app_id: str = None) -> Dict:
     """
     Extract answers to master questions from a meeting transcript using OpenAI.
 
     Args:
         transcript_text: The full transcript text
         application_name: Optional application name for context
+        app_id: Optional application id (for LLM cost attribution)
 
     Returns:
         Dict with structure: {
@@ -133,14 +37,6 @@ def extract_answers_from_transcript(transcript_text: str, application_name: str
         }
     """
 
-    # Flatten all questions
-    all_questions = []
-    question_to_block = {}
-    for block, questions in MASTER_QUESTIONS.items():
-        for q in questions:
-            all_questions.append(q)
-            question_to_block[q] = block
-
     # Create prompt
     prompt = f"""You are an expert consultant analyzing application assessment meeting transcripts.
 
@@ -152,7 +48,7 @@ TRANSCRIPT:
 {transcript_text[:15000]}  # Limit to ~15k chars to avoid token limits
 
 QUESTIONS TO ANSWER:
-{json.dumps(all_questions, indent=2)}
+{_QUESTIONS_JSON}
 
 For each question:
 1. If the transcript contains information to answer it, extract the answer
@@ -184,22 +80,24 @@ Return ONLY valid JSON, no other text.
 """
 
     try:
-        response = client.chat.completions.create(
+        response = get_backend().chat(
             model="gpt-4o-mini",  # Cost-effective model with excellent performance
             messages=[
                 {"role": "system", "content": "You are an expert application portfolio management consultant. You analyze transcripts deeply and extract structured information accurately."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
-            response_format={"type": "json_object"}
+            json_mode=True,
+            feature="extract_answers",
+            app_ids=[app_id] if app_id else None
         )
 
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response.content)
 
         # Add synergy block to each answer
         for answer in result.get("answers", []):
             question = answer.get("question", "")
-            answer["synergy_block"] = question_to_block.get(question, "Unknown")
+            answer["synergy_block"] = QUESTION_TO_BLOCK.get(question, "Unknown")
 
         return result
 
@@ -208,70 +106,7 @@ Return ONLY valid JSON, no other text.
         return {"answers": [], "summary": "Error processing transcript", "error": str(e)}
 
 
-def suggest_scores(questionnaire_answers: Dict, transcript_answers: List[Dict]) -> Dict:
-    """
-    Suggest synergy block scores based on questionnaire and transcript answers.
-
-    Args:
-        questionnaire_answers: Dict of {question: answer} from original questionnaire
-        transcript_answers: List of extracted answers from transcripts
-
-    Returns:
-        Dict with structure: {
-            "scores": {
-                "Block Name": {
-                    "score": 1-5,
-                    "confidence": 0.0-1.0,
-                    "rationale": "explanation"
-                }
-            }
-        }
-    """
-
-    # Combine all answers and track which blocks have data
-    combined_answers = []
-    blocks_with_data = set()
-
-    for question, answer_obj in questionnaire_answers.items():
-        answer_text = answer_obj.get("a", "")
-        if answer_text and answer_text.strip():
-            combined_answers.append({
-                "question": question,
-                "answer": answer_text,
-                "source": "questionnaire"
-            })
-            # Find which block this question belongs to
-            for block_name, questions in MASTER_QUESTIONS.items():
-                if question in questions:
-                    blocks_with_data.add(block_name)
-                    break
-
-    for ta in transcript_answers:
-        if ta.get("answer") and ta.get("confidence", 0) > 0.5:
-            combined_answers.append({
-                "question": ta.get("question", ""),
-                "answer": ta.get("answer", ""),
-                "source": "transcript",
-                "confidence": ta.get("confidence", 0)
-            })
-            # Find which block this question belongs to
-            question_text = ta.get("question", "")
-            for block_name, questions in MASTER_QUESTIONS.items():
-                if question_text in questions:
-                    blocks_with_data.add(block_name)
-                    break
-
-    # Log processing info
-    print(f"[AI_PROCESSOR] Preparing to call OpenAI for score suggestion...")
-    print(f"[AI_PROCESSOR] Blocks with data: {blocks_with_data}")
-    print(f"[AI_PROCESSOR] Total answers to process: {len(combined_answers)}")
-
-    # Create prompt
-    prompt = f"""You are an expert application portfolio management consultant using the APM Strategic Framework.
-
-Your task is to analyze all available answers and suggest scores (1-5) for each of the 8 synergy blocks.
-
-SYNERGY BLOCKS AND THEIR MEANINGS:
+SCORING_RUBRIC = """SYNERGY BLOCKS AND THEIR MEANINGS:
 1. Strategic Fit (Business): How well the application aligns with business strategy
    - 1: Completely misaligned
    - 2: Partially aligned
@@ -326,18 +161,144 @@ SYNERGY BLOCKS AND THEIR MEANINGS:
    - 2: Reactive
    - 3: Defined
    - 4: Proactive
-   - 5: World-class
+   - 5: World-class"""
 
-AVAILABLE ANSWERS:
-{json.dumps(combined_answers, indent=2)[:10000]}
-
-SCORING GUIDELINES:
+SCORING_GUIDELINES = """SCORING GUIDELINES:
 - Only score blocks where you have sufficient information from the available answers
 - Analyze deeply: look for patterns, implicit signals, sentiment
 - Negative keywords (manual, legacy, obsolete, gaps, issues, poor) → lower scores
 - Positive keywords (automated, modern, strategic, optimized, satisfied) → higher scores
 - Be contextual: "stable" might be good for Architecture but "stable usage" might be neutral for User Value
-- Provide detailed rationale for each score based on the evidence
+- Provide detailed rationale for each score based on the evidence"""
+
+SCORING_SYSTEM_MESSAGE = "You are an expert application portfolio management consultant with deep experience in IT assessment and scoring frameworks."
+
+# Answers JSON is truncated to this many characters per application
+MAX_ANSWERS_CHARS = 10000
+
+NO_DATA_SCORE = {
+    "score": 2,
+    "confidence": 0.2,
+    "rationale": "⚠️ NO DATA - Conservative score assigned due to lack of responses. Manual review recommended."
+}
+
+def _collect_answers(questionnaire_answers: Dict, transcript_answers: List[Dict]) -> Tuple[List[Dict], set]:
+    """Combine questionnaire and transcript answers and track which blocks have data."""
+    combined_answers = []
+    blocks_with_data = set()
+
+    for question, answer_obj in questionnaire_answers.items():
+        answer_text = answer_obj.get("a", "")
+        if answer_text and answer_text.strip():
+            combined_answers.append({
+                "question": question,
+                "answer": answer_text,
+                "source": "questionnaire"
+            })
+            if question in QUESTION_TO_BLOCK:
+                blocks_with_data.add(QUESTION_TO_BLOCK[question])
+
+    for ta in transcript_answers:
+        if ta.get("answer") and ta.get("confidence", 0) > 0.5:
+            question_text = ta.get("question", "")
+            combined_answers.append({
+                "question": question_text,
+                "answer": ta.get("answer", ""),
+                "source": "transcript",
+                "confidence": ta.get("confidence", 0)
+            })
+            if question_text in QUESTION_TO_BLOCK:
+                blocks_with_data.add(QUESTION_TO_BLOCK[question_text])
+
+    return combined_answers, blocks_with_data
+
+
+def _apply_no_data_overrides(scores: Dict, blocks_with_data: set) -> List[str]:
+    """Replace scores of blocks without any answers by the conservative default."""
+    blocks_overridden = []
+    for block_name in SYNERGY_BLOCKS.keys():
+        if block_name not in blocks_with_data:
+            scores[block_name] = dict(NO_DATA_SCORE)
+            blocks_overridden.append(block_name)
+    return blocks_overridden
+
+
+def _validate_scores(scores, blocks=None) -> bool:
+    """Check that a model response holds a usable score for every given block (default: all blocks).
+
+    Blocks without data are replaced by the no-data default afterwards, so they need not be valid.
+    """
+    if not isinstance(scores, dict):
+        return False
+    for block_name in (SYNERGY_BLOCKS.keys() if blocks is None else blocks):
+        entry = scores.get(block_name)
+        if not isinstance(entry, dict):
+            return False
+        score = entry.get("score")
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not 1 <= score <= 5:
+            return False
+        confidence = entry.get("confidence", 0.5)
+        if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
+            return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of prompt tokens of a text (tiktoken if available, else ~4 chars/token)."""
+    encoder = _get_token_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return len(text) // 4 + 1
+
+
+def suggest_scores(questionnaire_answers: Dict, transcript_answers: List[Dict], app_id: str = None) -> Dict:
+    """
+    Suggest synergy block scores based on questionnaire and transcript answers.
+
+    Args:
+        questionnaire_answers: Dict of {question: answer} from original questionnaire
+        transcript_answers: List of extracted answers from transcripts
+        app_id: Optional application id (for LLM cost attribution)
+
+    Returns:
+        Dict with structure: {
+            "scores": {
+                "Block Name": {
+                    "score": 1-5,
+                    "confidence": 0.0-1.0,
+                    "rationale": "explanation"
+                }
+            }
+        }
+    """
+
+    combined_answers, blocks_with_data = _collect_answers(questionnaire_answers, transcript_answers)
+
+    # Log processing info
+    print(f"[AI_PROCESSOR] Preparing to call OpenAI for score suggestion...")
+    print(f"[AI_PROCESSOR] Blocks with data: {blocks_with_data}")
+    print(f"[AI_PROCESSOR] Total answers to process: {len(combined_answers)}")
+
+    # Create prompt
+    prompt = f"""You are an expert application portfolio management consultant using the APM Strategic Framework.
+
+Your task is to analyze all available answers and suggest scores (1-5) for each of the 8 synergy blocks.
+
+{SCORING_RUBRIC}
+
+AVAILABLE ANSWERS:
+{json.dumps(combined_answers, indent=2)[:MAX_ANSWERS_CHARS]}
+
+{SCORING_GUIDELINES}
 
 Output format (JSON):
 {{
@@ -356,37 +317,30 @@ Return ONLY valid JSON, no other text.
 
     try:
         print(f"[AI_PROCESSOR] 🤖 Calling OpenAI API (gpt-4o-mini)...")
-        import time
         start_time = time.time()
 
-        response = client.chat.completions.create(
+        response = get_backend().chat(
             model="gpt-4o-mini",  # Cost-effective model with excellent performance
             messages=[
-                {"role": "system", "content": "You are an expert application portfolio management consultant with deep experience in IT assessment and scoring frameworks."},
+                {"role": "system", "content": SCORING_SYSTEM_MESSAGE},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
-            response_format={"type": "json_object"}
+            json_mode=True,
+            feature="suggest_scores",
+            app_ids=[app_id] if app_id else None
         )
 
         elapsed_time = time.time() - start_time
         print(f"[AI_PROCESSOR] ✅ OpenAI response received in {elapsed_time:.2f}s")
 
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response.content)
         print(f"[AI_PROCESSOR] Scores generated for {len(result.get('scores', {}))} blocks")
 
         # Override scores for blocks with no data
         blocks_overridden = []
         if "scores" in result:
-            for block_name in SYNERGY_BLOCKS.keys():
-                if block_name not in blocks_with_data:
-                    # No data available for this block - assign conservative defaults
-                    result["scores"][block_name] = {
-                        "score": 2,
-                        "confidence": 0.2,
-                        "rationale": "⚠️ NO DATA - Conservative score assigned due to lack of responses. Manual review recommended."
-                    }
-                    blocks_overridden.append(block_name)
+            blocks_overridden = _apply_no_data_overrides(result["scores"], blocks_with_data)
 
         if blocks_overridden:
             print(f"[AI_PROCESSOR] ⚠️  Overridden {len(blocks_overridden)} blocks with no data: {blocks_overridden}")
@@ -409,6 +363,174 @@ Return ONLY valid JSON, no other text.
         }
 
 
+def _plan_score_batches(prepared: List[Dict], token_budget: int, max_apps_per_batch: int) -> List[List[Dict]]:
+    """Greedily pack applications into batches whose answer payload fits the token budget."""
+    header_tokens = estimate_tokens(SCORING_RUBRIC + SCORING_GUIDELINES) + 300
+    available = max(token_budget - header_tokens, 1)
+
+    batches, current, current_tokens = [], [], 0
+    for item in prepared:
+        if current and (current_tokens + item["tokens"] > available or len(current) >= max_apps_per_batch):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += item["tokens"]
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _score_batch(batch: List[Dict]) -> Dict[str, Dict]:
+    """Score several applications in one request. Returns {app_id: scores} for valid entries only."""
+    payload = "\n\n".join(
+        f"### APPLICATION app_id={item['app_id']}\n{item['answers_json']}" for item in batch
+    )
+
+    prompt = f"""You are an expert application portfolio management consultant using the APM Strategic Framework.
+
+Your task is to analyze the available answers of EACH application below independently and suggest scores (1-5) for each of the 8 synergy blocks per application.
+Never mix evidence between applications.
+
+{SCORING_RUBRIC}
+
+{SCORING_GUIDELINES}
+
+APPLICATIONS AND THEIR AVAILABLE ANSWERS:
+{payload}
+
+Output format (JSON):
+{{
+  "results": [
+    {{
+      "app_id": "the app_id given above",
+      "scores": {{
+        "Strategic Fit": {{
+          "score": 1-5,
+          "confidence": 0.0-1.0,
+          "rationale": "detailed explanation considering the answers"
+        }},
+        ... (repeat for all 8 blocks)
+      }}
+    }},
+    ... (one entry per application, {len(batch)} in total)
+  ]
+}}
+
+Return ONLY valid JSON, no other text.
+"""
+
+    response = get_backend().chat(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": SCORING_SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        json_mode=True,
+        feature="suggest_scores_batch",
+        app_ids=[item["app_id"] for item in batch]
+    )
+
+    result = json.loads(response.content)
+    blocks_by_app = {item["app_id"]: item["blocks_with_data"] for item in batch}
+    valid = {}
+    for entry in result.get("results", []) if isinstance(result, dict) else []:
+        if not isinstance(entry, dict):
+            continue
+        app_id = str(entry.get("app_id", ""))
+        if (app_id in blocks_by_app and app_id not in valid
+                and _validate_scores(entry.get("scores"), blocks_by_app[app_id])):
+            valid[app_id] = entry["scores"]
+    return valid
+
+
+def suggest_scores_batch(apps: List[Dict], token_budget: int = 24000, max_apps_per_batch: int = 8,
+                         max_workers: int = 4, progress_callback=None) -> Dict[str, Dict]:
+    """
+    Suggest synergy block scores for many applications with batched OpenAI requests.
+
+    Several applications share one prompt (the block definitions are sent once per batch),
+    packed under a token budget. Each batch response is validated per application; apps
+    missing from the response or with invalid scores fall back to single-app suggest_scores.
+
+    Args:
+        apps: List of {"app_id": str, "questionnaire_answers": Dict, "transcript_answers": List[Dict]}
+        token_budget: Approximate prompt token budget per batch request
+        max_apps_per_batch: Maximum number of applications packed into one request
+        max_workers: Number of batch requests sent concurrently
+        progress_callback: Optional callable(done, total) called as applications complete
+
+    Returns:
+        Dict of {app_id: {"scores": {...}}} with the same per-app structure as suggest_scores
+    """
+    if not apps:
+        return {}
+
+    prepared = []
+    for app in apps:
+        questionnaire_answers = app.get("questionnaire_answers") or {}
+        transcript_answers = app.get("transcript_answers") or []
+        combined_answers, blocks_with_data = _collect_answers(questionnaire_answers, transcript_answers)
+        answers_json = json.dumps(combined_answers, indent=1)[:MAX_ANSWERS_CHARS]
+        prepared.append({
+            "app_id": str(app["app_id"]),
+            "questionnaire_answers": questionnaire_answers,
+            "transcript_answers": transcript_answers,
+            "blocks_with_data": blocks_with_data,
+            "answers_json": answers_json,
+            "tokens": estimate_tokens(answers_json) + 20
+        })
+
+    batches = _plan_score_batches(prepared, token_budget, max_apps_per_batch)
+    print(f"[AI_PROCESSOR] Batched score suggestion: {len(prepared)} apps in {len(batches)} requests")
+
+    results = {}
+    done = 0
+    start_time = time.time()
+
+    def run_batch(batch):
+        try:
+            return batch, _score_batch(batch)
+        except Exception as e:
+            print(f"[AI_PROCESSOR] ⚠️  Batch of {len(batch)} apps failed: {e}")
+            return batch, {}
+
+    def run_single(item):
+        return suggest_scores(item["questionnaire_answers"], item["transcript_answers"], app_id=item["app_id"])
+
+    def app_done(app_id, result):
+        nonlocal done
+        results[app_id] = result
+        done += 1
+        if progress_callback:
+            progress_callback(done, len(prepared))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+        pending = {executor.submit(run_batch, batch) for batch in batches}
+        single_futures = {}  # future -> app_id of the single-app fallback calls
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in single_futures:
+                    app_done(single_futures[future], future.result())
+                    continue
+                batch, valid = future.result()
+                for item in batch:
+                    scores = valid.get(item["app_id"])
+                    if scores is None:
+                        # Fall back to a single-app call (on the pool, next to the remaining batches)
+                        print(f"[AI_PROCESSOR] ↩️  Falling back to single-app scoring for {item['app_id']}")
+                        fallback = executor.submit(run_single, item)
+                        single_futures[fallback] = item["app_id"]
+                        pending.add(fallback)
+                    else:
+                        _apply_no_data_overrides(scores, item["blocks_with_data"])
+                        app_done(item["app_id"], {"scores": scores})
+
+    print(f"[AI_PROCESSOR] ✅ Batched score suggestion complete in {time.time() - start_time:.2f}s")
+    return results
+
+
 def generate_insights(applications_data: List[Dict]) -> List[Dict]:
     """
     Generate portfolio-wide insights using OpenAI.
@@ -474,17 +596,18 @@ Return ONLY valid JSON, no other text.
 """
 
     try:
-        response = client.chat.completions.create(
+        response = get_backend().chat(
             model="gpt-4o-mini",  # Cost-effective model with excellent performance
             messages=[
                 {"role": "system", "content": "You are a senior technology strategy consultant with expertise in application portfolio management and IT modernization."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.5,
-            response_format={"type": "json_object"}
+            json_mode=True,
+            feature="generate_insights"
         )
 
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response.content)
         return result.get("insights", [])
 
     except Exception as e:
@@ -492,7 +615,7 @@ Return ONLY valid JSON, no other text.
         return []
 
 
-def answer_question(question: str, context_data: Dict) -> Tuple[str, List[str]]:
+def answer_question(question: str, context_data: Dict) -> Tuple[str, List[str], int]:
     """
     Answer a user question about the portfolio using RAG approach.
 
@@ -501,7 +624,10 @@ def answer_question(question: str, context_data: Dict) -> Tuple[str, List[str]]:
         context_data: Relevant context (applications, answers, scores)
 
     Returns:
-        Tuple of (answer, sources)
+        Tuple of (answer, sources, response_time_ms)
+
+    Raises:
+        Exception: The LLM call failed (there is no answer to show or to cache)
     """
 
     # Prepare context - MUCH more generous limit for rich context
@@ -568,18 +694,19 @@ Sources:
     try:
         start_time = time.time()
 
-        response = client.chat.completions.create(
+        response = get_backend().chat(
             model="gpt-4o-mini",  # Cost-effective model with excellent performance
             messages=[
                 {"role": "system", "content": "You are a senior Avangrid business and technical consultant with 15+ years of experience in electric/gas utility operations and application portfolio management. You provide strategic, context-rich insights based on stakeholder interviews and operational knowledge. You NEVER lead with scores - you lead with business impact, technical reality, and user needs. You never make up information."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.3  # Slightly higher for more natural consulting voice
+            temperature=0.3,  # Slightly higher for more natural consulting voice
+            feature="answer_question"
         )
 
         response_time = int((time.time() - start_time) * 1000)
 
-        answer_text = response.choices[0].message.content
+        answer_text = response.content
 
         # Extract sources (simple parsing)
         sources = []
@@ -595,7 +722,7 @@ Sources:
 
     except Exception as e:
         print(f"Error answering question: {e}")
-        return f"Error processing question: {e}", [], 0
+        raise
 
 
 def calculate_bvi_thi(scores: Dict, custom_weights: Dict = None) -> Tuple[float, float]:
@@ -604,24 +731,21 @@ def calculate_bvi_thi(scores: Dict, custom_weights: Dict = None) -> Tuple[float,
 
     Args:
         scores: Dict of {block_name: score}
-        custom_weights: Optional dict of {block_name: weight}. If None, uses SYNERGY_BLOCKS weights.
+        custom_weights: Optional dict of {block_name: weight}. If None, uses the default block weights.
 
     Returns:
         Tuple of (BVI, THI)
     """
 
-    # Use custom weights if provided, otherwise use default SYNERGY_BLOCKS
-    weights = custom_weights if custom_weights else SYNERGY_BLOCKS
-
-    business_blocks = ["Strategic Fit", "Business Efficiency", "User Value", "Financial Value"]
-    tech_blocks = ["Architecture", "Operational Risk", "Maintainability", "Support Quality"]
+    # Use custom weights if provided, otherwise the default block weights
+    weights = custom_weights if custom_weights else DEFAULT_WEIGHTS
 
     # Calculate BVI (Business Value Index) using weighted average
     bvi_sum = 0
     bvi_weight_sum = 0
-    for block in business_blocks:
+    for block in BUSINESS_BLOCKS:
         score = scores.get(block, 1)
-        weight = weights.get(block, {}).get('Weight', 25) if isinstance(weights.get(block), dict) else weights.get(block, 25)
+        weight = weights.get(block, {}).get('Weight', 25) if isinstance(weights.get(block), Mapping) else weights.get(block, 25)
         bvi_sum += score * weight
         bvi_weight_sum += weight
 
@@ -630,9 +754,9 @@ def calculate_bvi_thi(scores: Dict, custom_weights: Dict = None) -> Tuple[float,
     # Calculate THI (Technical Health Index) using weighted average
     thi_sum = 0
     thi_weight_sum = 0
-    for block in tech_blocks:
+    for block in TECH_BLOCKS:
         score = scores.get(block, 1)
-        weight = weights.get(block, {}).get('Weight', 25) if isinstance(weights.get(block), dict) else weights.get(block, 25)
+        weight = weights.get(block, {}).get('Weight', 25) if isinstance(weights.get(block), Mapping) else weights.get(block, 25)
         thi_sum += score * weight
         thi_weight_sum += weight
 
@@ -0,0 +1,134 @@
+"""
+Answer matrix: applications × questions
+Questionnaire answers, transcript answers and David's notes are pivoted once per data revision into
+one layer per source plus a merged view (David's notes > transcripts > questionnaire), served from
+memory: one application's answers are a precomputed dict. Used by the Q&A context, the Analyses
+insights and the PowerPoint export.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from database import Application, QuestionnaireAnswer, TranscriptAnswer, DavidNote, get_data_revision
+from framework import ALL_QUESTIONS, QUESTION_INDEX
+
+SOURCES = ('questionnaire', 'transcript', 'note')  # Increasing precedence
+MERGED = 'merged'
+
+_cache_lock = threading.Lock()
+_cache: Dict = {"key": None, "matrix": None}
+
+
+class AnswerMatrix:
+    """Answers of every application to every question, per source and merged"""
+
+    def __init__(self, revision: int, app_ids: List[str], app_names: List[str], questions: List[str],
+                 rows: Dict[str, Dict[str, Dict[str, str]]], confidence: Dict[str, Dict[str, float]],
+                 insights: Dict[str, str]):
+        self.revision = revision
+        self.app_ids = app_ids
+        self.app_names = dict(zip(app_ids, app_names))  # app_id -> name, by name
+        self.questions = questions  # Master questions first
+        self._rows = rows  # source -> app_id -> {question: answer}
+        self._confidence = confidence  # app_id -> {question: confidence of the transcript answer}
+        self._insights = insights
+        self._sources = {}  # app_id -> {question: winning source}
+        self._merge()
+
+    def _merge(self):
+        merged = {}
+        for source in SOURCES:
+            for app_id, answers in self._rows[source].items():
+                merged_row = merged.setdefault(app_id, {})
+                app_sources = self._sources.setdefault(app_id, {})
+                for question, answer in answers.items():
+                    # A higher-precedence source only wins with an actual answer
+                    if answer or question not in merged_row:
+                        merged_row[question] = answer
+                        app_sources[question] = source
+        self._rows[MERGED] = merged
+
+    def answers(self, app_id: str, source: str = MERGED) -> Dict[str, str]:
+        """{question: answer} of one application (a copy)"""
+        return dict(self._rows[source].get(app_id, {}))
+
+    def answer(self, app_id: str, question: str, source: str = MERGED) -> Optional[str]:
+        return self._rows[source].get(app_id, {}).get(question)
+
+    def source_of(self, app_id: str, question: str) -> Optional[str]:
+        """Source of the merged answer"""
+        return self._sources.get(app_id, {}).get(question)
+
+    def confidence(self, app_id: str, question: str) -> Optional[float]:
+        """Extraction confidence of the transcript answer"""
+        return self._confidence.get(app_id, {}).get(question)
+
+    def count(self, app_id: str, source: str = MERGED) -> int:
+        return len(self._rows[source].get(app_id, {}))
+
+    def insight(self, app_id: str) -> str:
+        """David's key insights for the application"""
+        return self._insights.get(app_id, "")
+
+
+def _question_order(questions) -> List[str]:
+    # Master questions in questionnaire order, then any other question text
+    extra = sorted(q for q in questions if q not in QUESTION_INDEX)
+    return list(ALL_QUESTIONS) + extra
+
+
+def build_answer_matrix(session, revision: int = None) -> AnswerMatrix:
+    """Pivot all answers (three queries, no ORM objects)"""
+    if revision is None:
+        revision = get_data_revision(session)
+    apps = session.execute(select(Application.id, Application.name).order_by(Application.name)).all()
+
+    rows = {source: {} for source in SOURCES}
+    confidence: Dict[str, Dict[str, float]] = {}
+    insights: Dict[str, str] = {}
+    questions = set()
+
+    for app_id, question, answer in session.execute(
+        select(QuestionnaireAnswer.application_id, QuestionnaireAnswer.question_text, QuestionnaireAnswer.answer_text)
+        .order_by(QuestionnaireAnswer.created_at)
+    ):
+        if question:
+            rows['questionnaire'].setdefault(app_id, {})[question] = answer
+            questions.add(question)
+
+    # Several transcripts may answer the same question: the most recent answer wins
+    for app_id, question, answer, score in session.execute(
+        select(TranscriptAnswer.application_id, TranscriptAnswer.question_text, TranscriptAnswer.answer_text,
+               TranscriptAnswer.confidence_score)
+        .order_by(TranscriptAnswer.created_at)
+    ):
+        if question:
+            rows['transcript'].setdefault(app_id, {})[question] = answer
+            if score is not None:
+                confidence.setdefault(app_id, {})[question] = score
+            questions.add(question)
+
+    for app_id, question, answer, note_type in session.execute(
+        select(DavidNote.application_id, DavidNote.question_text, DavidNote.answer_text, DavidNote.note_type)
+        .order_by(DavidNote.created_at)
+    ):
+        if note_type == 'insight':
+            insights.setdefault(app_id, answer or "")
+        elif question:
+            rows['note'].setdefault(app_id, {})[question] = answer
+            questions.add(question)
+
+    return AnswerMatrix(revision, [app_id for app_id, _ in apps], [name for _, name in apps],
+                        _question_order(questions), rows, confidence, insights)
+
+
+def get_answer_matrix(session) -> AnswerMatrix:
+    """The answer matrix of the current data revision (built on first use after every data change)"""
+    key = (str(session.get_bind().url), get_data_revision(session))
+    with _cache_lock:
+        if _cache["key"] != key:
+            _cache["matrix"] = build_answer_matrix(session, key[1])
+            _cache["key"] = key
+        return _cache["matrix"]
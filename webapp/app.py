@@ -5,18 +5,14 @@ Modern web application for Application Portfolio Management
 
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from streamlit_option_menu import option_menu
 import uuid
-import io
 import os
 import sys
 import json
-from datetime import datetime, timezone
+import html
+import time
+from datetime import datetime, timezone, timedelta
 from typing import Dict
-import difflib
 
 # Ensure webapp directory is in Python path (needed for Streamlit Cloud)
 _WEBAPP_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -27,8 +23,18 @@ if _WEBAPP_DIR not in sys.path:
 from database import (
     get_session, close_session,
     Application, QuestionnaireAnswer, MeetingTranscript,
-    TranscriptAnswer, SynergyScore, Insight, QAHistory, CustomWeight
+    TranscriptAnswer, SynergyScore, Insight, QAHistory, CustomWeight, LLMCall,
+    get_data_revision
 )
+from qa_cache import find_cached_answer
+import ingestion
+from ingestion import find_matching_application, app_name_from_filename
+import text_extraction
+from transcript_dedup import TranscriptDedupIndex
+from upload_spool import UploadSpool
+import search_index
+import jobs
+from telemetry import record_llm_call
 from ai_processor import (
     extract_answers_from_transcript,
     suggest_scores,
@@ -37,29 +43,12 @@ from ai_processor import (
     calculate_bvi_thi,
     get_recommendation,
     get_subcategory_and_priority_detail,
-    extract_dependencies_info,
-    MASTER_QUESTIONS,
-    SYNERGY_BLOCKS
+    extract_dependencies_info
 )
+from framework import MASTER_QUESTIONS, SYNERGY_BLOCKS, BUSINESS_BLOCKS, TECH_BLOCKS, DEFAULT_WEIGHTS
 
-# Import existing parsing logic
-try:
-    import openpyxl
-    from openpyxl import load_workbook, Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    from openpyxl.utils import get_column_letter
-    from openpyxl.chart import ScatterChart, Series, Reference
-    from openpyxl.chart.label import DataLabelList
-    from openpyxl.chart.shapes import GraphicalProperties
-    from openpyxl.drawing.line import LineProperties
-    from openpyxl.chart.axis import ChartLines
-    from openpyxl.workbook.defined_name import DefinedName
-    from openpyxl.worksheet.datavalidation import DataValidation
-    from openpyxl.formatting.rule import FormulaRule
-    from PyPDF2 import PdfReader
-    from docx import Document
-except ImportError:
-    pass
+# Heavy libraries (pandas, plotly, openpyxl, PyPDF2, docx, matplotlib, pptx) are imported inside
+# the functions that use them so that app startup and reruns stay fast
 
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
@@ -79,7 +68,7 @@ def load_weights_from_db():
             if saved:
                 st.session_state.custom_weights = {w.block_name: w.weight for w in saved}
             else:
-                st.session_state.custom_weights = {block: info['Weight'] for block, info in SYNERGY_BLOCKS.items()}
+                st.session_state.custom_weights = dict(DEFAULT_WEIGHTS)
         finally:
             close_session(session)
 
@@ -107,7 +96,7 @@ def save_weights_to_db():
 def get_current_weights():
     """Get current weights from session_state or defaults"""
     load_weights_from_db()
-    return st.session_state.get('custom_weights', {block: info['Weight'] for block, info in SYNERGY_BLOCKS.items()})
+    return st.session_state.get('custom_weights', dict(DEFAULT_WEIGHTS))
 
 
 # ==================== ULTRA MODERN CSS - AVANGRID DESIGN SYSTEM ====================
@@ -592,426 +581,19 @@ if 'chat_history' not in st.session_state:
 
 # ==================== HELPER FUNCTIONS ====================
 
-def _parse_meetings_sheet(wb):
-    """Parse the Meetings sheet to extract Business Owner and IT Owner per application.
-    Returns dict: {normalized_app_name: {'business_owner': str, 'it_owner': str, 'raw_name': str}}
-    """
-    meetings_data = {}
-    if 'Meetings' not in wb.sheetnames:
-        return meetings_data
-
-    ws = wb['Meetings']
-    # Find header row and column indices
-    header_row = None
-    col_app_name = None
-    col_business_owner = None
-    col_it_owner = None
-
-    for row in ws.iter_rows(max_row=5):
-        for idx, cell in enumerate(row):
-            val = str(cell.value).lower().strip() if cell.value else ""
-            if 'application name' in val or val == 'application':
-                col_app_name = idx
-                header_row = cell.row
-            elif 'business owner' in val:
-                col_business_owner = idx
-            elif 'it owner' in val:
-                col_it_owner = idx
-
-    if col_app_name is None or header_row is None:
-        return meetings_data
-
-    for row in ws.iter_rows(min_row=header_row + 1, max_row=ws.max_row):
-        app_name_cell = row[col_app_name].value if col_app_name < len(row) else None
-        if not app_name_cell:
-            continue
-        app_name = str(app_name_cell).strip()
-        if not app_name:
-            continue
-
-        bo = ""
-        it_o = ""
-        if col_business_owner is not None and col_business_owner < len(row):
-            bo = str(row[col_business_owner].value or "").strip()
-        if col_it_owner is not None and col_it_owner < len(row):
-            it_o = str(row[col_it_owner].value or "").strip()
-
-        normalized = normalize_app_name(app_name)
-        meetings_data[normalized] = {
-            'business_owner': bo,
-            'it_owner': it_o,
-            'raw_name': app_name
-        }
-
-    return meetings_data
-
-
 def parse_questionnaire_excel(uploaded_file):
-    """Parse uploaded questionnaire Excel file (from existing code)"""
+    """Parse uploaded questionnaire Excel file"""
     try:
-        wb = openpyxl.load_workbook(uploaded_file, data_only=True)
-        applications = []
-
-        # Parse Meetings sheet for Business Owner / IT Owner data
-        meetings_data = _parse_meetings_sheet(wb)
-
-        for sheet_name in wb.sheetnames:
-            # Skip template/metadata sheets
-            if sheet_name.lower() in ['index', 'introduction', 'methodology', 'user guide',
-                                       'calculator', 'dashboard', 'strategic roadmap',
-                                       'application groups', 'value chain', 'sheet1',
-                                       'meetings', 'opcos', 'to delete', 'questions template']:
-                continue
-
-            ws = wb[sheet_name]
-
-            # Find columns
-            header_row = None
-            for row in ws.iter_rows(max_row=10):
-                cells = [str(cell.value).lower() if cell.value else "" for cell in row]
-                if any('question' in c for c in cells):
-                    header_row = row
-                    break
-
-            if not header_row:
-                continue
-
-            # Map columns
-            col_map = {}
-            for idx, cell in enumerate(header_row):
-                val = str(cell.value).lower() if cell.value else ""
-                if 'question' in val:
-                    col_map['question'] = idx
-                elif 'answer' in val or 'response' in val:
-                    col_map['answer'] = idx
-                elif 'score' in val:
-                    col_map['score'] = idx
-
-            if 'question' not in col_map or 'answer' not in col_map:
-                continue
-
-            # Extract Q&A
-            app_data = {
-                'name': sheet_name.strip(),
-                'safe_name': sheet_name[:31].strip(),
-                'is_green': ws.sheet_properties.tabColor is not None and
-                           hasattr(ws.sheet_properties.tabColor, 'rgb') and
-                           ws.sheet_properties.tabColor.rgb and
-                           'FF00FF00' in str(ws.sheet_properties.tabColor.rgb).upper(),
-                'answers': {}
-            }
-
-            for row in ws.iter_rows(min_row=header_row[0].row + 1):
-                question = row[col_map['question']].value
-                answer = row[col_map['answer']].value
-                score = row[col_map.get('score', -1)].value if 'score' in col_map else None
-
-                if question and str(question).strip():
-                    question_text = str(question).strip()
-                    answer_text = str(answer).strip() if answer else ""
-
-                    # Fuzzy match to master questions
-                    best_match = None
-                    best_ratio = 0
-                    for block, questions in MASTER_QUESTIONS.items():
-                        for mq in questions:
-                            ratio = difflib.SequenceMatcher(None, question_text.lower(), mq.lower()).ratio()
-                            if ratio > best_ratio:
-                                best_ratio = ratio
-                                best_match = (mq, block)
-
-                    if best_ratio > 0.75 and best_match:
-                        matched_question, synergy_block = best_match
-                        app_data['answers'][matched_question] = {
-                            'a': answer_text,
-                            's': score if score else None,
-                            'block': synergy_block
-                        }
-
-            # Inject Business Owner / IT Owner from Meetings sheet
-            if meetings_data:
-                norm_sheet = normalize_app_name(sheet_name)
-                # Try exact normalized match first, then fuzzy
-                owner_info = meetings_data.get(norm_sheet)
-                if not owner_info:
-                    # Fuzzy match against Meetings app names
-                    best_ratio = 0
-                    best_key = None
-                    for mk in meetings_data:
-                        ratio = difflib.SequenceMatcher(None, norm_sheet, mk).ratio()
-                        if ratio > best_ratio:
-                            best_ratio = ratio
-                            best_key = mk
-                    if best_ratio > 0.75 and best_key:
-                        owner_info = meetings_data[best_key]
-
-                if owner_info:
-                    if owner_info['business_owner']:
-                        app_data['answers']["Who is the Business Owner of this application?"] = {
-                            'a': owner_info['business_owner'],
-                            's': None,
-                            'block': 'Strategic Fit'
-                        }
-                    if owner_info['it_owner']:
-                        app_data['answers']["Who is the IT Owner of this application?"] = {
-                            'a': owner_info['it_owner'],
-                            's': None,
-                            'block': 'Strategic Fit'
-                        }
-
-            if app_data['answers']:
-                applications.append(app_data)
-
-        return applications
-
+        return ingestion.parse_questionnaire_excel(uploaded_file)
     except Exception as e:
         st.error(f"Error parsing questionnaire: {e}")
         return []
 
 
-def normalize_app_name(name: str) -> str:
-    """Normalize application name for matching"""
-    import re
-
-    # Remove extra spaces, convert to lowercase
-    normalized = ' '.join(name.strip().lower().split())
-
-    # Remove parentheses and their content (e.g., "(SCG & CNG)" → "")
-    normalized = re.sub(r'\([^)]*\)', '', normalized)
-
-    # Remove common words that don't affect app identity
-    noise_words = ['remote', 'local', 'the', 'a', 'an']
-    for word in noise_words:
-        normalized = normalized.replace(f' {word} ', ' ')
-
-    # Remove common separators for comparison
-    normalized = normalized.replace(' - ', ' ').replace('-', ' ')
-    normalized = normalized.replace(' & ', ' ').replace('&', ' ')
-
-    # Remove special characters but keep alphanumeric and spaces
-    normalized = ''.join(c if c.isalnum() or c.isspace() else ' ' for c in normalized)
-
-    # Remove extra spaces again
-    normalized = ' '.join(normalized.split())
-    return normalized
-
-
-def get_significant_tokens(name: str) -> tuple:
-    """
-    Extract significant tokens from app name
-    Returns: (primary_tokens, all_tokens)
-    Primary tokens are from main part (before parentheses), more important for matching
-    """
-    import re
-
-    # Convert to lowercase and split
-    text = name.lower()
-
-    # Separate primary (before parens) and secondary (in parens) content
-    text_no_paren = re.sub(r'\([^)]*\)', '', text)
-    paren_content = re.findall(r'\(([^)]+)\)', text)
-
-    # Expanded noise words - common descriptive terms that don't identify the app
-    noise = {
-        'the', 'a', 'an', 'and', 'or', 'of', 'in', 'on', 'at', 'to', 'for', 'with', 'by',
-        'file', 'app', 'application', 'system', 'tool', 'software', 'ms', 'project',
-        'database', 'db', 'program', 'service'
-    }
-
-    # Extract primary tokens (before parentheses) - most important
-    primary_tokens = set(re.findall(r'\w+', text_no_paren))
-    primary_tokens = {t for t in primary_tokens if t not in noise and len(t) >= 2}
-
-    # Extract all tokens including parentheses content
-    all_text = text_no_paren + ' ' + ' '.join(paren_content)
-    all_tokens = set(re.findall(r'\w+', all_text))
-    all_tokens = {t for t in all_tokens if t not in noise and len(t) >= 2}
-
-    return primary_tokens, all_tokens
-
-
-def find_matching_application(file_app_name: str, app_dict: dict) -> tuple:
-    """
-    Find matching application using smart matching algorithm
-    Returns: (matched_app, match_type) or (None, None)
-
-    Match types: 'exact', 'normalized', 'substring', 'token', 'fuzzy', 'fuzzy_normalized'
-    """
-    file_app_lower = file_app_name.strip().lower()
-
-    # Strategy 1: Exact match (case-insensitive)
-    if file_app_lower in app_dict:
-        return app_dict[file_app_lower], 'exact'
-
-    # Strategy 2: Normalized match (remove dashes and extra spaces)
-    file_normalized = normalize_app_name(file_app_name)
-
-    for app_name_lower, app in app_dict.items():
-        app_normalized = normalize_app_name(app_name_lower)
-        if file_normalized == app_normalized:
-            return app, 'normalized'
-
-    # Strategy 3: Substring containment - check if file name contains an app name
-    # or vice versa. Prefer longest match to avoid "Bentley" matching when
-    # "Bentley - PLS-CADD" exists.
-    substring_matches = []
-    for app_name_lower, app in app_dict.items():
-        # Check both directions
-        if app_name_lower in file_app_lower or file_app_lower in app_name_lower:
-            # Score by length of overlap (prefer longer/more specific matches)
-            overlap_len = min(len(app_name_lower), len(file_app_lower))
-            substring_matches.append((app, overlap_len, app_name_lower))
-
-    if substring_matches:
-        # Pick the longest (most specific) match
-        substring_matches.sort(key=lambda x: x[1], reverse=True)
-        return substring_matches[0][0], 'substring'
-
-    # Strategy 4: Token-based matching - prioritize primary tokens
-    file_primary, file_all = get_significant_tokens(file_app_name)
-
-    best_match = None
-    best_score = 0
-
-    for app_name_lower, app in app_dict.items():
-        app_primary, app_all = get_significant_tokens(app_name_lower)
-
-        if not file_primary or not app_primary:
-            continue
-
-        # First check primary tokens match (more important)
-        primary_intersection = len(file_primary & app_primary)
-        primary_union = len(file_primary | app_primary)
-        primary_similarity = primary_intersection / primary_union if primary_union > 0 else 0
-
-        # If primary tokens match well (>=80%), it's a strong match
-        if primary_similarity >= 0.8:
-            if primary_similarity > best_score:
-                best_score = primary_similarity
-                best_match = app
-            continue
-
-        # Otherwise, check all tokens with lower threshold
-        all_intersection = len(file_all & app_all)
-        all_union = len(file_all | app_all)
-        all_similarity = all_intersection / all_union if all_union > 0 else 0
-
-        if all_similarity > best_score and all_similarity >= 0.4:  # Lower threshold for all tokens
-            best_score = all_similarity
-            best_match = app
-
-    if best_match:
-        return best_match, 'token'
-
-    # Strategy 5: Fuzzy match using difflib (similarity > 80%)
-    matches = difflib.get_close_matches(
-        file_app_lower,
-        app_dict.keys(),
-        n=1,
-        cutoff=0.80
-    )
-
-    if matches:
-        return app_dict[matches[0]], 'fuzzy'
-
-    # Strategy 6: Try normalized fuzzy match
-    app_names_normalized = {normalize_app_name(k): v for k, v in app_dict.items()}
-
-    matches_normalized = difflib.get_close_matches(
-        file_normalized,
-        app_names_normalized.keys(),
-        n=1,
-        cutoff=0.80
-    )
-
-    if matches_normalized:
-        return app_names_normalized[matches_normalized[0]], 'fuzzy_normalized'
-
-    return None, None
-
-
-def read_transcript_file(uploaded_file) -> str:
-    """Read transcript from various file formats"""
-    try:
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-
-        if file_extension == 'txt':
-            return uploaded_file.getvalue().decode('utf-8')
-
-        elif file_extension == 'pdf':
-            pdf_reader = PdfReader(io.BytesIO(uploaded_file.getvalue()))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-
-        elif file_extension in ['docx', 'doc']:
-            doc = Document(io.BytesIO(uploaded_file.getvalue()))
-            text = "\n".join([para.text for para in doc.paragraphs])
-            return text
-
-        else:
-            st.warning(f"Unsupported file format: {file_extension}")
-            return ""
-
-    except Exception as e:
-        st.error(f"Error reading transcript file: {e}")
-        return ""
-
-
 def save_application_to_db(app_data: dict, session):
     """Save application and its answers to database"""
     try:
-        # Check if application exists
-        existing_app = session.query(Application).filter_by(name=app_data['name']).first()
-
-        if existing_app:
-            app = existing_app
-        else:
-            app = Application(
-                id=str(uuid.uuid4()),
-                name=app_data['name'],
-                safe_name=app_data.get('safe_name', app_data['name'][:31]),
-                is_green=app_data.get('is_green', False)
-            )
-            session.add(app)
-
-        # Save questionnaire answers
-        for question, answer_obj in app_data['answers'].items():
-            existing_answer = session.query(QuestionnaireAnswer).filter_by(
-                application_id=app.id,
-                question_text=question
-            ).first()
-
-            new_answer_text = answer_obj.get('a', '')
-
-            if not existing_answer:
-                # No answer exists - create new
-                qa = QuestionnaireAnswer(
-                    id=str(uuid.uuid4()),
-                    application_id=app.id,
-                    question_text=question,
-                    answer_text=new_answer_text,
-                    score=answer_obj.get('s'),
-                    synergy_block=answer_obj.get('block', 'Unknown')
-                )
-                session.add(qa)
-            else:
-                # Answer exists - check if incomplete (empty or very short)
-                is_incomplete = (
-                    not existing_answer.answer_text or
-                    len(existing_answer.answer_text.strip()) < 5
-                )
-
-                # Only update if existing answer is incomplete AND new answer has content
-                if is_incomplete and new_answer_text and len(new_answer_text.strip()) >= 5:
-                    existing_answer.answer_text = new_answer_text
-                    existing_answer.score = answer_obj.get('s')
-                    existing_answer.synergy_block = answer_obj.get('block', 'Unknown')
-
-        session.commit()
-        return app
-
+        return ingestion.save_application_to_db(app_data, session)
     except Exception as e:
         session.rollback()
         st.error(f"Error saving to database: {e}")
@@ -1366,6 +948,8 @@ def page_dashboard():
     # DEPRECATED - This page has been replaced by Introduction + Analyses
     st.warning("⚠️ This page has been deprecated. Please use Introduction or Analyses instead.")
     return
+    import pandas as pd
+    import plotly.express as px
     # Hero Section
     st.markdown("""
     <div style="margin-bottom: 2rem;">
@@ -1574,11 +1158,213 @@ def page_dashboard():
         close_session(session)
 
 
+# ==================== BACKGROUND JOBS ====================
+JOB_LABELS = {
+    "score_applications": "🤖 AI score calculation",
+    "process_transcripts": "🎙️ Transcript processing",
+    "export_excel": "📥 Portfolio Excel",
+    "export_pptx": "📊 Portfolio PowerPoint",
+}
+
+
+@st.cache_resource(show_spinner=False)
+def start_background_worker():
+    """Run queued jobs in a worker thread of the server process (once per process).
+    Set APM_EMBEDDED_WORKER=0 when dedicated `python worker.py` processes are used."""
+    if os.getenv("APM_EMBEDDED_WORKER", "1") == "0":
+        return None
+    from worker import start_embedded_worker
+    return start_embedded_worker()
+
+
+def track_job(group: str, job_id: str):
+    """Remember a job started from this browser session so its status is shown on the page"""
+    tracked = st.session_state.setdefault('tracked_jobs', {}).setdefault(group, [])
+    if job_id not in tracked:
+        tracked.append(job_id)
+
+
+def _job_summary(job: Dict) -> str:
+    result = job.get('result') or {}
+    if job['job_type'] == 'score_applications':
+        return f"Auto-calculated scores for {result.get('scored', 0)} applications"
+    if job['job_type'] == 'process_transcripts':
+        summary = (f"Processed {result.get('processed', 0)} transcript(s), "
+                   f"skipped {result.get('skipped', 0)}, errors {result.get('errors', 0)}")
+        if result.get('scores_recalculated'):
+            summary += f" · recalculated scores for {result['scores_recalculated']} applications"
+        return summary
+    if result.get('empty'):
+        return "No application data available."
+    return f"Ready ({result.get('size_bytes', 0) / 1024:,.0f} KB{', from cache' if result.get('cached') else ''})"
+
+
+def _render_job(job: Dict, key_prefix: str):
+    label = JOB_LABELS.get(job['job_type'], job['job_type'])
+    if job['status'] in jobs.ACTIVE_STATUSES:
+        st.progress(job['progress'], text=f"{label}: {job['progress_message'] or job['status']}")
+    elif job['status'] == jobs.JOB_SUCCEEDED:
+        st.success(f"{label}: {_job_summary(job)}")
+        for file_result in (job.get('result') or {}).get('files', []):
+            if file_result.get('status') == 'error':
+                st.error(f"❌ {file_result['file']}: {file_result.get('error')}")
+        if job.get('artifact_name'):
+            artifact_name, artifact = jobs.get_job_artifact(job['id'])
+            if artifact is None:
+                st.info(f"{artifact_name} is no longer in the export cache: generate it again to download it.")
+            else:
+                st.download_button(
+                    label=f"⬇️ Download {artifact_name}",
+                    data=artifact,
+                    file_name=artifact_name,
+                    width="stretch",
+                    key=f"{key_prefix}_download_{job['id']}"
+                )
+    else:
+        error = (job.get('error') or '').splitlines()
+        st.error(f"{label} failed after {job['attempts']} attempt(s): {error[0] if error else 'unknown error'}")
+
+
+@st.fragment(run_every=2)
+def _poll_jobs(group: str):
+    job_list = [job for job in map(jobs.get_job, st.session_state['tracked_jobs'][group]) if job]
+    for job in job_list:
+        _render_job(job, group)
+    if not any(job['status'] in jobs.ACTIVE_STATUSES for job in job_list):
+        # Everything finished: refresh the whole page once (stops polling, shows new data)
+        st.rerun()
+
+
+def render_job_status(group: str):
+    """Status of the jobs started from this session for a page (polls while any is running)"""
+    job_ids = st.session_state.get('tracked_jobs', {}).get(group)
+    if not job_ids:
+        return
+
+    job_list = [job for job in map(jobs.get_job, job_ids) if job]
+    if any(job['status'] in jobs.ACTIVE_STATUSES for job in job_list):
+        _poll_jobs(group)
+    else:
+        for job in job_list:
+            _render_job(job, group)
+        if st.button("🧹 Clear finished jobs", key=f"{group}_clear_jobs"):
+            st.session_state['tracked_jobs'][group] = []
+            st.rerun()
+
+
+def _quick_upload_app_name(filename: str) -> str:
+    # Extract app name
+    if " - " in filename:
+        return filename.split(" - ")[0].strip()
+    # No separator - use filename without extension as app name
+    return filename.rsplit('.', 1)[0].strip()
+
+
+def store_uploaded_transcripts(uploaded_files, session, app_dict: dict, app_name_parser, on_progress) -> Dict:
+    """
+    Read, match and store uploaded transcripts, skipping exact and near duplicates of stored ones.
+    Returns counters, "duplicates" [(file, message)] and "to_process" {transcript_id: content_hash}.
+    """
+    report = {"saved": 0, "updated": 0, "errors": 0, "unmatched": 0, "duplicates": [], "to_process": {},
+              "extractions": []}
+    dedup_index = TranscriptDedupIndex.load(session, application_ids=[app.id for app in app_dict.values()])
+
+    with UploadSpool() as spool:
+        # Uploads are streamed to disk once and parsed from there (PDF/DOCX in parallel processes,
+        # previously extracted files from the text cache); results arrive one file at a time
+        spooled_files = spool.add_all(uploaded_files)
+        extractions = text_extraction.iter_extract(
+            [(f.name, f.path) for f in spooled_files], hashes=[f.sha256 for f in spooled_files]
+        )
+
+        for idx, (spooled, extraction) in enumerate(zip(spooled_files, extractions)):
+            spooled.release()
+            report['extractions'].append(extraction)
+            filename = spooled.name
+            try:
+                app_name_from_file = app_name_parser(filename)
+
+                # Find app using smart matching
+                matched_app, match_type = find_matching_application(app_name_from_file, app_dict)
+                if not matched_app:
+                    st.warning(f"⚠️ {filename}: Application '{app_name_from_file}' not found in database")
+                    report['unmatched'] += 1
+                    continue
+
+                if match_type != 'exact':
+                    st.info(f"ℹ️ {filename}: Matched to '{matched_app.name}' ({match_type})")
+
+                transcript_text = extraction.text
+                if not transcript_text:
+                    st.error(f"❌ {filename}: Could not read file{f' ({extraction.error})' if extraction.error else ''}")
+                    report['errors'] += 1
+                    continue
+
+                status, transcript, duplicate = ingestion.store_transcript(
+                    session, matched_app, filename, transcript_text, dedup_index
+                )
+                session.commit()
+
+                if duplicate:
+                    report['duplicates'].append((filename, ingestion.describe_duplicate(duplicate)))
+                elif status == ingestion.TRANSCRIPT_UPDATED:
+                    report['updated'] += 1
+                    st.info(f"🔄 {filename}: Content changed, previous extraction will be replaced")
+                else:
+                    report['saved'] += 1
+                if not transcript.processed:
+                    report['to_process'][transcript.id] = transcript.content_hash
+
+            except Exception as e:
+                session.rollback()
+                st.error(f"❌ {filename}: {str(e)}")
+                report['errors'] += 1
+            finally:
+                # The text is in the database now; only the statistics are kept for the report
+                extraction.text = ""
+                on_progress(idx + 1, len(spooled_files))
+
+    return report
+
+
+def render_duplicate_report(report: Dict):
+    """List uploaded files recognized as exact or near duplicates of stored transcripts, and extraction timings"""
+    if report['duplicates']:
+        with st.expander(f"⏭️ {len(report['duplicates'])} duplicate transcript(s) skipped (no AI extraction)"):
+            for filename, message in report['duplicates']:
+                st.markdown(f"- **{filename}**: {message}")
+
+    extractions = report.get('extractions') or []
+    if extractions:
+        total_pages = sum(e.pages for e in extractions)
+        cached = sum(1 for e in extractions if e.cached)
+        with st.expander(f"⏱️ Text extraction: {len(extractions)} file(s), {total_pages} page(s), {cached} from cache"):
+            for e in sorted(extractions, key=lambda e: e.seconds, reverse=True):
+                st.markdown(f"- **{e.file_name}**: {e.pages} page(s), {e.seconds * 1000:,.0f} ms"
+                            f"{' (cached)' if e.cached else ''}{f' ❌ {e.error}' if e.error else ''}")
+
+
 # ==================== PAGE: UPLOADS ====================
 def page_uploads():
     st.title("📤 Uploads")
     st.markdown("### Upload questionnaires and meeting transcripts")
 
+    # Background jobs started from this page (rendered after the tabs so new jobs show up immediately)
+    jobs_panel = st.container()
+    _render_upload_tabs()
+    with jobs_panel:
+        render_job_status('uploads')
+
+    recent_jobs = jobs.list_jobs(limit=10, job_types=["score_applications", "process_transcripts"])
+    if recent_jobs:
+        with st.expander("🗂️ Recent background jobs"):
+            for job in recent_jobs:
+                created = job['created_at'].strftime('%Y-%m-%d %H:%M') if job['created_at'] else ''
+                st.markdown(f"- {created} · {JOB_LABELS.get(job['job_type'], job['job_type'])} · "
+                            f"**{job['status']}** ({job['progress'] * 100:.0f}%)")
+
+
+def _render_upload_tabs():
     tab1, tab2 = st.tabs(["📋 Questionnaire", "🎙️ Transcripts"])
 
     # Tab 1: Questionnaire Upload
@@ -1593,8 +1379,9 @@ def page_uploads():
         )
 
         if uploaded_file:
-            with st.spinner("Parsing questionnaire..."):
-                apps_data = parse_questionnaire_excel(uploaded_file)
+            with st.spinner("Parsing questionnaire..."), UploadSpool() as spool:
+                spooled = spool.add(uploaded_file)
+                apps_data = parse_questionnaire_excel(spooled.path)
 
             if apps_data:
                 st.success(f"✅ Found {len(apps_data)} applications!")
@@ -1622,86 +1409,20 @@ def page_uploads():
 
                         st.success(f"✅ Successfully saved {len(apps_data)} applications!")
 
-                        # Step 2: Auto-calculate scores
-                        status_text.text("🤖 Auto-calculating scores with AI...")
-                        calculated_count = 0
-
-                        for idx, app_data in enumerate(apps_data):
-                            app_name = app_data['name']
-
-                            # Find the application in database
-                            app = session.query(Application).filter_by(name=app_name).first()
-
-                            if app:
-                                # Check if manually edited scores exist (don't recalculate those)
-                                manual_scores = session.query(SynergyScore).filter(
-                                    SynergyScore.application_id == app.id,
-                                    SynergyScore.approved == True,
-                                    SynergyScore.approved_by != 'auto_ai_generated'
-                                ).first()
-
-                                if manual_scores:
-                                    # User has manually edited scores - don't overwrite
-                                    pass
-                                else:
-                                    # Check if questionnaire has enough complete answers
-                                    qa_answers = session.query(QuestionnaireAnswer).filter_by(
-                                        application_id=app.id
-                                    ).all()
-
-                                    # Count complete answers (not empty)
-                                    complete_answers = [qa for qa in qa_answers if qa.answer_text and len(qa.answer_text.strip()) >= 5]
-                                    total_answers = len(qa_answers)
-
-                                    # Only calculate if we have at least 50% complete answers
-                                    if total_answers > 0 and (len(complete_answers) / total_answers) >= 0.5:
-                                        # Delete old auto-generated scores to recalculate
-                                        session.query(SynergyScore).filter_by(
-                                            application_id=app.id,
-                                            approved_by='auto_ai_generated'
-                                        ).delete()
-
-                                        session.commit()  # Commit deletion before calculating new scores
-
-                                        # Gather questionnaire data (only complete answers)
-                                        questionnaire_dict = {}
-                                        for qa in complete_answers:
-                                            questionnaire_dict[qa.question_text] = {'a': qa.answer_text, 's': qa.score}
-
-                                        # Generate scores with AI
-                                        if questionnaire_dict:
-                                            try:
-                                                result = suggest_scores(questionnaire_dict, [])
-
-                                                if result.get('scores'):
-                                                    for block_name, score_data in result['scores'].items():
-                                                        score = SynergyScore(
-                                                            id=str(uuid.uuid4()),
-                                                            application_id=app.id,
-                                                            block_name=block_name,
-                                                            score=score_data['score'],
-                                                            suggested_by='ai_questionnaire',
-                                                            confidence=score_data.get('confidence', 0.8),
-                                                            rationale=score_data.get('rationale', ''),
-                                                            approved=True,
-                                                            approved_by='auto_ai_generated',
-                                                            approved_at=datetime.now(timezone.utc)
-                                                        )
-                                                        session.add(score)
-
-                                                    calculated_count += 1
-                                            except Exception as e:
-                                                st.warning(f"⚠️ Could not calculate scores for {app_name}: {str(e)}")
-                                    else:
-                                        # Not enough complete answers - skip score calculation
-                                        pass
-
-                            progress.progress(0.5 + ((idx + 1) / len(apps_data) * 0.5))  # Second 50%
-
-                        session.commit()
-
-                        if calculated_count > 0:
-                            st.success(f"🎉 Auto-calculated scores for {calculated_count} applications!")
+                        # Step 2: Auto-calculate scores in the background
+                        progress.progress(1.0)
+                        app_ids = [
+                            app_id for (app_id,) in session.query(Application.id).filter(
+                                Application.name.in_([app_data['name'] for app_data in apps_data])
+                            ).all()
+                        ]
+                        job_id = jobs.enqueue(
+                            "score_applications",
+                            {"app_ids": app_ids, "mode": "questionnaire"},
+                            idempotency_key=f"score_applications:questionnaire:{spooled.sha256}:{jobs.hash_values(app_ids)}"
+                        )
+                        track_job('uploads', job_id)
+                        st.info("🤖 Score calculation started in the background. You can keep working; progress is shown below.")
 
                         status_text.empty()
                         st.balloons()
@@ -1754,327 +1475,61 @@ def page_uploads():
                 st.markdown(f"### 📁 Uploading {len(uploaded_transcripts)} file(s)...")
 
                 progress_bar = st.progress(0)
-                saved_count = 0
-                skipped_count = 0
-                error_count = 0
-
-                for idx, uploaded_file in enumerate(uploaded_transcripts):
-                    try:
-                        filename = uploaded_file.name
-
-                        # Extract app name
-                        if " - " in filename:
-                            app_name_from_file = filename.split(" - ")[0].strip()
-                        else:
-                            # No separator - use filename without extension as app name
-                            app_name_from_file = filename.rsplit('.', 1)[0].strip()
-
-                        # Find app using smart matching
-                        matched_app, match_type = find_matching_application(app_name_from_file, app_dict)
-                        if not matched_app:
-                            st.warning(f"⚠️ {filename}: App '{app_name_from_file}' not found")
-                            error_count += 1
-                            progress_bar.progress((idx + 1) / len(uploaded_transcripts))
-                            continue
-
-                        if match_type != 'exact':
-                            st.info(f"ℹ️ {filename}: Matched to '{matched_app.name}' ({match_type})")
-
-                        # Check if exists
-                        existing = session.query(MeetingTranscript).filter_by(
-                            application_id=matched_app.id,
-                            file_name=uploaded_file.name
-                        ).first()
-
-                        if existing:
-                            st.info(f"⏭️ {filename}: Already exists")
-                            skipped_count += 1
-                        else:
-                            # Read and save
-                            transcript_text = read_transcript_file(uploaded_file)
-                            if transcript_text:
-                                transcript = MeetingTranscript(
-                                    id=str(uuid.uuid4()),
-                                    application_id=matched_app.id,
-                                    file_name=uploaded_file.name,
-                                    transcript_text=transcript_text,
-                                    processed=False
-                                )
-                                session.add(transcript)
-                                session.commit()
-                                saved_count += 1
-                            else:
-                                st.error(f"❌ {filename}: Could not read file")
-                                error_count += 1
-
-                        progress_bar.progress((idx + 1) / len(uploaded_transcripts))
-
-                    except Exception as e:
-                        st.error(f"❌ {filename}: {str(e)}")
-                        error_count += 1
+                report = store_uploaded_transcripts(
+                    uploaded_transcripts, session, app_dict, _quick_upload_app_name,
+                    lambda done, total: progress_bar.progress(done / total)
+                )
 
                 st.markdown("---")
                 st.markdown("### 📊 Upload Summary")
-                col1, col2, col3 = st.columns(3)
+                col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("✅ Saved", saved_count)
+                    st.metric("✅ Saved", report['saved'] + report['updated'])
                 with col2:
-                    st.metric("⏭️ Skipped", skipped_count)
+                    st.metric("⏭️ Duplicates", len(report['duplicates']))
                 with col3:
-                    st.metric("❌ Errors", error_count)
+                    st.metric("❌ Errors", report['errors'])
+                with col4:
+                    st.metric("⚠️ Unmatched", report['unmatched'])
+                render_duplicate_report(report)
 
-                if saved_count > 0:
-                    st.success(f"🎉 {saved_count} files saved! Go to **Batch Operations** to process them.")
+                if report['saved'] + report['updated'] > 0:
+                    st.success(f"🎉 {report['saved'] + report['updated']} files saved! Go to **Batch Operations** to process them.")
 
             # Process Immediately (current behavior)
             elif uploaded_transcripts and process_now:
-                import time
-                start_time = time.time()
-
-                processed_count = 0
-                skipped_count = 0
-                error_count = 0
-                unmatched_count = 0
-
-                # Track which apps were processed
-                apps_processed = {}
-
-                with st.status(f"🤖 Processing {len(uploaded_transcripts)} transcript(s)...", expanded=True) as status:
+                # Store the files here (uploads only live in this session), AI work runs as a background job
+                with st.status(f"📥 Storing {len(uploaded_transcripts)} transcript(s)...", expanded=True) as status:
                     progress_bar = st.progress(0)
+                    report = store_uploaded_transcripts(
+                        uploaded_transcripts, session, app_dict, app_name_from_filename,
+                        lambda done, total: progress_bar.progress(done / total)
+                    )
+                    status.update(label=f"✅ Stored {report['saved'] + report['updated']} transcript(s)",
+                                  state="complete", expanded=False)
 
-                    for idx, uploaded_file in enumerate(uploaded_transcripts):
-                        # Update progress percentage
-                        progress = (idx) / len(uploaded_transcripts)
-                        progress_bar.progress(progress)
-
-                        # Estimate time remaining
-                        if idx > 0:
-                            elapsed = time.time() - start_time
-                            avg_time = elapsed / idx
-                            remaining = avg_time * (len(uploaded_transcripts) - idx)
-                            status.update(label=f"🤖 Processing {idx+1}/{len(uploaded_transcripts)}: {uploaded_file.name} (~{int(remaining)}s remaining)")
-                        else:
-                            status.update(label=f"🤖 Processing 1/{len(uploaded_transcripts)}: {uploaded_file.name}")
-
-                        try:
-                            # Extract application name from filename
-                            # Handles multi-part names like "Bentley - PLS-CADD - Application Assessment..."
-                            filename = uploaded_file.name
-                            name_no_ext = filename.rsplit('.', 1)[0].strip()
-
-                            # Smart suffix removal: find description suffix boundary
-                            # This preserves multi-part app names (e.g., "Bentley - PLS-CADD")
-                            suffix_idx = name_no_ext.lower().find(' - application assessment')
-                            if suffix_idx > 0:
-                                app_name_from_file = name_no_ext[:suffix_idx].strip()
-                            elif " - " in name_no_ext:
-                                # Fallback: take first segment
-                                app_name_from_file = name_no_ext.split(" - ")[0].strip()
-                            else:
-                                app_name_from_file = name_no_ext
-
-                            # Find matching application using smart matching
-                            matched_app, match_type = find_matching_application(app_name_from_file, app_dict)
-
-                            if not matched_app:
-                                st.warning(f"⚠️ {filename}: Application '{app_name_from_file}' not found in database")
-                                unmatched_count += 1
-                                continue
-
-                            if match_type != 'exact':
-                                st.info(f"ℹ️ {filename}: Matched to '{matched_app.name}' ({match_type})")
-
-                            # Track apps being processed
-                            if matched_app.name not in apps_processed:
-                                apps_processed[matched_app.name] = []
-                            apps_processed[matched_app.name].append(filename)
-
-                            # Check if transcript already exists and was processed
-                            existing_transcript = session.query(MeetingTranscript).filter_by(
-                                application_id=matched_app.id,
-                                file_name=uploaded_file.name
-                            ).first()
-
-                            if existing_transcript and existing_transcript.processed:
-                                st.info(f"⏭️ Skipping {uploaded_file.name} (already processed)")
-                                skipped_count += 1
-                                continue
-
-                            # Read transcript
-                            transcript_text = read_transcript_file(uploaded_file)
-
-                            if not transcript_text:
-                                st.error(f"❌ Could not read {uploaded_file.name}")
-                                error_count += 1
-                                continue
-
-                            # Create or use existing transcript
-                            if existing_transcript:
-                                transcript = existing_transcript
-                                transcript.transcript_text = transcript_text
-                            else:
-                                transcript = MeetingTranscript(
-                                    id=str(uuid.uuid4()),
-                                    application_id=matched_app.id,
-                                    file_name=uploaded_file.name,
-                                    transcript_text=transcript_text,
-                                    processed=False
-                                )
-                                session.add(transcript)
-
-                            session.commit()
-
-                            # Extract answers using AI
-                            st.write(f"🤖 AI analyzing for **{matched_app.name}**...")
-                            result = extract_answers_from_transcript(transcript_text, matched_app.name)
-
-                            if result.get('answers'):
-                                answer_count = 0
-                                # Save extracted answers (avoid duplicates)
-                                for answer_data in result['answers']:
-                                    if answer_data.get('answer') and answer_data.get('confidence', 0) > 0.3:
-                                        # Check if this answer already exists for this transcript
-                                        existing_answer = session.query(TranscriptAnswer).filter_by(
-                                            transcript_id=transcript.id,
-                                            question_text=answer_data['question']
-                                        ).first()
-
-                                        if not existing_answer:
-                                            ta = TranscriptAnswer(
-                                                id=str(uuid.uuid4()),
-                                                application_id=matched_app.id,
-                                                transcript_id=transcript.id,
-                                                question_text=answer_data['question'],
-                                                answer_text=answer_data['answer'],
-                                                confidence_score=answer_data['confidence'],
-                                                synergy_block=answer_data.get('synergy_block', 'Unknown')
-                                            )
-                                            session.add(ta)
-                                            answer_count += 1
-
-                                transcript.processed = True
-                                session.commit()
-
-                                st.success(f"✅ **{matched_app.name}** - {uploaded_file.name}: Extracted {answer_count} new answers")
-                                processed_count += 1
-
-                            else:
-                                st.warning(f"⚠️ {uploaded_file.name}: No answers extracted")
-                                processed_count += 1
-
-                        except Exception as e:
-                            st.error(f"❌ Error processing {uploaded_file.name}: {str(e)}")
-                            error_count += 1
-
-                    # Update final progress
-                    progress_bar.progress(1.0)
-                    total_time = time.time() - start_time
-                    status.update(label=f"✅ Complete! Processed {len(uploaded_transcripts)} files in {int(total_time)}s", state="complete", expanded=False)
-
-                # Final summary - Make it very prominent
-                st.markdown("---")
-                st.success("🎉 **PROCESSING COMPLETE!**")
-                st.markdown("### 📊 Summary")
-
+                to_process = report['to_process']
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("✅ Processed", processed_count)
+                    st.metric("🤖 Queued for AI", len(to_process))
                 with col2:
-                    st.metric("⏭️ Skipped", skipped_count)
+                    st.metric("⏭️ Duplicates", len(report['duplicates']))
                 with col3:
-                    st.metric("❌ Errors", error_count)
+                    st.metric("❌ Errors", report['errors'])
                 with col4:
-                    st.metric("⚠️ Unmatched", unmatched_count)
-
-                # Show which applications were processed
-                if apps_processed:
-                    st.markdown("#### Applications Updated:")
-                    for app_name, files in apps_processed.items():
-                        with st.expander(f"📱 {app_name} ({len(files)} files)"):
-                            for file in files:
-                                st.markdown(f"- {file}")
-
-                if processed_count > 0:
-                    st.success("🎉 All transcripts processed!")
-
-                    # Auto-recalculate scores for affected applications
-                    if apps_processed:
-                        st.markdown("---")
-                        st.markdown("### 🤖 Auto-Recalculating Scores")
-                        recalc_progress = st.progress(0)
-                        recalc_status = st.empty()
-
-                        recalculated_count = 0
-                        app_names = list(apps_processed.keys())
-
-                        for idx, app_name in enumerate(app_names):
-                            recalc_status.text(f"Recalculating {idx+1}/{len(app_names)}: {app_name}")
-
-                            app = session.query(Application).filter_by(name=app_name).first()
-
-                            if app:
-                                # Gather questionnaire data
-                                questionnaire_dict = {}
-                                qa_answers = session.query(QuestionnaireAnswer).filter_by(
-                                    application_id=app.id
-                                ).all()
-                                for qa in qa_answers:
-                                    questionnaire_dict[qa.question_text] = {'a': qa.answer_text, 's': qa.score}
-
-                                # Gather transcript data
-                                transcript_list = []
-                                ta_answers = session.query(TranscriptAnswer).filter_by(
-                                    application_id=app.id
-                                ).all()
-                                for ta in ta_answers:
-                                    transcript_list.append({
-                                        'question': ta.question_text,
-                                        'answer': ta.answer_text,
-                                        'confidence': ta.confidence_score
-                                    })
-
-                                # Recalculate scores
-                                if questionnaire_dict or transcript_list:
-                                    try:
-                                        result = suggest_scores(questionnaire_dict, transcript_list)
-
-                                        if result.get('scores'):
-                                            # Delete old auto-generated scores
-                                            session.query(SynergyScore).filter_by(
-                                                application_id=app.id,
-                                                approved_by='auto_ai_generated'
-                                            ).delete()
-
-                                            # Insert new scores
-                                            for block_name, score_data in result['scores'].items():
-                                                score = SynergyScore(
-                                                    id=str(uuid.uuid4()),
-                                                    application_id=app.id,
-                                                    block_name=block_name,
-                                                    score=score_data['score'],
-                                                    suggested_by='ai_combined',
-                                                    confidence=score_data.get('confidence', 0.8),
-                                                    rationale=score_data.get('rationale', ''),
-                                                    approved=True,
-                                                    approved_by='auto_ai_generated',
-                                                    approved_at=datetime.now(timezone.utc)
-                                                )
-                                                session.add(score)
-
-                                            recalculated_count += 1
-                                    except Exception as e:
-                                        st.warning(f"⚠️ Could not recalculate scores for {app_name}: {str(e)}")
-
-                            recalc_progress.progress((idx + 1) / len(app_names))
-
-                        session.commit()
-
-                        if recalculated_count > 0:
-                            st.success(f"🎉 Recalculated scores for {recalculated_count} applications!")
-
-                        recalc_status.empty()
-
-                    st.balloons()
+                    st.metric("⚠️ Unmatched", report['unmatched'])
+                render_duplicate_report(report)
+
+                if to_process:
+                    # Same transcripts with the same content -> same job (double clicks and reruns don't duplicate work)
+                    transcript_ids = list(to_process)
+                    job_id = jobs.enqueue(
+                        "process_transcripts",
+                        {"transcript_ids": transcript_ids, "recalculate_scores": True},
+                        idempotency_key=f"process_transcripts:{jobs.hash_values(transcript_ids + list(to_process.values()))}"
+                    )
+                    track_job('uploads', job_id)
+                    st.info("🤖 AI processing started in the background. It continues if you refresh or leave this page; progress is shown above.")
 
         finally:
             close_session(session)
@@ -2083,6 +1538,7 @@ def page_uploads():
 # ==================== PAGE: APPLICATIONS ====================
 def page_applications():
     """Simplified Applications page with table view grouped by synergy blocks"""
+    import pandas as pd
 
     st.title("📱 Applications Portfolio")
     st.markdown("Review and edit application scores by synergy block")
@@ -2127,20 +1583,17 @@ def page_applications():
 
         st.markdown("---")
 
-        # Display by synergy block
+        # Display by synergy block (answers loaded once, looked up per master question)
         current_weights = get_current_weights()
+        qa_dict = {
+            qa.question_text: qa.answer_text
+            for qa in session.query(QuestionnaireAnswer).filter_by(application_id=selected_app.id).all()
+        }
         for block_name, block_info in SYNERGY_BLOCKS.items():
             w = current_weights.get(block_name, block_info['Weight'])
             with st.expander(f"📋 {block_name} (Weight: {w}%)", expanded=False):
                 # Get questions for this block
-                block_questions = MASTER_QUESTIONS.get(block_name, [])
-
-                # Get questionnaire answers
-                qa_answers = session.query(QuestionnaireAnswer).filter_by(
-                    application_id=selected_app.id,
-                    synergy_block=block_name
-                ).all()
-                qa_dict = {qa.question_text: qa.answer_text for qa in qa_answers}
+                block_questions = MASTER_QUESTIONS.get(block_name, ())
 
                 # Build table data - Show ALL questions (with or without answers)
                 table_data = []
@@ -2569,187 +2022,9 @@ def page_analyses():
             st.markdown("#### Portfolio Strategic Matrix")
             st.caption("Technical Health Index (THI) vs. Business Value Index (BVI)")
 
-            # Create scatter plot
-            df = pd.DataFrame(apps_with_scores)
-
-            fig = go.Figure()
-
-            # Add quadrant backgrounds (X=THI, Y=BVI - Standard APM Matrix)
-            fig.add_shape(type="rect", x0=0, y0=0, x1=60, y1=60,
-                         fillcolor="rgba(239, 68, 68, 0.1)", line_width=0)  # ELIMINATE (low THI, low BVI)
-            fig.add_shape(type="rect", x0=60, y0=0, x1=100, y1=60,
-                         fillcolor="rgba(59, 130, 246, 0.1)", line_width=0)  # MAINTAIN (high THI, low BVI)
-            fig.add_shape(type="rect", x0=0, y0=60, x1=60, y1=100,
-                         fillcolor="rgba(245, 158, 11, 0.1)", line_width=0)  # INVEST (low THI, high BVI)
-            fig.add_shape(type="rect", x0=60, y0=60, x1=100, y1=100,
-                         fillcolor="rgba(16, 185, 129, 0.1)", line_width=0)  # EVOLVE (high THI, high BVI)
-
-            # Add quadrant lines
-            fig.add_hline(y=60, line_dash="dash", line_color="gray")
-            fig.add_vline(x=60, line_dash="dash", line_color="gray")
-
-            # Add points (X=THI, Y=BVI)
-            colors_map = {
-                'EVOLVE': '#10B981',
-                'INVEST': '#F59E0B',
-                'MAINTAIN': '#3B82F6',
-                'ELIMINATE': '#EF4444'
-            }
-
-            import math
-
-            # All 9 plotly textposition options with their offset vectors (dx, dy)
-            TEXT_POSITIONS = [
-                ('top right',      ( 1,  1)),
-                ('top left',       (-1,  1)),
-                ('bottom right',   ( 1, -1)),
-                ('bottom left',    (-1, -1)),
-                ('middle right',   ( 1,  0)),
-                ('middle left',    (-1,  0)),
-                ('top center',     ( 0,  1)),
-                ('bottom center',  ( 0, -1)),
-            ]
-
-            def assign_text_positions(apps_list):
-                """Assign plotly textposition for each app to minimize neighbor conflicts.
-                Returns list of textposition strings in the same order as input."""
-                coords = [(a['thi'], a['bvi']) for a in apps_list]
-                n = len(coords)
-                assigned = [None] * n
-
-                # Process most crowded points first
-                neighbor_counts = []
-                for i, (x1, y1) in enumerate(coords):
-                    cnt = sum(1 for j, (x2, y2) in enumerate(coords)
-                              if i != j and math.hypot(x2 - x1, y2 - y1) < 15)
-                    neighbor_counts.append(cnt)
-                order = sorted(range(n), key=lambda i: -neighbor_counts[i])
-
-                # Track which positions are used by nearby points
-                for idx in order:
-                    x, y = coords[idx]
-                    best_pos = 'top right'
-                    best_conflicts = float('inf')
-
-                    for pos_name, (dx, dy) in TEXT_POSITIONS:
-                        conflicts = 0
-                        # Check how many nearby points use the same position
-                        for j in range(n):
-                            if j == idx or assigned[j] is None:
-                                continue
-                            dist = math.hypot(coords[j][0] - x, coords[j][1] - y)
-                            if dist < 15 and assigned[j] == pos_name:
-                                conflicts += 3 if dist < 8 else 1
-                        # Prefer positions that push text away from chart center/edges
-                        if x > 70 and dx > 0: conflicts += 0.5   # near right edge, don't go right
-                        if x < 30 and dx < 0: conflicts += 0.5   # near left edge, don't go left
-                        if y > 80 and dy > 0: conflicts += 0.5   # near top, don't go up
-                        if y < 20 and dy < 0: conflicts += 0.5   # near bottom, don't go down
-
-                        if conflicts < best_conflicts:
-                            best_conflicts = conflicts
-                            best_pos = pos_name
-                            if conflicts == 0:
-                                break
-
-                    assigned[idx] = best_pos
-                return assigned
-
-            # Compute best text positions
-            text_positions = assign_text_positions(apps_with_scores)
-
-            # Build a lookup: app_name -> textposition
-            pos_lookup = {app['name']: text_positions[i] for i, app in enumerate(apps_with_scores)}
-
-            for rec in ['EVOLVE', 'INVEST', 'MAINTAIN', 'ELIMINATE']:
-                df_rec = df[df['recommendation'] == rec].copy()
-                if not df_rec.empty:
-                    for idx, (_, row) in enumerate(df_rec.iterrows()):
-                        text_pos = pos_lookup.get(row['name'], 'top right')
-                        is_overridden = row.get('is_overridden', False)
-                        calc_rec_short = row.get('calculated_recommendation', '')[:3] if row.get('calculated_recommendation') else ''
-                        base_name = row['name'] if len(row['name']) <= 18 else row['name'][:15] + '...'
-                        # Show transition for overridden: "AppName (INV→EVO)"
-                        if is_overridden:
-                            display_name = f"{base_name} ({calc_rec_short}→{rec[:3]})"
-                        else:
-                            display_name = base_name
-
-                        # Star marker for overridden apps, circle for normal
-                        marker_symbol = 'star' if is_overridden else 'circle'
-                        marker_size = 14 if is_overridden else 10
-                        marker_line_color = '#000000' if is_overridden else 'white'
-                        marker_line_width = 2 if is_overridden else 1.5
-                        text_color = '#B45309' if is_overridden else '#444444'  # Orange-brown for overridden
-
-                        calc_rec = row.get('calculated_recommendation', 'N/A')
-                        hover_text = f'<b>{row["name"]}</b><br>THI: {row["thi"]:.1f}<br>BVI: {row["bvi"]:.1f}'
-                        if is_overridden:
-                            hover_text += f'<br><br><b>⚠️ MANUAL OVERRIDE</b>'
-                            hover_text += f'<br>Calculated: <b>{calc_rec}</b>'
-                            hover_text += f'<br>Overridden to: <b>{rec}</b>'
-                        hover_text += '<extra></extra>'
-
-                        fig.add_trace(go.Scatter(
-                            x=[row['thi']],
-                            y=[row['bvi']],
-                            mode='markers+text',
-                            name=rec if not is_overridden else f'{rec} (Override)',
-                            text=[display_name],
-                            textposition=text_pos,
-                            textfont=dict(
-                                size=8,
-                                color=text_color,
-                                family='Arial, sans-serif'
-                            ),
-                            marker=dict(
-                                size=marker_size,
-                                symbol=marker_symbol,
-                                color=colors_map[rec],
-                                line=dict(width=marker_line_width, color=marker_line_color),
-                                opacity=0.85
-                            ),
-                            showlegend=(idx == 0 and not is_overridden),
-                            legendgroup=rec,
-                            hovertemplate=hover_text,
-                            hoverlabel=dict(
-                                bgcolor='white',
-                                bordercolor=colors_map[rec],
-                                font=dict(size=12, color='black')
-                            )
-                        ))
-
-            # Add quadrant labels (X=THI, Y=BVI) - Increased font size
-            fig.add_annotation(x=80, y=80, text="EVOLVE", showarrow=False, font=dict(size=20, color="green", family="Arial Black"))
-            fig.add_annotation(x=30, y=80, text="INVEST", showarrow=False, font=dict(size=20, color="orange", family="Arial Black"))
-            fig.add_annotation(x=80, y=30, text="MAINTAIN", showarrow=False, font=dict(size=20, color="blue", family="Arial Black"))
-            fig.add_annotation(x=30, y=30, text="ELIMINATE", showarrow=False, font=dict(size=20, color="red", family="Arial Black"))
-
-            fig.update_layout(
-                xaxis_title="Technical Health Index (THI)",
-                yaxis_title="Business Value Index (BVI)",
-                xaxis=dict(
-                    range=[0, 100],  # Appropriate zoom level for actual data range
-                    gridcolor='lightgray',
-                    title_font=dict(size=16),
-                    showgrid=True,
-                    zeroline=False
-                ),
-                yaxis=dict(
-                    range=[0, 100],  # Appropriate zoom level for actual data range
-                    gridcolor='lightgray',
-                    title_font=dict(size=16),
-                    showgrid=True,
-                    zeroline=False
-                ),
-                height=800,  # Standard height for better visualization
-                showlegend=True,
-                legend=dict(font=dict(size=14), x=1.02, y=1),
-                plot_bgcolor='white',
-                hoverlabel=dict(font_size=12),
-                margin=dict(l=80, r=100, t=60, b=80),
-                font=dict(size=12)
-            )
+            # Scatter plot, rebuilt only when the scores / recommendations changed
+            from matrix_chart import matrix_figure
+            fig = matrix_figure(apps_with_scores)
 
             st.plotly_chart(fig, width="stretch", key="strategic_matrix_thi_bvi_v2")
 
@@ -2927,10 +2202,26 @@ def page_insights():
         # Generate insights button
         if st.button("🤖 Generate Insights with AI", type="primary"):
             with st.spinner("Analyzing portfolio and generating insights..."):
+                from answer_matrix import get_answer_matrix
+
                 # Get all applications with scores
                 apps = get_all_applications_from_db(session)
                 apps_data = []
 
+                # Key-fact questions, classified once (not per application and answer)
+                matrix = get_answer_matrix(session)
+                fact_questions = {}
+                for question in matrix.questions:
+                    q = question.lower()
+                    if "business-critical" in q:
+                        fact_questions[question] = 'business_critical'
+                    elif "technolog" in q:
+                        fact_questions[question] = 'technology'
+                    elif "cost" in q:
+                        fact_questions[question] = 'cost'
+                    elif "integrate" in q:
+                        fact_questions[question] = 'integrations'
+
                 for app in apps:
                     scores_data = session.query(SynergyScore).filter_by(
                         application_id=app.id,
@@ -2942,35 +2233,23 @@ def page_insights():
                         bvi, thi = calculate_bvi_thi(scores, {b: {'Weight': w} for b, w in get_current_weights().items()})
                         rec = get_recommendation(bvi, thi)
 
-                        # Get key facts
-                        qa_data = session.query(QuestionnaireAnswer).filter_by(
-                            application_id=app.id
-                        ).all()
-
-                        business_critical = ""
-                        technology = ""
-                        cost = ""
-                        integrations = []
-
-                        for qa in qa_data:
-                            if "business-critical" in qa.question_text.lower():
-                                business_critical = qa.answer_text
-                            elif "technolog" in qa.question_text.lower():
-                                technology = qa.answer_text
-                            elif "cost" in qa.question_text.lower():
-                                cost = qa.answer_text
-                            elif "integrate" in qa.question_text.lower():
-                                integrations.append(qa.answer_text)
+                        # Get key facts (questionnaire answers)
+                        facts = {'business_critical': "", 'technology': "", 'cost': "", 'integrations': []}
+                        qa_answers = matrix.answers(app.id, 'questionnaire')
+                        for question, fact in fact_questions.items():
+                            if question not in qa_answers:
+                                continue
+                            if fact == 'integrations':
+                                facts['integrations'].append(qa_answers[question])
+                            else:
+                                facts[fact] = qa_answers[question]
 
                         apps_data.append({
                             'name': app.name,
                             'bvi': bvi,
                             'thi': thi,
                             'recommendation': rec,
-                            'business_critical': business_critical,
-                            'technology': technology,
-                            'cost': cost,
-                            'integrations': integrations
+                            **facts
                         })
 
                 # Generate insights
@@ -3056,6 +2335,79 @@ def page_insights():
 
 
 # ==================== PAGE: Q&A ASSISTANT ====================
+def build_qa_context(session, question: str = None) -> tuple:
+    """Gather the Q&A assistant context for all applications. Returns (apps, context_data)"""
+    from answer_matrix import get_answer_matrix
+
+    apps = get_all_applications_from_db(session)
+    matrix = get_answer_matrix(session)
+    context_data = {}
+    if question:
+        # Full-text matches first: they survive the context size limit
+        context_data['passages_matching_question'] = search_index.retrieve_passages(session, question)
+    context_data['applications'] = []
+
+    for app in apps:
+        # Get scores
+        scores_data = session.query(SynergyScore).filter_by(
+            application_id=app.id,
+            approved=True
+        ).all()
+
+        if scores_data:
+            scores = {s.block_name: s.score for s in scores_data}
+            bvi, thi = calculate_bvi_thi(scores, {b: {'Weight': w} for b, w in get_current_weights().items()})
+            rec = get_recommendation(bvi, thi)
+
+            # Build RICH CONTEXT from the answer matrix - David's notes take priority over transcripts,
+            # transcripts over the questionnaire (FULL TEXT, no truncation)
+            all_answers = matrix.answers(app.id)
+            for question in all_answers:
+                confidence = matrix.confidence(app.id, question)
+                if confidence is not None and matrix.source_of(app.id, question) == 'transcript':
+                    all_answers[question] = f"{all_answers[question]} (confidence: {confidence:.0%})"
+            david_insight_text = matrix.insight(app.id)
+
+            # 6. Get synergy block scores with rationales
+            scores_with_rationale = {s.block_name: {'score': s.score, 'rationale': s.rationale} for s in scores_data}
+
+            context_data['applications'].append({
+                'name': app.name,
+                'bvi': bvi,
+                'thi': thi,
+                'recommendation': rec,
+                'scores': scores_with_rationale,  # Include rationales
+                'all_answers': all_answers,  # Complete answers from all sources
+                'david_key_insights': david_insight_text,  # Executive summary from David
+                'data_sources': {
+                    'questionnaire_count': matrix.count(app.id, 'questionnaire'),
+                    'transcript_count': matrix.count(app.id, 'transcript'),
+                    'david_notes_count': matrix.count(app.id, 'note'),
+                    'has_david_insights': bool(david_insight_text)
+                }
+            })
+
+    return apps, context_data
+
+
+def _record_qa_feedback(history_id: str, feedback: str):
+    """Store feedback on a Q&A answer and, for an answer served from the cache, on its source entry"""
+    session = get_session()
+    try:
+        entry = session.get(QAHistory, history_id)
+        if entry is None:
+            return
+        entry.user_feedback = feedback
+        source = session.get(QAHistory, entry.source_id) if entry.source_id else None
+        if source is not None:
+            # A 'not_helpful' source is no longer served from the cache
+            source.user_feedback = feedback
+        session.commit()
+    finally:
+        close_session(session)
+    st.toast("Thanks for your feedback!")
+
+
 def page_qa_assistant():
     st.title("🤖 AI Assistant")
     st.markdown("### Ask questions about your application portfolio")
@@ -3081,90 +2433,42 @@ def page_qa_assistant():
         # Chat input
         user_question = st.text_area("Your question:", height=100, placeholder="e.g., Which applications should we prioritize for cloud migration?")
 
+        bypass_cache = st.checkbox("Always ask the AI (skip cached answers)", value=False)
+
         if st.button("🔍 Ask", type="primary") and user_question:
             with st.spinner("Thinking..."):
-                # Gather context
-                apps = get_all_applications_from_db(session)
-                context_data = {'applications': []}
-
-                for app in apps:
-                    # Get scores
-                    scores_data = session.query(SynergyScore).filter_by(
-                        application_id=app.id,
-                        approved=True
-                    ).all()
-
-                    if scores_data:
-                        scores = {s.block_name: s.score for s in scores_data}
-                        bvi, thi = calculate_bvi_thi(scores, {b: {'Weight': w} for b, w in get_current_weights().items()})
-                        rec = get_recommendation(bvi, thi)
-
-                        # Build RICH CONTEXT - Prioritize David's notes
-                        from database import DavidNote
-
-                        # 1. Get David's insights (highest priority)
-                        david_insights = session.query(DavidNote).filter_by(
-                            application_id=app.id,
-                            note_type='insight'
-                        ).first()
-                        david_insight_text = david_insights.answer_text if david_insights else ""
-
-                        # 2. Get David's detailed notes (highest priority for Q&A)
-                        david_notes = session.query(DavidNote).filter_by(
-                            application_id=app.id,
-                            note_type='answer'
-                        ).all()
-                        david_answers = {dn.question_text: dn.answer_text for dn in david_notes}  # FULL TEXT, no truncation
-
-                        # 3. Get questionnaire answers (complete)
-                        qa_data = session.query(QuestionnaireAnswer).filter_by(
-                            application_id=app.id
-                        ).all()
-                        qa_answers = {qa.question_text: qa.answer_text for qa in qa_data}  # FULL TEXT
-
-                        # 4. Get transcript answers (complete)
-                        ta_data = session.query(TranscriptAnswer).filter_by(
-                            application_id=app.id
-                        ).all()
-                        transcript_answers = {ta.question_text: f"{ta.answer_text} (confidence: {ta.confidence_score:.0%})" for ta in ta_data}
-
-                        # 5. Merge all answers - David's notes take priority
-                        all_answers = {
-                            **qa_answers,           # Base: questionnaire
-                            **transcript_answers,   # Override: transcripts
-                            **david_answers         # Highest priority: David's notes
-                        }
-
-                        # 6. Get synergy block scores with rationales
-                        scores_with_rationale = {s.block_name: {'score': s.score, 'rationale': s.rationale} for s in scores_data}
-
-                        context_data['applications'].append({
-                            'name': app.name,
-                            'bvi': bvi,
-                            'thi': thi,
-                            'recommendation': rec,
-                            'scores': scores_with_rationale,  # Include rationales
-                            'all_answers': all_answers,  # Complete answers from all sources
-                            'david_key_insights': david_insight_text,  # Executive summary from David
-                            'data_sources': {
-                                'questionnaire_count': len(qa_answers),
-                                'transcript_count': len(transcript_answers),
-                                'david_notes_count': len(david_answers),
-                                'has_david_insights': bool(david_insight_text)
-                            }
-                        })
-
-                # Call AI
-                answer, sources, response_time = answer_question(user_question, context_data)
+                failed = False
+                start_time = time.perf_counter()
+                revision = get_data_revision(session)
+                cached_entry, similarity = (None, 0.0) if bypass_cache else find_cached_answer(session, user_question, revision)
+
+                if cached_entry:
+                    # Semantically equivalent question already answered against the same data
+                    answer = cached_entry.ai_response
+                    sources = cached_entry.sources or []
+                    response_time = int((time.perf_counter() - start_time) * 1000)
+                    context_count = (cached_entry.context_applications or {}).get('count', 0)
+                    record_llm_call(feature="answer_question", model="gpt-4o-mini", cache_status="hit",
+                                    latency_ms=response_time)
+                else:
+                    # Gather context and call AI
+                    apps, context_data = build_qa_context(session, user_question)
+                    context_count = len(apps)
+                    try:
+                        answer, sources, response_time = answer_question(user_question, context_data)
+                    except Exception as e:
+                        answer, sources, response_time, failed = f"Error processing question: {e}", [], 0, True
 
                 # Save to history
                 qa_history = QAHistory(
                     id=str(uuid.uuid4()),
                     user_question=user_question,
                     ai_response=answer,
-                    context_applications={'count': len(apps)},
+                    context_applications={'count': context_count},
                     sources=sources,
-                    response_time_ms=response_time
+                    response_time_ms=response_time,
+                    data_revision=None if failed else revision,  # No revision: never served from the cache
+                    source_id=cached_entry.id if cached_entry else None
                 )
                 session.add(qa_history)
                 session.commit()
@@ -3178,20 +2482,21 @@ def page_qa_assistant():
                     for source in sources:
                         st.markdown(f"- {source}")
 
-                st.caption(f"Response time: {response_time}ms")
+                if cached_entry:
+                    st.success(f"⚡ Served from cache — {similarity:.0%} match with a previous question "
+                               f"(\"{cached_entry.user_question[:80]}\", asked {cached_entry.created_at.strftime('%Y-%m-%d %H:%M')}). "
+                               f"The portfolio data has not changed since. Tick \"Always ask the AI\" for a fresh answer.")
+                elif failed:
+                    st.error("The AI model could not answer this question. The error above is not cached — ask again to retry.")
+                else:
+                    st.caption(f"🤖 Answered by the AI model · Response time: {response_time}ms")
 
-                # Feedback
+                # Feedback (callbacks: the buttons are gone on the rerun their click triggers)
                 col1, col2 = st.columns(2)
                 with col1:
-                    if st.button("👍 Helpful"):
-                        qa_history.user_feedback = 'helpful'
-                        session.commit()
-                        st.success("Thanks for your feedback!")
+                    st.button("👍 Helpful", on_click=_record_qa_feedback, args=(qa_history.id, 'helpful'))
                 with col2:
-                    if st.button("👎 Not Helpful"):
-                        qa_history.user_feedback = 'not_helpful'
-                        session.commit()
-                        st.info("Thanks for your feedback!")
+                    st.button("👎 Not Helpful", on_click=_record_qa_feedback, args=(qa_history.id, 'not_helpful'))
 
         # Chat history
         st.markdown("---")
@@ -3212,9 +2517,158 @@ def page_qa_assistant():
         close_session(session)
 
 
+# ==================== PAGE: SEARCH ====================
+def render_search_snippet(snippet: str) -> str:
+    """HTML of a search snippet with the matched terms highlighted"""
+    escaped = html.escape(snippet or "").replace("\n", " ")
+    return (escaped.replace(search_index.HIGHLIGHT_START, "<mark>")
+                   .replace(search_index.HIGHLIGHT_END, "</mark>"))
+
+
+def page_search():
+    st.title("🔎 Search")
+    st.markdown("### Find what transcripts, answers, notes and insights say")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        query = st.text_input("Search", placeholder='e.g. SAP, Dynatrace, "work order"', label_visibility="collapsed")
+    with col2:
+        doc_types = st.multiselect(
+            "Sources", list(search_index.DOC_TYPE_LABELS),
+            format_func=lambda t: search_index.DOC_TYPE_LABELS[t],
+            placeholder="All sources", label_visibility="collapsed"
+        )
+
+    if not query.strip():
+        st.caption("All words must match (the last one as a prefix); use \"quotes\" for exact phrases.")
+        return
+
+    session = get_session()
+    try:
+        hits, elapsed_ms = search_index.timed_search(session, query, limit=50, doc_types=doc_types or None)
+    finally:
+        close_session(session)
+
+    st.caption(f"{len(hits)} result(s) in {elapsed_ms:.0f} ms")
+    if not hits:
+        st.info("No matches.")
+        return
+
+    for hit in hits:
+        label = search_index.DOC_TYPE_LABELS.get(hit.doc_type, hit.doc_type)
+        st.markdown(
+            f"**{html.escape(hit.application_name or 'Unknown app')}** · {label}"
+            f"<br><span style='color:#6B7280'>{render_search_snippet(hit.title)}</span>"
+            f"<br>{render_search_snippet(hit.snippet)}",
+            unsafe_allow_html=True
+        )
+
+
+# ==================== PAGE: LLM USAGE ====================
+def page_llm_usage():
+    """LLM call telemetry: latency percentiles, cost per feature and cost per application"""
+    import pandas as pd
+    import plotly.express as px
+
+    st.title("💸 LLM Usage")
+    st.markdown("### Where the money and time go")
+
+    days = st.selectbox("Period", [1, 7, 30, 90, 365], index=2, format_func=lambda d: f"Last {d} day{'s' if d > 1 else ''}")
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+
+    session = get_session()
+    try:
+        calls = session.query(LLMCall).filter(LLMCall.created_at >= since.replace(tzinfo=None)).all()
+        app_names = {a.id: a.name for a in session.query(Application.id, Application.name).all()}
+    finally:
+        close_session(session)
+
+    if not calls:
+        st.info("No LLM calls recorded in this period")
+        return
+
+    df = pd.DataFrame([{
+        'feature': c.feature or 'unknown',
+        'model': c.model,
+        'application_ids': c.application_ids or [],
+        'prompt_tokens': c.prompt_tokens or 0,
+        'completion_tokens': c.completion_tokens or 0,
+        'cost_usd': c.cost_usd or 0.0,
+        'latency_ms': c.latency_ms,
+        'retries': c.retries or 0,
+        'cache_status': c.cache_status or 'miss',
+        'success': bool(c.success),
+    } for c in calls])
+
+    llm_df = df[df['cache_status'] != 'hit']
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("LLM Calls", len(llm_df))
+    with col2:
+        st.metric("Total Cost", f"${df['cost_usd'].sum():,.4f}")
+    with col3:
+        st.metric("Tokens", f"{int(df['prompt_tokens'].sum() + df['completion_tokens'].sum()):,}")
+    with col4:
+        st.metric("Cache Hit Rate", f"{(df['cache_status'] == 'hit').mean():.0%}")
+    with col5:
+        st.metric("Failed Calls", int((~df['success']).sum()))
+
+    # Per-feature latency and cost
+    st.markdown("#### ⏱️ Latency and Cost per Feature")
+    by_feature = llm_df.groupby('feature').agg(
+        calls=('feature', 'size'),
+        p50_ms=('latency_ms', lambda x: x.quantile(0.50)),
+        p95_ms=('latency_ms', lambda x: x.quantile(0.95)),
+        prompt_tokens=('prompt_tokens', 'sum'),
+        completion_tokens=('completion_tokens', 'sum'),
+        retries=('retries', 'sum'),
+        cost_usd=('cost_usd', 'sum'),
+    ).sort_values('cost_usd', ascending=False)
+    if not by_feature.empty:
+        by_feature['cost_per_call'] = by_feature['cost_usd'] / by_feature['calls']
+        st.dataframe(
+            by_feature.style.format({
+                'p50_ms': '{:,.0f}', 'p95_ms': '{:,.0f}', 'cost_usd': '${:,.4f}', 'cost_per_call': '${:,.4f}'
+            }),
+            width="stretch"
+        )
+        fig = px.bar(by_feature.reset_index(), x='feature', y='cost_usd', title='Cost per Feature (USD)',
+                     color_discrete_sequence=['#E87722'])
+        st.plotly_chart(fig, width="stretch")
+
+    # Per-application cost (batched calls are split evenly between their applications)
+    st.markdown("#### 📱 Cost per Application")
+    per_app = df[df['application_ids'].map(len) > 0].copy()
+    if per_app.empty:
+        st.info("No application-level calls recorded in this period")
+    else:
+        per_app['share'] = per_app['cost_usd'] / per_app['application_ids'].map(len)
+        per_app = per_app.explode('application_ids')
+        by_app = per_app.groupby('application_ids').agg(
+            calls=('feature', 'size'),
+            cost_usd=('share', 'sum'),
+        ).sort_values('cost_usd', ascending=False)
+        by_app.index = [app_names.get(app_id, app_id) for app_id in by_app.index]
+        by_app.index.name = 'application'
+        st.dataframe(by_app.style.format({'cost_usd': '${:,.4f}'}), width="stretch")
+
+
 # ==================== PAGE: METHODOLOGY ====================
+def _data_export_file(dataset: str, fmt: str, custom_weights: Dict):
+    """Data export for a download button (runs on click, outside the script thread)"""
+    import tempfile
+    import data_export
+    # Small exports stay in memory, large ones spill to disk while they are streamed
+    output = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    data_export.export_data(output, dataset, fmt, custom_weights)
+    output.seek(0)
+    return output
+
+
 def page_calculator():
     """Calculator page - Overview of all applications with scores"""
+    import pandas as pd
 
     # Hero header
     st.markdown("""
@@ -3250,7 +2704,7 @@ def page_calculator():
 
             with col1:
                 st.markdown("**📈 Business Value Blocks**")
-                for block in ["Strategic Fit", "Business Efficiency", "User Value", "Financial Value"]:
+                for block in BUSINESS_BLOCKS:
                     new_val = st.number_input(
                         f"{block}",
                         min_value=0,
@@ -3265,7 +2719,7 @@ def page_calculator():
 
             with col2:
                 st.markdown("**🔧 Technical Health Blocks**")
-                for block in ["Architecture", "Operational Risk", "Maintainability", "Support Quality"]:
+                for block in TECH_BLOCKS:
                     new_val = st.number_input(
                         f"{block}",
                         min_value=0,
@@ -3284,8 +2738,8 @@ def page_calculator():
                 st.toast("Weights saved automatically!", icon="✅")
 
             # Show totals
-            business_total = sum(st.session_state.custom_weights[b] for b in ["Strategic Fit", "Business Efficiency", "User Value", "Financial Value"])
-            tech_total = sum(st.session_state.custom_weights[b] for b in ["Architecture", "Operational Risk", "Maintainability", "Support Quality"])
+            business_total = sum(st.session_state.custom_weights[b] for b in BUSINESS_BLOCKS)
+            tech_total = sum(st.session_state.custom_weights[b] for b in TECH_BLOCKS)
 
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -3294,9 +2748,7 @@ def page_calculator():
                 st.metric("Tech Total", f"{tech_total}%")
             with col3:
                 if st.button("🔄 Reset to Defaults"):
-                    st.session_state.custom_weights = {
-                        block: info['Weight'] for block, info in SYNERGY_BLOCKS.items()
-                    }
+                    st.session_state.custom_weights = dict(DEFAULT_WEIGHTS)
                     save_weights_to_db()
                     st.rerun()
 
@@ -3532,47 +2984,39 @@ def page_calculator():
 
             with col_xl:
                 if st.button("📥 Generate Portfolio Excel", width="stretch", type="primary", key="gen_excel"):
-                    with st.spinner("Generating Excel with all sheets (Calculator, Dashboard, Roadmap, App Groups, Value Chain, App Sheets)..."):
-                        from excel_generator import generate_portfolio_excel
-                        xlsx_bytes = generate_portfolio_excel(custom_weights=st.session_state.get('custom_weights'))
-                        if xlsx_bytes:
-                            st.session_state['xlsx_data'] = xlsx_bytes
-                            st.session_state['xlsx_ready'] = True
-                            st.rerun()
-                        else:
-                            st.error("No application data available.")
+                    from pipeline import enqueue_export
+                    # Same data, weights, template and generator -> the already generated file is reused
+                    job_id = enqueue_export("xlsx", st.session_state.get('custom_weights'))
+                    track_job('export_excel', job_id)
 
-                if st.session_state.get('xlsx_ready'):
-                    st.download_button(
-                        label="⬇️ Download Portfolio Excel",
-                        data=st.session_state['xlsx_data'],
-                        file_name=f"Avangrid_Application_Portfolio_Management_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        width="stretch"
-                    )
+                render_job_status('export_excel')
 
             with col_ppt:
                 if st.button("📊 Generate Portfolio PowerPoint", width="stretch", type="primary", key="gen_ppt"):
-                    with st.spinner("Generating PowerPoint with all application cards..."):
-                        try:
-                            from ppt_generator import generate_portfolio_pptx
-                            pptx_bytes = generate_portfolio_pptx()
-                            if pptx_bytes:
-                                st.session_state['pptx_data'] = pptx_bytes
-                                st.session_state['pptx_ready'] = True
-                                st.rerun()
-                            else:
-                                st.error("No application data available.")
-                        except Exception as e:
-                            st.error(f"Error generating PowerPoint: {str(e)}")
-
-                if st.session_state.get('pptx_ready'):
+                    from pipeline import enqueue_export
+                    job_id = enqueue_export("pptx")
+                    track_job('export_pptx', job_id)
+
+                render_job_status('export_pptx')
+
+            # Raw data for BI tools: streamed from the database when the button is clicked
+            import data_export
+            col_fmt, col_portfolio, col_answers = st.columns([1, 2, 2])
+            with col_fmt:
+                data_format = st.selectbox("Data format", list(data_export.FORMATS), key="data_export_format",
+                                           label_visibility="collapsed")
+            export_weights = dict(st.session_state.custom_weights)
+            for col, dataset, label in ((col_portfolio, 'portfolio', "⬇️ Scores & Recommendations"),
+                                        (col_answers, 'answers', "⬇️ Canonical Answers")):
+                with col:
                     st.download_button(
-                        label="⬇️ Download Portfolio PPTX",
-                        data=st.session_state['pptx_data'],
-                        file_name=f"Avangrid_Portfolio_{datetime.now().strftime('%Y%m%d')}.pptx",
-                        mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                        width="stretch"
+                        label=f"{label} ({data_format.upper()})",
+                        data=lambda dataset=dataset, fmt=data_format: _data_export_file(dataset, fmt, export_weights),
+                        file_name=data_export.export_file_name(dataset, data_format),
+                        mime=data_export.FORMATS[data_format][0],
+                        on_click="ignore",
+                        width="stretch",
+                        key=f"data_export_{dataset}"
                     )
         else:
             st.warning("No applications with approved scores found.")
@@ -3902,16 +3346,16 @@ def page_batch_operations():
                                 with log_container:
                                     try:
                                         # Extract answers using AI
-                                        result = extract_answers_from_transcript(transcript.transcript_text, app.name)
+                                        result = extract_answers_from_transcript(transcript.transcript_text, app.name, app_id=app.id)
 
                                         if result.get('answers'):
                                             answer_count = 0
                                             for answer_data in result['answers']:
                                                 if answer_data.get('answer') and answer_data.get('confidence', 0) > 0.3:
                                                     # Check for duplicates
-                                                    existing = session.query(TranscriptAnswer).filter_by(
-                                                        transcript_id=transcript.id,
-                                                        question_text=answer_data['question']
+                                                    existing = session.query(TranscriptAnswer).filter(
+                                                        TranscriptAnswer.transcript_id == transcript.id,
+                                                        TranscriptAnswer.question_is(answer_data['question'])
                                                     ).first()
 
                                                     if not existing:
@@ -4115,7 +3559,7 @@ def page_batch_operations():
 
                                     # Generate scores using AI
                                     if questionnaire_dict or transcript_list:
-                                        result = suggest_scores(questionnaire_dict, transcript_list)
+                                        result = suggest_scores(questionnaire_dict, transcript_list, app_id=app.id)
 
                                         if result.get('scores'):
                                             # Save suggested scores (auto-approved)
@@ -4173,6 +3617,8 @@ def page_batch_operations():
 
 # ==================== MAIN APPLICATION ====================
 def main():
+    start_background_worker()
+
     # Top header bar - Professional, corporate style
     st.markdown("""
     <div style="background: linear-gradient(to right, #1F2937 0%, #111827 100%);
@@ -4255,7 +3701,9 @@ def main():
         ("Applications", "📦"),
         ("Analyses", "📊"),
         ("Uploads", "☁️"),
+        ("Search", "🔎"),
         ("Q&A Assistant", "💬"),
+        ("LLM Usage", "💸"),
     ]
 
     current_page = st.session_state.get('current_page', 'Introduction')
@@ -4279,6 +3727,7 @@ def main():
     # Old sidebar code removed - now using top horizontal menu
     if False:
         pass  # Sidebar disabled
+        from streamlit_option_menu import option_menu
         st.markdown("""
         <style>
         @keyframes gradient-shift {
@@ -4378,6 +3827,7 @@ def main():
             "Applications",
             "Analyses",
             "Uploads",
+            "Search",
             "Q&A Assistant"
         ]
 
@@ -4397,6 +3847,7 @@ def main():
                 "app",
                 "graph-up",
                 "cloud-upload",
+                "search",
                 "chat-dots"
             ],
             menu_icon=None,
@@ -4676,8 +4127,12 @@ def main():
         page_analyses()
     elif st.session_state.current_page == "Uploads":
         page_uploads()
+    elif st.session_state.current_page == "Search":
+        page_search()
     elif st.session_state.current_page == "Q&A Assistant":
         page_qa_assistant()
+    elif st.session_state.current_page == "LLM Usage":
+        page_llm_usage()
 
 
 if __name__ == "__main__":
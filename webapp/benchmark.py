@@ -0,0 +1,847 @@
+"""
+Performance benchmarks for the APM Platform
+
+Usage:
+    python benchmark.py startup [--runs 5] [--page Introduction]
+    python benchmark.py extraction [--files 100] [--pages 8] [--workers 1 2 4]
+    python benchmark.py uploads [--total-mb 500] [--file-mb 5] [--max-peak-mb 64]
+    python benchmark.py excel-export [--apps 50 150 300]
+    python benchmark.py xlsx-template [--rows 400] [--exports 10] [--template path.xlsx]
+    python benchmark.py pptx-deck [--slides 100 500 1000]
+    python benchmark.py parallel-export [--apps 300] [--workers 1 2 4]
+    python benchmark.py label-placement [--points 200 2000] [--max-seconds 1]
+    python benchmark.py matrix-chart [--apps 40 300]
+    python benchmark.py keywords [--apps 100 1000] [--answer-words 60]
+    python benchmark.py data-export [--apps 1000 10000] [--formats csv ndjson parquet]
+
+Benchmarks run against a throw-away copy of the database (never the live one) unless
+DATABASE_URL / DATABASE_PATH are set explicitly.
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+WEBAPP_DIR = os.path.dirname(os.path.abspath(__file__))
+LIVE_DB_PATH = os.path.join(WEBAPP_DIR, "data", "avangrid.db")
+
+
+def _benchmark_env() -> dict:
+    """Environment for child processes: isolated DB copy, no real LLM calls"""
+    env = dict(os.environ)
+    if not env.get("DATABASE_URL") and not env.get("DATABASE_PATH"):
+        tmp_db = os.path.join(tempfile.gettempdir(), "apm_benchmark.db")
+        if os.path.exists(LIVE_DB_PATH):
+            shutil.copy2(LIVE_DB_PATH, tmp_db)
+        env["DATABASE_PATH"] = tmp_db
+    env.setdefault("OPENAI_API_KEY", "benchmark-no-calls")
+    env.setdefault("LLM_TELEMETRY", "0")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def _summary(values):
+    return {
+        "min": round(min(values), 3),
+        "median": round(statistics.median(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+# ==================== STARTUP ====================
+_STARTUP_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_streamlit = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=300)
+at.session_state["current_page"] = sys.argv[1]
+at.run()
+t_cold = time.perf_counter()
+assert not at.exception, [e.message for e in at.exception]
+reruns = []
+for _ in range(int(sys.argv[2])):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+# Bare-mode script execution: what Streamlit does on every rerun, without the test harness
+import runpy, streamlit as st
+bare_reruns = []
+for _ in range(int(sys.argv[2])):
+    t = time.perf_counter()
+    runpy.run_path("app.py", run_name="__main__")
+    bare_reruns.append(time.perf_counter() - t)
+heavy = sorted(m for m in ("pptx", "matplotlib", "PyPDF2", "docx", "plotly", "openai", "openpyxl") if m in sys.modules)
+print(json.dumps({
+    "streamlit_import_s": t_streamlit - t0,
+    "cold_start_s": t_cold - t_streamlit,
+    "reruns_s": reruns,
+    "bare_reruns_s": bare_reruns,
+    "heavy_modules_loaded": heavy,
+}))
+"""
+
+
+def bench_startup(args):
+    env = _benchmark_env()
+    cold, rerun, bare_rerun, streamlit_import = [], [], [], []
+    loaded = None
+    for i in range(args.runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", _STARTUP_CHILD, args.page, str(args.reruns)],
+            cwd=WEBAPP_DIR, env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(proc.stderr[-3000:])
+            raise SystemExit(f"Startup run {i + 1} failed")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        cold.append(result["cold_start_s"])
+        streamlit_import.append(result["streamlit_import_s"])
+        rerun.extend(result["reruns_s"])
+        bare_rerun.extend(result["bare_reruns_s"])
+        loaded = result["heavy_modules_loaded"]
+
+    # Fresh interpreter: import the app modules / run the whole script once (bare mode)
+    import_times, bare_cold = [], []
+    for _ in range(args.runs):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import database, ai_processor"], cwd=WEBAPP_DIR, env=env, check=True)
+        import_times.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import runpy; runpy.run_path('app.py', run_name='__main__')"],
+                       cwd=WEBAPP_DIR, env=env, check=True, capture_output=True)
+        bare_cold.append(time.perf_counter() - t)
+
+    report = {
+        "page": args.page,
+        "runs": args.runs,
+        "streamlit_import_s": _summary(streamlit_import),
+        "cold_start_s": _summary(cold),
+        "rerun_s": _summary(rerun),
+        "bare_cold_process_s": _summary(bare_cold),
+        "bare_rerun_s": _summary(bare_rerun),
+        "import_database_ai_processor_s": _summary(import_times),
+        "heavy_modules_loaded_on_page": loaded,
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# ==================== TEXT EXTRACTION ====================
+def _make_pdf_templates(directory: str, pages: int, count: int = 4):
+    """Synthetic multi-page transcript PDFs (matplotlib, TrueType text so it can be extracted)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    matplotlib.rcParams["pdf.fonttype"] = 42
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    paths = []
+    for t in range(count):
+        path = os.path.join(directory, f"template_{t}.pdf")
+        with PdfPages(path) as pdf:
+            for page in range(pages):
+                fig = plt.figure(figsize=(8.5, 11))
+                for line in range(45):
+                    fig.text(0.05, 0.95 - line * 0.02,
+                             f"[{page:02d}:{line:02d}] Speaker {line % 3}: the application supports "
+                             f"process {t}-{page}-{line} and integrates with the billing system.",
+                             fontsize=7)
+                pdf.savefig(fig)
+                plt.close(fig)
+        paths.append(path)
+    return paths
+
+
+def bench_extraction(args):
+    work_dir = tempfile.mkdtemp(prefix="apm_extraction_")
+    os.environ["TEXT_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    sys.path.insert(0, WEBAPP_DIR)
+    import text_extraction
+
+    templates = _make_pdf_templates(work_dir, args.pages)
+    files = []
+    for i in range(args.files):
+        with open(templates[i % len(templates)], "rb") as f:
+            # Unique trailing comment: same text, different bytes (no cache sharing between files)
+            files.append((f"Application {i} - Meeting.pdf", f.read() + f"\n%{i}\n".encode()))
+    total_mb = sum(len(data) for _, data in files) / 1024 / 1024
+
+    report = {"files": args.files, "pages_per_file": args.pages, "total_mb": round(total_mb, 2),
+              "cpu_count": os.cpu_count(), "cold": {}}
+    for workers in args.workers:
+        shutil.rmtree(text_extraction.CACHE_DIR, ignore_errors=True)
+        t = time.perf_counter()
+        results = text_extraction.extract_many(files, workers=workers)
+        seconds = time.perf_counter() - t
+        assert not any(r.error for r in results), [r.error for r in results if r.error][:3]
+        report["cold"][f"workers={workers}"] = {
+            "seconds": round(seconds, 3),
+            "files_per_s": round(args.files / seconds, 1),
+            "per_file_ms_p50": round(statistics.median(r.seconds for r in results) * 1000, 1),
+        }
+
+    t = time.perf_counter()
+    results = text_extraction.extract_many(files)
+    seconds = time.perf_counter() - t
+    report["warm_cache"] = {"seconds": round(seconds, 3), "cached": sum(r.cached for r in results)}
+
+    # Baseline: page-by-page string concatenation, one file after another, no cache
+    from PyPDF2 import PdfReader
+    import io
+    t = time.perf_counter()
+    for _, data in files:
+        text = ""
+        for page in PdfReader(io.BytesIO(data)).pages:
+            text += page.extract_text() + "\n"
+    report["baseline_sequential_s"] = round(time.perf_counter() - t, 3)
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# ==================== UPLOAD MEMORY ====================
+class _SyntheticUpload:
+    """File-like upload producing deterministic transcript text on demand (never held in memory)"""
+
+    def __init__(self, name: str, size: int, seed: int):
+        self.name = name
+        self.size = size
+        line = f"[{seed:05d}] Speaker {seed % 7}: the application integrates with billing and GIS.\n"
+        self._block = (line * (65536 // len(line) + 1)).encode()[:65536]
+        self._pos = 0
+
+    def seek(self, pos: int):
+        self._pos = pos
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self.size - self._pos
+        size = remaining if size is None or size < 0 else min(size, remaining)
+        parts, offset = [], self._pos % len(self._block)
+        while sum(len(p) for p in parts) < size:
+            parts.append(self._block[offset:offset + size - sum(len(p) for p in parts)])
+            offset = 0
+        self._pos += size
+        return b"".join(parts)
+
+    def getvalue(self) -> bytes:
+        self.seek(0)
+        return self.read()
+
+
+def bench_uploads(args):
+    import tracemalloc
+    work_dir = tempfile.mkdtemp(prefix="apm_uploads_")
+    os.environ["TEXT_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    os.environ["UPLOAD_SPOOL_DIR"] = os.path.join(work_dir, "spool")
+    sys.path.insert(0, WEBAPP_DIR)
+    import text_extraction
+    from upload_spool import UploadSpool
+    from transcript_dedup import content_hash, minhash_signature
+
+    file_size = int(args.file_mb * 1024 * 1024)
+    count = max(1, int(args.total_mb * 1024 * 1024 // file_size))
+
+    def _uploads():
+        return [_SyntheticUpload(f"Application {i} - Meeting.txt", file_size, i) for i in range(count)]
+
+    def _consume(extraction):
+        # What storing a transcript does with the text: fingerprint it (optional, slow on big batches)
+        if args.fingerprint:
+            content_hash(extraction.text)
+            minhash_signature(extraction.text)
+        extraction.text = ""
+
+    report = {"files": count, "file_mb": args.file_mb, "total_mb": round(count * file_size / 1024 / 1024, 1)}
+
+    # Spooled: stream to disk, parse from the files, drop each text once stored
+    uploads = _uploads()
+    tracemalloc.start()
+    t = time.perf_counter()
+    with UploadSpool() as spool:
+        spooled = spool.add_all(uploads)
+        for f, extraction in zip(spooled, text_extraction.iter_extract(
+                [(f.name, f.path) for f in spooled], hashes=[f.sha256 for f in spooled])):
+            f.release()
+            assert not extraction.error, extraction.error
+            _consume(extraction)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report["spooled"] = {"seconds": round(time.perf_counter() - t, 2), "peak_mb": round(peak / 1024 / 1024, 1)}
+
+    if not args.skip_baseline:
+        # Previous handling: getvalue() of every upload, then every text, all held at once
+        shutil.rmtree(text_extraction.CACHE_DIR, ignore_errors=True)
+        uploads = _uploads()
+        tracemalloc.start()
+        t = time.perf_counter()
+        extractions = text_extraction.extract_many([(f.name, f.getvalue()) for f in uploads])
+        for extraction in extractions:
+            _consume(extraction)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del extractions
+        report["in_memory_baseline"] = {"seconds": round(time.perf_counter() - t, 2),
+                                        "peak_mb": round(peak / 1024 / 1024, 1)}
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    report["max_peak_mb"] = args.max_peak_mb
+    report["bounded"] = report["spooled"]["peak_mb"] <= args.max_peak_mb
+    print(json.dumps(report, indent=2))
+    if not report["bounded"]:
+        raise SystemExit(f"Peak memory {report['spooled']['peak_mb']} MB exceeds {args.max_peak_mb} MB")
+    return report
+
+
+# ==================== EXCEL EXPORT ====================
+_SEED_PORTFOLIO = r"""
+import json, os, resource, sys, time, uuid
+from sqlalchemy import event, insert
+from database import (init_db, get_engine, get_session, close_session, question_id_for, block_id_for,
+                      Application, SynergyScore, QuestionnaireAnswer)
+from framework import MASTER_QUESTIONS, BLOCK_NAMES
+
+apps = int(sys.argv[1])
+init_db()
+session = get_session()
+if not session.query(Application).count():
+    # Synthetic portfolio: approved scores for every block, an answer to every master question
+    # (inserted 1000 applications at a time)
+    for start in range(0, apps, 1000):
+        app_rows = [{"id": str(uuid.uuid4()), "name": f"Application {i:04d}", "subcategory": None}
+                    for i in range(start, min(start + 1000, apps))]
+        session.execute(insert(Application), app_rows)
+        session.execute(insert(SynergyScore), [
+            {"id": str(uuid.uuid4()), "application_id": app["id"], "block_name": block,
+             "score": (i + j) % 5 + 1, "approved": True}
+            for i, app in enumerate(app_rows, start) for j, block in enumerate(BLOCK_NAMES)
+        ])
+        session.execute(insert(QuestionnaireAnswer), [
+            {"id": str(uuid.uuid4()), "application_id": app["id"], "question_id": question_id_for(question),
+             "block_id": block_id_for(block), "answer_text": f"Answer {i}-{q} about billing, work orders and asset maintenance."}
+            for i, app in enumerate(app_rows, start) for block, questions in MASTER_QUESTIONS.items()
+            for q, question in enumerate(questions)
+        ])
+    session.commit()
+close_session(session)
+"""
+
+_EXCEL_EXPORT_CHILD = _SEED_PORTFOLIO + r"""
+queries = []
+event.listen(get_engine(), "before_cursor_execute", lambda *args: queries.append(1))
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+import excel_generator
+output = os.path.join(os.path.dirname(os.environ["DATABASE_PATH"]), "portfolio.xlsx")
+t = time.perf_counter()
+excel_generator.generate_portfolio_excel(output=output)
+print(json.dumps({
+    "apps": apps,
+    "seconds": time.perf_counter() - t,
+    "queries": len(queries),
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "rss_before_export_mb": rss_before / 1024,
+    "file_mb": os.path.getsize(output) / 1024 / 1024,
+}))
+"""
+
+
+def bench_excel_export(args):
+    report = {"sizes": []}
+    for apps in args.apps:
+        work_dir = tempfile.mkdtemp(prefix="apm_excel_")
+        env = _benchmark_env()
+        env.pop("DATABASE_URL", None)
+        env["DATABASE_PATH"] = os.path.join(work_dir, "portfolio.db")
+        # Fresh process per size: peak RSS (ru_maxrss) is a high-water mark
+        proc = subprocess.run([sys.executable, "-c", _EXCEL_EXPORT_CHILD, str(apps)],
+                              cwd=WEBAPP_DIR, env=env, capture_output=True, text=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if proc.returncode != 0:
+            print(proc.stderr[-3000:])
+            raise SystemExit(f"Excel export of {apps} applications failed")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        report["sizes"].append({key: round(value, 2) if isinstance(value, float) else value
+                                for key, value in result.items()})
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# ==================== EXCEL TEMPLATE SHEETS ====================
+_TEMPLATE_SHEETS = ("Index", "Introduction", "Methodology")
+
+
+def _make_xlsx_template(path: str, rows: int):
+    """Synthetic template: styled text tables, merged title rows, row heights and an image per sheet"""
+    from openpyxl import Workbook
+    from openpyxl.drawing.image import Image as XLImage
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from PIL import Image
+
+    logo_path = os.path.join(os.path.dirname(path), "logo.png")
+    Image.new("RGB", (400, 120), "#E87722").save(logo_path)
+    side = Side(style="thin", color="BFBFBF")
+    wb = Workbook()
+    wb.remove(wb.active)
+    for title in _TEMPLATE_SHEETS:
+        ws = wb.create_sheet(title)
+        for row in range(1, rows + 1):
+            if row % 20 == 1:
+                ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=8)
+                cell = ws.cell(row=row, column=1, value=f"{title} section {row // 20 + 1}")
+                cell.font = Font(name="Calibri", size=14, bold=True, color="FFFFFF")
+                cell.fill = PatternFill("solid", start_color="333333")
+                ws.row_dimensions[row].height = 24
+                continue
+            for column in range(1, 9):
+                cell = ws.cell(row=row, column=column, value=f"{title} text {row}.{column}")
+                cell.font = Font(name="Calibri", size=10, bold=column == 1)
+                cell.border = Border(left=side, right=side, top=side, bottom=side)
+                cell.alignment = Alignment(wrap_text=True, vertical="top")
+                if row % 2:
+                    cell.fill = PatternFill("solid", start_color="FAFAFA")
+        for column in range(1, 9):
+            ws.column_dimensions[chr(64 + column)].width = 18
+        image = XLImage(logo_path)
+        image.anchor = "J2"
+        ws.add_image(image)
+    wb.save(path)
+
+
+def _copy_template_cell_by_cell(wb, path: str):
+    """Previous handling: reload the template and copy every cell value and style object"""
+    from copy import copy
+    from openpyxl import load_workbook
+    from openpyxl.drawing.image import Image as XLImage
+    wb_template = load_workbook(path)
+    for position, title in enumerate(_TEMPLATE_SHEETS):
+        source_ws, target_ws = wb_template[title], wb.create_sheet(title, position)
+        for row in source_ws.iter_rows():
+            for cell in row:
+                target_cell = target_ws[cell.coordinate]
+                target_cell.value = cell.value
+                if cell.has_style:
+                    target_cell.font = copy(cell.font)
+                    target_cell.border = copy(cell.border)
+                    target_cell.fill = copy(cell.fill)
+                    target_cell.number_format = copy(cell.number_format)
+                    target_cell.protection = copy(cell.protection)
+                    target_cell.alignment = copy(cell.alignment)
+        for merged_range in source_ws.merged_cells.ranges:
+            target_ws.merge_cells(str(merged_range))
+        for col_letter, col_dim in source_ws.column_dimensions.items():
+            target_ws.column_dimensions[col_letter].width = col_dim.width
+        for row_num, row_dim in source_ws.row_dimensions.items():
+            target_ws.row_dimensions[row_num].height = row_dim.height
+        for img in source_ws._images:
+            new_image = XLImage(img.ref)
+            new_image.anchor = img.anchor
+            target_ws.add_image(new_image)
+    wb_template.close()
+
+
+def bench_xlsx_template(args):
+    sys.path.insert(0, WEBAPP_DIR)
+    from openpyxl import Workbook
+    import xlsx_template
+    from excel_generator import SheetWriter
+
+    work_dir = tempfile.mkdtemp(prefix="apm_template_")
+    path = args.template
+    if not path:
+        path = os.path.join(work_dir, "template.xlsx")
+        _make_xlsx_template(path, args.rows)
+
+    def _timed(copy_sheets, write_only=False):
+        times = []
+        for _ in range(args.exports):
+            wb = Workbook(write_only=write_only)
+            t = time.perf_counter()
+            copy_sheets(wb)
+            times.append((time.perf_counter() - t) * 1000)
+        return times
+
+    def _replay(wb):
+        template = xlsx_template.get_compiled_template(path)
+        for position, title in enumerate(_TEMPLATE_SHEETS):
+            if title in template:
+                template[title].replay(wb.create_sheet(title, position))
+
+    def _replay_streamed(wb):
+        template = xlsx_template.get_compiled_template(path)
+        for title in _TEMPLATE_SHEETS:
+            if title in template:
+                template[title].replay(SheetWriter(wb, title)).close()
+
+    baseline = _timed(lambda wb: _copy_template_cell_by_cell(wb, path))
+    compiled = _timed(_replay)
+    streamed = _timed(_replay_streamed, write_only=True)
+    report = {
+        "template": args.template or f"synthetic, {len(_TEMPLATE_SHEETS)} sheets x {args.rows} rows",
+        "exports": args.exports,
+        "cell_by_cell_ms": _summary(baseline),
+        "compiled_first_export_ms": round(compiled[0], 1),
+        "compiled_replay_ms": _summary(compiled[1:] or compiled),
+        "compiled_replay_streamed_incl_xml_ms": _summary(streamed),
+    }
+    shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# ==================== POWERPOINT DECK ====================
+def _synthetic_slide_data(index: int) -> dict:
+    """Data map of one application as extract_app_data_from_db returns it"""
+    text = f"Application {index:04d} supports billing, work orders and asset maintenance. "
+    return {
+        "NOME_DO_APP": f"Application {index:04d}",
+        "UTILITY_DOMAIN": "Electric, Gas", "OPCOS": "NYSEG\nRG&E\nCMP", "BUSINESS_AREA": "Customer Operations",
+        "OWNED_BY": "IT", "BUSINESS_CRITICALITY": "High", "USAGE": "Increasing",
+        "BUSINESS_PURPOSE": text * 2, "APPLICATION_FUNCTIONALITY": text * (index % 4 + 1),
+        "BUSINESS_PROCESS_COVERAGE": text, "USER_PERSONAS": "Field technicians, dispatchers",
+        "NO_USERS": str(100 + index), "BUSINESS_OWNER": "Jane Doe - U123456 (Operations), John Roe",
+        "IT_OWNER": "Alex Smith", "SATISFACTION": "😊", "REGULATORY": "SOX, NERC CIP",
+        "APP_CATEGORY": "Market", "INTEGRATIONS": "SAP, Maximo, GIS", "PROGRAMMING_LANGUAGE": "Java",
+        "DEPLOYMENT": "Cloud", "COMPATIBILITY": "Windows, iOS", "MONITORED": "Yes", "SECURITY": "SSO",
+        "PLANNED_UPGRADES": "Version 12 upgrade planned", "USER_MANAGEMENT": "", "BUGS_INCIDENTS": "",
+        "ENHANCEMENTS": "",
+    }
+
+
+def bench_pptx_deck(args):
+    sys.path.insert(0, WEBAPP_DIR)
+    import ppt_generator
+
+    t = time.perf_counter()
+    ppt_generator.get_compiled_slide()
+    report = {"compile_template_ms": round((time.perf_counter() - t) * 1000, 1), "sizes": []}
+    for slides in args.slides:
+        apps_data = [_synthetic_slide_data(i) for i in range(slides)]
+        t = time.perf_counter()
+        data = ppt_generator.render_portfolio_deck(apps_data)
+        seconds = time.perf_counter() - t
+        report["sizes"].append({
+            "slides": slides,
+            "seconds": round(seconds, 2),
+            "ms_per_slide": round(seconds * 1000 / slides, 2),
+            "file_mb": round(len(data) / 1024 / 1024, 2),
+        })
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# ==================== PARALLEL EXPORTS ====================
+def _package_parts(data: bytes) -> dict:
+    """Parts of an .xlsx/.pptx package; docProps/core.xml only holds the creation time"""
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        return {name: package.read(name) for name in package.namelist() if name != "docProps/core.xml"}
+
+
+def bench_parallel_export(args):
+    work_dir = tempfile.mkdtemp(prefix="apm_parallel_")
+    env = _benchmark_env()
+    env.pop("DATABASE_URL", None)
+    env["DATABASE_PATH"] = os.path.join(work_dir, "portfolio.db")
+    # Synthetic portfolio seeded (and exported once) by the excel-export child
+    proc = subprocess.run([sys.executable, "-c", _EXCEL_EXPORT_CHILD, str(args.apps)],
+                          cwd=WEBAPP_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr[-3000:])
+        raise SystemExit("Could not build the synthetic portfolio")
+    os.environ.update(env)
+    sys.path.insert(0, WEBAPP_DIR)
+    import excel_generator
+    import ppt_generator
+
+    apps_data = [_synthetic_slide_data(i) for i in range(args.apps)]
+    report = {"apps": args.apps, "cpus": os.cpu_count(), "runs": []}
+    baseline = {}
+    try:
+        for workers in args.workers:
+            output = os.path.join(work_dir, f"portfolio-{workers}.xlsx")
+            t = time.perf_counter()
+            excel_generator.generate_portfolio_excel(output=output, workers=workers)
+            excel_seconds = time.perf_counter() - t
+            with open(output, "rb") as f:
+                excel_parts = _package_parts(f.read())
+
+            t = time.perf_counter()
+            pptx_parts = _package_parts(ppt_generator.render_portfolio_deck(apps_data, workers=workers))
+            pptx_seconds = time.perf_counter() - t
+
+            # Every run is compared with the first one (normally workers=1)
+            baseline.setdefault("xlsx", (excel_seconds, excel_parts))
+            baseline.setdefault("pptx", (pptx_seconds, pptx_parts))
+            report["runs"].append({
+                "workers": workers,
+                "xlsx_seconds": round(excel_seconds, 2),
+                "xlsx_speedup": round(baseline["xlsx"][0] / excel_seconds, 2),
+                "xlsx_identical": excel_parts == baseline["xlsx"][1],
+                "pptx_seconds": round(pptx_seconds, 2),
+                "pptx_speedup": round(baseline["pptx"][0] / pptx_seconds, 2),
+                "pptx_identical": pptx_parts == baseline["pptx"][1],
+            })
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+    if not all(run["xlsx_identical"] and run["pptx_identical"] for run in report["runs"]):
+        raise SystemExit("Parallel exports differ from the first run")
+    return report
+
+
+# ==================== LABEL PLACEMENT ====================
+def bench_label_placement(args):
+    import random
+    sys.path.insert(0, WEBAPP_DIR)
+    import label_placement
+
+    rng = random.Random(0)
+    report = {"sizes": []}
+    for points in args.points:
+        # Uniform over the matrix plus tight clusters (many apps on the same scores)
+        coords = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(points * 3 // 4)]
+        while len(coords) < points:
+            x, y = rng.choice(coords)
+            coords.append((x + rng.uniform(-1, 1), y + rng.uniform(-1, 1)))
+        names = [f"Application {i:04d}" for i in range(points)]
+
+        t = time.perf_counter()
+        label_placement.place_labels(coords, names)
+        matplotlib_seconds = time.perf_counter() - t
+        t = time.perf_counter()
+        label_placement.assign_text_positions(coords)
+        plotly_seconds = time.perf_counter() - t
+        report["sizes"].append({
+            "points": points,
+            "matplotlib_seconds": round(matplotlib_seconds, 3),
+            "plotly_seconds": round(plotly_seconds, 3),
+        })
+    print(json.dumps(report, indent=2))
+    slow = [size for size in report["sizes"]
+            if max(size["matplotlib_seconds"], size["plotly_seconds"]) > args.max_seconds]
+    if slow:
+        raise SystemExit(f"Label placement slower than {args.max_seconds}s: {slow}")
+    return report
+
+
+# ==================== MATRIX CHART ====================
+def bench_matrix_chart(args):
+    import random
+    cache_dir = tempfile.mkdtemp(prefix="apm_charts_")
+    os.environ["EXPORT_CACHE_DIR"] = cache_dir
+    os.environ["EXPORT_CACHE"] = "1"
+    sys.path.insert(0, WEBAPP_DIR)
+    import matrix_chart
+
+    rng = random.Random(0)
+    recommendations = matrix_chart.RECOMMENDATIONS
+    report = {"webgl_threshold": matrix_chart.WEBGL_THRESHOLD, "sizes": []}
+    try:
+        for apps in args.apps:
+            points = []
+            for i in range(apps):
+                calculated = rng.choice(recommendations)
+                recommendation = calculated if rng.random() < 0.9 else rng.choice(recommendations)
+                points.append({"name": f"Application {i:04d}", "thi": rng.uniform(0, 100), "bvi": rng.uniform(0, 100),
+                               "recommendation": recommendation, "calculated_recommendation": calculated,
+                               "is_overridden": recommendation != calculated})
+            timings = {}
+            for label in ("png_first", "png_cached"):
+                t = time.perf_counter()
+                matrix_chart.matrix_png(points)
+                timings[label] = round(time.perf_counter() - t, 3)
+            for label in ("figure_first", "figure_cached"):
+                t = time.perf_counter()
+                fig = matrix_chart.matrix_figure(points)
+                timings[label] = round(time.perf_counter() - t, 3)
+            report["sizes"].append({"apps": apps, "traces": len(fig.data), **timings})
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# ==================== KEYWORD CLASSIFICATION ====================
+def bench_keywords(args):
+    import random
+    sys.path.insert(0, WEBAPP_DIR)
+    from excel_generator import APP_GROUP_CATEGORIES, VALUE_CHAIN_STAGES, CATEGORY_MATCHER
+    from framework import ALL_QUESTIONS
+
+    taxonomies = {
+        "groups": {name: info["keywords"] for name, info in APP_GROUP_CATEGORIES.items()},
+        "value_chain": {name: info["keywords"] for name, info in VALUE_CHAIN_STAGES.items()},
+    }
+    rng = random.Random(0)
+    # Answers made of questionnaire words plus a few keywords
+    vocabulary = " ".join(ALL_QUESTIONS).lower().split()
+    keywords = [kw for categories in taxonomies.values() for kws in categories.values() for kw in kws]
+    report = {"keywords": len(keywords), "sizes": []}
+    for apps in args.apps:
+        texts = [" ".join(" ".join(rng.choice(vocabulary) if rng.random() > 0.02 else rng.choice(keywords)
+                                   for _ in range(args.answer_words))
+                          for _ in range(len(ALL_QUESTIONS)))
+                 for _ in range(apps)]
+        megabytes = sum(len(text) for text in texts) / 1024 / 1024
+
+        # Per category, per keyword substring checks (every category scored)
+        t = time.perf_counter()
+        expected = []
+        for text in texts:
+            lowered = text.lower()
+            expected.append({name: {category: sum(1 for kw in kws if kw in lowered) for category, kws in categories.items()}
+                             for name, categories in taxonomies.items()})
+        loop_seconds = time.perf_counter() - t
+
+        t = time.perf_counter()
+        scanned = [CATEGORY_MATCHER.scan(text) for text in texts]
+        matcher_seconds = time.perf_counter() - t
+        report["sizes"].append({
+            "apps": apps,
+            "text_mb": round(megabytes, 2),
+            "keyword_loop_seconds": round(loop_seconds, 3),
+            "matcher_seconds": round(matcher_seconds, 3),
+            "matcher_seconds_per_mb": round(matcher_seconds / megabytes, 3),
+            "identical": scanned == expected,
+        })
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# ==================== DATA EXPORT ====================
+_DATA_EXPORT_CHILD = r"""
+import json, os, resource, sys, time
+import data_export
+from database import get_session, close_session
+dataset, fmt, output = sys.argv[1:4]
+close_session(get_session())  # One-off schema checks / search indexing of a new database are not measured
+if fmt == "parquet":
+    import pyarrow.parquet  # Imported before the baseline: only the export itself is measured
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t = time.perf_counter()
+with open(output, "wb") as f:
+    rows = data_export.export_data(f, dataset, fmt)
+print(json.dumps({
+    "dataset": dataset,
+    "format": fmt,
+    "rows": rows,
+    "seconds": time.perf_counter() - t,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "export_rss_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+    "file_mb": os.path.getsize(output) / 1024 / 1024,
+}))
+"""
+
+
+def bench_data_export(args):
+    report = {"sizes": []}
+    for apps in args.apps:
+        work_dir = tempfile.mkdtemp(prefix="apm_data_export_")
+        env = _benchmark_env()
+        env.pop("DATABASE_URL", None)
+        env["DATABASE_PATH"] = os.path.join(work_dir, "portfolio.db")
+        try:
+            proc = subprocess.run([sys.executable, "-c", _SEED_PORTFOLIO, str(apps)],
+                                  cwd=WEBAPP_DIR, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(proc.stderr[-3000:])
+                raise SystemExit(f"Could not build the synthetic portfolio of {apps} applications")
+            runs = []
+            for dataset in args.datasets:
+                for fmt in args.formats:
+                    # Fresh process per export: peak RSS (ru_maxrss) is a high-water mark
+                    output = os.path.join(work_dir, f"{dataset}.{fmt}")
+                    proc = subprocess.run([sys.executable, "-c", _DATA_EXPORT_CHILD, dataset, fmt, output],
+                                          cwd=WEBAPP_DIR, env=env, capture_output=True, text=True)
+                    if proc.returncode != 0:
+                        print(proc.stderr[-3000:])
+                        raise SystemExit(f"{dataset} {fmt} export of {apps} applications failed")
+                    result = json.loads(proc.stdout.strip().splitlines()[-1])
+                    runs.append({key: round(value, 2) if isinstance(value, float) else value
+                                 for key, value in result.items()})
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        report["sizes"].append({"apps": apps, "runs": runs})
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="APM Platform performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("startup", help="Cold start and rerun time of the Streamlit app")
+    p.add_argument("--runs", type=int, default=5, help="Fresh processes to start")
+    p.add_argument("--reruns", type=int, default=5, help="Reruns per process")
+    p.add_argument("--page", default="Introduction", help="Page to render")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("extraction", help="PDF text extraction: process pool scaling and disk cache")
+    p.add_argument("--files", type=int, default=100, help="PDF files in the batch")
+    p.add_argument("--pages", type=int, default=8, help="Pages per PDF")
+    p.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}),
+                   help="Process pool sizes to compare")
+    p.set_defaults(func=bench_extraction)
+
+    p = sub.add_parser("uploads", help="Peak Python memory of a large transcript upload batch (tracemalloc)")
+    p.add_argument("--total-mb", type=float, default=500, help="Size of the batch")
+    p.add_argument("--file-mb", type=float, default=5, help="Size of each transcript")
+    p.add_argument("--max-peak-mb", type=float, default=64, help="Fail when the spooled peak exceeds this")
+    p.add_argument("--fingerprint", action="store_true", help="Also compute the deduplication fingerprints")
+    p.add_argument("--skip-baseline", action="store_true", help="Don't measure the in-memory handling")
+    p.set_defaults(func=bench_uploads)
+
+    p = sub.add_parser("excel-export", help="Portfolio Excel export time, queries and peak RSS by portfolio size")
+    p.add_argument("--apps", type=int, nargs="+", default=[50, 150, 300], help="Portfolio sizes (synthetic)")
+    p.set_defaults(func=bench_excel_export)
+
+    p = sub.add_parser("xlsx-template", help="Per-export cost of the template sheets (cell-by-cell copy vs compiled replay)")
+    p.add_argument("--rows", type=int, default=400, help="Rows per synthetic template sheet")
+    p.add_argument("--exports", type=int, default=10, help="Exports to simulate")
+    p.add_argument("--template", help="Benchmark a real template workbook instead")
+    p.set_defaults(func=bench_xlsx_template)
+
+    p = sub.add_parser("pptx-deck", help="Portfolio PowerPoint rendering time by deck size (synthetic data)")
+    p.add_argument("--slides", type=int, nargs="+", default=[100, 500, 1000], help="Deck sizes")
+    p.set_defaults(func=bench_pptx_deck)
+
+    p = sub.add_parser("parallel-export", help="Excel/PowerPoint export time by worker processes (output must be identical)")
+    p.add_argument("--apps", type=int, default=300, help="Portfolio size (synthetic)")
+    p.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}),
+                   help="Worker processes to compare")
+    p.set_defaults(func=bench_parallel_export)
+
+    p = sub.add_parser("label-placement", help="Matrix chart label placement time by number of points")
+    p.add_argument("--points", type=int, nargs="+", default=[200, 2000], help="Points on the chart")
+    p.add_argument("--max-seconds", type=float, default=1.0, help="Fail when a placement takes longer")
+    p.set_defaults(func=bench_label_placement)
+
+    p = sub.add_parser("matrix-chart", help="THI x BVI chart rendering: first render vs cached (PNG and plotly figure)")
+    p.add_argument("--apps", type=int, nargs="+", default=[40, 300], help="Portfolio sizes (synthetic)")
+    p.set_defaults(func=bench_matrix_chart)
+
+    p = sub.add_parser("keywords", help="App group / value chain keyword classification time by portfolio size")
+    p.add_argument("--apps", type=int, nargs="+", default=[100, 1000], help="Portfolio sizes (synthetic)")
+    p.add_argument("--answer-words", type=int, default=60, help="Words per answer")
+    p.set_defaults(func=bench_keywords)
+
+    p = sub.add_parser("data-export", help="Streaming CSV/NDJSON/Parquet export time and peak RSS by portfolio size")
+    p.add_argument("--apps", type=int, nargs="+", default=[1000, 10000], help="Portfolio sizes (synthetic)")
+    p.add_argument("--datasets", nargs="+", default=["portfolio", "answers"], help="Datasets to export")
+    p.add_argument("--formats", nargs="+", default=["csv", "ndjson", "parquet"], help="Formats to compare")
+    p.set_defaults(func=bench_data_export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Streaming portfolio data export (CSV, NDJSON, Parquet)
+
+Usage:
+    python data_export.py --dataset portfolio --format csv --output portfolio.csv
+    python data_export.py --dataset answers --format parquet --output answers.parquet
+
+A lightweight alternative to the styled Excel / PowerPoint exports for BI jobs that only need the
+numbers. Rows are generated one application at a time from a single ordered query read through a
+server-side cursor (yield_per) and written as they come, so memory stays flat whatever the size of
+the portfolio. Two datasets:
+  - portfolio: one row per application - approved block scores, BVI / THI, calculated and
+    overridden recommendations (same numbers as the Calculator page)
+  - answers: one row per application and master question - the canonical (merged) answer,
+    David's notes > transcripts > questionnaire, and the source it comes from
+Parquet needs pyarrow (optional dependency).
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Ensure webapp modules can be imported
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import and_, literal, or_, select, union_all
+
+from database import (
+    get_session, close_session,
+    Application, SynergyScore, QuestionnaireAnswer, TranscriptAnswer, DavidNote, CustomWeight,
+    question_for_id, block_for_id
+)
+from ai_processor import calculate_bvi_thi, get_recommendation
+from framework import BLOCK_NAMES, DEFAULT_WEIGHTS
+
+STREAM_BATCH = int(os.getenv("DATA_EXPORT_BATCH", "2000"))  # Rows fetched per cursor round trip
+
+# format -> (MIME type, file extension)
+FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'ndjson': ('application/x-ndjson', '.ndjson'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+
+SCORE_COLUMNS = {block: block.lower().replace(' ', '_') for block in BLOCK_NAMES}
+
+# dataset -> [(column, type)]; types are 'string', 'int', 'float' or 'bool'
+COLUMNS = {
+    'portfolio': [
+        ('application_id', 'string'), ('application', 'string'), ('subcategory', 'string'), ('quick_win', 'bool'),
+        *[(column, 'int') for column in SCORE_COLUMNS.values()],
+        ('bvi', 'float'), ('thi', 'float'), ('calculated_recommendation', 'string'),
+        ('recommendation_override', 'string'), ('recommendation', 'string'), ('is_overridden', 'bool'),
+    ],
+    'answers': [
+        ('application_id', 'string'), ('application', 'string'), ('question_id', 'int'), ('block', 'string'),
+        ('question', 'string'), ('answer', 'string'), ('source', 'string'),
+    ],
+}
+DATASETS = tuple(COLUMNS)
+
+ANSWER_SOURCES = ('questionnaire', 'transcript', 'note')  # Increasing precedence
+
+# Not a real application (same exclusion as the Excel export)
+_TEMPLATE_APP = 'questions template'
+
+
+def saved_weights(session) -> Dict[str, int]:
+    """Block weights saved from the Calculator page (defaults for the blocks never changed)"""
+    weights = dict(DEFAULT_WEIGHTS)
+    for block_name, weight in session.execute(select(CustomWeight.block_name, CustomWeight.weight)):
+        if block_name in weights:
+            weights[block_name] = weight
+    return weights
+
+
+def _stream(session, statement):
+    # Core rows straight from the connection (no ORM result processing), STREAM_BATCH at a time
+    return session.connection().execute(statement.execution_options(yield_per=STREAM_BATCH))
+
+
+# ==================== ROW GENERATORS ====================
+def portfolio_rows(session, custom_weights: Optional[Dict[str, int]] = None) -> Iterator[Tuple]:
+    """One tuple per application (COLUMNS['portfolio'] order), from one query: applications left
+    joined to their approved scores, ordered by application so each one is a run of rows"""
+    weights = custom_weights or saved_weights(session)
+    rows = _stream(session, (
+        select(Application.id, Application.name, Application.subcategory, Application.quick_win,
+               Application.recommendation_override, SynergyScore.block_name, SynergyScore.score)
+        .outerjoin(SynergyScore, and_(SynergyScore.application_id == Application.id,
+                                      SynergyScore.approved.is_(True)))
+        # The most recent approved score of a block wins
+        .order_by(Application.name, Application.id, SynergyScore.created_at)
+    ))
+
+    for app_id, app_rows in groupby(rows, key=lambda row: row[0]):
+        scores = {}
+        for _, name, subcategory, quick_win, override, block_name, score in app_rows:
+            if block_name is not None:
+                scores[block_name] = score
+        if name.strip().lower() == _TEMPLATE_APP:
+            continue
+
+        if scores:
+            bvi, thi = calculate_bvi_thi(scores, weights)
+            calculated_rec = get_recommendation(bvi, thi)
+        else:
+            bvi = thi = calculated_rec = None
+        yield (
+            app_id, name, subcategory, bool(quick_win),
+            *[scores.get(block) for block in SCORE_COLUMNS],
+            bvi, thi, calculated_rec, override, override or calculated_rec,
+            override is not None and override != calculated_rec,
+        )
+
+
+def _answer_select(model, rank: int):
+    statement = (
+        select(model.application_id, Application.name, model.question_id, model.block_id, model.answer_text,
+               literal(rank).label('rank'), model.created_at)
+        .join(Application, Application.id == model.application_id)
+        .where(model.question_id.is_not(None))
+    )
+    if model is DavidNote:
+        statement = statement.where(or_(DavidNote.note_type.is_(None), DavidNote.note_type != 'insight'))
+    return statement
+
+
+def answer_rows(session) -> Iterator[Tuple]:
+    """One tuple per application and answered master question (COLUMNS['answers'] order): the three
+    answer sources in one UNION ALL ordered by application, precedence and date, merged one
+    application at a time"""
+    union = union_all(*(_answer_select(model, rank) for rank, model in
+                        enumerate((QuestionnaireAnswer, TranscriptAnswer, DavidNote)))).subquery()
+    rows = _stream(session, select(union).order_by(union.c.name, union.c.application_id,
+                                                   union.c.rank, union.c.created_at))
+
+    question_texts, block_names = {}, {}  # Registry lookups, once per id
+    for app_id, app_rows in groupby(rows, key=lambda row: row[0]):
+        # Per source, the most recent answer wins; a higher-precedence source then only wins with an
+        # actual answer (same merge as answer_matrix.py)
+        layers = [{} for _ in ANSWER_SOURCES]  # question_id -> (block_id, answer)
+        for _, name, question_id, block_id, answer, rank, _ in app_rows:
+            layers[rank][question_id] = (block_id, answer)
+        if name.strip().lower() == _TEMPLATE_APP:
+            continue
+        merged = {}  # question_id -> (block_id, answer, source rank)
+        for rank, layer in enumerate(layers):
+            for question_id, (block_id, answer) in layer.items():
+                if answer or question_id not in merged:
+                    merged[question_id] = (block_id, answer, rank)
+
+        for question_id in sorted(merged):
+            block_id, answer, rank = merged[question_id]
+            if question_id not in question_texts:
+                question_texts[question_id] = question_for_id(question_id)
+            if block_id not in block_names:
+                block_names[block_id] = block_for_id(block_id) if block_id is not None else None
+            yield (app_id, name, question_id, block_names[block_id], question_texts[question_id],
+                   answer, ANSWER_SOURCES[rank])
+
+
+# ==================== WRITERS ====================
+def _write_csv(rows, columns, output):
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow([name for name, _ in columns])
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    text.flush()
+    text.detach()  # Leave the binary output open for the caller
+    return count
+
+
+def _write_ndjson(rows, columns, output):
+    names = [name for name, _ in columns]
+    count = 0
+    for row in rows:
+        output.write(json.dumps(dict(zip(names, row)), ensure_ascii=False).encode('utf-8') + b'\n')
+        count += 1
+    return count
+
+
+def _write_parquet(rows, columns, output):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from e
+
+    types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    def record_batch(batch):
+        return pa.RecordBatch.from_arrays(
+            [pa.array(list(values), type=field.type) for values, field in zip(zip(*batch), schema)]
+            if batch else [pa.array([], type=field.type) for field in schema], schema=schema)
+
+    count = 0
+    with pq.ParquetWriter(output, schema) as writer:
+        # One row group per STREAM_BATCH rows
+        batch: List[Tuple] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= STREAM_BATCH:
+                writer.write_batch(record_batch(batch))
+                count += len(batch)
+                batch = []
+        if batch or not count:
+            writer.write_batch(record_batch(batch))
+            count += len(batch)
+    return count
+
+
+_WRITERS = {'csv': _write_csv, 'ndjson': _write_ndjson, 'parquet': _write_parquet}
+
+
+# ==================== EXPORT ====================
+def export_data(output, dataset: str = 'portfolio', fmt: str = 'csv',
+                custom_weights: Optional[Dict[str, int]] = None, session=None) -> int:
+    """Stream a dataset into output (a binary file object); returns the number of rows written"""
+    if dataset not in COLUMNS:
+        raise ValueError(f"Unknown dataset '{dataset}' (expected one of {', '.join(DATASETS)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (expected one of {', '.join(FORMATS)})")
+
+    own_session = session is None
+    if own_session:
+        session = get_session()
+    try:
+        rows = portfolio_rows(session, custom_weights) if dataset == 'portfolio' else answer_rows(session)
+        return _WRITERS[fmt](rows, COLUMNS[dataset], output)
+    finally:
+        if own_session:
+            close_session(session)
+
+
+def export_file_name(dataset: str, fmt: str) -> str:
+    return f"apm_{dataset}{FORMATS[fmt][1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream portfolio data as CSV, NDJSON or Parquet")
+    parser.add_argument("--dataset", choices=DATASETS, default="portfolio")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv", dest="fmt")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, 'wb') as output:
+            count = export_data(output, args.dataset, args.fmt)
+        print(f"📤 {count} {args.dataset} row(s) written to {args.output}", file=sys.stderr)
+    else:
+        export_data(sys.stdout.buffer, args.dataset, args.fmt)
+        sys.stdout.buffer.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,26 +4,47 @@ Supports PostgreSQL (production/Streamlit Cloud) and SQLite (local development).
 Set DATABASE_URL env var or Streamlit secret for PostgreSQL.
 """
 
-from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, Text, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, Text, DateTime, ForeignKey, JSON, LargeBinary
+from sqlalchemy import event, inspect, text, update, insert, delete, select, func, and_, Index
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import declarative_base, sessionmaker, relationship, Session, deferred, object_session
 from datetime import datetime, timezone
+import hashlib
 import os
+import sys
 import shutil
+import sqlite3
+import threading
+import zlib
 from dotenv import load_dotenv
 
 load_dotenv()
 
+_SECRETS_PATHS = [
+    os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml"),
+    os.path.join(os.getcwd(), ".streamlit", "secrets.toml"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml"),
+]
+
+
+def get_streamlit_secret(name: str):
+    """Read a Streamlit secret without importing Streamlit in headless processes (CLI, worker)"""
+    if "streamlit" not in sys.modules and not any(os.path.exists(p) for p in _SECRETS_PATHS):
+        return None
+    try:
+        import streamlit as st
+        return st.secrets.get(name)
+    except Exception:
+        return None
+
 # ── Determine database URL ──
 # Priority: DATABASE_URL env var > Streamlit secrets > local SQLite
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
     # Try Streamlit secrets (available on Streamlit Cloud)
-    try:
-        import streamlit as st
-        DATABASE_URL = st.secrets.get("DATABASE_URL")
-    except Exception:
-        pass
+    DATABASE_URL = get_streamlit_secret("DATABASE_URL")
 
 if DATABASE_URL:
     # PostgreSQL mode - persistent cloud database
@@ -94,60 +115,187 @@ class Application(Base):
     synergy_scores = relationship("SynergyScore", back_populates="application", cascade="all, delete-orphan")
     insights = relationship("Insight", back_populates="application", cascade="all, delete-orphan")
 
-class QuestionnaireAnswer(Base):
+class SynergyBlockDef(Base):
+    """Synergy block registry (small integer ids referenced by answer rows)"""
+    __tablename__ = 'synergy_blocks'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class Question(Base):
+    """Master question registry, populated from framework.MASTER_QUESTIONS (ids never change once assigned)"""
+    __tablename__ = 'questions'
+
+    id = Column(Integer, primary_key=True)
+    block_id = Column(Integer, ForeignKey('synergy_blocks.id'), index=True)
+    text = Column(Text, unique=True, nullable=False)
+    position = Column(Integer)  # Order within the block
+
+
+class RegisteredQuestionMixin:
+    """
+    question_text / synergy_block of an answer row. Master questions and known blocks are stored as
+    question_id / block_id and resolved through the in-memory registry; only other texts are stored inline.
+    The setters only keep the text: it is resolved to an id at flush time (_resolve_registered_questions),
+    so rows can be built without a database.
+    """
+
+    @hybrid_property
+    def question_text(self):
+        if self.question_id is not None:
+            return question_for_id(self.question_id)
+        return self._question_text
+
+    @question_text.setter
+    def question_text(self, value):
+        self.question_id = None
+        self._question_text = value
+
+    @question_text.expression
+    def question_text(cls):
+        return func.coalesce(
+            select(Question.text).where(Question.id == cls.question_id).scalar_subquery(), cls._question_text
+        )
+
+    @hybrid_property
+    def synergy_block(self):
+        if self.block_id is not None:
+            return block_for_id(self.block_id)
+        return self._synergy_block
+
+    @synergy_block.setter
+    def synergy_block(self, value):
+        self.block_id = None
+        self._synergy_block = value
+
+    @synergy_block.expression
+    def synergy_block(cls):
+        return func.coalesce(
+            select(SynergyBlockDef.name).where(SynergyBlockDef.id == cls.block_id).scalar_subquery(),
+            cls._synergy_block
+        )
+
+    @classmethod
+    def question_is(cls, question: str):
+        """Filter on a question: an indexed integer comparison for master questions"""
+        question_id = question_id_for(question)
+        if question_id is not None:
+            return cls.question_id == question_id
+        return and_(cls.question_id.is_(None), cls._question_text == question)
+
+
+class QuestionnaireAnswer(RegisteredQuestionMixin, Base):
     """Answers from the original questionnaire"""
     __tablename__ = 'questionnaire_answers'
 
     id = Column(String, primary_key=True)
     application_id = Column(String, ForeignKey('applications.id'))
-    question_text = Column(Text)
+    question_id = Column(Integer, ForeignKey('questions.id'), index=True)
+    _question_text = Column('question_text', Text)  # Only for questions outside the registry
     answer_text = Column(Text)
     score = Column(Integer)
-    synergy_block = Column(String)
+    block_id = Column(Integer, ForeignKey('synergy_blocks.id'))
+    _synergy_block = Column('synergy_block', String)  # Only for blocks outside the registry
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     application = relationship("Application", back_populates="questionnaire_answers")
 
+class TranscriptBlob(Base):
+    """Compressed transcript body, addressed by the SHA-256 of its text (shared by identical texts)"""
+    __tablename__ = 'transcript_blobs'
+
+    sha256 = Column(String(64), primary_key=True)
+    codec = Column(String, default='zlib')
+    size_bytes = Column(Integer)  # Uncompressed UTF-8 size
+    data = deferred(Column(LargeBinary))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    @staticmethod
+    def sha256_of(text_value: str) -> str:
+        return hashlib.sha256(text_value.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_text(cls, text_value: str, sha256: str = None):
+        raw = text_value.encode('utf-8')
+        return cls(sha256=sha256 or hashlib.sha256(raw).hexdigest(), codec='zlib',
+                   size_bytes=len(raw), data=zlib.compress(raw, 6))
+
+    @property
+    def text(self) -> str:
+        if self.codec != 'zlib':
+            raise ValueError(f"Unsupported transcript codec: {self.codec}")
+        return zlib.decompress(self.data).decode('utf-8')
+
+
 class MeetingTranscript(Base):
-    """Meeting transcripts uploaded by users"""
+    """Meeting transcripts uploaded by users (the text itself lives in transcript_blobs)"""
     __tablename__ = 'meeting_transcripts'
 
     id = Column(String, primary_key=True)
     application_id = Column(String, ForeignKey('applications.id'))
     file_name = Column(String)
-    transcript_text = Column(Text)
+    text_sha256 = Column(String(64), ForeignKey('transcript_blobs.sha256'), index=True)
     upload_date = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     processed = Column(Boolean, default=False)
+    content_hash = Column(String(64), index=True)  # SHA-256 of the normalized text (transcript_dedup.py)
+    minhash_signature = Column(LargeBinary)  # MinHash of word shingles, for near-duplicate detection
 
     application = relationship("Application", back_populates="transcripts")
     answers = relationship("TranscriptAnswer", back_populates="transcript", cascade="all, delete-orphan")
 
-class TranscriptAnswer(Base):
+    @property
+    def transcript_text(self):
+        """Full text, loaded from transcript_blobs on first access"""
+        cached = self.__dict__.get('_text')
+        if cached is not None and cached[0] == self.text_sha256:
+            return cached[1]
+        if not self.text_sha256:
+            return None
+        session = object_session(self)
+        blob = session.get(TranscriptBlob, self.text_sha256) if session is not None else None
+        if blob is None:
+            return None
+        self.__dict__['_text'] = (self.text_sha256, blob.text)
+        return self.__dict__['_text'][1]
+
+    @transcript_text.setter
+    def transcript_text(self, text_value):
+        # The blob row is written at flush time (_store_transcript_blobs)
+        sha256 = TranscriptBlob.sha256_of(text_value) if text_value is not None else None
+        self.__dict__['_text'] = (sha256, text_value) if text_value is not None else None
+        self.text_sha256 = sha256
+
+class TranscriptAnswer(RegisteredQuestionMixin, Base):
     """Answers extracted from transcripts using AI"""
     __tablename__ = 'transcript_answers'
 
     id = Column(String, primary_key=True)
     application_id = Column(String, ForeignKey('applications.id'))
     transcript_id = Column(String, ForeignKey('meeting_transcripts.id'))
-    question_text = Column(Text)
+    question_id = Column(Integer, ForeignKey('questions.id'), index=True)
+    _question_text = Column('question_text', Text)
     answer_text = Column(Text)
     confidence_score = Column(Float)  # 0.0 to 1.0
     extraction_method = Column(String, default='ai_extraction')
-    synergy_block = Column(String)
+    block_id = Column(Integer, ForeignKey('synergy_blocks.id'))
+    _synergy_block = Column('synergy_block', String)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     application = relationship("Application", back_populates="transcript_answers")
     transcript = relationship("MeetingTranscript", back_populates="answers")
 
-class DavidNote(Base):
+class DavidNote(RegisteredQuestionMixin, Base):
     """David's detailed meeting notes and insights per application"""
     __tablename__ = 'david_notes'
 
     id = Column(String, primary_key=True)
     application_id = Column(String, ForeignKey('applications.id'))
-    question_text = Column(Text)
+    question_id = Column(Integer, ForeignKey('questions.id'), index=True)
+    _question_text = Column('question_text', Text)
     answer_text = Column(Text)
-    synergy_block = Column(String)
+    block_id = Column(Integer, ForeignKey('synergy_blocks.id'))
+    _synergy_block = Column('synergy_block', String)
     note_type = Column(String, default='answer')  # 'answer' or 'insight'
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
@@ -241,10 +389,337 @@ class QAHistory(Base):
     response_time_ms = Column(Integer)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     user_feedback = Column(String)  # 'helpful', 'not_helpful', null
+    data_revision = Column(Integer)  # Data revision the answer was produced against (for the Q&A cache)
+    source_id = Column(String)  # Entry a cached answer was served from (feedback applies to it)
+
+class LLMCall(Base):
+    """Telemetry for every LLM call (tokens, cost, latency, cache status)"""
+    __tablename__ = 'llm_calls'
+
+    id = Column(String, primary_key=True)
+    feature = Column(String, index=True)  # 'suggest_scores', 'extract_answers', 'answer_question', ...
+    model = Column(String)
+    application_ids = Column(JSON)  # Apps the call was made for (batched calls cover several)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cost_usd = Column(Float, default=0.0)
+    latency_ms = Column(Integer)
+    retries = Column(Integer, default=0)
+    cache_status = Column(String, default='miss')  # 'miss' (LLM called), 'hit' (served from cache)
+    success = Column(Boolean, default=True)
+    error = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+
+class Job(Base):
+    """Background job (run by worker.py or the app's embedded worker)"""
+    __tablename__ = 'jobs'
+
+    id = Column(String, primary_key=True)
+    job_type = Column(String, index=True)  # 'score_applications', 'process_transcripts', 'export_excel', 'export_pptx'
+    status = Column(String, default='queued', index=True)  # 'queued', 'running', 'succeeded', 'failed'
+    idempotency_key = Column(String, unique=True)
+    payload = Column(JSON)
+    result = Column(JSON)
+    artifact_file = Column(String)  # Generated file (exports), stored in the export cache directory
+    artifact_name = Column(String)
+    progress = Column(Float, default=0.0)  # 0.0 to 1.0
+    progress_message = Column(Text)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    error = Column(Text)
+    worker_id = Column(String)
+    run_after = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class DataRevision(Base):
+    """Single-row counter bumped on every change to portfolio data (used to invalidate caches)"""
+    __tablename__ = 'data_revision'
+
+    id = Column(Integer, primary_key=True)
+    revision = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
 
-# Database engine and session
+class SearchDocument(Base):
+    """
+    Full-text search entry for a transcript, answer, note or insight (search_index.py).
+    Title and body are not stored: they are indexed by a contentless FTS5 table on SQLite and a
+    tsvector column + GIN index on PostgreSQL, and read back from the source row for display.
+    """
+    __tablename__ = 'search_documents'
+    # AUTOINCREMENT: ids are never reused (they are the rowids of the FTS5 entries)
+    __table_args__ = (Index('ix_search_documents_doc', 'doc_type', 'doc_id', unique=True),
+                      {'sqlite_autoincrement': True})
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    doc_type = Column(String, nullable=False)  # 'transcript', 'questionnaire', 'transcript_answer', 'note', 'insight'
+    doc_id = Column(String, nullable=False)
+    application_id = Column(String, index=True)
+
+
+# Tables whose changes do not affect portfolio data (and must not invalidate caches)
+_REVISION_EXEMPT_TABLES = {'qa_history', 'llm_calls', 'data_revision', 'jobs', 'transcript_blobs', 'search_documents'}
+
+
+def _bump_revision(connection):
+    table = DataRevision.__table__
+    result = connection.execute(
+        update(table).where(table.c.id == 1).values(
+            revision=table.c.revision + 1,
+            updated_at=datetime.now(timezone.utc)
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(id=1, revision=1, updated_at=datetime.now(timezone.utc)))
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_revision_on_flush(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if getattr(obj, '__tablename__', None) not in _REVISION_EXEMPT_TABLES:
+            _bump_revision(session.connection())
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_revision_on_bulk(orm_execute_state):
+    # query(...).delete() / .update() bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None and table.name not in _REVISION_EXEMPT_TABLES:
+            _bump_revision(orm_execute_state.session.connection())
+
+
+@event.listens_for(Session, "before_flush")
+def _store_transcript_blobs(session, flush_context, instances):
+    """Write the blob of every transcript whose text was set, unless an identical text is stored"""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, MeetingTranscript):
+            continue
+        cached = obj.__dict__.get('_text')
+        if cached is None or cached[0] != obj.text_sha256:
+            continue
+        with session.no_autoflush:
+            if session.get(TranscriptBlob, cached[0]) is None:
+                session.add(TranscriptBlob.from_text(cached[1], cached[0]))
+
+
+@event.listens_for(Session, "before_flush")
+def _resolve_registered_questions(session, flush_context, instances):
+    """Store master questions / known blocks set by text as question_id / block_id"""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, RegisteredQuestionMixin):
+            continue
+        if obj.question_id is None and obj._question_text is not None:
+            question_id = question_id_for(obj._question_text)
+            if question_id is not None:
+                obj.question_id, obj._question_text = question_id, None
+        if obj.block_id is None and obj._synergy_block is not None:
+            block_id = block_id_for(obj._synergy_block)
+            if block_id is not None:
+                obj.block_id, obj._synergy_block = block_id, None
+
+
+# ==================== SEARCH INDEX SYNC ====================
+# doc_type -> (model, title attribute, body attribute)
+SEARCH_SOURCES = {
+    'transcript': (MeetingTranscript, 'file_name', 'transcript_text'),
+    'questionnaire': (QuestionnaireAnswer, 'question_text', 'answer_text'),
+    'transcript_answer': (TranscriptAnswer, 'question_text', 'answer_text'),
+    'note': (DavidNote, 'question_text', 'answer_text'),
+    'insight': (AppInsight, 'insight_type', 'content'),
+}
+_SEARCH_DOC_TYPES = {model: (doc_type, title, body) for doc_type, (model, title, body) in SEARCH_SOURCES.items()}
+_SEARCH_TABLES = {model.__tablename__: doc_type for doc_type, (model, _, _) in SEARCH_SOURCES.items()}
+
+
+def search_document_values(obj) -> dict:
+    """Entry of a source row; 'title' and 'body' are only passed to the full-text index"""
+    doc_type, title_attr, body_attr = _SEARCH_DOC_TYPES[type(obj)]
+    return {'doc_type': doc_type, 'doc_id': obj.id, 'application_id': obj.application_id,
+            'title': getattr(obj, title_attr) or '', 'body': getattr(obj, body_attr) or ''}
+
+
+def index_search_documents(connection, documents):
+    """Add entries: doc_type / doc_id / application_id in search_documents, title and body only in
+    the full-text index (FTS5 rowid = search_documents.id on SQLite, search_vector on PostgreSQL)"""
+    if not documents:
+        return
+    table = SearchDocument.__table__
+    ids = connection.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True),
+        [{key: value for key, value in document.items() if key not in ('title', 'body')} for document in documents]
+    ).scalars().all()
+    rows = [{'id': doc_id, 'title': document['title'], 'body': document['body']}
+            for doc_id, document in zip(ids, documents)]
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text(
+            "UPDATE search_documents SET search_vector = "
+            "setweight(to_tsvector('english', :title), 'A') || setweight(to_tsvector('english', :body), 'B') "
+            "WHERE id = :id"
+        ), rows)
+    else:
+        connection.execute(text("INSERT INTO search_fts(rowid, title, body) VALUES (:id, :title, :body)"), rows)
+
+
+# Computed attributes -> the mapped columns they are stored in
+_SEARCH_STORED_ATTRS = {'transcript_text': ('text_sha256',), 'question_text': ('question_id', '_question_text')}
+
+
+def _search_fields_changed(obj) -> bool:
+    _, title_attr, body_attr = _SEARCH_DOC_TYPES[type(obj)]
+    state = inspect(obj)
+    attrs = ['application_id']
+    for attr in (title_attr, body_attr):
+        attrs.extend(_SEARCH_STORED_ATTRS.get(attr, (attr,)))
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_documents(session, flush_context):
+    table = SearchDocument.__table__
+    removed, upserts = [], []
+    for obj in session.deleted:
+        if type(obj) in _SEARCH_DOC_TYPES:
+            removed.append((_SEARCH_DOC_TYPES[type(obj)][0], obj.id))
+    for obj in list(session.new) + list(session.dirty):
+        if type(obj) in _SEARCH_DOC_TYPES and (obj in session.new or _search_fields_changed(obj)):
+            upserts.append(search_document_values(obj))
+    if not removed and not upserts:
+        return
+
+    connection = session.connection()
+    for doc_type, doc_id in removed + [(v['doc_type'], v['doc_id']) for v in upserts]:
+        connection.execute(delete(table).where(table.c.doc_type == doc_type, table.c.doc_id == doc_id))
+    index_search_documents(connection, upserts)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _sync_search_documents_on_bulk(orm_execute_state):
+    # query(...).delete() / .update() bypass the flush: drop (and re-add, for updates) the affected entries
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    statement = orm_execute_state.statement
+    doc_type = _SEARCH_TABLES.get(getattr(getattr(statement, 'table', None), 'name', None))
+    if doc_type is None:
+        return
+
+    model = SEARCH_SOURCES[doc_type][0]
+    source_ids = select(model.__table__.c.id)
+    if statement.whereclause is not None:
+        source_ids = source_ids.where(statement.whereclause)
+    session = orm_execute_state.session
+    connection = session.connection()
+    table = SearchDocument.__table__
+    ids = [row[0] for row in connection.execute(source_ids)]
+    if ids:
+        connection.execute(delete(table).where(table.c.doc_type == doc_type, table.c.doc_id.in_(ids)))
+
+    if orm_execute_state.is_update and ids:
+        result = orm_execute_state.invoke_statement()
+        with session.no_autoflush:
+            index_search_documents(connection, [
+                search_document_values(obj)
+                for obj in session.query(model).filter(model.id.in_(ids)).populate_existing()
+            ])
+        return result
+
+
+def prune_transcript_blobs(session) -> int:
+    """Delete blobs no transcript refers to any more (replaced or deleted transcripts)"""
+    referenced = session.query(MeetingTranscript.text_sha256).filter(MeetingTranscript.text_sha256.isnot(None))
+    deleted = session.query(TranscriptBlob).filter(
+        TranscriptBlob.sha256.notin_(referenced)
+    ).delete(synchronize_session=False)
+    session.commit()
+    return deleted
+
+
+def rebuild_search_documents(session, batch_size: int = 500) -> int:
+    """Re-create every search entry from the source tables; returns the number indexed"""
+    table = SearchDocument.__table__
+    connection = session.connection()
+    connection.execute(delete(table))
+    if connection.dialect.name == 'sqlite':
+        # Also drops the entries left behind by deletes when SQLite lacks contentless_delete
+        connection.execute(text("INSERT INTO search_fts(search_fts) VALUES ('delete-all')"))
+    indexed = 0
+    for doc_type, (model, _, _) in SEARCH_SOURCES.items():
+        batch = []
+        for obj in session.query(model).yield_per(batch_size):
+            batch.append(search_document_values(obj))
+            if len(batch) >= batch_size:
+                index_search_documents(connection, batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            index_search_documents(connection, batch)
+            indexed += len(batch)
+    session.commit()
+    return indexed
+
+
+# ==================== QUESTION REGISTRY ====================
+# In-memory copy of the questions / synergy_blocks tables (loaded by init_db): O(1) text <-> id lookups
+_registry = {'question_ids': {}, 'questions': {}, 'block_ids': {}, 'blocks': {}}
+_registry_lock = threading.Lock()
+
+
+def _load_question_registry(connection):
+    questions = connection.execute(select(Question.id, Question.text)).fetchall()
+    blocks = connection.execute(select(SynergyBlockDef.id, SynergyBlockDef.name)).fetchall()
+    with _registry_lock:
+        _registry['questions'] = {question_id: question for question_id, question in questions}
+        _registry['question_ids'] = {question: question_id for question_id, question in questions}
+        _registry['blocks'] = {block_id: name for block_id, name in blocks}
+        _registry['block_ids'] = {name: block_id for block_id, name in blocks}
+
+
+def _registry_lookup(kind: str, key):
+    if key is None:
+        return None
+    get_engine()
+    value = _registry[kind].get(key)
+    if value is None and kind in ('questions', 'blocks'):
+        # An id registered by a newer process since this one started
+        with engine.connect() as conn:
+            _load_question_registry(conn)
+        value = _registry[kind].get(key)
+    return value
+
+
+def question_id_for(question: str):
+    """Registry id of a master question (None for other texts)"""
+    return _registry_lookup('question_ids', question)
+
+
+def question_for_id(question_id: int):
+    return _registry_lookup('questions', question_id)
+
+
+def block_id_for(block: str):
+    """Registry id of a synergy block (None for other names, e.g. 'Unknown')"""
+    return _registry_lookup('block_ids', block)
+
+
+def block_for_id(block_id: int):
+    return _registry_lookup('blocks', block_id)
+
+
+def get_data_revision(session) -> int:
+    """Current data revision (changes whenever portfolio data changes)"""
+    revision = session.query(DataRevision.revision).filter(DataRevision.id == 1).scalar()
+    return revision or 0
+
+
+# Database engine and session (created lazily on first use, once per process)
 engine = None
 SessionLocal = None
+_init_lock = threading.Lock()
 
 def init_db():
     """Initialize database and create all tables"""
@@ -255,29 +730,190 @@ def init_db():
     else:
         # SQLite - ensure data directory exists
         os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-        engine = create_engine(f'sqlite:///{DATABASE_PATH}', echo=False)
+        # The app and background workers write concurrently: wait for locks instead of failing
+        engine = create_engine(f'sqlite:///{DATABASE_PATH}', echo=False, connect_args={'timeout': 30})
 
     # Create all tables
     Base.metadata.create_all(engine)
+    _migrate_schema(engine)
+    _migrate_transcript_bodies(engine)
+    _sync_question_registry(engine)
+    _migrate_question_ids(engine)
 
     # Create session factory
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+    _install_search_index(engine)
+
+    session = SessionLocal()
+    try:
+        pruned = prune_transcript_blobs(session)
+        if pruned:
+            print(f"[DATABASE] Deleted {pruned} unused transcript blob(s)")
+        # Existing data (or a database created before the search index): index everything once
+        if session.query(SearchDocument.id).first() is None:
+            indexed = rebuild_search_documents(session)
+            if indexed:
+                print(f"[DATABASE] Indexed {indexed} document(s) for full-text search")
+    finally:
+        session.close()
+
+    return engine
+
+def _migrate_schema(engine):
+    """Add nullable columns that were added to the models after the tables were created"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable or column.primary_key:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                print(f"[DATABASE] Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                if index.name not in {i['name'] for i in inspector.get_indexes(table.name)}:
+                    index.create(conn, checkfirst=True)
+
+def _migrate_transcript_bodies(engine, batch_size: int = 200):
+    """Move inline meeting_transcripts.transcript_text into transcript_blobs, then drop the column"""
+    inspector = inspect(engine)
+    if 'transcript_text' not in {c['name'] for c in inspector.get_columns('meeting_transcripts')}:
+        return
+
+    moved = 0
+    blobs = TranscriptBlob.__table__
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                'SELECT id, transcript_text FROM meeting_transcripts '
+                'WHERE transcript_text IS NOT NULL AND text_sha256 IS NULL LIMIT :limit'
+            ), {'limit': batch_size}).fetchall()
+            if not rows:
+                break
+            for transcript_id, transcript_text in rows:
+                blob = TranscriptBlob.from_text(transcript_text)
+                if conn.execute(blobs.select().with_only_columns(blobs.c.sha256)
+                                .where(blobs.c.sha256 == blob.sha256)).first() is None:
+                    conn.execute(insert(blobs).values(
+                        sha256=blob.sha256, codec=blob.codec, size_bytes=blob.size_bytes,
+                        data=blob.data, created_at=datetime.now(timezone.utc)
+                    ))
+                conn.execute(text('UPDATE meeting_transcripts SET text_sha256 = :sha WHERE id = :id'),
+                             {'sha': blob.sha256, 'id': transcript_id})
+            moved += len(rows)
+
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE meeting_transcripts DROP COLUMN transcript_text'))
+    print(f"[DATABASE] Moved {moved} transcript bodies to transcript_blobs")
+
+    if engine.dialect.name == 'sqlite':
+        # Give the space of the inline text back to the file system
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('VACUUM'))
+
+def _sync_question_registry(engine):
+    """Register new master questions and synergy blocks; existing ids are never renumbered"""
+    from framework import MASTER_QUESTIONS
+
+    blocks_table, questions_table = SynergyBlockDef.__table__, Question.__table__
+    try:
+        with engine.begin() as conn:
+            block_ids = {name: block_id for block_id, name in conn.execute(select(blocks_table.c.id, blocks_table.c.name))}
+            questions = {row.text: row for row in conn.execute(select(questions_table))}
+            # Explicit ids (max + 1) instead of sequences: copies between databases keep them valid
+            next_block_id = max(block_ids.values(), default=0) + 1
+            next_question_id = max((row.id for row in questions.values()), default=0) + 1
+            for block_name, block_questions in MASTER_QUESTIONS.items():
+                if block_name not in block_ids:
+                    conn.execute(insert(blocks_table).values(id=next_block_id, name=block_name))
+                    block_ids[block_name] = next_block_id
+                    next_block_id += 1
+                for position, question in enumerate(block_questions, 1):
+                    row = questions.get(question)
+                    if row is None:
+                        conn.execute(insert(questions_table).values(
+                            id=next_question_id, block_id=block_ids[block_name], text=question, position=position
+                        ))
+                        next_question_id += 1
+                    elif (row.block_id, row.position) != (block_ids[block_name], position):
+                        conn.execute(update(questions_table).where(questions_table.c.id == row.id).values(
+                            block_id=block_ids[block_name], position=position
+                        ))
+    except IntegrityError:
+        pass  # Another process registered them at the same time
+
+    with engine.connect() as conn:
+        _load_question_registry(conn)
+
+def _migrate_question_ids(engine):
+    """Replace inline master question texts and block names of answer rows by registry ids"""
+    moved = 0
+    with engine.begin() as conn:
+        for model in (QuestionnaireAnswer, TranscriptAnswer, DavidNote):
+            table = model.__tablename__
+            moved += conn.execute(text(
+                f'UPDATE {table} SET question_id = (SELECT q.id FROM questions q WHERE q.text = {table}.question_text), '
+                f'question_text = NULL WHERE question_id IS NULL AND question_text IN (SELECT text FROM questions)'
+            )).rowcount
+            conn.execute(text(
+                f'UPDATE {table} SET block_id = (SELECT b.id FROM synergy_blocks b WHERE b.name = {table}.synergy_block), '
+                f'synergy_block = NULL WHERE block_id IS NULL AND synergy_block IN (SELECT name FROM synergy_blocks)'
+            ))
+    if not moved:
+        return
+    print(f"[DATABASE] Linked {moved} answer(s) to the question registry")
+
+    if engine.dialect.name == 'sqlite':
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('VACUUM'))
+
+# contentless_delete=1 (SQLite 3.43+): FTS5 rows of a contentless table can be deleted by rowid
+_FTS5_CONTENTLESS_DELETE = tuple(int(part) for part in sqlite3.sqlite_version.split('.')) >= (3, 43, 0)
+
+
+def _install_search_index(engine):
+    """Create the full-text index over search_documents (contentless FTS5 on SQLite, tsvector + GIN
+    on PostgreSQL)"""
+    with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql':
+            conn.execute(text("ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_search_documents_vector ON search_documents USING GIN (search_vector)"
+            ))
+            return
+        # Contentless FTS5 table (rowid = search_documents.id): stores the index, not the text
+        options = ", contentless_delete=1" if _FTS5_CONTENTLESS_DELETE else ""
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(title, body, content=''{options}, "
+            "tokenize='porter unicode61 remove_diacritics 2')"
+        ))
+        if _FTS5_CONTENTLESS_DELETE:
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+                "DELETE FROM search_fts WHERE rowid = old.id; END"
+            ))
+        # Older SQLite: entries of deleted documents stay in search_fts (ids are never reused, and
+        # searches join search_documents) until the next rebuild_search_documents()
+
+def get_engine():
+    """Get the database engine, initializing the database on first use"""
+    if SessionLocal is None:
+        with _init_lock:
+            if SessionLocal is None:
+                init_db()
     return engine
 
 def get_session():
     """Get a new database session"""
     if SessionLocal is None:
-        init_db()
+        get_engine()
     return SessionLocal()
 
 def close_session(session):
     """Close database session"""
     session.close()
-
-# Initialize on import
-try:
-    init_db()
-except Exception as e:
-    import sys
-    print(f"Warning: Database init deferred ({e})", file=sys.stderr)
@@ -3,54 +3,48 @@ Excel Generator for Avangrid APM Platform
 Generates a full Excel workbook matching the original APM format with:
 Calculator, Dashboard, Strategic Roadmap, Application Groups, Value Chain,
 and individual application sheets.
+The workbook is written in openpyxl write-only mode: every sheet is streamed row by row to a
+temporary file (SheetWriter) and the .xlsx is assembled when saved, so memory stays bounded by
+one sheet instead of the whole portfolio.
 """
 
 import io
 import os
 import re
-from copy import copy
-from openpyxl import Workbook, load_workbook
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
 from openpyxl.chart import ScatterChart, Reference, Series
 from openpyxl.chart.label import DataLabelList
 from openpyxl.chart.marker import Marker
 from openpyxl.chart.series import DataPoint
 from openpyxl.chart.axis import ChartLines
-from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter, coordinate_to_tuple
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.worksheet.datavalidation import DataValidation
+from sqlalchemy import select
 from database import (
     get_session, close_session,
     Application, QuestionnaireAnswer, SynergyScore
 )
+from xlsx_template import get_compiled_template
+from matrix_chart import matrix_png
+from keyword_matcher import KeywordMatcher, first_category
+from framework import SYNERGY_BLOCKS, BLOCK_NAMES, BLOCK_DEFINITIONS, BUSINESS_BLOCKS, TECH_BLOCKS, DEFAULT_WEIGHTS
 
 EXCEL_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "template_excel.xlsx")
 
+# Processes rendering the application sheets (1 = in this process)
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "1"))
+
 # ============================================================
 # Constants
 # ============================================================
 
-SYNERGY_BLOCKS = {
-    'Strategic Fit': {'Type': 'Business', 'Weight': 30},
-    'Business Efficiency': {'Type': 'Business', 'Weight': 30},
-    'User Value': {'Type': 'Business', 'Weight': 20},
-    'Financial Value': {'Type': 'Business', 'Weight': 20},
-    'Architecture': {'Type': 'Technical', 'Weight': 30},
-    'Operational Risk': {'Type': 'Technical', 'Weight': 30},
-    'Maintainability': {'Type': 'Technical', 'Weight': 25},
-    'Support Quality': {'Type': 'Technical', 'Weight': 15},
-}
-
-BLOCK_DEFINITIONS = {
-    'Strategic Fit': {1: 'Completely misaligned', 2: 'Partially aligned', 3: 'Neutral', 4: 'Well-aligned', 5: 'Strategic driver'},
-    'Business Efficiency': {1: 'Manual', 2: 'Low efficiency', 3: 'Average', 4: 'High', 5: 'Optimized'},
-    'User Value': {1: 'Rejected', 2: 'Low satisfaction', 3: 'Acceptable', 4: 'Good', 5: 'Delightful'},
-    'Financial Value': {1: 'Negative', 2: 'Poor', 3: 'Neutral', 4: 'Positive', 5: 'Exceptional'},
-    'Architecture': {1: 'Obsolete', 2: 'Aging', 3: 'Stable', 4: 'Modern', 5: 'Future-proof'},
-    'Operational Risk': {1: 'Critical', 2: 'High', 3: 'Managed', 4: 'Low', 5: 'Fortified'},
-    'Maintainability': {1: 'Impossible', 2: 'Hard', 3: 'Standard', 4: 'Good', 5: 'Excellent'},
-    'Support Quality': {1: 'Non-existent', 2: 'Reactive', 3: 'Defined', 4: 'Proactive', 5: 'World-class'},
-}
-
 REC_COLORS = {
     'EVOLVE': {'fill': 'C6EFCE', 'font': '006100'},
     'INVEST': {'fill': 'FFEB9C', 'font': '9C5700'},
@@ -152,38 +146,113 @@ def get_recommendation(bvi, thi):
 def calculate_bvi_thi(scores, custom_weights=None):
     """Calculate BVI and THI from block scores."""
     weights = custom_weights or SYNERGY_BLOCKS
-    bvi_blocks = ['Strategic Fit', 'Business Efficiency', 'User Value', 'Financial Value']
-    thi_blocks = ['Architecture', 'Operational Risk', 'Maintainability', 'Support Quality']
 
-    bvi_total = sum(scores.get(b, 0) * weights.get(b, {}).get('Weight', SYNERGY_BLOCKS[b]['Weight']) for b in bvi_blocks)
-    bvi_weight = sum(weights.get(b, {}).get('Weight', SYNERGY_BLOCKS[b]['Weight']) for b in bvi_blocks)
+    bvi_total = sum(scores.get(b, 0) * weights.get(b, {}).get('Weight', DEFAULT_WEIGHTS[b]) for b in BUSINESS_BLOCKS)
+    bvi_weight = sum(weights.get(b, {}).get('Weight', DEFAULT_WEIGHTS[b]) for b in BUSINESS_BLOCKS)
     bvi = (bvi_total / bvi_weight * 20) if bvi_weight > 0 else 0
 
-    thi_total = sum(scores.get(b, 0) * weights.get(b, {}).get('Weight', SYNERGY_BLOCKS[b]['Weight']) for b in thi_blocks)
-    thi_weight = sum(weights.get(b, {}).get('Weight', SYNERGY_BLOCKS[b]['Weight']) for b in thi_blocks)
+    thi_total = sum(scores.get(b, 0) * weights.get(b, {}).get('Weight', DEFAULT_WEIGHTS[b]) for b in TECH_BLOCKS)
+    thi_weight = sum(weights.get(b, {}).get('Weight', DEFAULT_WEIGHTS[b]) for b in TECH_BLOCKS)
     thi = (thi_total / thi_weight * 20) if thi_weight > 0 else 0
 
     return round(bvi, 1), round(thi, 1)
 
 
-def categorize_app(app_name, qa_texts):
-    """Categorize an application into groups based on name and Q&A content."""
-    search_text = (app_name + " " + " ".join(qa_texts)).lower()
-    for cat_name, cat_info in APP_GROUP_CATEGORIES.items():
-        for kw in cat_info['keywords']:
-            if kw in search_text:
-                return cat_name
-    return 'Uncategorized'
+# Application Groups and Value Chain keywords, matched in one pass over an app's text
+CATEGORY_MATCHER = KeywordMatcher({
+    'groups': {name: info['keywords'] for name, info in APP_GROUP_CATEGORIES.items()},
+    'value_chain': {name: info['keywords'] for name, info in VALUE_CHAIN_STAGES.items()},
+})
+
+
+def scan_categories(app_name, qa_texts):
+    """Keyword hits of an application's name and Q&A content, for both classifications."""
+    return CATEGORY_MATCHER.scan(app_name + " " + " ".join(qa_texts))
+
+
+def categorize_app(category_hits):
+    """Categorize an application into groups (category_hits: see scan_categories)."""
+    return first_category(category_hits['groups'], 'Uncategorized')
 
 
-def categorize_value_chain(app_name, qa_texts):
-    """Categorize an application into value chain stage."""
-    search_text = (app_name + " " + " ".join(qa_texts)).lower()
-    for stage_name, stage_info in VALUE_CHAIN_STAGES.items():
-        for kw in stage_info['keywords']:
-            if kw in search_text:
-                return stage_name
-    return 'Cross-Cutting'
+def categorize_value_chain(category_hits):
+    """Categorize an application into value chain stage (category_hits: see scan_categories)."""
+    return first_category(category_hits['value_chain'], 'Cross-Cutting')
+
+
+# ============================================================
+# Streaming sheet writer
+# ============================================================
+
+class SheetWriter:
+    """Write-only worksheet with the cell API of a regular one (cell(), ['A1'], merge_cells()).
+
+    Cells are buffered per row and streamed to the sheet in row order by flush(); flushed rows
+    can no longer be changed. Column widths, freeze panes and the tab color are written with
+    the first row, so they must be set before the first flush. close() writes the rest.
+    """
+
+    def __init__(self, wb, title):
+        self._ws = wb.create_sheet(title)
+        self._rows = {}  # row -> {column: cell}
+        self._next_row = 1  # First row not streamed yet
+
+    def __getattr__(self, name):
+        # column_dimensions, row_dimensions, sheet_properties, merged_cells, add_image, title...
+        return getattr(self._ws, name)
+
+    def __getitem__(self, coordinate):
+        row, column = coordinate_to_tuple(coordinate)
+        return self.cell(row=row, column=column)
+
+    @property
+    def freeze_panes(self):
+        return self._ws.freeze_panes
+
+    @freeze_panes.setter
+    def freeze_panes(self, value):
+        self._ws.freeze_panes = value
+
+    @property
+    def max_row(self):
+        return max(max(self._rows, default=0), self._next_row - 1)
+
+    def cell(self, row, column, value=None):
+        if row < self._next_row:
+            raise ValueError(f"Row {row} of sheet '{self._ws.title}' was already written")
+        cells = self._rows.setdefault(row, {})
+        cell = cells.get(column)
+        if cell is None:
+            cell = cells[column] = WriteOnlyCell(self._ws)
+            cell.row, cell.column = row, column
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def merge_cells(self, range_string=None, start_row=None, start_column=None, end_row=None, end_column=None):
+        self._ws.merged_cells.add(CellRange(range_string, min_col=start_column, min_row=start_row,
+                                            max_col=end_column, max_row=end_row))
+
+    def unmerge_cells(self, range_string):
+        self._ws.merged_cells.remove(CellRange(range_string))
+
+    def add_data_validation(self, data_validation):
+        self._ws.data_validations.append(data_validation)
+
+    def flush(self, before_row=None):
+        """Stream every buffered row above before_row (all rows when omitted)"""
+        last_row = self.max_row if before_row is None else before_row - 1
+        for row in range(self._next_row, last_row + 1):
+            cells = self._rows.pop(row, None)
+            values = [None] * max(cells, default=0) if cells else []
+            for column, cell in (cells or {}).items():
+                values[column - 1] = cell
+            self._ws.append(values)
+        self._next_row = max(self._next_row, last_row + 1)
+
+    def close(self):
+        self.flush()
+        self._ws.close()
 
 
 # ============================================================
@@ -192,8 +261,8 @@ def categorize_value_chain(app_name, qa_texts):
 
 def build_calculator_sheet(wb, apps_data, custom_weights):
     """Build the Calculator sheet with scores, BVI, THI, and recommendations."""
-    ws = wb.create_sheet("Calculator")
-    blocks = list(SYNERGY_BLOCKS.keys())
+    ws = SheetWriter(wb, "Calculator")
+    blocks = BLOCK_NAMES
 
     # Column widths
     ws.column_dimensions['A'].width = 30
@@ -236,7 +305,7 @@ def build_calculator_sheet(wb, apps_data, custom_weights):
     # Row 2: Weights
     ws.cell(row=2, column=1, value="Weight").font = Font(name='Calibri', size=9, italic=True, color='666666')
     for i, block in enumerate(blocks):
-        w = custom_weights.get(block, SYNERGY_BLOCKS[block]['Weight'])
+        w = custom_weights.get(block, DEFAULT_WEIGHTS[block])
         cell = ws.cell(row=2, column=i + 2, value=f"{w}%")
         cell.font = Font(name='Calibri', size=9, italic=True, color='666666')
         cell.alignment = Alignment(horizontal='center')
@@ -246,6 +315,8 @@ def build_calculator_sheet(wb, apps_data, custom_weights):
 
     # Data rows
     for row_idx, app in enumerate(apps_data, start=3):
+        ws.flush(row_idx)
+
         # App name
         cell = ws.cell(row=row_idx, column=1, value=app['name'])
         cell.font = Font(name='Calibri', size=10, bold=True)
@@ -288,132 +359,19 @@ def build_calculator_sheet(wb, apps_data, custom_weights):
         cell.border = THIN_BORDER
         cell.alignment = Alignment(horizontal='center')
 
+    ws.close()
     return ws
 
 
-def _compute_matplotlib_label_positions(apps_data):
-    """Compute optimal label positions for matplotlib scatter chart.
-    Uses greedy placement with 16 offset directions, prioritizing crowded points.
-    Returns list of (dx, dy, ha, va) offsets in data units for each app (same order as input)."""
-    import math
-
-    # 16 possible offset directions: (dx, dy, horizontal_align, vertical_align)
-    # in data-coordinate units (chart range 0-100)
-    OFFSETS = [
-        ( 2.0,  2.0, 'left',   'bottom'),   # top-right
-        ( 2.0, -2.0, 'left',   'top'),       # bottom-right
-        (-2.0,  2.0, 'right',  'bottom'),    # top-left
-        (-2.0, -2.0, 'right',  'top'),       # bottom-left
-        ( 3.0,  0.0, 'left',   'center'),    # right
-        (-3.0,  0.0, 'right',  'center'),    # left
-        ( 0.0,  3.0, 'center', 'bottom'),    # top
-        ( 0.0, -3.0, 'center', 'top'),       # bottom
-        ( 4.0,  3.5, 'left',   'bottom'),    # far top-right
-        ( 4.0, -3.5, 'left',   'top'),       # far bottom-right
-        (-4.0,  3.5, 'right',  'bottom'),    # far top-left
-        (-4.0, -3.5, 'right',  'top'),       # far bottom-left
-        ( 6.0,  1.0, 'left',   'center'),    # far right
-        (-6.0,  1.0, 'right',  'center'),    # far left
-        ( 0.0,  5.0, 'center', 'bottom'),    # far top
-        ( 0.0, -5.0, 'center', 'top'),       # far bottom
-    ]
-
-    coords = [(app['thi'], app['bvi'], app['name']) for app in apps_data]
-
-    # Sort by density (most crowded points first get priority)
-    neighbor_counts = []
-    for i, (x1, y1, _) in enumerate(coords):
-        count = sum(1 for j, (x2, y2, _) in enumerate(coords)
-                    if i != j and math.hypot(x2 - x1, y2 - y1) < 12)
-        neighbor_counts.append(count)
-    order = sorted(range(len(coords)), key=lambda i: -neighbor_counts[i])
-
-    positions = [None] * len(coords)
-    placed_bboxes = []  # list of (x1, y1, x2, y2) in data coords
-
-    # Label dimensions in data units (for ~22x16 inch figure, 0-100 range)
-    CHAR_W = 0.32   # width per character in data units
-    LABEL_H = 2.0   # label height in data units
-    PAD = 0.3       # padding around label
-
-    def get_bbox(lx, ly, ha, name):
-        w = len(name) * CHAR_W
-        h = LABEL_H
-        if ha == 'left':
-            return (lx - PAD, ly - h / 2 - PAD, lx + w + PAD, ly + h / 2 + PAD)
-        elif ha == 'right':
-            return (lx - w - PAD, ly - h / 2 - PAD, lx + PAD, ly + h / 2 + PAD)
-        else:  # center
-            return (lx - w / 2 - PAD, ly - h / 2 - PAD, lx + w / 2 + PAD, ly + h / 2 + PAD)
-
-    def score_placement(bbox):
-        score = 0
-        cx = (bbox[0] + bbox[2]) / 2
-        cy = (bbox[1] + bbox[3]) / 2
-        # Overlap with already-placed labels
-        for pb in placed_bboxes:
-            dx = min(bbox[2], pb[2]) - max(bbox[0], pb[0])
-            dy = min(bbox[3], pb[3]) - max(bbox[1], pb[1])
-            if dx > 0 and dy > 0:
-                score += dx * dy * 10  # heavy penalty for overlap area
-            else:
-                # Proximity penalty
-                pcx = (pb[0] + pb[2]) / 2
-                pcy = (pb[1] + pb[3]) / 2
-                dist = math.hypot(cx - pcx, cy - pcy)
-                if dist < 5:
-                    score += 3
-                elif dist < 8:
-                    score += 1
-        # Boundary penalty
-        if bbox[0] < -2: score += 6
-        if bbox[2] > 102: score += 6
-        if bbox[1] < -2: score += 6
-        if bbox[3] > 102: score += 6
-        # Overlap with data points (markers)
-        for x, y, _ in coords:
-            if bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
-                score += 4
-        return score
-
-    for idx in order:
-        x, y, name = coords[idx]
-        best_score = float('inf')
-        best_pos = OFFSETS[0]
-        best_bbox = None
-
-        for dx, dy, ha, va in OFFSETS:
-            lx = x + dx
-            ly = y + dy
-            bbox = get_bbox(lx, ly, ha, name)
-            s = score_placement(bbox)
-            if s < best_score:
-                best_score = s
-                best_pos = (dx, dy, ha, va)
-                best_bbox = bbox
-                if s == 0:
-                    break
-
-        positions[idx] = best_pos
-        if best_bbox:
-            placed_bboxes.append(best_bbox)
-
-    return positions
-
-
 def build_dashboard_sheet(wb, apps_data):
     """Build the Dashboard sheet with a matplotlib-rendered scatter chart image.
-    Uses matplotlib for pixel-perfect label positioning with leader lines.
+    Uses matplotlib for pixel-perfect label positioning with leader lines
+    (matrix_chart.render_matrix_png; the image is cached per chart content).
     Features: app name labels on dots (no collisions), dashed threshold lines at 60/60,
     quadrant labels (EVOLVE/INVEST/MAINTAIN/ELIMINATE), color-coded markers."""
-    import matplotlib
-    matplotlib.use('Agg')
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
-    from io import BytesIO
     from openpyxl.drawing.image import Image as XlImage
 
-    ws = wb.create_sheet("Dashboard")
+    ws = SheetWriter(wb, "Dashboard")
 
     # ── Data table for reference (columns A-E) ──
     headers = [("Application", 35), ("THI", 10), ("BVI", 10), ("Recommendation", 18), ("Override", 10)]
@@ -460,110 +418,8 @@ def build_dashboard_sheet(wb, apps_data):
         if is_overridden:
             cell.fill = PatternFill(start_color='FEF3C7', end_color='FEF3C7', fill_type='solid')
 
-    # ── Generate matplotlib chart ──
-    marker_colors_plt = {
-        'EVOLVE': '#10B981',
-        'INVEST': '#F59E0B',
-        'MAINTAIN': '#3B82F6',
-        'ELIMINATE': '#EF4444',
-    }
-
-    fig, ax = plt.subplots(figsize=(22, 16))
-    fig.patch.set_facecolor('white')
-    ax.set_facecolor('white')
-    ax.set_xlim(-3, 103)
-    ax.set_ylim(-3, 103)
-    ax.set_xticks(range(0, 101, 20))
-    ax.set_yticks(range(0, 101, 20))
-    ax.grid(True, color='#D3D3D3', linewidth=0.5)
-    ax.set_axisbelow(True)
-
-    # Dashed threshold lines at 60,60
-    ax.axhline(y=60, color='#808080', linestyle='--', linewidth=1.5, alpha=0.7, zorder=2)
-    ax.axvline(x=60, color='#808080', linestyle='--', linewidth=1.5, alpha=0.7, zorder=2)
-
-    # Quadrant labels (large, faded, positioned in quadrant centers)
-    ax.text(80, 88, 'EVOLVE', fontsize=22, fontweight='bold', ha='center', va='center',
-            color='#10B981', alpha=0.25, zorder=1)
-    ax.text(30, 88, 'INVEST', fontsize=22, fontweight='bold', ha='center', va='center',
-            color='#F59E0B', alpha=0.25, zorder=1)
-    ax.text(80, 12, 'MAINTAIN', fontsize=22, fontweight='bold', ha='center', va='center',
-            color='#3B82F6', alpha=0.25, zorder=1)
-    ax.text(30, 12, 'ELIMINATE', fontsize=22, fontweight='bold', ha='center', va='center',
-            color='#EF4444', alpha=0.25, zorder=1)
-
-    # Axis labels and title
-    ax.set_xlabel('Technical Health Index (THI)', fontsize=14, labelpad=10)
-    ax.set_ylabel('Business Value Index (BVI)', fontsize=14, labelpad=10)
-    ax.set_title('Application Portfolio \u2013 Strategic Positioning',
-                 fontsize=16, fontweight='bold', pad=15)
-
-    # Plot scatter points - use star marker for overridden apps
-    has_overridden = any(app.get('is_overridden', False) for app in apps_data)
-    for app in apps_data:
-        color = marker_colors_plt.get(app['recommendation'], '#999999')
-        is_overridden = app.get('is_overridden', False)
-        if is_overridden:
-            # Star marker with thick black edge for overridden apps
-            ax.scatter(app['thi'], app['bvi'], c=color, s=150, zorder=6,
-                       marker='*', edgecolors='#000000', linewidth=1.5)
-        else:
-            # Regular circle marker
-            ax.scatter(app['thi'], app['bvi'], c=color, s=90, zorder=5,
-                       edgecolors='white', linewidth=0.5)
-
-    # Compute optimal label positions (greedy, no-collision)
-    positions = _compute_matplotlib_label_positions(apps_data)
-
-    # Draw labels with thin leader lines - show override details for overridden apps
-    for i, app in enumerate(apps_data):
-        dx, dy, ha, va = positions[i]
-        is_overridden = app.get('is_overridden', False)
-        if is_overridden:
-            calc_rec = app.get('calculated_recommendation', '')
-            new_rec = app.get('recommendation', '')
-            # Show: "AppName (CALC→NEW)"
-            label_text = f"{app['name']} ({calc_rec}→{new_rec})"
-            label_color = '#B45309'  # Orange-brown for overridden
-        else:
-            label_text = app['name']
-            label_color = '#333333'
-        ax.annotate(
-            label_text,
-            xy=(app['thi'], app['bvi']),
-            xytext=(app['thi'] + dx, app['bvi'] + dy),
-            fontsize=7,
-            fontweight='bold' if is_overridden else 'normal',
-            color=label_color,
-            ha=ha, va=va,
-            arrowprops=dict(arrowstyle='-', color='#BBBBBB', linewidth=0.5,
-                            shrinkA=0, shrinkB=2),
-            zorder=10,
-        )
-
-    # Color legend
-    legend_elements = [
-        mpatches.Patch(facecolor='#10B981', edgecolor='#CCCCCC', label='EVOLVE'),
-        mpatches.Patch(facecolor='#F59E0B', edgecolor='#CCCCCC', label='INVEST'),
-        mpatches.Patch(facecolor='#3B82F6', edgecolor='#CCCCCC', label='MAINTAIN'),
-        mpatches.Patch(facecolor='#EF4444', edgecolor='#CCCCCC', label='ELIMINATE'),
-    ]
-    # Add override indicator to legend if any app is overridden
-    if has_overridden:
-        from matplotlib.lines import Line2D
-        legend_elements.append(Line2D([0], [0], marker='*', color='w', label='⚠️ Override',
-                                       markerfacecolor='gray', markersize=12,
-                                       markeredgecolor='black', markeredgewidth=1.5))
-    ax.legend(handles=legend_elements, loc='lower right', fontsize=11,
-              framealpha=0.9, edgecolor='#CCCCCC')
-
-    plt.tight_layout()
-
-    # Render to PNG at high DPI
-    img_buf = BytesIO()
-    fig.savefig(img_buf, format='png', dpi=120, bbox_inches='tight', facecolor='white')
-    plt.close(fig)
-    img_buf.seek(0)
+    # ── Matplotlib chart (rendered once per distinct chart) ──
+    img_buf = io.BytesIO(matrix_png(apps_data))
 
     # Insert chart image to the right of the data table (column F)
     xl_img = XlImage(img_buf)
@@ -571,12 +427,13 @@ def build_dashboard_sheet(wb, apps_data):
     xl_img.height = 1200   # ~12.5 inches at 96 DPI
     ws.add_image(xl_img, "F1")
 
+    ws.close()
     return ws
 
 
 def build_roadmap_sheet(wb, apps_data):
     """Build the Strategic Roadmap sheet."""
-    ws = wb.create_sheet("Strategic Roadmap")
+    ws = SheetWriter(wb, "Strategic Roadmap")
 
     headers = ['Application Name', 'BVI', 'THI', 'Recommendation', 'Subcategory', 'Quick Win?', 'Priority', 'Rationale', 'Comments']
     widths = [35, 15, 15, 18, 18, 12, 18, 25, 30]
@@ -592,6 +449,7 @@ def build_roadmap_sheet(wb, apps_data):
     ws.freeze_panes = 'A2'
 
     for row_idx, app in enumerate(apps_data, start=2):
+        ws.flush(row_idx)
         rec = app['recommendation']
         rec_colors = REC_COLORS.get(rec, {'fill': 'FFFFFF', 'font': '000000'})
 
@@ -655,20 +513,20 @@ def build_roadmap_sheet(wb, apps_data):
         cell.font = CONTENT_FONT
         cell.border = THIN_BORDER
 
+    ws.close()
     return ws
 
 
 def build_app_groups_sheet(wb, apps_data):
     """Build the Application Groups sheet."""
-    ws = wb.create_sheet("Application Groups")
+    ws = SheetWriter(wb, "Application Groups")
 
     # Group apps
     groups = {cat: [] for cat in APP_GROUP_CATEGORIES}
     groups['Uncategorized'] = []
 
     for app in apps_data:
-        qa_texts = [a for a in app.get('qa_answers', {}).values() if a]
-        cat = categorize_app(app['name'], qa_texts)
+        cat = categorize_app(app['category_hits'])
         groups[cat].append(app)
 
     # Layout: 2 rows x 3 cols grid
@@ -716,12 +574,13 @@ def build_app_groups_sheet(wb, apps_data):
         for offset in range(4):
             ws.column_dimensions[get_column_letter(col + offset)].width = 10
 
+    ws.close()
     return ws
 
 
 def build_value_chain_sheet(wb, apps_data):
     """Build the Value Chain sheet with improved layout."""
-    ws = wb.create_sheet("Value Chain")
+    ws = SheetWriter(wb, "Value Chain")
 
     # Title
     ws.merge_cells('B2:V2')
@@ -735,8 +594,7 @@ def build_value_chain_sheet(wb, apps_data):
     stages['Cross-Cutting'] = []
 
     for app in apps_data:
-        qa_texts = [a for a in app.get('qa_answers', {}).values() if a]
-        stage = categorize_value_chain(app['name'], qa_texts)
+        stage = categorize_value_chain(app['category_hits'])
         stages[stage].append(app)
 
     # Wider columns (5 cols per stage instead of 4) and more spacing
@@ -788,18 +646,28 @@ def build_value_chain_sheet(wb, apps_data):
         cell.font = Font(name='Calibri', size=16)
         cell.alignment = Alignment(horizontal='center', vertical='center')
 
+    ws.close()
     return ws
 
 
-def build_app_sheet(wb, app_data, session):
+def build_app_sheet(wb, app_data):
     """Build an individual application assessment sheet.
-    2-column layout: Question | Answer (from questionnaire only)."""
+    2-column layout: Question | Answer (from questionnaire only).
+    Answers come from app_data['questionnaire'] (see load_portfolio_data)."""
     sheet_name = sanitize_sheet_name(app_data['name'])
-    ws = wb.create_sheet(sheet_name)
+    ws = SheetWriter(wb, sheet_name)
 
     ws.column_dimensions['A'].width = 50
     ws.column_dimensions['B'].width = 55
 
+    # Tab color based on recommendation
+    rec = app_data.get('recommendation', '')
+    tab_colors = {
+        'EVOLVE': '00B050', 'INVEST': 'FFC000',
+        'MAINTAIN': '4472C4', 'ELIMINATE': 'FF0000',
+    }
+    ws.sheet_properties.tabColor = tab_colors.get(rec, 'D9D9D9')
+
     # Title
     ws.merge_cells('A1:B1')
     cell = ws.cell(row=1, column=1, value=f"Assessment: {app_data['name']}")
@@ -816,7 +684,7 @@ def build_app_sheet(wb, app_data, session):
     cell_b.border = THIN_BORDER
 
     # Score rows
-    blocks = list(SYNERGY_BLOCKS.keys())
+    blocks = BLOCK_NAMES
     dv = DataValidation(type="whole", operator="between", formula1="0", formula2="5")
     ws.add_data_validation(dv)
 
@@ -834,18 +702,19 @@ def build_app_sheet(wb, app_data, session):
         cell_b.alignment = Alignment(horizontal='center')
         dv.add(cell_b)
 
-    # Get questionnaire answers
-    qa_answers = session.query(QuestionnaireAnswer).filter_by(application_id=app_data['id']).all()
-
+    # Questionnaire answers
     qa_by_question = {}
-    for qa in qa_answers:
-        if qa.question_text:
-            qa_by_question[qa.question_text] = qa.answer_text or '-'
+    questions_by_block = {}
+    for question, answer, block in app_data.get('questionnaire', ()):
+        qa_by_question[question] = answer or '-'
+        questions_by_block.setdefault(block, set()).add(question)
 
     # ── Detailed Q&A sections per synergy block ──
     current_row = 13
 
     for block in blocks:
+        ws.flush(current_row)
+
         # Block header
         ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=2)
         cell = ws.cell(row=current_row, column=1, value=block.upper())
@@ -880,11 +749,7 @@ def build_app_sheet(wb, app_data, session):
         cell_a_hdr.border = THIN_BORDER
         current_row += 1
 
-        # Collect questions for this block
-        block_questions = set()
-        for qa in qa_answers:
-            if qa.synergy_block == block and qa.question_text:
-                block_questions.add(qa.question_text)
+        block_questions = questions_by_block.get(block, set())
 
         if block_questions:
             for question in sorted(block_questions):
@@ -908,64 +773,104 @@ def build_app_sheet(wb, app_data, session):
 
         current_row += 1  # Blank separator
 
-    # Tab color based on recommendation
-    rec = app_data.get('recommendation', '')
-    tab_colors = {
-        'EVOLVE': '00B050', 'INVEST': 'FFC000',
-        'MAINTAIN': '4472C4', 'ELIMINATE': 'FF0000',
-    }
-    ws.sheet_properties.tabColor = tab_colors.get(rec, 'D9D9D9')
-
+    ws.close()
     return ws
 
 
 # ============================================================
-# Main generation function
+# Parallel app sheets
 # ============================================================
+# Each application sheet only depends on its own data, so with EXPORT_WORKERS > 1 the sheets are
+# built in a process pool. A worker builds one sheet in its own write-only workbook and returns the
+# streamed sheet XML with that workbook's style tables; this process registers the styles in the
+# worker's order (exactly as building the sheet here would) and rewrites the cell style ids. Sheets
+# are merged in portfolio order, so every part of the package is identical to a serial export.
+# This relies on openpyxl internals (the streamed sheet writer and the workbook style tables): with
+# an openpyxl that does not have them, the sheets are built serially.
+
+_STYLE_TABLES = ('_fonts', '_fills', '_borders', '_number_formats', '_alignments', '_protections', '_cell_styles')
+_CELL_STYLE_ID = re.compile(rb'(<c\s[^>]*?\bs=")([0-9]+)"')  # Any attribute order
 
-def copy_template_sheet(wb, source_ws, tab_name, position):
-    """Copy a sheet from the template workbook preserving styles, merges, and dimensions."""
-    target_ws = wb.create_sheet(tab_name, position)
-
-    # Copy all cells and styles
-    for row in source_ws.iter_rows():
-        for cell in row:
-            target_cell = target_ws[cell.coordinate]
-            target_cell.value = cell.value
-            if cell.has_style:
-                target_cell.font = copy(cell.font)
-                target_cell.border = copy(cell.border)
-                target_cell.fill = copy(cell.fill)
-                target_cell.number_format = copy(cell.number_format)
-                target_cell.protection = copy(cell.protection)
-                target_cell.alignment = copy(cell.alignment)
-
-    # Copy merged cells
-    for merged_range in source_ws.merged_cells.ranges:
-        target_ws.merge_cells(str(merged_range))
-
-    # Copy column dimensions
-    for col_letter, col_dim in source_ws.column_dimensions.items():
-        target_ws.column_dimensions[col_letter].width = col_dim.width
-
-    # Copy row dimensions
-    for row_num, row_dim in source_ws.row_dimensions.items():
-        target_ws.row_dimensions[row_num].height = row_dim.height
-
-    # Copy images
+
+@lru_cache(maxsize=1)
+def _parallel_supported():
+    """Whether this openpyxl has the internals the parallel app sheets rely on"""
+    try:
+        from openpyxl.worksheet._writer import WorksheetWriter
+    except ImportError:
+        return False
+    wb = Workbook(write_only=True)
+    if not all(hasattr(wb, table) for table in _STYLE_TABLES):
+        return False
+    ws = wb.create_sheet()
+    ws.close()
+    writer = getattr(ws, '_writer', None)
+    if not isinstance(writer, WorksheetWriter) or not isinstance(getattr(writer, 'out', None), str):
+        return False  # The streamed part must be a temporary file
+    writer.cleanup()
+    return hasattr(writer, 'read')
+
+
+def _render_app_sheet(app_data):
+    """Worker: (sheet XML, style tables) of one application sheet"""
+    wb = Workbook(write_only=True)
+    writer = build_app_sheet(wb, app_data)._ws._writer
     try:
-        if hasattr(source_ws, '_images') and source_ws._images:
-            from openpyxl.drawing.image import Image as XLImage
-            for img in source_ws._images:
-                new_image = XLImage(img.ref)
-                if hasattr(img, 'anchor'):
-                    new_image.anchor = img.anchor
-                target_ws.add_image(new_image)
-    except Exception:
-        pass  # Images may fail in some environments
+        xml = writer.read()
+    finally:
+        writer.cleanup()
+    return xml, tuple(list(getattr(wb, table)) for table in _STYLE_TABLES)
+
+
+def _merge_styles(wb, tables):
+    """Register a worker workbook's style tables in wb; returns worker style id -> style id in wb"""
+    fonts, fills, borders, number_formats, alignments, protections, cell_styles = tables
+    font_ids = [wb._fonts.add(font) for font in fonts]
+    fill_ids = [wb._fills.add(fill) for fill in fills]
+    border_ids = [wb._borders.add(border) for border in borders]
+    format_ids = [wb._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+                  for number_format in number_formats]
+    alignment_ids = [wb._alignments.add(alignment) for alignment in alignments]
+    protection_ids = [wb._protections.add(protection) for protection in protections]
+
+    style_ids = []
+    for style in cell_styles:
+        merged = StyleArray(style)
+        merged.fontId = font_ids[style.fontId]
+        merged.fillId = fill_ids[style.fillId]
+        merged.borderId = border_ids[style.borderId]
+        merged.alignmentId = alignment_ids[style.alignmentId]
+        merged.protectionId = protection_ids[style.protectionId]
+        if style.numFmtId >= BUILTIN_FORMATS_MAX_SIZE:
+            merged.numFmtId = format_ids[style.numFmtId - BUILTIN_FORMATS_MAX_SIZE]
+        style_ids.append(wb._cell_styles.add(merged))
+    return style_ids
+
+
+def build_app_sheets(wb, apps_data, workers=1):
+    """Individual app sheets in portfolio order (in a process pool when workers > 1)"""
+    if workers <= 1 or len(apps_data) < 2 or not _parallel_supported():
+        for app in apps_data:
+            build_app_sheet(wb, app)
+        return
+
+    workers = min(workers, len(apps_data))
+    chunksize = max(1, len(apps_data) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rendered = executor.map(_render_app_sheet, apps_data, chunksize=chunksize)
+        for app, (xml, tables) in zip(apps_data, rendered):
+            style_ids = _merge_styles(wb, tables)
+            xml = _CELL_STYLE_ID.sub(lambda m: b'%s%d"' % (m.group(1), style_ids[int(m.group(2))]), xml)
+            # An empty streamed sheet whose part is replaced by the rendered one
+            ws = wb.create_sheet(sanitize_sheet_name(app['name']))
+            ws.close()
+            with open(ws._writer.out, 'wb') as f:
+                f.write(xml)
 
-    return target_ws
 
+# ============================================================
+# Main generation function
+# ============================================================
 
 def populate_index_sheet(ws, apps_data):
     """Update the Index sheet with a unified table of all sheets with descriptions and hyperlinks."""
@@ -1077,110 +982,131 @@ def populate_index_sheet(ws, apps_data):
         row += 1
 
 
-def generate_portfolio_excel(custom_weights=None):
+def load_portfolio_data(session, custom_weights=None):
+    """Rows of every application for the export (excluding "Questions Template", which is not a
+    real application), loaded with three set-based queries: applications, approved scores and
+    questionnaire answers."""
+    apps = session.execute(
+        select(Application.id, Application.name, Application.subcategory, Application.quick_win,
+               Application.recommendation_override)
+        .order_by(Application.name)
+    ).all()
+
+    scores_by_app = {}
+    for app_id, block_name, score in session.execute(
+        select(SynergyScore.application_id, SynergyScore.block_name, SynergyScore.score)
+        .where(SynergyScore.approved.is_(True))
+    ):
+        scores_by_app.setdefault(app_id, {})[block_name] = score
+
+    answers_by_app = {}
+    for app_id, question, answer, block in session.execute(
+        select(QuestionnaireAnswer.application_id, QuestionnaireAnswer.question_text,
+               QuestionnaireAnswer.answer_text, QuestionnaireAnswer.synergy_block)
+        .order_by(QuestionnaireAnswer.created_at)
+    ):
+        if question:
+            answers_by_app.setdefault(app_id, []).append((question, answer, block))
+
+    # Use custom weights
+    w = custom_weights or DEFAULT_WEIGHTS
+    weight_dict = {b: {'Weight': w.get(b, DEFAULT_WEIGHTS[b])} for b in BLOCK_NAMES}
+
+    apps_data = []
+    for app in apps:
+        if app.name.strip().lower() == 'questions template':
+            continue
+        scores = scores_by_app.get(app.id, {})
+        bvi, thi = calculate_bvi_thi(scores, weight_dict)
+        calculated_rec = get_recommendation(bvi, thi)
+
+        # Use override if set, otherwise use calculated recommendation
+        rec = app.recommendation_override if app.recommendation_override else calculated_rec
+        is_overridden = app.recommendation_override is not None and app.recommendation_override != calculated_rec
+
+        # Priority
+        priority = ''
+        if app.subcategory:
+            priority_map = {m[1]: m[2] for m in MATRIX_CONFIG if m[0] == rec}
+            base_priority = priority_map.get(app.subcategory, '')
+            if not base_priority:
+                for decision, subcat, prio, rat in MATRIX_CONFIG:
+                    if subcat == app.subcategory:
+                        base_priority = prio
+                        break
+            if app.quick_win and base_priority.startswith('P2'):
+                priority = 'P1 - Quick Win'
+            elif app.quick_win and base_priority.startswith('P3'):
+                priority = 'P2 - Quick Win'
+            else:
+                priority = base_priority
+
+        questionnaire = answers_by_app.get(app.id, [])
+        qa_answers = {question: answer for question, answer, _ in questionnaire if answer}
+        apps_data.append({
+            'id': app.id,
+            'name': app.name,
+            'scores': scores,
+            'bvi': bvi,
+            'thi': thi,
+            'recommendation': rec,
+            'calculated_recommendation': calculated_rec,
+            'is_overridden': is_overridden,
+            'subcategory': app.subcategory or '',
+            'quick_win': app.quick_win,
+            'priority': priority,
+            # Application Groups / Value Chain keyword hits (one scan of the name and Q&A answers)
+            'category_hits': scan_categories(app.name, qa_answers.values()),
+            'questionnaire': questionnaire,
+        })
+    return apps_data
+
+
+def generate_portfolio_excel(custom_weights=None, output=None, workers=None):
     """Generate the full portfolio Excel workbook.
-    Returns bytes of the generated .xlsx file."""
+    Streams it to output (a file path or binary file object) when given and returns output;
+    otherwise returns bytes of the generated .xlsx file. Returns None without applications.
+    workers: processes rendering the application sheets (default EXPORT_WORKERS)."""
 
     session = get_session()
     try:
-        apps = session.query(Application).order_by(Application.name).all()
-        if not apps:
-            return None
-
-        # Build apps_data list (exclude "Questions Template" which is not a real application)
-        apps_data = []
-        for app in apps:
-            if app.name.strip().lower() == 'questions template':
-                continue
-            scores_data = session.query(SynergyScore).filter_by(
-                application_id=app.id, approved=True
-            ).all()
-
-            scores = {s.block_name: s.score for s in scores_data}
-
-            # Use custom weights
-            w = custom_weights or {b: SYNERGY_BLOCKS[b]['Weight'] for b in SYNERGY_BLOCKS}
-            weight_dict = {b: {'Weight': w.get(b, SYNERGY_BLOCKS[b]['Weight'])} for b in SYNERGY_BLOCKS}
-            bvi, thi = calculate_bvi_thi(scores, weight_dict)
-            calculated_rec = get_recommendation(bvi, thi)
-
-            # Use override if set, otherwise use calculated recommendation
-            rec = app.recommendation_override if app.recommendation_override else calculated_rec
-            is_overridden = app.recommendation_override is not None and app.recommendation_override != calculated_rec
-
-            # Priority
-            priority = ''
-            if app.subcategory:
-                priority_map = {m[1]: m[2] for m in MATRIX_CONFIG if m[0] == rec}
-                base_priority = priority_map.get(app.subcategory, '')
-                if not base_priority:
-                    for decision, subcat, prio, rat in MATRIX_CONFIG:
-                        if subcat == app.subcategory:
-                            base_priority = prio
-                            break
-                if app.quick_win and base_priority.startswith('P2'):
-                    priority = 'P1 - Quick Win'
-                elif app.quick_win and base_priority.startswith('P3'):
-                    priority = 'P2 - Quick Win'
-                else:
-                    priority = base_priority
-
-            # Collect Q&A answers for grouping
-            qa_answers = session.query(QuestionnaireAnswer).filter_by(application_id=app.id).all()
-            qa_dict = {}
-            for qa in qa_answers:
-                if qa.answer_text:
-                    qa_dict[qa.question_text] = qa.answer_text
-
-            apps_data.append({
-                'id': app.id,
-                'name': app.name,
-                'scores': scores,
-                'bvi': bvi,
-                'thi': thi,
-                'recommendation': rec,
-                'calculated_recommendation': calculated_rec,
-                'is_overridden': is_overridden,
-                'subcategory': app.subcategory or '',
-                'quick_win': app.quick_win,
-                'priority': priority,
-                'qa_answers': qa_dict,
-            })
-
-        # Create workbook
-        wb = Workbook()
-        wb.remove(wb.active)
-
-        # 1. Copy Index, Introduction, Methodology from template
-        try:
-            wb_template = load_workbook(EXCEL_TEMPLATE_PATH)
-            template_tabs = [("Index", 0), ("Introduction", 1), ("Methodology", 2)]
-            for tab_name, position in template_tabs:
-                if tab_name in wb_template.sheetnames:
-                    copy_template_sheet(wb, wb_template[tab_name], tab_name, position)
-            wb_template.close()
-        except Exception:
-            pass  # Template may not exist in all environments
-
-        # 2. Build data sheets (positions after Index=0, Introduction=1, Methodology=2)
-        build_calculator_sheet(wb, apps_data, custom_weights or {b: SYNERGY_BLOCKS[b]['Weight'] for b in SYNERGY_BLOCKS})
-        build_dashboard_sheet(wb, apps_data)
-        build_roadmap_sheet(wb, apps_data)
-        build_value_chain_sheet(wb, apps_data)
-
-        # 3. Individual app sheets
-        for app in apps_data:
-            build_app_sheet(wb, app, session)
-
-        # 4. Update Index with dynamic hyperlinks
-        if "Index" in wb.sheetnames:
-            populate_index_sheet(wb["Index"], apps_data)
-
-        # Save to bytes
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
-
+        apps_data = load_portfolio_data(session, custom_weights)
     finally:
         close_session(session)
+    if not apps_data:
+        return None
+
+    # Create workbook (sheets are streamed in creation order)
+    wb = Workbook(write_only=True)
+
+    # 1. Copy Index, Introduction, Methodology from template (compiled once per process)
+    try:
+        template = get_compiled_template(EXCEL_TEMPLATE_PATH)
+    except Exception as e:
+        print(f"[EXCEL] ⚠️  Could not read the Excel template: {e}")
+        template = None  # Template may not exist in all environments
+    if template is not None:
+        for tab_name in ("Index", "Introduction", "Methodology"):
+            if tab_name in template:
+                ws = template[tab_name].replay(SheetWriter(wb, tab_name))
+                # Update Index with dynamic hyperlinks
+                if tab_name == "Index":
+                    populate_index_sheet(ws, apps_data)
+                ws.close()
+
+    # 2. Build data sheets
+    build_calculator_sheet(wb, apps_data, custom_weights or dict(DEFAULT_WEIGHTS))
+    build_dashboard_sheet(wb, apps_data)
+    build_roadmap_sheet(wb, apps_data)
+    build_value_chain_sheet(wb, apps_data)
+
+    # 3. Individual app sheets
+    build_app_sheets(wb, apps_data, EXPORT_WORKERS if workers is None else workers)
+
+    # 4. Save (zips the streamed sheets)
+    if output is not None:
+        wb.save(output)
+        return output
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,190 @@
+"""
+Export artifact cache
+Generated portfolio files (.xlsx / .pptx) are kept on disk, keyed by everything that determines
+their content: the database and its data revision, the weight vector (Excel), the SHA-256 of the
+template file and of the generator source files. A repeated download of unchanged data is a file
+read; the least recently used files are evicted once the cache exceeds EXPORT_CACHE_MAX_MB.
+Files generated by background export jobs are kept here as well; the job only records the file name.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, List, Optional
+
+from database import get_session, close_session, get_data_revision
+from framework import BLOCK_NAMES, DEFAULT_WEIGHTS
+
+WEBAPP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", os.path.join(WEBAPP_DIR, "data", "export_cache"))
+CACHE_ENABLED = os.getenv("EXPORT_CACHE", "1") != "0"
+MAX_CACHE_BYTES = int(float(os.getenv("EXPORT_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+# Per format: the files whose content changes the output (sources = "generator version")
+EXPORTS = {
+    "xlsx": {
+        "template": "template_excel.xlsx",
+        "sources": ("excel_generator.py", "xlsx_template.py", "matrix_chart.py", "label_placement.py",
+                    "keyword_matcher.py", "framework.py"),
+    },
+    "pptx": {
+        "template": "template.pptx",
+        "sources": ("ppt_generator.py", "answer_matrix.py", "framework.py"),
+    },
+}
+
+_digest_lock = threading.Lock()
+_file_digests: Dict = {}  # path -> ((mtime_ns, size), sha256)
+
+
+def _file_digest(file_name: str) -> str:
+    """SHA-256 of a webapp file ("missing" if absent), recomputed only when the file changes"""
+    path = os.path.join(WEBAPP_DIR, file_name)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _digest_lock:
+        cached = _file_digests.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    with _digest_lock:
+        _file_digests[path] = (signature, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def file_digests(file_names) -> List[str]:
+    """SHA-256 of each webapp file, e.g. the sources of a generated artifact"""
+    return [_file_digest(file_name) for file_name in file_names]
+
+
+def normalize_weights(custom_weights: Optional[Dict] = None) -> Dict[str, float]:
+    """Full weight vector (no custom weights == the default weights)"""
+    weights = custom_weights or {}
+    return {block: float(weights.get(block, DEFAULT_WEIGHTS[block])) for block in BLOCK_NAMES}
+
+
+def export_key(kind: str, custom_weights: Optional[Dict] = None, session=None) -> str:
+    """Cache key of an export: database, data revision, weights, template and generator digests"""
+    spec = EXPORTS[kind]
+    own_session = session is None
+    if own_session:
+        session = get_session()
+    try:
+        database = session.get_bind().url.render_as_string(hide_password=True)
+        revision = get_data_revision(session)
+    finally:
+        if own_session:
+            close_session(session)
+    material = {
+        "kind": kind,
+        "database": database,
+        "revision": revision,
+        "weights": normalize_weights(custom_weights) if kind == "xlsx" else None,
+        "template": _file_digest(spec["template"]),
+        "generator": file_digests(spec["sources"]),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+
+# ==================== DISK CACHE ====================
+def _cache_path(key: str, kind: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.{kind}")
+
+
+def get(key: str, kind: str) -> Optional[bytes]:
+    if not CACHE_ENABLED:
+        return None
+    path = _cache_path(key, kind)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.utime(path)  # Recently used: evicted last
+        return data
+    except OSError:
+        return None
+
+
+def _write(path: str, data: bytes) -> bool:
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temporary file and rename: concurrent writers never leave a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[EXPORT] ⚠️  Could not write export cache entry: {e}")
+        return False
+    evict()
+    return True
+
+
+def put(key: str, kind: str, data: bytes):
+    if not CACHE_ENABLED or not data:
+        return
+    _write(_cache_path(key, kind), data)
+
+
+def evict(max_bytes: int = None) -> int:
+    """Remove least recently used entries until the cache fits in max_bytes; returns files removed"""
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    try:
+        entries = [entry for entry in os.scandir(CACHE_DIR) if entry.is_file() and not entry.name.endswith('.tmp')]
+    except OSError:
+        return 0
+    stats = sorted(((entry.stat(), entry.path) for entry in entries), key=lambda item: item[0].st_mtime)
+    total = sum(stat.st_size for stat, _ in stats)
+    removed = 0
+    for stat, path in stats:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= stat.st_size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def cached_export(kind: str, generate: Callable[[], Optional[bytes]], custom_weights: Optional[Dict] = None,
+                  key: str = None):
+    """Return (file bytes, served_from_cache); generate() runs only on a cache miss"""
+    key = key or export_key(kind, custom_weights)
+    data = get(key, kind)
+    if data is not None:
+        return data, True
+    data = generate()
+    if data:
+        put(key, kind, data)
+    return data, False
+
+
+# ==================== JOB ARTIFACTS ====================
+def store_artifact(key: str, kind: str, data: bytes) -> Optional[str]:
+    """Keep the file of a background export in the cache directory (also with EXPORT_CACHE=0: the
+    job refers to it) and return its file name, or None if it could not be written"""
+    path = _cache_path(key, kind)
+    if os.path.exists(path):
+        os.utime(path)
+    elif not _write(path, data):
+        return None
+    return os.path.basename(path)
+
+
+def load_artifact(file_name: str) -> Optional[bytes]:
+    """File of a background export, or None once it has been evicted"""
+    try:
+        with open(os.path.join(CACHE_DIR, os.path.basename(file_name)), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
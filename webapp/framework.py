@@ -0,0 +1,162 @@
+"""
+Assessment framework: the 8 synergy blocks and the master questions
+Single source of truth for the scorers, parsers and exporters of the webapp and for the root scripts.
+Everything is built once at import and frozen (read-only mappings and tuples), including the derived
+lookups: question -> block, per-block questions, business/tech block indexes and a normalized-question
+index for matching questionnaire wording.
+"""
+
+import difflib
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional
+
+# ==================== CATALOGUE ====================
+# Block -> (type, default weight, score definitions)
+_SYNERGY_BLOCKS = {
+    "Strategic Fit": ("Business", 30, {1: "Completely misaligned", 2: "Partially aligned", 3: "Neutral", 4: "Well-aligned", 5: "Strategic driver"}),
+    "Business Efficiency": ("Business", 30, {1: "Manual", 2: "Low efficiency", 3: "Average", 4: "High", 5: "Optimized"}),
+    "User Value": ("Business", 20, {1: "Rejected", 2: "Low satisfaction", 3: "Acceptable", 4: "Good", 5: "Delightful"}),
+    "Financial Value": ("Business", 20, {1: "Negative", 2: "Poor", 3: "Neutral", 4: "Positive", 5: "Exceptional"}),
+    "Architecture": ("Tech", 30, {1: "Obsolete", 2: "Aging", 3: "Stable", 4: "Modern", 5: "Future-proof"}),
+    "Operational Risk": ("Tech", 30, {1: "Critical", 2: "High", 3: "Managed", 4: "Low", 5: "Fortified"}),
+    "Maintainability": ("Tech", 25, {1: "Impossible", 2: "Hard", 3: "Standard", 4: "Good", 5: "Excellent"}),
+    "Support Quality": ("Tech", 15, {1: "Non-existent", 2: "Reactive", 3: "Defined", 4: "Proactive", 5: "World-class"}),
+}
+
+# Master questions per block (from the Application Questionnaire)
+_MASTER_QUESTIONS = {
+    "Strategic Fit": [
+        "What is the name of the application?",
+        "What is the primary business purpose of the application?",
+        "Which OPCOs use the application?",
+        "Which utility domain(s) is the application used for? (Electric, Gas, or Both)",
+        "Which Business Unit(s) use or own the application?",
+        "Is the application IT-owned, business-owned, or jointly governed?",
+        "Is this application considered business-critical, important, or supportive? Provide an explanation of the statement",
+        "Does the application align with the current and future Mobility strategy?",
+        "Are there important capabilities missing that limit business effectiveness?",
+        "Is the application expected to be used in the next 3–5 years?",
+        "Are there planned upgrades, migrations, or replacements?",
+        "Could this application be replaced or consolidated with another platform?"
+    ],
+    "Business Efficiency": [
+        "What key business processes does the application support?",
+        "What core functionalities does the application provide?",
+        "Are any processes partially supported or handled outside the application (manual workarounds, spreadsheets, etc.)?",
+        "Does the application overlap functionally with other systems?",
+        "Could this application absorb business processes currently supported by another platform or executed through manual workarounds? If yes, which processes and which platform(s)"
+    ],
+    "User Value": [
+        "Which user roles or personas use the application (e.g., field technician, dispatcher, supervisor)?",
+        "How many active users does the application have (daily/monthly)?",
+        "Is application usage growing, stable, or declining?",
+        "Is usage mandatory or optional for users?",
+        "What is the overall level of user satisfaction?",
+        "Are there known usability or mobility experience issues?"
+    ],
+    "Financial Value": [
+        "What business value does the application deliver today?",
+        "What would be the business impact if the application were unavailable?",
+        "What are the main cost components (licenses, infrastructure, support)?, and what is the total cost of ownership?",
+        "Is the cost reasonable compared to the business value delivered?",
+        "Are there upcoming license renewals or contract milestones?",
+        "Are there opportunities for cost reduction through consolidation or modernization?"
+    ],
+    "Architecture": [
+        "Is the application a custom-built solution or a market (COTS/SaaS) product?",
+        "What platforms does the application run on (mobile OS, web, backend)?",
+        "What technologies, frameworks, or programming languages are used?",
+        "What version of the application is currently deployed?",
+        "Is the application deployed on-premises, in the cloud, or in a hybrid model?",
+        "If cloud-based, which hyperscaler or cloud provider is used (e.g., AWS, Azure, GCP)?",
+        "Which systems does the application integrate with?",
+        "Are integrations real-time, batch-based, or manual?",
+        "What limits future evolution or innovation?"
+    ],
+    "Operational Risk": [
+        "Does the application support regulatory and compliance requirements?",
+        "How critical are these integrations to business operations?",
+        "What type of data does the application create, consume, or update?",
+        "Are there known integration or data quality issues?",
+        "Does the application handle sensitive, personal, or regulated data?",
+        "Is the application governed by corporate security and IT policies?",
+        "Is identity and access management (IAM) integrated with corporate IAM solutions?",
+        "Are security controls (authentication, authorization, logging) centrally managed or application-specific?",
+        "Are there known security risks, audit findings, or compliance gaps?"
+    ],
+    "Maintainability": [
+        "How complex is ongoing maintenance and support?",
+        "How frequently are incidents or defects reported?",
+        "How easy is it to implement enhancements or changes?",
+        "What are the main business challenges with the application?",
+        "What are the main technical challenges or limitations?",
+        "Are there scalability, performance, or reliability concerns?",
+        "Are stakeholders requesting changes or replacement?"
+    ],
+    "Support Quality": [
+        "Is vendor or technology support still available and active?",
+        "Who provides application support (internal IT, vendor, third party)?",
+        "Is the application proactively monitored (e.g., APM, Dynatrace), or is downtime primarily reported by users?",
+        "Are alerts integrated with ITSM tools (e.g., ServiceNow) for auto-ticketing, or are they email-based/manual?"
+    ]
+}
+
+
+# ==================== FROZEN STRUCTURES ====================
+BLOCK_NAMES = tuple(_SYNERGY_BLOCKS)
+BLOCK_INDEX = MappingProxyType({block: idx for idx, block in enumerate(BLOCK_NAMES)})
+
+# {block: {"Type": "Business" | "Tech", "Weight": int, "Defs": {score: definition}}}
+SYNERGY_BLOCKS = MappingProxyType({
+    block: MappingProxyType({"Type": block_type, "Weight": weight, "Defs": MappingProxyType(defs)})
+    for block, (block_type, weight, defs) in _SYNERGY_BLOCKS.items()
+})
+DEFAULT_WEIGHTS = MappingProxyType({block: info["Weight"] for block, info in SYNERGY_BLOCKS.items()})
+BLOCK_DEFINITIONS = MappingProxyType({block: info["Defs"] for block, info in SYNERGY_BLOCKS.items()})
+
+BUSINESS_BLOCKS = tuple(block for block in BLOCK_NAMES if SYNERGY_BLOCKS[block]["Type"] == "Business")
+TECH_BLOCKS = tuple(block for block in BLOCK_NAMES if SYNERGY_BLOCKS[block]["Type"] == "Tech")
+BUSINESS_BLOCK_INDEXES = tuple(BLOCK_INDEX[block] for block in BUSINESS_BLOCKS)
+TECH_BLOCK_INDEXES = tuple(BLOCK_INDEX[block] for block in TECH_BLOCKS)
+
+# {block: (question, ...)} in questionnaire order
+MASTER_QUESTIONS = MappingProxyType({block: tuple(questions) for block, questions in _MASTER_QUESTIONS.items()})
+ALL_QUESTIONS = tuple(question for questions in MASTER_QUESTIONS.values() for question in questions)
+QUESTION_TO_BLOCK = MappingProxyType({
+    question: block for block, questions in MASTER_QUESTIONS.items() for question in questions
+})
+QUESTION_INDEX = MappingProxyType({question: idx for idx, question in enumerate(ALL_QUESTIONS)})
+
+del _SYNERGY_BLOCKS, _MASTER_QUESTIONS
+
+
+# ==================== QUESTION MATCHING ====================
+_DASHES = str.maketrans({"\u2013": "-", "\u2014": "-", "\u2019": "'", "\u201c": '"', "\u201d": '"'})
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Case, whitespace and typographic punctuation folded (questionnaire wording varies in these)"""
+    return _SPACES.sub(" ", (text or "").translate(_DASHES)).strip().lower()
+
+
+NORMALIZED_QUESTIONS = MappingProxyType({normalize_question(question): question for question in ALL_QUESTIONS})
+_NORMALIZED_KEYS = tuple(NORMALIZED_QUESTIONS)
+
+
+@lru_cache(maxsize=4096)
+def match_question(text: str, cutoff: float = 0.75) -> Optional[str]:
+    """
+    Master question for a (possibly reworded) question: exact and normalized matches are dict
+    lookups; otherwise the closest master question with a difflib similarity of at least cutoff.
+    """
+    if text in QUESTION_TO_BLOCK:
+        return text
+    key = normalize_question(text)
+    question = NORMALIZED_QUESTIONS.get(key)
+    if question is None and key:
+        close = difflib.get_close_matches(key, _NORMALIZED_KEYS, n=1, cutoff=cutoff)
+        question = NORMALIZED_QUESTIONS[close[0]] if close else None
+    return question
@@ -13,7 +13,7 @@ from datetime import datetime, timezone
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database import get_session, close_session, Application, DavidNote
-from ai_processor import MASTER_QUESTIONS
+from framework import QUESTION_TO_BLOCK
 import re
 
 # David's notes structured by application
@@ -322,10 +322,7 @@ def find_matching_application(file_app_name: str, app_dict: dict) -> tuple:
 
 def map_answer_to_synergy_block(question_text):
     """Map a question to its synergy block"""
-    for block_name, questions in MASTER_QUESTIONS.items():
-        if question_text in questions:
-            return block_name
-    return "Strategic Fit"  # Default block
+    return QUESTION_TO_BLOCK.get(question_text, "Strategic Fit")  # Default block
 
 
 def import_david_notes():
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Headless bulk ingestion of questionnaires and transcript directories
+
+Usage:
+    python ingest.py --questionnaire Questionnaire.xlsx --transcripts transcripts/ [--workers 8]
+                     [--score] [--process] [--run-worker] [--job-size 20]
+
+Same parsing, application matching, "never overwrite complete answers" and transcript
+deduplication rules as the Uploads page. AI work (--score, --process) is enqueued as background
+jobs; --run-worker executes them in this process and waits for the queue to drain.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+# Ensure webapp modules can be imported
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import get_session, close_session
+import ingestion
+import jobs
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds > 0 else 0.0
+
+
+def ingest_questionnaire(path: str, session) -> dict:
+    start_time = time.time()
+    apps_data = ingestion.parse_questionnaire_excel(path)
+    parse_seconds = time.time() - start_time
+
+    app_ids = ingestion.save_applications_bulk(apps_data, session) if apps_data else {}
+    total_seconds = time.time() - start_time
+
+    answers = sum(len(app_data['answers']) for app_data in apps_data)
+    print(f"📋 Questionnaire: {len(apps_data)} applications, {answers} answers "
+          f"(parse {parse_seconds:.2f}s, save {total_seconds - parse_seconds:.2f}s)")
+
+    with open(path, 'rb') as f:
+        file_hash = hashlib.sha256(f.read()).hexdigest()
+    return {"app_ids": [app_ids[app_data['name']] for app_data in apps_data], "file_hash": file_hash}
+
+
+def ingest_transcripts(root: str, session, workers: int = None, show_timings: bool = False) -> dict:
+    paths = ingestion.find_transcript_files(root)
+    print(f"🎙️  Transcripts: {len(paths)} file(s) found under {root}")
+    if not paths:
+        return {"to_process": []}
+
+    step = max(1, len(paths) // 10)
+
+    def _progress(done, total):
+        if done % step == 0 or done == total:
+            print(f"   ... {done}/{total} files parsed")
+
+    stats = ingestion.ingest_transcript_files(paths, session, workers=workers, progress=_progress)
+
+    for path, message in stats["fuzzy_matches"]:
+        print(f"   ℹ️  {os.path.relpath(path, root)}: {message}")
+    for path, message in stats["duplicates"]:
+        print(f"   ⏭️  {os.path.relpath(path, root)}: {message}")
+    for path, message in stats["issues"]:
+        print(f"   ⚠️  {os.path.relpath(path, root)}: {message}")
+
+    seconds = stats["seconds"]
+    print(f"   ✅ Saved {stats['saved']} · 🔄 Updated {stats['updated']} · ⏭️ Duplicates "
+          f"{stats['exact_duplicates']} exact / {stats['near_duplicates']} near · "
+          f"⚠️ Unmatched {stats['unmatched']} · ❌ Errors {stats['errors']}")
+    print(f"   ⏱️  {seconds:.2f}s · {_rate(stats['files'], seconds):.1f} files/s · "
+          f"{_rate(stats['bytes'] / 1024 / 1024, seconds):.2f} MB/s · {stats['pages']} pages · "
+          f"{stats['cached']} from text cache · extraction {stats['extraction_seconds']:.2f}s CPU "
+          f"(x{_rate(stats['extraction_seconds'], seconds):.1f} parallel)")
+
+    timings = sorted(stats["timings"], key=lambda t: t[2], reverse=True)
+    for path, pages, file_seconds, cached in (timings if show_timings else timings[:5]):
+        print(f"      {file_seconds * 1000:8.1f} ms  {pages:4d} page(s){'  (cached)' if cached else ''}  "
+              f"{os.path.relpath(path, root)}")
+    return stats
+
+
+def enqueue_ai_jobs(args, questionnaire: dict, transcripts: dict) -> list:
+    job_ids = []
+    if args.score and questionnaire and questionnaire["app_ids"]:
+        app_ids = questionnaire["app_ids"]
+        job_ids.append(jobs.enqueue(
+            "score_applications",
+            {"app_ids": app_ids, "mode": "questionnaire"},
+            idempotency_key=f"score_applications:questionnaire:{questionnaire['file_hash']}:{jobs.hash_values(app_ids)}"
+        ))
+
+    to_process = transcripts.get("to_process", []) if transcripts else []
+    if args.process and to_process:
+        # Several smaller jobs so that workers process them in parallel
+        for i in range(0, len(to_process), args.job_size):
+            chunk = to_process[i:i + args.job_size]
+            transcript_ids = [transcript_id for transcript_id, _ in chunk]
+            job_ids.append(jobs.enqueue(
+                "process_transcripts",
+                {"transcript_ids": transcript_ids, "recalculate_scores": True},
+                idempotency_key=f"process_transcripts:{jobs.hash_values([value for pair in chunk for value in pair])}"
+            ))
+
+    if job_ids:
+        print(f"🤖 Enqueued {len(job_ids)} AI job(s)")
+    return job_ids
+
+
+def run_worker(job_ids: list, concurrency: int):
+    from worker import Worker
+
+    start_time = time.time()
+    Worker(concurrency=concurrency, poll_interval=0.5).run_forever(once=True)
+    seconds = time.time() - start_time
+
+    for job_id in job_ids:
+        job = jobs.get_job(job_id)
+        status = "✅" if job["status"] == jobs.JOB_SUCCEEDED else "❌"
+        detail = job["result"] if job["status"] == jobs.JOB_SUCCEEDED else (job["error"] or "").splitlines()[:1]
+        print(f"   {status} {job['job_type']} {job_id[:8]}: {job['status']} {detail}")
+    print(f"   ⏱️  AI jobs finished in {seconds:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingestion of questionnaires and transcripts")
+    parser.add_argument("--questionnaire", help="Questionnaire workbook (.xlsx)")
+    parser.add_argument("--transcripts", help="Directory tree of transcripts (txt/pdf/docx)")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--timings", action="store_true", help="Print extraction time and pages of every file "
+                                                                   "(default: the 5 slowest)")
+    parser.add_argument("--score", action="store_true", help="Enqueue AI score calculation for the questionnaire apps")
+    parser.add_argument("--process", action="store_true", help="Enqueue AI extraction for the new transcripts")
+    parser.add_argument("--job-size", type=int, default=20, help="Transcripts per extraction job")
+    parser.add_argument("--run-worker", action="store_true", help="Run the enqueued jobs in this process and wait")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel jobs with --run-worker")
+    args = parser.parse_args()
+
+    if not args.questionnaire and not args.transcripts:
+        parser.error("nothing to ingest: pass --questionnaire and/or --transcripts")
+    if args.transcripts and not os.path.isdir(args.transcripts):
+        parser.error(f"not a directory: {args.transcripts}")
+
+    start_time = time.time()
+    session = get_session()
+    try:
+        # Questionnaire first: it creates the applications transcripts are matched to
+        questionnaire = ingest_questionnaire(args.questionnaire, session) if args.questionnaire else None
+        transcripts = ingest_transcripts(args.transcripts, session, workers=args.workers,
+                                         show_timings=args.timings) if args.transcripts else None
+    finally:
+        close_session(session)
+    print(f"📦 Ingestion finished in {time.time() - start_time:.2f}s")
+
+    job_ids = enqueue_ai_jobs(args, questionnaire, transcripts)
+    if job_ids and args.run_worker:
+        run_worker(job_ids, args.concurrency)
+    elif job_ids:
+        print("   Run `python worker.py --once` (or keep the app running) to execute them.")
+
+
+if __name__ == "__main__":
+    main()
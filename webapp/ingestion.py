@@ -0,0 +1,648 @@
+"""
+Ingestion of questionnaires and meeting transcripts (no Streamlit dependency)
+Parsing, application matching and database writes shared by the Uploads page and the
+headless bulk ingester (ingest.py).
+"""
+
+import difflib
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from framework import QUESTION_TO_BLOCK, match_question
+from database import Application, QuestionnaireAnswer, MeetingTranscript, TranscriptAnswer
+import text_extraction
+from text_extraction import ExtractionResult
+from transcript_dedup import TranscriptDedupIndex, DuplicateMatch, content_hash, minhash_signature
+
+TRANSCRIPT_EXTENSIONS = ('txt', 'pdf', 'docx', 'doc')
+
+# Rows written per commit when bulk-inserting transcripts
+TRANSCRIPT_COMMIT_BATCH = 100
+
+
+# ==================== QUESTIONNAIRES ====================
+def match_master_question(question_text: str) -> Optional[Tuple[str, str]]:
+    """Fuzzy match a questionnaire question to a master question.
+    Returns (master_question, synergy_block) or None (similarity < 0.75)."""
+    question = match_question(question_text, cutoff=0.75)
+    return (question, QUESTION_TO_BLOCK[question]) if question else None
+
+
+def _parse_meetings_sheet(wb):
+    """Parse the Meetings sheet to extract Business Owner and IT Owner per application.
+    Returns dict: {normalized_app_name: {'business_owner': str, 'it_owner': str, 'raw_name': str}}
+    """
+    meetings_data = {}
+    if 'Meetings' not in wb.sheetnames:
+        return meetings_data
+
+    ws = wb['Meetings']
+    # Find header row and column indices
+    header_row = None
+    col_app_name = None
+    col_business_owner = None
+    col_it_owner = None
+
+    for row in ws.iter_rows(max_row=5):
+        for idx, cell in enumerate(row):
+            val = str(cell.value).lower().strip() if cell.value else ""
+            if 'application name' in val or val == 'application':
+                col_app_name = idx
+                header_row = cell.row
+            elif 'business owner' in val:
+                col_business_owner = idx
+            elif 'it owner' in val:
+                col_it_owner = idx
+
+    if col_app_name is None or header_row is None:
+        return meetings_data
+
+    for row in ws.iter_rows(min_row=header_row + 1, max_row=ws.max_row):
+        app_name_cell = row[col_app_name].value if col_app_name < len(row) else None
+        if not app_name_cell:
+            continue
+        app_name = str(app_name_cell).strip()
+        if not app_name:
+            continue
+
+        bo = ""
+        it_o = ""
+        if col_business_owner is not None and col_business_owner < len(row):
+            bo = str(row[col_business_owner].value or "").strip()
+        if col_it_owner is not None and col_it_owner < len(row):
+            it_o = str(row[col_it_owner].value or "").strip()
+
+        normalized = normalize_app_name(app_name)
+        meetings_data[normalized] = {
+            'business_owner': bo,
+            'it_owner': it_o,
+            'raw_name': app_name
+        }
+
+    return meetings_data
+
+
+def parse_questionnaire_excel(source) -> List[Dict]:
+    """
+    Parse a questionnaire workbook (one sheet per application).
+
+    Args:
+        source: Path or file-like object of the .xlsx file
+
+    Returns:
+        List of {'name', 'safe_name', 'is_green', 'answers': {question: {'a', 's', 'block'}}}
+    """
+    import openpyxl
+    wb = openpyxl.load_workbook(source, data_only=True)
+    applications = []
+
+    # Parse Meetings sheet for Business Owner / IT Owner data
+    meetings_data = _parse_meetings_sheet(wb)
+
+    for sheet_name in wb.sheetnames:
+        # Skip template/metadata sheets
+        if sheet_name.lower() in ['index', 'introduction', 'methodology', 'user guide',
+                                   'calculator', 'dashboard', 'strategic roadmap',
+                                   'application groups', 'value chain', 'sheet1',
+                                   'meetings', 'opcos', 'to delete', 'questions template']:
+            continue
+
+        ws = wb[sheet_name]
+
+        # Find columns
+        header_row = None
+        for row in ws.iter_rows(max_row=10):
+            cells = [str(cell.value).lower() if cell.value else "" for cell in row]
+            if any('question' in c for c in cells):
+                header_row = row
+                break
+
+        if not header_row:
+            continue
+
+        # Map columns
+        col_map = {}
+        for idx, cell in enumerate(header_row):
+            val = str(cell.value).lower() if cell.value else ""
+            if 'question' in val:
+                col_map['question'] = idx
+            elif 'answer' in val or 'response' in val:
+                col_map['answer'] = idx
+            elif 'score' in val:
+                col_map['score'] = idx
+
+        if 'question' not in col_map or 'answer' not in col_map:
+            continue
+
+        # Extract Q&A
+        app_data = {
+            'name': sheet_name.strip(),
+            'safe_name': sheet_name[:31].strip(),
+            'is_green': ws.sheet_properties.tabColor is not None and
+                       hasattr(ws.sheet_properties.tabColor, 'rgb') and
+                       ws.sheet_properties.tabColor.rgb and
+                       'FF00FF00' in str(ws.sheet_properties.tabColor.rgb).upper(),
+            'answers': {}
+        }
+
+        for row in ws.iter_rows(min_row=header_row[0].row + 1):
+            question = row[col_map['question']].value
+            answer = row[col_map['answer']].value
+            score = row[col_map.get('score', -1)].value if 'score' in col_map else None
+
+            if question and str(question).strip():
+                question_text = str(question).strip()
+                answer_text = str(answer).strip() if answer else ""
+
+                # Fuzzy match to master questions
+                best_match = match_master_question(question_text)
+
+                if best_match:
+                    matched_question, synergy_block = best_match
+                    app_data['answers'][matched_question] = {
+                        'a': answer_text,
+                        's': score if score else None,
+                        'block': synergy_block
+                    }
+
+        # Inject Business Owner / IT Owner from Meetings sheet
+        if meetings_data:
+            norm_sheet = normalize_app_name(sheet_name)
+            # Try exact normalized match first, then fuzzy
+            owner_info = meetings_data.get(norm_sheet)
+            if not owner_info:
+                # Fuzzy match against Meetings app names
+                best_ratio = 0
+                best_key = None
+                for mk in meetings_data:
+                    ratio = difflib.SequenceMatcher(None, norm_sheet, mk).ratio()
+                    if ratio > best_ratio:
+                        best_ratio = ratio
+                        best_key = mk
+                if best_ratio > 0.75 and best_key:
+                    owner_info = meetings_data[best_key]
+
+            if owner_info:
+                if owner_info['business_owner']:
+                    app_data['answers']["Who is the Business Owner of this application?"] = {
+                        'a': owner_info['business_owner'],
+                        's': None,
+                        'block': 'Strategic Fit'
+                    }
+                if owner_info['it_owner']:
+                    app_data['answers']["Who is the IT Owner of this application?"] = {
+                        'a': owner_info['it_owner'],
+                        's': None,
+                        'block': 'Strategic Fit'
+                    }
+
+        if app_data['answers']:
+            applications.append(app_data)
+
+    return applications
+
+
+# ==================== APPLICATION MATCHING ====================
+def normalize_app_name(name: str) -> str:
+    """Normalize application name for matching"""
+    import re
+
+    # Remove extra spaces, convert to lowercase
+    normalized = ' '.join(name.strip().lower().split())
+
+    # Remove parentheses and their content (e.g., "(SCG & CNG)" → "")
+    normalized = re.sub(r'\([^)]*\)', '', normalized)
+
+    # Remove common words that don't affect app identity
+    noise_words = ['remote', 'local', 'the', 'a', 'an']
+    for word in noise_words:
+        normalized = normalized.replace(f' {word} ', ' ')
+
+    # Remove common separators for comparison
+    normalized = normalized.replace(' - ', ' ').replace('-', ' ')
+    normalized = normalized.replace(' & ', ' ').replace('&', ' ')
+
+    # Remove special characters but keep alphanumeric and spaces
+    normalized = ''.join(c if c.isalnum() or c.isspace() else ' ' for c in normalized)
+
+    # Remove extra spaces again
+    normalized = ' '.join(normalized.split())
+    return normalized
+
+
+def get_significant_tokens(name: str) -> tuple:
+    """
+    Extract significant tokens from app name
+    Returns: (primary_tokens, all_tokens)
+    Primary tokens are from main part (before parentheses), more important for matching
+    """
+    import re
+
+    # Convert to lowercase and split
+    text = name.lower()
+
+    # Separate primary (before parens) and secondary (in parens) content
+    text_no_paren = re.sub(r'\([^)]*\)', '', text)
+    paren_content = re.findall(r'\(([^)]+)\)', text)
+
+    # Expanded noise words - common descriptive terms that don't identify the app
+    noise = {
+        'the', 'a', 'an', 'and', 'or', 'of', 'in', 'on', 'at', 'to', 'for', 'with', 'by',
+        'file', 'app', 'application', 'system', 'tool', 'software', 'ms', 'project',
+        'database', 'db', 'program', 'service'
+    }
+
+    # Extract primary tokens (before parentheses) - most important
+    primary_tokens = set(re.findall(r'\w+', text_no_paren))
+    primary_tokens = {t for t in primary_tokens if t not in noise and len(t) >= 2}
+
+    # Extract all tokens including parentheses content
+    all_text = text_no_paren + ' ' + ' '.join(paren_content)
+    all_tokens = set(re.findall(r'\w+', all_text))
+    all_tokens = {t for t in all_tokens if t not in noise and len(t) >= 2}
+
+    return primary_tokens, all_tokens
+
+
+def find_matching_application(file_app_name: str, app_dict: dict) -> tuple:
+    """
+    Find matching application using smart matching algorithm
+    Returns: (matched_app, match_type) or (None, None)
+
+    Match types: 'exact', 'normalized', 'substring', 'token', 'fuzzy', 'fuzzy_normalized'
+    """
+    file_app_lower = file_app_name.strip().lower()
+
+    # Strategy 1: Exact match (case-insensitive)
+    if file_app_lower in app_dict:
+        return app_dict[file_app_lower], 'exact'
+
+    # Strategy 2: Normalized match (remove dashes and extra spaces)
+    file_normalized = normalize_app_name(file_app_name)
+
+    for app_name_lower, app in app_dict.items():
+        app_normalized = normalize_app_name(app_name_lower)
+        if file_normalized == app_normalized:
+            return app, 'normalized'
+
+    # Strategy 3: Substring containment - check if file name contains an app name
+    # or vice versa. Prefer longest match to avoid "Bentley" matching when
+    # "Bentley - PLS-CADD" exists.
+    substring_matches = []
+    for app_name_lower, app in app_dict.items():
+        # Check both directions
+        if app_name_lower in file_app_lower or file_app_lower in app_name_lower:
+            # Score by length of overlap (prefer longer/more specific matches)
+            overlap_len = min(len(app_name_lower), len(file_app_lower))
+            substring_matches.append((app, overlap_len, app_name_lower))
+
+    if substring_matches:
+        # Pick the longest (most specific) match
+        substring_matches.sort(key=lambda x: x[1], reverse=True)
+        return substring_matches[0][0], 'substring'
+
+    # Strategy 4: Token-based matching - prioritize primary tokens
+    file_primary, file_all = get_significant_tokens(file_app_name)
+
+    best_match = None
+    best_score = 0
+
+    for app_name_lower, app in app_dict.items():
+        app_primary, app_all = get_significant_tokens(app_name_lower)
+
+        if not file_primary or not app_primary:
+            continue
+
+        # First check primary tokens match (more important)
+        primary_intersection = len(file_primary & app_primary)
+        primary_union = len(file_primary | app_primary)
+        primary_similarity = primary_intersection / primary_union if primary_union > 0 else 0
+
+        # If primary tokens match well (>=80%), it's a strong match
+        if primary_similarity >= 0.8:
+            if primary_similarity > best_score:
+                best_score = primary_similarity
+                best_match = app
+            continue
+
+        # Otherwise, check all tokens with lower threshold
+        all_intersection = len(file_all & app_all)
+        all_union = len(file_all | app_all)
+        all_similarity = all_intersection / all_union if all_union > 0 else 0
+
+        if all_similarity > best_score and all_similarity >= 0.4:  # Lower threshold for all tokens
+            best_score = all_similarity
+            best_match = app
+
+    if best_match:
+        return best_match, 'token'
+
+    # Strategy 5: Fuzzy match using difflib (similarity > 80%)
+    matches = difflib.get_close_matches(
+        file_app_lower,
+        app_dict.keys(),
+        n=1,
+        cutoff=0.80
+    )
+
+    if matches:
+        return app_dict[matches[0]], 'fuzzy'
+
+    # Strategy 6: Try normalized fuzzy match
+    app_names_normalized = {normalize_app_name(k): v for k, v in app_dict.items()}
+
+    matches_normalized = difflib.get_close_matches(
+        file_normalized,
+        app_names_normalized.keys(),
+        n=1,
+        cutoff=0.80
+    )
+
+    if matches_normalized:
+        return app_names_normalized[matches_normalized[0]], 'fuzzy_normalized'
+
+    return None, None
+
+
+
+# ==================== DATABASE WRITES ====================
+def _merge_answers(app_id: str, answers: Dict, existing_by_question: Dict, new_rows: List):
+    """Add new answers and complete incomplete ones (existing complete answers are never overwritten)"""
+    for question, answer_obj in answers.items():
+        existing_answer = existing_by_question.get(question)
+        new_answer_text = answer_obj.get('a', '')
+
+        if not existing_answer:
+            # No answer exists - create new
+            qa = QuestionnaireAnswer(
+                id=str(uuid.uuid4()),
+                application_id=app_id,
+                question_text=question,
+                answer_text=new_answer_text,
+                score=answer_obj.get('s'),
+                synergy_block=answer_obj.get('block', 'Unknown')
+            )
+            new_rows.append(qa)
+            existing_by_question[question] = qa
+        else:
+            # Answer exists - check if incomplete (empty or very short)
+            is_incomplete = (
+                not existing_answer.answer_text or
+                len(existing_answer.answer_text.strip()) < 5
+            )
+
+            # Only update if existing answer is incomplete AND new answer has content
+            if is_incomplete and new_answer_text and len(new_answer_text.strip()) >= 5:
+                existing_answer.answer_text = new_answer_text
+                existing_answer.score = answer_obj.get('s')
+                existing_answer.synergy_block = answer_obj.get('block', 'Unknown')
+
+
+def _new_application(app_data: Dict) -> Application:
+    return Application(
+        id=str(uuid.uuid4()),
+        name=app_data['name'],
+        safe_name=app_data.get('safe_name', app_data['name'][:31]),
+        is_green=app_data.get('is_green', False)
+    )
+
+
+def save_application_to_db(app_data: Dict, session) -> Application:
+    """Save application and its answers to database (commits; raises on error)"""
+    app = session.query(Application).filter_by(name=app_data['name']).first()
+    if not app:
+        app = _new_application(app_data)
+        session.add(app)
+
+    existing_by_question = {
+        qa.question_text: qa
+        for qa in session.query(QuestionnaireAnswer).filter_by(application_id=app.id).all()
+    }
+    new_rows = []
+    _merge_answers(app.id, app_data['answers'], existing_by_question, new_rows)
+    session.add_all(new_rows)
+    session.commit()
+    return app
+
+
+def save_applications_bulk(apps_data: List[Dict], session) -> Dict[str, str]:
+    """
+    Save many parsed applications with a constant number of queries and a single commit.
+
+    Returns:
+        Dict of application name -> application id
+    """
+    names = [app_data['name'] for app_data in apps_data]
+    apps_by_name = {app.name: app for app in session.query(Application).filter(Application.name.in_(names)).all()}
+
+    new_rows = []
+    for app_data in apps_data:
+        if app_data['name'] not in apps_by_name:
+            app = _new_application(app_data)
+            apps_by_name[app.name] = app
+            new_rows.append(app)
+
+    existing_answers: Dict[str, Dict] = {}
+    app_ids = [app.id for app in apps_by_name.values()]
+    for qa in session.query(QuestionnaireAnswer).filter(QuestionnaireAnswer.application_id.in_(app_ids)).all():
+        existing_answers.setdefault(qa.application_id, {})[qa.question_text] = qa
+
+    for app_data in apps_data:
+        app = apps_by_name[app_data['name']]
+        _merge_answers(app.id, app_data['answers'], existing_answers.setdefault(app.id, {}), new_rows)
+
+    session.add_all(new_rows)
+    session.commit()
+    return {name: app.id for name, app in apps_by_name.items()}
+
+
+# ==================== TRANSCRIPTS ====================
+def app_name_from_filename(filename: str) -> str:
+    """
+    Application name encoded in a transcript file name.
+    Handles multi-part names like "Bentley - PLS-CADD - Application Assessment..."
+    """
+    name_no_ext = os.path.basename(filename).rsplit('.', 1)[0].strip()
+
+    # Smart suffix removal: find description suffix boundary
+    # This preserves multi-part app names (e.g., "Bentley - PLS-CADD")
+    suffix_idx = name_no_ext.lower().find(' - application assessment')
+    if suffix_idx > 0:
+        return name_no_ext[:suffix_idx].strip()
+    elif " - " in name_no_ext:
+        # Fallback: take first segment
+        return name_no_ext.split(" - ")[0].strip()
+    return name_no_ext
+
+
+def extract_transcript_text(filename: str, data) -> str:
+    """Read transcript text from TXT, PDF or DOCX content or file path (raises ValueError for other formats)"""
+    return text_extraction.extract_text(filename, data).text
+
+
+def find_transcript_files(root: str) -> List[str]:
+    """All transcript files under a directory tree (sorted, hidden/lock files skipped)"""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            if filename.startswith(('.', '~$')):
+                continue
+            if filename.rsplit('.', 1)[-1].lower() in TRANSCRIPT_EXTENSIONS:
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+TRANSCRIPT_NEW = 'new'
+TRANSCRIPT_UPDATED = 'updated'
+TRANSCRIPT_EXACT_DUPLICATE = 'exact_duplicate'
+TRANSCRIPT_NEAR_DUPLICATE = 'near_duplicate'
+
+
+def store_transcript(session, app, file_name: str, text: str, dedup_index: TranscriptDedupIndex,
+                     fingerprint: Tuple[str, bytes] = None) -> Tuple[str, MeetingTranscript, Optional[DuplicateMatch]]:
+    """
+    Store an uploaded transcript unless it duplicates one already stored for the application.
+
+    - exact duplicate (same normalized content, whatever the file name): nothing is stored, the
+      existing transcript is returned
+    - same file name with different content (even a small edit, similar to the stored version):
+      the stored text is replaced, the answers extracted from the old version are dropped and the
+      transcript is marked for processing again
+    - near duplicate (MinHash similarity >= threshold) under a new file name: nothing is stored
+    - otherwise a new transcript is added
+
+    The caller commits. Returns (status, transcript, duplicate); the transcript needs AI
+    extraction when transcript.processed is False.
+    """
+    text_hash, signature = fingerprint or (content_hash(text), minhash_signature(text))
+
+    duplicate = dedup_index.find_duplicate(app.id, text_hash, signature)
+    same_name_id = dedup_index.transcript_id_for_name(app.id, file_name)
+    if duplicate or same_name_id:
+        # The match may have been added earlier in this batch and not be flushed yet
+        session.flush()
+    if duplicate and duplicate.kind == 'near' and same_name_id:
+        # A (small) edit of the file stored under the same name is an update: only identical
+        # content is skipped
+        duplicate = None
+    if duplicate:
+        status = TRANSCRIPT_EXACT_DUPLICATE if duplicate.kind == 'exact' else TRANSCRIPT_NEAR_DUPLICATE
+        return status, session.get(MeetingTranscript, duplicate.transcript_id), duplicate
+
+    same_name = session.get(MeetingTranscript, same_name_id) if same_name_id else None
+    if same_name:
+        # Edited file uploaded under the same name
+        session.query(TranscriptAnswer).filter_by(transcript_id=same_name.id).delete()
+        same_name.transcript_text = text
+        same_name.content_hash = text_hash
+        same_name.minhash_signature = signature
+        same_name.processed = False
+        dedup_index.remove(same_name.id)
+        dedup_index.add(same_name.id, app.id, file_name, text_hash, signature)
+        return TRANSCRIPT_UPDATED, same_name, None
+
+    transcript = MeetingTranscript(
+        id=str(uuid.uuid4()),
+        application_id=app.id,
+        file_name=file_name,
+        transcript_text=text,
+        processed=False,
+        content_hash=text_hash,
+        minhash_signature=signature
+    )
+    session.add(transcript)
+    dedup_index.add(transcript.id, app.id, file_name, text_hash, signature)
+    return TRANSCRIPT_NEW, transcript, None
+
+
+def _read_transcript_path(path: str) -> Tuple[str, ExtractionResult, Optional[Tuple[str, bytes]]]:
+    """Worker-process task: returns (path, extraction result, (content_hash, minhash_signature))"""
+    # Parsed from the file itself (memory-mapped PDFs), never read into memory as a whole
+    extraction = text_extraction.extract_text_safe(path, path)
+    fingerprint = (content_hash(extraction.text), minhash_signature(extraction.text)) if extraction.text else None
+    return path, extraction, fingerprint
+
+
+def ingest_transcript_files(paths: List[str], session, workers: int = None,
+                            progress: Callable[[int, int], None] = None) -> Dict:
+    """
+    Parse and fingerprint transcript files in parallel processes, match them to applications
+    and bulk-insert them (see store_transcript for the duplicate rules). Nothing is sent to the AI here.
+
+    Returns:
+        Dict of counters, "timings" [(file, pages, seconds, cached)], "issues", "fuzzy_matches" and
+        "duplicates" [(file, message)], and "to_process" [(transcript_id, content_hash)] for
+        transcripts awaiting AI extraction
+    """
+    stats = {"files": len(paths), "bytes": 0, "pages": 0, "cached": 0, "extraction_seconds": 0.0,
+             "timings": [], "saved": 0, "updated": 0, "exact_duplicates": 0,
+             "near_duplicates": 0, "unmatched": 0, "errors": 0, "issues": [], "fuzzy_matches": [],
+             "duplicates": [], "to_process": []}
+
+    app_dict = {app.name.strip().lower(): app for app in session.query(Application).all()}
+    dedup_index = TranscriptDedupIndex.load(session)
+    match_cache: Dict[str, Tuple] = {}
+    to_process: Dict[str, str] = {}
+
+    start_time = time.time()
+    pending = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for done, (path, extraction, fingerprint) in enumerate(
+                executor.map(_read_transcript_path, paths, chunksize=2), start=1):
+            filename = os.path.basename(path)
+            text, error = extraction.text, extraction.error
+            stats["bytes"] += extraction.size_bytes
+            stats["pages"] += extraction.pages
+            stats["cached"] += extraction.cached
+            stats["extraction_seconds"] += extraction.seconds
+            stats["timings"].append((path, extraction.pages, extraction.seconds, extraction.cached))
+            if progress:
+                progress(done, len(paths))
+
+            if error or not text:
+                stats["errors"] += 1
+                stats["issues"].append((path, error or "No text could be read"))
+                continue
+
+            app_name = app_name_from_filename(filename)
+            if app_name not in match_cache:
+                match_cache[app_name] = find_matching_application(app_name, app_dict)
+            matched_app, match_type = match_cache[app_name]
+            if not matched_app:
+                stats["unmatched"] += 1
+                stats["issues"].append((path, f"Application '{app_name}' not found"))
+                continue
+            if match_type != 'exact':
+                stats["fuzzy_matches"].append((path, f"Matched to '{matched_app.name}' ({match_type})"))
+
+            status, transcript, duplicate = store_transcript(session, matched_app, filename, text,
+                                                             dedup_index, fingerprint)
+            if status == TRANSCRIPT_NEW:
+                stats["saved"] += 1
+            elif status == TRANSCRIPT_UPDATED:
+                stats["updated"] += 1
+            else:
+                stats["exact_duplicates" if duplicate.kind == 'exact' else "near_duplicates"] += 1
+                stats["duplicates"].append((path, describe_duplicate(duplicate)))
+            if not transcript.processed:
+                to_process[transcript.id] = transcript.content_hash
+
+            pending += 1
+            if pending >= TRANSCRIPT_COMMIT_BATCH:
+                session.commit()
+                pending = 0
+
+    session.commit()
+    stats["to_process"] = list(to_process.items())
+    stats["seconds"] = time.time() - start_time
+    return stats
+
+
+def describe_duplicate(duplicate: DuplicateMatch) -> str:
+    if duplicate.kind == 'exact':
+        return f"Exact duplicate of '{duplicate.file_name}'"
+    return f"Near duplicate ({duplicate.similarity:.0%} similar) of '{duplicate.file_name}'"
@@ -7,7 +7,6 @@ import json
 import uuid
 from typing import List, Dict, Tuple
 from datetime import datetime, timezone
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
 
@@ -16,10 +15,10 @@ from database import (
     Application, MeetingTranscript, QuestionnaireAnswer,
     TranscriptAnswer, SynergyScore, AppInsight, PortfolioInsight
 )
-from ai_processor import calculate_bvi_thi, get_recommendation, SYNERGY_BLOCKS
+from ai_processor import calculate_bvi_thi, get_recommendation
+from llm_backend import get_backend
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # Commercial products that have market alternatives
 COMMERCIAL_PRODUCTS = [
@@ -39,8 +38,6 @@ def search_market_data(app_name: str) -> str:
     # Use web search to find market information
     # This is a placeholder - would integrate with actual web search
     try:
-        from ai_processor import client as ai_client
-
         search_query = f"{app_name} application capabilities features alternatives 2026"
 
         # Simple web search approach - in production, use dedicated search API
@@ -122,6 +119,8 @@ def generate_app_insight(app: Application, session) -> Dict:
         print(f"   📊 Commercial product detected - gathering market data...")
         market_data = search_market_data(app.name)
 
+    market_section = f"MARKET RESEARCH:\n{market_data}\n" if market_data else ""
+
     # Create comprehensive prompt
     prompt = f"""You are a strategic IT portfolio consultant analyzing an application for decision-making.
 
@@ -145,7 +144,7 @@ TRANSCRIPT DATA (User feedback, technical discussions, pain points):
 TRANSCRIPT-EXTRACTED ANSWERS:
 {all_ta[:2000]}
 
-{f"MARKET RESEARCH:\n{market_data}\n" if market_data else ""}
+{market_section}
 
 Your task is to provide deep, actionable strategic insights across multiple dimensions:
 
@@ -221,7 +220,7 @@ Return ONLY valid JSON, no other text."""
     try:
         print(f"   🤖 Calling OpenAI GPT-4o for deep analysis...")
 
-        response = client.chat.completions.create(
+        response = get_backend().chat(
             model="gpt-4o",  # Using most powerful model for best insights
             messages=[
                 {
@@ -231,10 +230,12 @@ Return ONLY valid JSON, no other text."""
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
-            response_format={"type": "json_object"}
+            json_mode=True,
+            feature="app_insight",
+            app_ids=[app.id]
         )
 
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response.content)
         print(f"   ✅ Analysis complete!")
 
         return result
@@ -412,7 +413,7 @@ Return ONLY valid JSON."""
     try:
         print(f"   🤖 Calling OpenAI GPT-4o for portfolio analysis...")
 
-        response = client.chat.completions.create(
+        response = get_backend().chat(
             model="gpt-4o",
             messages=[
                 {
@@ -422,10 +423,11 @@ Return ONLY valid JSON."""
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
-            response_format={"type": "json_object"}
+            json_mode=True,
+            feature="portfolio_insights"
         )
 
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response.content)
         print(f"   ✅ Portfolio analysis complete!")
 
         return result
@@ -0,0 +1,361 @@
+"""
+Background job queue
+Persistent jobs table (SQLite or PostgreSQL, no external broker) with idempotency keys,
+progress reporting, retries with backoff and recovery of jobs whose worker died.
+Jobs are executed by worker.py (separate process) or by the embedded worker thread of the app.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+import export_cache
+from database import get_session, close_session, Job
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+# A running job whose heartbeat is older than this is considered abandoned (worker died)
+STALE_AFTER_SECONDS = 300
+# A thread of the worker refreshes the heartbeat of each running job this often, so a handler
+# blocked in one long call (LLM retries, export rendering) is not taken for abandoned
+HEARTBEAT_INTERVAL_SECONDS = 30
+# Minimum delay between two progress writes of the same job
+PROGRESS_WRITE_INTERVAL = 0.5
+# Finished (succeeded or failed) jobs are deleted after this many days
+RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+_HANDLERS: Dict[str, Callable] = {}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def job_handler(job_type: str):
+    """
+    Register a job handler.
+
+    The handler is called as handler(payload, progress) where progress(fraction, message)
+    reports progress. It returns a JSON-serializable result dict; the optional keys
+    "artifact_file" (a file in the export cache, see export_cache.store_artifact) and
+    "artifact_name" (download name) are stored separately for download.
+    """
+    def decorator(func):
+        _HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def registered_job_types() -> List[str]:
+    return sorted(_HANDLERS)
+
+
+def hash_values(values) -> str:
+    """Short order-independent digest of the values identifying a job input (for idempotency keys)"""
+    return hashlib.sha256("|".join(sorted(values)).encode("utf-8")).hexdigest()[:16]
+
+
+def _job_to_dict(job: Job) -> Dict:
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "payload": job.payload,
+        "result": job.result,
+        "artifact_name": job.artifact_name,
+        "progress": job.progress or 0.0,
+        "progress_message": job.progress_message,
+        "attempts": job.attempts or 0,
+        "max_attempts": job.max_attempts,
+        "error": job.error,
+        "worker_id": job.worker_id,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+# ==================== PRODUCER SIDE ====================
+def enqueue(job_type: str, payload: Dict = None, idempotency_key: str = None, max_attempts: int = 3) -> str:
+    """
+    Add a job to the queue and return its id.
+
+    If a queued or running job has the same idempotency key it is returned instead of creating a
+    new one (double clicks, reruns). A finished job (succeeded or failed) releases its key to the
+    new job, so the same input can always be run again, e.g. to retry the failed parts of a batch.
+    """
+    session = get_session()
+    try:
+        if idempotency_key:
+            existing = session.query(Job).filter_by(idempotency_key=idempotency_key).first()
+            if existing:
+                if existing.status in ACTIVE_STATUSES:
+                    return existing.id
+                existing.idempotency_key = None  # Kept as history
+                session.flush()
+
+        job = Job(
+            id=str(uuid.uuid4()),
+            job_type=job_type,
+            status=JOB_QUEUED,
+            idempotency_key=idempotency_key,
+            payload=payload or {},
+            progress=0.0,
+            progress_message="Waiting for a worker...",
+            attempts=0,
+            max_attempts=max_attempts,
+            created_at=_utcnow()
+        )
+        session.add(job)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Same idempotency key enqueued concurrently
+            session.rollback()
+            return session.query(Job.id).filter_by(idempotency_key=idempotency_key).scalar()
+        return job.id
+    finally:
+        close_session(session)
+
+
+def get_job(job_id: str) -> Optional[Dict]:
+    """Job status snapshot (without the artifact bytes)"""
+    session = get_session()
+    try:
+        job = session.get(Job, job_id)
+        return _job_to_dict(job) if job else None
+    finally:
+        close_session(session)
+
+
+def get_job_artifact(job_id: str):
+    """Return (artifact_name, artifact_bytes) of a finished job; the bytes are None once the file
+    has been evicted from the export cache, both are None for an unknown job"""
+    session = get_session()
+    try:
+        row = session.query(Job.artifact_name, Job.artifact_file).filter(Job.id == job_id).first()
+    finally:
+        close_session(session)
+    if not row:
+        return None, None
+    return row[0], export_cache.load_artifact(row[1]) if row[1] else None
+
+
+def list_jobs(limit: int = 20, job_types: List[str] = None) -> List[Dict]:
+    """Most recent jobs first"""
+    session = get_session()
+    try:
+        query = session.query(Job)
+        if job_types:
+            query = query.filter(Job.job_type.in_(job_types))
+        return [_job_to_dict(j) for j in query.order_by(Job.created_at.desc()).limit(limit).all()]
+    finally:
+        close_session(session)
+
+
+# ==================== WORKER SIDE ====================
+def requeue_stale_jobs(stale_after_seconds: int = STALE_AFTER_SECONDS) -> int:
+    """Put running jobs whose worker stopped heart-beating back in the queue (jobs that used all
+    their attempts are marked failed instead)"""
+    session = get_session()
+    try:
+        now = _utcnow()
+        stale = (Job.status == JOB_RUNNING, Job.heartbeat_at < now - timedelta(seconds=stale_after_seconds))
+        session.execute(
+            update(Job)
+            .where(*stale, Job.attempts >= Job.max_attempts)
+            .values(status=JOB_FAILED, worker_id=None, finished_at=now,
+                    error="Worker stopped responding on the last attempt",
+                    progress_message="Failed after worker interruption")
+        )
+        count = session.execute(
+            update(Job)
+            .where(*stale, Job.attempts < Job.max_attempts)
+            .values(status=JOB_QUEUED, worker_id=None, progress_message="Re-queued after worker interruption")
+        ).rowcount
+        session.commit()
+        return count
+    finally:
+        close_session(session)
+
+
+def prune_finished_jobs(retention_days: float = RETENTION_DAYS) -> int:
+    """Delete succeeded and failed jobs finished more than retention_days ago; returns the count
+    (their export files stay in the export cache, which evicts them on its own)"""
+    session = get_session()
+    try:
+        count = session.query(Job).filter(
+            Job.status.in_((JOB_SUCCEEDED, JOB_FAILED)),
+            Job.finished_at < _utcnow() - timedelta(days=retention_days)
+        ).delete(synchronize_session=False)
+        session.commit()
+        return count
+    finally:
+        close_session(session)
+
+
+def claim_job(worker_id: str, job_types: List[str] = None) -> Optional[Dict]:
+    """
+    Atomically claim the oldest runnable job.
+
+    Uses a compare-and-set UPDATE (... WHERE status = 'queued') so several workers,
+    in one or many processes, can poll the same table safely on SQLite and PostgreSQL.
+    """
+    job_types = job_types or registered_job_types()
+    session = get_session()
+    try:
+        now = _utcnow()
+        candidates = session.query(Job.id).filter(
+            Job.status == JOB_QUEUED,
+            Job.job_type.in_(job_types),
+            (Job.run_after.is_(None)) | (Job.run_after <= now)
+        ).order_by(Job.created_at).limit(5).all()
+
+        for (job_id,) in candidates:
+            claimed = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JOB_QUEUED)
+                .values(status=JOB_RUNNING, worker_id=worker_id, started_at=now, heartbeat_at=now,
+                        attempts=Job.attempts + 1, progress_message="Starting...")
+            ).rowcount
+            session.commit()
+            if claimed:
+                return _job_to_dict(session.get(Job, job_id))
+        return None
+    finally:
+        close_session(session)
+
+
+def _owned(job_id: str, worker_id: Optional[str]):
+    """Filter on a job still running under worker_id (any running job when worker_id is None)"""
+    conditions = [Job.id == job_id]
+    if worker_id is not None:
+        conditions += [Job.worker_id == worker_id, Job.status == JOB_RUNNING]
+    return conditions
+
+
+def report_progress(job_id: str, progress: float, message: str = None, worker_id: str = None):
+    """Update job progress (also refreshes the heartbeat)"""
+    session = get_session()
+    try:
+        values = {"progress": max(0.0, min(1.0, progress)), "heartbeat_at": _utcnow()}
+        if message is not None:
+            values["progress_message"] = message[:2000]
+        session.execute(update(Job).where(*_owned(job_id, worker_id)).values(**values))
+        session.commit()
+    finally:
+        close_session(session)
+
+
+def heartbeat(job_id: str, worker_id: str = None) -> bool:
+    """Refresh the heartbeat of a running job; False when the worker no longer owns it"""
+    session = get_session()
+    try:
+        updated = session.execute(
+            update(Job).where(*_owned(job_id, worker_id)).values(heartbeat_at=_utcnow())
+        ).rowcount
+        session.commit()
+        return bool(updated)
+    finally:
+        close_session(session)
+
+
+def complete_job(job_id: str, result: Dict = None, artifact_file: str = None, artifact_name: str = None,
+                 worker_id: str = None) -> bool:
+    """Mark the job succeeded; with worker_id, only if that worker still owns it (a job re-queued
+    and claimed by another worker is left to that worker). Returns whether the job was updated."""
+    session = get_session()
+    try:
+        values = {"status": JOB_SUCCEEDED, "result": result or {}, "progress": 1.0,
+                  "progress_message": "Done", "finished_at": _utcnow(), "error": None}
+        if artifact_file is not None:
+            values["artifact_file"] = artifact_file
+            values["artifact_name"] = artifact_name
+        updated = session.execute(update(Job).where(*_owned(job_id, worker_id)).values(**values)).rowcount
+        session.commit()
+        return bool(updated)
+    finally:
+        close_session(session)
+
+
+def fail_job(job_id: str, error: str, worker_id: str = None):
+    """Record a failed attempt: retry with exponential backoff, or mark the job failed (with
+    worker_id, only if that worker still owns the job)"""
+    session = get_session()
+    try:
+        job = session.get(Job, job_id)
+        if job is None:
+            return
+        if worker_id is not None and (job.worker_id != worker_id or job.status != JOB_RUNNING):
+            print(f"[JOBS] ⚠️  Job {job_id} is no longer owned by {worker_id}: failure not recorded")
+            return
+        job.error = error[-4000:]
+        if (job.attempts or 0) < (job.max_attempts or 1):
+            delay = min(10 * 2 ** ((job.attempts or 1) - 1), 600)
+            job.status = JOB_QUEUED
+            job.worker_id = None
+            job.run_after = _utcnow() + timedelta(seconds=delay)
+            job.progress_message = f"Attempt {job.attempts} failed, retrying in {delay}s"
+        else:
+            job.status = JOB_FAILED
+            job.finished_at = _utcnow()
+            job.progress_message = f"Failed after {job.attempts} attempt(s)"
+        session.commit()
+    finally:
+        close_session(session)
+
+
+def run_job(job: Dict):
+    """Execute a claimed job with its registered handler"""
+    handler = _HANDLERS.get(job["job_type"])
+    if handler is None:
+        fail_job(job["id"], f"No handler registered for job type '{job['job_type']}'")
+        return
+
+    worker_id = job.get("worker_id")
+    last_write = [0.0]
+
+    def progress(fraction: float, message: str = None):
+        now = time.time()
+        if now - last_write[0] >= PROGRESS_WRITE_INTERVAL or fraction >= 1.0:
+            last_write[0] = now
+            try:
+                report_progress(job["id"], fraction, message, worker_id)
+            except Exception as e:
+                print(f"[JOBS] ⚠️  Could not report progress for {job['id']}: {e}")
+
+    # Heartbeat independent of the handler's progress calls
+    finished = threading.Event()
+
+    def beat():
+        while not finished.wait(HEARTBEAT_INTERVAL_SECONDS):
+            try:
+                if not heartbeat(job["id"], worker_id):
+                    return
+            except Exception as e:
+                print(f"[JOBS] ⚠️  Heartbeat failed for {job['id']}: {e}")
+
+    threading.Thread(target=beat, name=f"apm-heartbeat-{job['id'][:8]}", daemon=True).start()
+    try:
+        result = handler(job.get("payload") or {}, progress) or {}
+        artifact_file = result.pop("artifact_file", None)
+        artifact_name = result.pop("artifact_name", None)
+        if not complete_job(job["id"], result, artifact_file, artifact_name, worker_id):
+            print(f"[JOBS] ⚠️  Job {job['id']} is no longer owned by {worker_id}: result discarded")
+    except Exception as e:
+        print(f"[JOBS] ❌ Job {job['id']} ({job['job_type']}) failed: {e}")
+        fail_job(job["id"], f"{type(e).__name__}: {e}\n{traceback.format_exc()}", worker_id)
+    finally:
+        finished.set()
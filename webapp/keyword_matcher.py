@@ -0,0 +1,85 @@
+"""
+Multi-pattern keyword matching (Aho–Corasick)
+The keywords of one or more taxonomies ({category: [keywords]}) are compiled once into an
+Aho–Corasick automaton over UTF-8 bytes with a full transition table, so a text is scanned once,
+byte by byte, whatever the number of keywords. Matching keeps the semantics of `keyword in text`
+on the lowercased text: a category scores one hit per listed keyword found anywhere in the text.
+Used by the Application Groups / Value Chain classification of the Excel export and by the root
+generator app (category scores and answer evaluation).
+"""
+
+from collections import deque
+from typing import Dict, List, Mapping, Optional, Sequence
+
+Taxonomy = Mapping[str, Sequence[str]]  # category -> keywords
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over the keywords of several taxonomies"""
+
+    def __init__(self, taxonomies: Mapping[str, Taxonomy]):
+        self.taxonomies = {name: list(categories) for name, categories in taxonomies.items()}
+        # Every (taxonomy, category) a keyword is listed in, once per listing
+        keywords: Dict[bytes, List] = {}
+        for name, categories in taxonomies.items():
+            for category, category_keywords in categories.items():
+                for keyword in category_keywords:
+                    keywords.setdefault(keyword.lower().encode('utf-8'), []).append((name, category))
+        self._targets = list(keywords.values())  # keyword id -> [(taxonomy, category), ...]
+
+        # Trie (state 0 is the root)
+        children: List[Dict[int, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for keyword_id, keyword in enumerate(keywords):
+            state = 0
+            for byte in keyword:
+                if byte not in children[state]:
+                    children.append({})
+                    outputs.append([])
+                    children[state][byte] = len(children) - 1
+                state = children[state][byte]
+            outputs[state].append(keyword_id)
+
+        # Failure links in breadth-first order, folded into a full transition table: the next
+        # state of any (state, byte) is one list lookup while scanning
+        self._table = [[0] * 256 for _ in children]
+        fail = [0] * len(children)
+        queue = deque()
+        for byte, child in children[0].items():
+            self._table[0][byte] = child
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            # Keywords ending at the failure state also end here (e.g. "meter" in "smart meter")
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            row = self._table[state]
+            row[:] = self._table[fail[state]]
+            for byte, child in children[state].items():
+                fail[child] = self._table[fail[state]][byte]
+                row[byte] = child
+                queue.append(child)
+        self._outputs = [tuple(output) or None for output in outputs]
+
+    def matched_keywords(self, text: str) -> set:
+        """Ids of the distinct keywords found in text (case-insensitive)"""
+        table, outputs = self._table, self._outputs
+        state = 0
+        found = set()
+        for byte in text.lower().encode('utf-8'):
+            state = table[state][byte]
+            if outputs[state]:
+                found.add(state)
+        return {keyword_id for state in found for keyword_id in outputs[state]}
+
+    def scan(self, text: str) -> Dict[str, Dict[str, int]]:
+        """{taxonomy: {category: keywords found}} for every category, in taxonomy order"""
+        counts = {name: dict.fromkeys(categories, 0) for name, categories in self.taxonomies.items()}
+        for keyword_id in self.matched_keywords(text):
+            for name, category in self._targets[keyword_id]:
+                counts[name][category] += 1
+        return counts
+
+
+def first_category(counts: Mapping[str, int], default: Optional[str] = None) -> Optional[str]:
+    """First category (in taxonomy order) with at least one keyword found"""
+    return next((category for category, hits in counts.items() if hits), default)
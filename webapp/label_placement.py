@@ -0,0 +1,224 @@
+"""
+Label placement for the THI × BVI matrix charts
+Greedy placement (most crowded points first) backed by a uniform grid index: neighbour counts,
+overlap with placed labels and markers under a label only look at the grid cells around the
+candidates, instead of every point and every placed label, and the 16 candidate offsets of a label
+are scored together with numpy. Used by the Dashboard chart of the Excel export (matplotlib
+offsets) and the Analyses strategic matrix (plotly text positions).
+"""
+
+import math
+from collections import defaultdict
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+Point = Tuple[float, float]
+Box = Tuple[float, float, float, float]  # (x1, y1, x2, y2) in data units
+
+
+class GridIndex:
+    """Uniform grid over the chart plane: each item is stored in every cell its box touches"""
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        self.items = []
+
+    def _span(self, x1, y1, x2, y2):
+        size = self.cell_size
+        return (range(math.floor(x1 / size), math.floor(x2 / size) + 1),
+                range(math.floor(y1 / size), math.floor(y2 / size) + 1))
+
+    def add(self, item, box: Box) -> int:
+        """Store item (with its box); returns its id (ids follow insertion order)"""
+        item_id = len(self.items)
+        self.items.append(item)
+        columns, rows = self._span(*box)
+        for cx in columns:
+            for cy in rows:
+                self._cells[(cx, cy)].append(item_id)
+        return item_id
+
+    def add_point(self, item, x: float, y: float) -> int:
+        return self.add(item, (x, y, x, y))
+
+    def query(self, box: Box) -> List[int]:
+        """Ids of the items stored in the cells box touches (a superset of the items it touches)"""
+        columns, rows = self._span(*box)
+        cells = self._cells
+        found = set()
+        for cx in columns:
+            for cy in rows:
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return list(found)
+
+
+def crowding_order(coords: Sequence[Point], radius: float) -> List[int]:
+    """Indexes of coords, most neighbours within radius first (ties keep input order)"""
+    points = np.array(coords, dtype=float).reshape(-1, 2)
+    grid = GridIndex(radius)
+    for i, (x, y) in enumerate(coords):
+        grid.add_point(i, x, y)
+    # Cell by cell: the points of a cell against the points of the 3x3 cells around it
+    counts = np.zeros(len(points), dtype=int)
+    for (cx, cy), members in grid._cells.items():
+        x, y = (cx + 0.5) * radius, (cy + 0.5) * radius
+        around = grid.query((x - radius, y - radius, x + radius, y + radius))
+        dist = np.hypot(points[members, 0:1] - points[around, 0], points[members, 1:2] - points[around, 1])
+        counts[members] = (dist < radius).sum(axis=1) - 1  # Minus the point itself
+    return sorted(range(len(points)), key=lambda i: -counts[i])
+
+
+# ==================== MATPLOTLIB (EXCEL DASHBOARD) ====================
+# 16 possible offset directions: (dx, dy, horizontal_align, vertical_align)
+# in data-coordinate units (chart range 0-100)
+OFFSETS = [
+    ( 2.0,  2.0, 'left',   'bottom'),   # top-right
+    ( 2.0, -2.0, 'left',   'top'),       # bottom-right
+    (-2.0,  2.0, 'right',  'bottom'),    # top-left
+    (-2.0, -2.0, 'right',  'top'),       # bottom-left
+    ( 3.0,  0.0, 'left',   'center'),    # right
+    (-3.0,  0.0, 'right',  'center'),    # left
+    ( 0.0,  3.0, 'center', 'bottom'),    # top
+    ( 0.0, -3.0, 'center', 'top'),       # bottom
+    ( 4.0,  3.5, 'left',   'bottom'),    # far top-right
+    ( 4.0, -3.5, 'left',   'top'),       # far bottom-right
+    (-4.0,  3.5, 'right',  'bottom'),    # far top-left
+    (-4.0, -3.5, 'right',  'top'),       # far bottom-left
+    ( 6.0,  1.0, 'left',   'center'),    # far right
+    (-6.0,  1.0, 'right',  'center'),    # far left
+    ( 0.0,  5.0, 'center', 'bottom'),    # far top
+    ( 0.0, -5.0, 'center', 'top'),       # far bottom
+]
+
+# Label dimensions in data units (for ~22x16 inch figure, 0-100 range)
+CHAR_W = 0.32   # width per character in data units
+LABEL_H = 2.0   # label height in data units
+PAD = 0.3       # padding around label
+
+CROWDING_RADIUS = 12
+PROXIMITY = 8   # Placed labels whose centre is closer than this cost a proximity penalty
+LABEL_CELL = 6  # Grid cell size of the label / marker indexes
+
+
+# Per offset: label position and the extent of the label left / right of it, in label widths
+_OFFSET_X = np.array([dx for dx, _, _, _ in OFFSETS])
+_OFFSET_Y = np.array([dy for _, dy, _, _ in OFFSETS])
+_EXTENT = {'left': (0.0, 1.0), 'right': (-1.0, 0.0), 'center': (-0.5, 0.5)}
+_LEFT_EXTENT = np.array([_EXTENT[ha][0] for _, _, ha, _ in OFFSETS])
+_RIGHT_EXTENT = np.array([_EXTENT[ha][1] for _, _, ha, _ in OFFSETS])
+
+
+def _candidate_boxes(x: float, y: float, name: str) -> np.ndarray:
+    """(16, 4) label boxes of the point, one per offset, padded by PAD"""
+    w = len(name) * CHAR_W
+    lx, ly = x + _OFFSET_X, y + _OFFSET_Y
+    return np.column_stack((lx + _LEFT_EXTENT * w - PAD, ly - LABEL_H / 2 - PAD,
+                            lx + _RIGHT_EXTENT * w + PAD, ly + LABEL_H / 2 + PAD))
+
+
+def _placement_scores(boxes: np.ndarray, placed: np.ndarray, markers: np.ndarray) -> np.ndarray:
+    """Score of each candidate box (lower is better) against the nearby placed labels and markers"""
+    x1, y1, x2, y2 = (boxes[:, i:i + 1] for i in range(4))
+    # Boundary penalty
+    penalties = 6 * ((x1 < -2).astype(int) + (x2 > 102) + (y1 < -2) + (y2 > 102))[:, 0]
+    # Overlap with data points (markers)
+    if len(markers):
+        mx, my = markers.T
+        penalties += 4 * ((x1 <= mx) & (mx <= x2) & (y1 <= my) & (my <= y2)).sum(axis=1)
+    if not len(placed):
+        return penalties.astype(float)
+    px1, py1, px2, py2 = placed.T
+    dx = np.minimum(x2, px2) - np.maximum(x1, px1)
+    dy = np.minimum(y2, py2) - np.maximum(y1, py1)
+    # Heavy penalty for overlap area, proximity penalty between centres otherwise
+    dist2 = ((x1 + x2) / 2 - (px1 + px2) / 2) ** 2 + ((y1 + y2) / 2 - (py1 + py2) / 2) ** 2
+    terms = np.where((dx > 0) & (dy > 0), dx * dy * 10, (dist2 < 25) * 2.0 + (dist2 < PROXIMITY ** 2))
+    return terms.sum(axis=1) + penalties
+
+
+def place_labels(coords: Sequence[Point], names: Sequence[str]) -> List[Tuple[float, float, str, str]]:
+    """Label offset (dx, dy, ha, va) in data units for each point (same order as input):
+    the first of the 16 offsets with the lowest overlap / proximity / boundary / marker score"""
+    points = np.array(coords, dtype=float).reshape(-1, 2)
+    markers = GridIndex(LABEL_CELL)
+    for x, y in coords:
+        markers.add_point((x, y), x, y)
+    labels = GridIndex(LABEL_CELL)
+    placed = np.empty((len(coords), 4))  # Placed boxes by label id
+
+    positions = [None] * len(coords)
+    for idx in crowding_order(coords, CROWDING_RADIUS):
+        x, y = coords[idx]
+        boxes = _candidate_boxes(x, y, names[idx])
+        # Every candidate at once, against the labels and markers around all of them. A label that
+        # overlaps a candidate shares a cell with it, and one whose centre is within PROXIMITY
+        # has that centre inside the candidate grown by PROXIMITY
+        left, bottom = boxes[:, 0].min(), boxes[:, 1].min()
+        right, top = boxes[:, 2].max(), boxes[:, 3].max()
+        nearby = labels.query((left - PROXIMITY, bottom - PROXIMITY, right + PROXIMITY, top + PROXIMITY))
+        scores = _placement_scores(boxes, placed[nearby], points[markers.query((left, bottom, right, top))])
+
+        # Lowest score, first offset on ties
+        best = int(np.argmin(scores))
+        positions[idx] = OFFSETS[best]
+        placed[labels.add(idx, tuple(boxes[best]))] = boxes[best]
+
+    return positions
+
+
+# ==================== PLOTLY (ANALYSES MATRIX) ====================
+# Plotly textposition options with their offset vectors (dx, dy)
+TEXT_POSITIONS = [
+    ('top right',      ( 1,  1)),
+    ('top left',       (-1,  1)),
+    ('bottom right',   ( 1, -1)),
+    ('bottom left',    (-1, -1)),
+    ('middle right',   ( 1,  0)),
+    ('middle left',    (-1,  0)),
+    ('top center',     ( 0,  1)),
+    ('bottom center',  ( 0, -1)),
+]
+
+TEXT_RADIUS = 15  # Points closer than this compete for the same text position
+
+
+def assign_text_positions(coords: Sequence[Point]) -> List[str]:
+    """Plotly textposition for each point (same order as input) minimizing conflicts with the
+    positions already given to nearby points"""
+    assigned = [None] * len(coords)
+    placed = GridIndex(TEXT_RADIUS)
+
+    for idx in crowding_order(coords, TEXT_RADIUS):
+        x, y = coords[idx]
+        # Points already assigned within TEXT_RADIUS: (distance, their position)
+        neighbours = []
+        for j in placed.query((x - TEXT_RADIUS, y - TEXT_RADIUS, x + TEXT_RADIUS, y + TEXT_RADIUS)):
+            other = placed.items[j]
+            dist = math.hypot(coords[other][0] - x, coords[other][1] - y)
+            if dist < TEXT_RADIUS:
+                neighbours.append((dist, assigned[other]))
+
+        best_pos = 'top right'
+        best_conflicts = float('inf')
+        for pos_name, (dx, dy) in TEXT_POSITIONS:
+            # How many nearby points use the same position
+            conflicts = sum(3 if dist < 8 else 1 for dist, used in neighbours if used == pos_name)
+            # Prefer positions that push text away from chart center/edges
+            if x > 70 and dx > 0: conflicts += 0.5   # near right edge, don't go right
+            if x < 30 and dx < 0: conflicts += 0.5   # near left edge, don't go left
+            if y > 80 and dy > 0: conflicts += 0.5   # near top, don't go up
+            if y < 20 and dy < 0: conflicts += 0.5   # near bottom, don't go down
+
+            if conflicts < best_conflicts:
+                best_conflicts = conflicts
+                best_pos = pos_name
+                if conflicts == 0:
+                    break
+
+        assigned[idx] = best_pos
+        placed.add_point(idx, x, y)
+    return assigned
@@ -0,0 +1,172 @@
+"""
+LLM backend abstraction
+Decouples the AI features from the OpenAI SDK so they can run against the real API
+or a local OpenAI-compatible endpoint (e.g. mock_llm_server.py) for offline tests and benchmarks
+"""
+
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from telemetry import record_llm_call
+
+load_dotenv()
+
+
+@dataclass
+class LLMResponse:
+    """Result of a single chat completion"""
+    content: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: int = 0
+    retries: int = 0
+
+
+class LLMBackend(ABC):
+    """Base class for chat-completion backends (subclasses implement _complete)"""
+
+    name = "base"
+
+    def chat(self, messages: List[Dict], model: str, temperature: float = 0.3,
+             json_mode: bool = False, feature: str = None, app_ids: List[str] = None) -> LLMResponse:
+        """
+        Run a chat completion and record it in the LLM call telemetry.
+
+        Args:
+            messages: OpenAI-style list of {"role", "content"} messages
+            model: Model name (e.g. "gpt-4o-mini")
+            temperature: Sampling temperature
+            json_mode: Ask for a JSON object response
+            feature: Name of the calling feature (used for logging/telemetry)
+            app_ids: Applications the call is made for (used for cost attribution)
+
+        Returns:
+            LLMResponse
+        """
+        start_time = time.time()
+        try:
+            response = self._complete(messages, model, temperature, json_mode, feature)
+        except Exception as e:
+            record_llm_call(
+                feature=feature, model=model,
+                latency_ms=int((time.time() - start_time) * 1000),
+                retries=getattr(e, "llm_retries", 0),
+                application_ids=app_ids, success=False,
+                error=f"{type(e).__name__}: {e}"
+            )
+            raise
+
+        record_llm_call(
+            feature=feature, model=response.model,
+            prompt_tokens=response.prompt_tokens, completion_tokens=response.completion_tokens,
+            latency_ms=response.latency_ms, retries=response.retries,
+            application_ids=app_ids
+        )
+        return response
+
+    @abstractmethod
+    def _complete(self, messages: List[Dict], model: str, temperature: float,
+                  json_mode: bool, feature: str) -> LLMResponse:
+        """One chat completion, without telemetry (recorded by chat)"""
+
+
+def _get_openai_key():
+    key = os.getenv("OPENAI_API_KEY")
+    if key:
+        return key
+    from database import get_streamlit_secret
+    return get_streamlit_secret("OPENAI_API_KEY")
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI chat-completions backend (also works with any OpenAI-compatible base_url)"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str = None, base_url: str = None, max_retries: int = 3,
+                 timeout: float = 120.0):
+        from openai import OpenAI
+
+        self.base_url = base_url
+        self.max_retries = max_retries
+        # Retries are handled here so they can be counted and reported
+        self.client = OpenAI(
+            api_key=api_key or _get_openai_key() or ("mock" if base_url else None),
+            base_url=base_url,
+            max_retries=0,
+            timeout=timeout
+        )
+
+    def _complete(self, messages: List[Dict], model: str, temperature: float,
+                  json_mode: bool, feature: str) -> LLMResponse:
+        import openai
+
+        kwargs = {"model": model, "messages": messages, "temperature": temperature}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        retryable = (openai.RateLimitError, openai.APIConnectionError,
+                     openai.APITimeoutError, openai.InternalServerError)
+
+        retries = 0
+        start_time = time.time()
+        while True:
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+                break
+            except retryable as e:
+                if retries >= self.max_retries:
+                    e.llm_retries = retries
+                    raise
+                retries += 1
+                delay = min(2 ** (retries - 1), 20) * (0.5 + random.random())
+                print(f"[LLM] ⚠️  {type(e).__name__} on {feature or model}, retry {retries}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+        usage = getattr(response, "usage", None)
+        return LLMResponse(
+            content=response.choices[0].message.content,
+            model=getattr(response, "model", None) or model,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            latency_ms=int((time.time() - start_time) * 1000),
+            retries=retries
+        )
+
+
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LLMBackend:
+    """
+    Return the process-wide LLM backend, created on first use.
+
+    Configuration (environment):
+        LLM_BASE_URL: OpenAI-compatible endpoint, e.g. http://127.0.0.1:8765/v1 for the mock server
+        LLM_MAX_RETRIES: Retries on rate limit / connection / server errors (default 3)
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = OpenAIBackend(
+                    base_url=os.getenv("LLM_BASE_URL") or None,
+                    max_retries=int(os.getenv("LLM_MAX_RETRIES", "3"))
+                )
+    return _backend
+
+
+def set_backend(backend: Optional[LLMBackend]):
+    """Replace the process-wide backend (None resets to the configured default)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
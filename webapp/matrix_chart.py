@@ -0,0 +1,334 @@
+"""
+THI × BVI matrix chart rendering (Excel Dashboard image and Analyses page figure)
+Both renderings are memoized by a hash of what they draw: the points (name, THI, BVI,
+recommendation, override), the style constants and the source of the rendering code. The PNG of the
+Excel export is kept in the export disk cache (export_cache.py); the plotly figure of the Analyses
+page is kept as JSON in memory, so a rerun with unchanged scores does not rebuild its traces.
+Large portfolios are drawn with one WebGL trace per recommendation instead of one trace per app.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, List
+
+import export_cache
+from label_placement import assign_text_positions, place_labels
+
+# Files whose content changes the rendered charts
+SOURCES = ("matrix_chart.py", "label_placement.py")
+
+RECOMMENDATIONS = ['EVOLVE', 'INVEST', 'MAINTAIN', 'ELIMINATE']
+MARKER_COLORS = {
+    'EVOLVE': '#10B981',
+    'INVEST': '#F59E0B',
+    'MAINTAIN': '#3B82F6',
+    'ELIMINATE': '#EF4444',
+}
+
+PNG_STYLE = {"figsize": (22, 16), "dpi": 120}
+# Above this many applications the figure uses one Scattergl trace per recommendation
+WEBGL_THRESHOLD = int(os.getenv("MATRIX_WEBGL_THRESHOLD", "150"))
+FIGURE_STYLE = {"height": 800, "webgl_threshold": WEBGL_THRESHOLD}
+
+MAX_CACHED_FIGURES = 8
+_figure_lock = threading.Lock()
+_figures: "OrderedDict[str, str]" = OrderedDict()  # chart key -> figure JSON
+
+
+def chart_key(kind: str, apps: List[Dict], style: Dict) -> str:
+    """Hash of the drawn points, the style and the rendering code"""
+    material = {
+        "kind": kind,
+        "points": [[app['name'], app['thi'], app['bvi'], app['recommendation'],
+                    app.get('calculated_recommendation'), bool(app.get('is_overridden', False))]
+                   for app in apps],
+        "style": style,
+        "sources": export_cache.file_digests(SOURCES),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:32]
+
+
+# ==================== EXCEL DASHBOARD (MATPLOTLIB) ====================
+def render_matrix_png(apps_data: List[Dict]) -> bytes:
+    """Render the scatter chart with matplotlib: app name labels on dots (no collisions) with
+    leader lines, dashed threshold lines at 60/60, quadrant labels, color-coded markers"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+
+    fig, ax = plt.subplots(figsize=PNG_STYLE["figsize"])
+    fig.patch.set_facecolor('white')
+    ax.set_facecolor('white')
+    ax.set_xlim(-3, 103)
+    ax.set_ylim(-3, 103)
+    ax.set_xticks(range(0, 101, 20))
+    ax.set_yticks(range(0, 101, 20))
+    ax.grid(True, color='#D3D3D3', linewidth=0.5)
+    ax.set_axisbelow(True)
+
+    # Dashed threshold lines at 60,60
+    ax.axhline(y=60, color='#808080', linestyle='--', linewidth=1.5, alpha=0.7, zorder=2)
+    ax.axvline(x=60, color='#808080', linestyle='--', linewidth=1.5, alpha=0.7, zorder=2)
+
+    # Quadrant labels (large, faded, positioned in quadrant centers)
+    ax.text(80, 88, 'EVOLVE', fontsize=22, fontweight='bold', ha='center', va='center',
+            color='#10B981', alpha=0.25, zorder=1)
+    ax.text(30, 88, 'INVEST', fontsize=22, fontweight='bold', ha='center', va='center',
+            color='#F59E0B', alpha=0.25, zorder=1)
+    ax.text(80, 12, 'MAINTAIN', fontsize=22, fontweight='bold', ha='center', va='center',
+            color='#3B82F6', alpha=0.25, zorder=1)
+    ax.text(30, 12, 'ELIMINATE', fontsize=22, fontweight='bold', ha='center', va='center',
+            color='#EF4444', alpha=0.25, zorder=1)
+
+    # Axis labels and title
+    ax.set_xlabel('Technical Health Index (THI)', fontsize=14, labelpad=10)
+    ax.set_ylabel('Business Value Index (BVI)', fontsize=14, labelpad=10)
+    ax.set_title('Application Portfolio – Strategic Positioning',
+                 fontsize=16, fontweight='bold', pad=15)
+
+    # Plot scatter points - use star marker for overridden apps
+    has_overridden = any(app.get('is_overridden', False) for app in apps_data)
+    for app in apps_data:
+        color = MARKER_COLORS.get(app['recommendation'], '#999999')
+        is_overridden = app.get('is_overridden', False)
+        if is_overridden:
+            # Star marker with thick black edge for overridden apps
+            ax.scatter(app['thi'], app['bvi'], c=color, s=150, zorder=6,
+                       marker='*', edgecolors='#000000', linewidth=1.5)
+        else:
+            # Regular circle marker
+            ax.scatter(app['thi'], app['bvi'], c=color, s=90, zorder=5,
+                       edgecolors='white', linewidth=0.5)
+
+    # Compute optimal label positions (greedy, no-collision)
+    positions = place_labels([(app['thi'], app['bvi']) for app in apps_data], [app['name'] for app in apps_data])
+
+    # Draw labels with thin leader lines - show override details for overridden apps
+    for i, app in enumerate(apps_data):
+        dx, dy, ha, va = positions[i]
+        is_overridden = app.get('is_overridden', False)
+        if is_overridden:
+            calc_rec = app.get('calculated_recommendation', '')
+            new_rec = app.get('recommendation', '')
+            # Show: "AppName (CALC→NEW)"
+            label_text = f"{app['name']} ({calc_rec}→{new_rec})"
+            label_color = '#B45309'  # Orange-brown for overridden
+        else:
+            label_text = app['name']
+            label_color = '#333333'
+        ax.annotate(
+            label_text,
+            xy=(app['thi'], app['bvi']),
+            xytext=(app['thi'] + dx, app['bvi'] + dy),
+            fontsize=7,
+            fontweight='bold' if is_overridden else 'normal',
+            color=label_color,
+            ha=ha, va=va,
+            arrowprops=dict(arrowstyle='-', color='#BBBBBB', linewidth=0.5,
+                            shrinkA=0, shrinkB=2),
+            zorder=10,
+        )
+
+    # Color legend
+    legend_elements = [
+        mpatches.Patch(facecolor=MARKER_COLORS[rec], edgecolor='#CCCCCC', label=rec)
+        for rec in RECOMMENDATIONS
+    ]
+    # Add override indicator to legend if any app is overridden
+    if has_overridden:
+        from matplotlib.lines import Line2D
+        legend_elements.append(Line2D([0], [0], marker='*', color='w', label='⚠️ Override',
+                                       markerfacecolor='gray', markersize=12,
+                                       markeredgecolor='black', markeredgewidth=1.5))
+    ax.legend(handles=legend_elements, loc='lower right', fontsize=11,
+              framealpha=0.9, edgecolor='#CCCCCC')
+
+    plt.tight_layout()
+
+    # Render to PNG at high DPI
+    img_buf = BytesIO()
+    fig.savefig(img_buf, format='png', dpi=PNG_STYLE["dpi"], bbox_inches='tight', facecolor='white')
+    plt.close(fig)
+    return img_buf.getvalue()
+
+
+def matrix_png(apps_data: List[Dict]) -> bytes:
+    """PNG of the Dashboard chart, rendered only when no cached image of the same chart exists"""
+    key = chart_key("png", apps_data, PNG_STYLE)
+    data = export_cache.get(key, "png")
+    if data is None:
+        data = render_matrix_png(apps_data)
+        export_cache.put(key, "png", data)
+    return data
+
+
+# ==================== ANALYSES PAGE (PLOTLY) ====================
+def _display_name(app: Dict) -> str:
+    base_name = app['name'] if len(app['name']) <= 18 else app['name'][:15] + '...'
+    # Show transition for overridden: "AppName (INV→EVO)"
+    if app.get('is_overridden', False):
+        calc_rec_short = app['calculated_recommendation'][:3] if app.get('calculated_recommendation') else ''
+        return f"{base_name} ({calc_rec_short}→{app['recommendation'][:3]})"
+    return base_name
+
+
+def _hover_text(app: Dict) -> str:
+    hover_text = f'<b>{app["name"]}</b><br>THI: {app["thi"]:.1f}<br>BVI: {app["bvi"]:.1f}'
+    if app.get('is_overridden', False):
+        hover_text += '<br><br><b>⚠️ MANUAL OVERRIDE</b>'
+        hover_text += f'<br>Calculated: <b>{app.get("calculated_recommendation", "N/A")}</b>'
+        hover_text += f'<br>Overridden to: <b>{app["recommendation"]}</b>'
+    return hover_text + '<extra></extra>'
+
+
+def _point_style(app: Dict) -> Dict:
+    # Star marker for overridden apps, circle for normal
+    if app.get('is_overridden', False):
+        return dict(symbol='star', size=14, line_color='#000000', line_width=2, text_color='#B45309')
+    return dict(symbol='circle', size=10, line_color='white', line_width=1.5, text_color='#444444')
+
+
+def _add_app_traces(fig, apps: List[Dict], text_positions: List[str]):
+    """One Scatter trace per application"""
+    import plotly.graph_objects as go
+
+    for rec in RECOMMENDATIONS:
+        group = [(app, pos) for app, pos in zip(apps, text_positions) if app['recommendation'] == rec]
+        for idx, (app, text_pos) in enumerate(group):
+            is_overridden = app.get('is_overridden', False)
+            style = _point_style(app)
+            fig.add_trace(go.Scatter(
+                x=[app['thi']],
+                y=[app['bvi']],
+                mode='markers+text',
+                name=rec if not is_overridden else f'{rec} (Override)',
+                text=[_display_name(app)],
+                textposition=text_pos,
+                textfont=dict(size=8, color=style['text_color'], family='Arial, sans-serif'),
+                marker=dict(
+                    size=style['size'],
+                    symbol=style['symbol'],
+                    color=MARKER_COLORS[rec],
+                    line=dict(width=style['line_width'], color=style['line_color']),
+                    opacity=0.85
+                ),
+                showlegend=(idx == 0 and not is_overridden),
+                legendgroup=rec,
+                hovertemplate=_hover_text(app),
+                hoverlabel=dict(bgcolor='white', bordercolor=MARKER_COLORS[rec], font=dict(size=12, color='black'))
+            ))
+
+
+def _add_group_traces(fig, apps: List[Dict], text_positions: List[str]):
+    """One WebGL trace per recommendation, with per-point text, symbols and hover"""
+    import plotly.graph_objects as go
+
+    for rec in RECOMMENDATIONS:
+        group = [(app, pos) for app, pos in zip(apps, text_positions) if app['recommendation'] == rec]
+        if not group:
+            continue
+        styles = [_point_style(app) for app, _ in group]
+        fig.add_trace(go.Scattergl(
+            x=[app['thi'] for app, _ in group],
+            y=[app['bvi'] for app, _ in group],
+            mode='markers+text',
+            name=rec,
+            text=[_display_name(app) for app, _ in group],
+            textposition=[pos for _, pos in group],
+            textfont=dict(size=8, color=[style['text_color'] for style in styles], family='Arial, sans-serif'),
+            marker=dict(
+                size=[style['size'] for style in styles],
+                symbol=[style['symbol'] for style in styles],
+                color=MARKER_COLORS[rec],
+                line=dict(width=[style['line_width'] for style in styles],
+                          color=[style['line_color'] for style in styles]),
+                opacity=0.85
+            ),
+            legendgroup=rec,
+            hovertemplate=[_hover_text(app) for app, _ in group],
+            hoverlabel=dict(bgcolor='white', bordercolor=MARKER_COLORS[rec], font=dict(size=12, color='black'))
+        ))
+
+
+def build_matrix_figure(apps: List[Dict]):
+    """Plotly strategic matrix (X=THI, Y=BVI) with quadrant backgrounds, lines and labels"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Add quadrant backgrounds (X=THI, Y=BVI - Standard APM Matrix)
+    fig.add_shape(type="rect", x0=0, y0=0, x1=60, y1=60,
+                  fillcolor="rgba(239, 68, 68, 0.1)", line_width=0)  # ELIMINATE (low THI, low BVI)
+    fig.add_shape(type="rect", x0=60, y0=0, x1=100, y1=60,
+                  fillcolor="rgba(59, 130, 246, 0.1)", line_width=0)  # MAINTAIN (high THI, low BVI)
+    fig.add_shape(type="rect", x0=0, y0=60, x1=60, y1=100,
+                  fillcolor="rgba(245, 158, 11, 0.1)", line_width=0)  # INVEST (low THI, high BVI)
+    fig.add_shape(type="rect", x0=60, y0=60, x1=100, y1=100,
+                  fillcolor="rgba(16, 185, 129, 0.1)", line_width=0)  # EVOLVE (high THI, high BVI)
+
+    # Add quadrant lines
+    fig.add_hline(y=60, line_dash="dash", line_color="gray")
+    fig.add_vline(x=60, line_dash="dash", line_color="gray")
+
+    # Best text positions (fewest conflicts with nearby labels), then the points
+    text_positions = assign_text_positions([(app['thi'], app['bvi']) for app in apps])
+    if len(apps) > FIGURE_STYLE["webgl_threshold"]:
+        _add_group_traces(fig, apps, text_positions)
+    else:
+        _add_app_traces(fig, apps, text_positions)
+
+    # Add quadrant labels (X=THI, Y=BVI) - Increased font size
+    fig.add_annotation(x=80, y=80, text="EVOLVE", showarrow=False, font=dict(size=20, color="green", family="Arial Black"))
+    fig.add_annotation(x=30, y=80, text="INVEST", showarrow=False, font=dict(size=20, color="orange", family="Arial Black"))
+    fig.add_annotation(x=80, y=30, text="MAINTAIN", showarrow=False, font=dict(size=20, color="blue", family="Arial Black"))
+    fig.add_annotation(x=30, y=30, text="ELIMINATE", showarrow=False, font=dict(size=20, color="red", family="Arial Black"))
+
+    fig.update_layout(
+        xaxis_title="Technical Health Index (THI)",
+        yaxis_title="Business Value Index (BVI)",
+        xaxis=dict(
+            range=[0, 100],  # Appropriate zoom level for actual data range
+            gridcolor='lightgray',
+            title_font=dict(size=16),
+            showgrid=True,
+            zeroline=False
+        ),
+        yaxis=dict(
+            range=[0, 100],  # Appropriate zoom level for actual data range
+            gridcolor='lightgray',
+            title_font=dict(size=16),
+            showgrid=True,
+            zeroline=False
+        ),
+        height=FIGURE_STYLE["height"],  # Standard height for better visualization
+        showlegend=True,
+        legend=dict(font=dict(size=14), x=1.02, y=1),
+        plot_bgcolor='white',
+        hoverlabel=dict(font_size=12),
+        margin=dict(l=80, r=100, t=60, b=80),
+        font=dict(size=12)
+    )
+    return fig
+
+
+def matrix_figure(apps: List[Dict]):
+    """The strategic matrix figure, rebuilt only when the chart changed (kept as JSON, LRU)"""
+    import plotly.io as pio
+
+    key = chart_key("figure", apps, FIGURE_STYLE)
+    with _figure_lock:
+        cached = _figures.get(key)
+        if cached is not None:
+            _figures.move_to_end(key)
+    if cached is None:
+        cached = build_matrix_figure(apps).to_json()
+        with _figure_lock:
+            _figures[key] = cached
+            while len(_figures) > MAX_CACHED_FIGURES:
+                _figures.popitem(last=False)
+    return pio.from_json(cached)
@@ -11,15 +11,19 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import sessionmaker
 from database import (
-    Base, Application, QuestionnaireAnswer, MeetingTranscript,
+    Base, Application, SynergyBlockDef, Question, QuestionnaireAnswer, TranscriptBlob, MeetingTranscript,
     TranscriptAnswer, DavidNote, SynergyScore, Insight,
-    AppInsight, PortfolioInsight, CustomWeight, QAHistory
+    AppInsight, PortfolioInsight, CustomWeight, QAHistory,
+    _migrate_schema, _migrate_transcript_bodies, _sync_question_registry, _migrate_question_ids
 )
 
 # All models in dependency order (parents before children)
 MODELS = [
     Application,
+    SynergyBlockDef,
+    Question,
     QuestionnaireAnswer,
+    TranscriptBlob,
     MeetingTranscript,
     TranscriptAnswer,
     DavidNote,
@@ -49,6 +53,12 @@ def migrate():
         sys.exit(1)
 
     sqlite_engine = create_engine(f"sqlite:///{sqlite_path}", echo=False)
+    # Bring the source schema up to date first (as the app does on start)
+    Base.metadata.create_all(sqlite_engine)
+    _migrate_schema(sqlite_engine)
+    _migrate_transcript_bodies(sqlite_engine)
+    _sync_question_registry(sqlite_engine)
+    _migrate_question_ids(sqlite_engine)
     SqliteSession = sessionmaker(bind=sqlite_engine)
     sqlite_session = SqliteSession()
 
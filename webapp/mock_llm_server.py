@@ -0,0 +1,336 @@
+"""
+Local mock LLM server
+Speaks the OpenAI chat-completions protocol and returns deterministic, schema-valid JSON
+for each prompt type used by ai_processor.py and insight_generator.py.
+
+Usage:
+    python mock_llm_server.py --port 8765 --latency-ms 300 --error-rate 0.02 --rate-limit-rate 0.05
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+
+Endpoints:
+    POST /v1/chat/completions   chat completion (supports response_format json_object)
+    GET  /stats                 request / token / error counters as JSON
+    POST /stats/reset           reset the counters
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from framework import BLOCK_NAMES
+
+BLOCKS = list(BLOCK_NAMES)
+
+RECOMMENDATIONS = ["EVOLVE", "INVEST", "MAINTAIN", "ELIMINATE"]
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken if available, else ~4 chars/token"""
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("o200k_base").encode(text))
+    except Exception:
+        return len(text) // 4 + 1
+
+
+# ==================== RESPONSE BUILDERS ====================
+def _block_scores(rng: random.Random) -> dict:
+    return {
+        block: {
+            "score": rng.randint(1, 5),
+            "confidence": round(rng.uniform(0.5, 0.95), 2),
+            "rationale": f"Mock rationale for {block} based on the available answers."
+        }
+        for block in BLOCKS
+    }
+
+
+def _extract_questions(prompt: str) -> list:
+    match = re.search(r"QUESTIONS TO ANSWER:\s*(\[.*?\])\s*\n\s*For each question", prompt, re.S)
+    if not match:
+        return []
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return []
+
+
+def build_extract_answers(prompt: str, rng: random.Random) -> dict:
+    answers = []
+    for question in _extract_questions(prompt):
+        found = rng.random() < 0.6
+        answers.append({
+            "question": question,
+            "answer": f"Mock answer to: {question}" if found else None,
+            "confidence": round(rng.uniform(0.55, 0.95), 2) if found else 0.0,
+            "source_excerpt": "Mock transcript excerpt." if found else None
+        })
+    return {"answers": answers, "summary": "Mock summary of the meeting transcript."}
+
+
+def build_batch_scores(prompt: str, rng: random.Random) -> dict:
+    app_ids = re.findall(r"### APPLICATION app_id=(\S+)", prompt)
+    return {"results": [{"app_id": app_id, "scores": _block_scores(rng)} for app_id in app_ids]}
+
+
+def build_scores(prompt: str, rng: random.Random) -> dict:
+    return {"scores": _block_scores(rng)}
+
+
+def build_portfolio_insights_list(prompt: str, rng: random.Random) -> dict:
+    kinds = ["integration", "absorption", "technology_update", "risk", "financial", "quick_win"]
+    return {
+        "insights": [
+            {
+                "type": rng.choice(kinds),
+                "title": f"Mock insight {i + 1}",
+                "description": "Mock insight description.",
+                "priority": rng.choice(["P1", "P2", "P3"]),
+                "affected_apps": [],
+                "recommendation": rng.choice(RECOMMENDATIONS)
+            }
+            for i in range(rng.randint(5, 8))
+        ]
+    }
+
+
+def build_app_insight(prompt: str, rng: random.Random) -> dict:
+    return {
+        "capabilities": {"strengths": ["Mock strength"], "limitations": ["Mock limitation"], "unique_value": "Mock unique value"},
+        "user_satisfaction": {"sentiment": rng.choice(["positive", "mixed", "negative"]), "pain_points": ["Mock pain"],
+                              "satisfaction_signals": ["Mock signal"], "key_quotes": ["Mock quote"]},
+        "technical_debt": {"severity": rng.choice(["high", "medium", "low"]), "issues": ["Mock issue"], "modernization_needs": ["Mock need"]},
+        "integration_opportunities": {"can_consolidate_with": [], "should_integrate_into": None, "dependencies": []},
+        "market_alternatives": {"alternatives": [], "migration_path": "Mock migration path", "market_position": "competitive"},
+        "strategic_recommendation": {
+            "action": rng.choice(["INTEGRATE", "MIGRATE", "RETIRE", "CONSOLIDATE", "ENHANCE", "MAINTAIN"]),
+            "target": "Mock target", "priority": rng.choice(["P1", "P2", "P3"]), "rationale": "Mock rationale",
+            "estimated_impact": "medium", "complexity": "medium"
+        },
+        "action_items": [{"action": "Mock action", "owner": "Mock owner", "timeline": "Q1"}],
+        "confidence": rng.choice(["high", "medium", "low"]),
+        "confidence_rationale": "Mock confidence rationale",
+        "evidence": ["Mock evidence"]
+    }
+
+
+def build_portfolio_analysis(prompt: str, rng: random.Random) -> dict:
+    return {
+        "consolidation_opportunities": [{"apps": [], "rationale": "Mock", "target_state": "Mock", "priority": "P2",
+                                         "estimated_impact": "medium", "complexity": "medium"}],
+        "integration_points": [{"apps": [], "integration_type": "API", "business_value": "Mock", "priority": "P2"}],
+        "redundancies": [{"capability": "Mock", "apps": [], "cost_impact": "unknown", "recommendation": "Mock"}],
+        "gaps": [{"capability": "Mock", "impact": "Mock", "recommendation": "buy"}],
+        "quick_wins": [{"opportunity": "Mock", "apps": [], "impact": "high", "effort": "low", "roi": "Mock"}],
+        "strategic_roadmap": {"p1_critical": ["Mock"], "p2_strategic": ["Mock"], "p3_routine": ["Mock"]},
+        "risk_areas": [{"risk": "Mock", "apps": [], "severity": "medium", "mitigation": "Mock"}]
+    }
+
+
+def build_answer_text(prompt: str, rng: random.Random) -> str:
+    return ("This is a deterministic mock answer produced by the local mock LLM server.\n\n"
+            "Sources:\n- Mock Application - Questionnaire")
+
+
+# (marker in user prompt, builder) - first match wins
+PROMPT_TYPES = [
+    ("QUESTIONS TO ANSWER:", "extract_answers", build_extract_answers),
+    ("APPLICATIONS AND THEIR AVAILABLE ANSWERS:", "suggest_scores_batch", build_batch_scores),
+    ("suggest scores (1-5) for each of the 8 synergy blocks", "suggest_scores", build_scores),
+    ("INDIVIDUAL APP INSIGHTS:", "portfolio_insights", build_portfolio_analysis),
+    ("Generate 5-8 actionable insights", "generate_insights", build_portfolio_insights_list),
+    ("SYNERGY BLOCK SCORES:", "app_insight", build_app_insight),
+]
+
+
+def build_completion(prompt: str, json_mode: bool, seed: int):
+    """Return (prompt_type, content) for a user prompt"""
+    digest = hashlib.sha256(f"{seed}:{prompt}".encode("utf-8")).hexdigest()
+    rng = random.Random(int(digest[:16], 16))
+    for marker, prompt_type, builder in PROMPT_TYPES:
+        if marker in prompt:
+            return prompt_type, json.dumps(builder(prompt, rng))
+    if json_mode:
+        return "unknown_json", json.dumps({"result": "mock"})
+    return "text", build_answer_text(prompt, rng)
+
+
+# ==================== HTTP SERVER ====================
+class MockStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.completions = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.by_type = {}
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "completions": self.completions,
+                "errors": self.errors,
+                "rate_limited": self.rate_limited,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "by_type": dict(self.by_type)
+            }
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.config.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.stats.as_dict())
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        config, stats = self.server.config, self.server.stats
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+
+        if self.path.rstrip("/") == "/stats/reset":
+            with stats.lock:
+                stats.reset()
+            self._send_json(200, {"ok": True})
+            return
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        try:
+            request = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        with stats.lock:
+            stats.requests += 1
+            roll = self.server.rng.random()
+
+        if roll < config.rate_limit_rate:
+            with stats.lock:
+                stats.rate_limited += 1
+            self._send_json(429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error",
+                                            "code": "rate_limit_exceeded"}}, {"Retry-After": "1"})
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            with stats.lock:
+                stats.errors += 1
+            self._send_json(500, {"error": {"message": "Internal server error (mock)", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        user_prompt = "\n".join(m.get("content") or "" for m in messages if m.get("role") == "user")
+        all_text = "\n".join(m.get("content") or "" for m in messages)
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+
+        prompt_type, content = build_completion(user_prompt, json_mode, config.seed)
+        prompt_tokens = count_tokens(all_text)
+        completion_tokens = count_tokens(content)
+
+        latency = config.latency_ms + (self.server.rng.uniform(0, config.jitter_ms) if config.jitter_ms else 0)
+        if latency:
+            time.sleep(latency / 1000.0)
+
+        with stats.lock:
+            stats.completions += 1
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.by_type[prompt_type] = stats.by_type.get(prompt_type, 0) + 1
+
+        self._send_json(200, {
+            "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8765, latency_ms: float = 0, jitter_ms: float = 0,
+                  error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: int = 0,
+                  verbose: bool = False) -> ThreadingHTTPServer:
+    """Create (but do not start) a mock server; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.config = argparse.Namespace(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate,
+                                       rate_limit_rate=rate_limit_rate, seed=seed, verbose=verbose)
+    server.stats = MockStats()
+    server.rng = random.Random(seed)
+    return server
+
+
+def start_in_thread(**kwargs):
+    """Start a mock server in a daemon thread. Returns (server, base_url)"""
+    server = create_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock OpenAI chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixed latency added to each completion")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency (0..jitter)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for deterministic responses")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                           args.rate_limit_rate, args.seed, args.verbose)
+    print(f"🧪 Mock LLM server listening on http://{args.host}:{server.server_address[1]}/v1")
+    print(f"   Set LLM_BASE_URL=http://{args.host}:{server.server_address[1]}/v1 to use it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Processing pipeline (no Streamlit dependency)
+Domain operations behind uploads, scoring and exports, usable from the app, the CLI tools
+and the background worker. Each public step is also registered as a background job type.
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from database import (
+    get_session, close_session,
+    Application, QuestionnaireAnswer, MeetingTranscript, TranscriptAnswer, SynergyScore
+)
+from ai_processor import extract_answers_from_transcript, suggest_scores_batch
+import export_cache
+import jobs
+from jobs import job_handler
+
+ProgressCallback = Optional[Callable[[float, str], None]]
+
+# Regenerate the default exports in the background after data-changing jobs
+EXPORT_PREGENERATE = os.getenv("EXPORT_PREGENERATE", "1") != "0"
+EXPORT_JOB_TYPES = {"xlsx": "export_excel", "pptx": "export_pptx"}
+
+
+def _noop_progress(fraction: float, message: str = None):
+    pass
+
+
+# ==================== SCORES ====================
+def save_suggested_scores(session, app_id: str, scores: dict, suggested_by: str):
+    """Replace the auto-generated synergy scores of an application by AI-suggested ones"""
+    # Delete old auto-generated scores
+    session.query(SynergyScore).filter_by(
+        application_id=app_id,
+        approved_by='auto_ai_generated'
+    ).delete()
+
+    # Insert new scores
+    for block_name, score_data in scores.items():
+        score = SynergyScore(
+            id=str(uuid.uuid4()),
+            application_id=app_id,
+            block_name=block_name,
+            score=score_data['score'],
+            suggested_by=suggested_by,
+            confidence=score_data.get('confidence', 0.8),
+            rationale=score_data.get('rationale', ''),
+            approved=True,
+            approved_by='auto_ai_generated',
+            approved_at=datetime.now(timezone.utc)
+        )
+        session.add(score)
+
+
+def collect_questionnaire_scoring_inputs(session, app_ids: List[str]) -> List[Dict]:
+    """
+    Scoring inputs for apps after a questionnaire upload.
+    Skips apps with manually edited scores and apps with less than 50% complete answers.
+    """
+    apps_to_score = []
+    for app_id in app_ids:
+        # Check if manually edited scores exist (don't recalculate those)
+        manual_scores = session.query(SynergyScore).filter(
+            SynergyScore.application_id == app_id,
+            SynergyScore.approved == True,
+            SynergyScore.approved_by != 'auto_ai_generated'
+        ).first()
+        if manual_scores:
+            continue
+
+        qa_answers = session.query(QuestionnaireAnswer).filter_by(application_id=app_id).all()
+
+        # Count complete answers (not empty)
+        complete_answers = [qa for qa in qa_answers if qa.answer_text and len(qa.answer_text.strip()) >= 5]
+        total_answers = len(qa_answers)
+
+        # Only calculate if we have at least 50% complete answers
+        if total_answers > 0 and (len(complete_answers) / total_answers) >= 0.5:
+            questionnaire_dict = {qa.question_text: {'a': qa.answer_text, 's': qa.score} for qa in complete_answers}
+            if questionnaire_dict:
+                apps_to_score.append({
+                    'app_id': app_id,
+                    'questionnaire_answers': questionnaire_dict,
+                    'transcript_answers': []
+                })
+    return apps_to_score
+
+
+def collect_combined_scoring_inputs(session, app_ids: List[str]) -> List[Dict]:
+    """Scoring inputs combining questionnaire and transcript answers (after transcript processing)"""
+    apps_to_score = []
+    for app_id in app_ids:
+        questionnaire_dict = {}
+        for qa in session.query(QuestionnaireAnswer).filter_by(application_id=app_id).all():
+            questionnaire_dict[qa.question_text] = {'a': qa.answer_text, 's': qa.score}
+
+        transcript_list = [
+            {'question': ta.question_text, 'answer': ta.answer_text, 'confidence': ta.confidence_score}
+            for ta in session.query(TranscriptAnswer).filter_by(application_id=app_id).all()
+        ]
+
+        if questionnaire_dict or transcript_list:
+            apps_to_score.append({
+                'app_id': app_id,
+                'questionnaire_answers': questionnaire_dict,
+                'transcript_answers': transcript_list
+            })
+    return apps_to_score
+
+
+def score_applications(app_ids: List[str], mode: str = 'combined', progress: ProgressCallback = None) -> Dict:
+    """
+    Suggest and save AI scores for applications (batched LLM calls).
+
+    Args:
+        app_ids: Applications to score
+        mode: 'questionnaire' (post-upload rules, suggested_by='ai_questionnaire')
+              or 'combined' (questionnaire + transcripts, suggested_by='ai_combined')
+        progress: Optional progress(fraction, message) callback
+
+    Returns:
+        Dict with "scored" and "skipped" counts
+    """
+    progress = progress or _noop_progress
+    session = get_session()
+    try:
+        if mode == 'questionnaire':
+            apps_to_score = collect_questionnaire_scoring_inputs(session, app_ids)
+            suggested_by = 'ai_questionnaire'
+        else:
+            apps_to_score = collect_combined_scoring_inputs(session, app_ids)
+            suggested_by = 'ai_combined'
+
+        scored = 0
+        if apps_to_score:
+            progress(0.0, f"Scoring {len(apps_to_score)} applications with AI...")
+            batch_results = suggest_scores_batch(
+                apps_to_score,
+                progress_callback=lambda done, total: progress(done / total, f"Scored {done}/{total} applications")
+            )
+            for item in apps_to_score:
+                result = batch_results.get(item['app_id'], {})
+                if result.get('scores'):
+                    save_suggested_scores(session, item['app_id'], result['scores'], suggested_by)
+                    scored += 1
+            session.commit()
+
+        return {"scored": scored, "skipped": len(app_ids) - scored}
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        close_session(session)
+
+
+# ==================== TRANSCRIPTS ====================
+def extract_transcript_answers(session, transcript: MeetingTranscript, app: Application) -> int:
+    """Run AI extraction on a stored transcript, save new answers and mark it processed.
+    Returns the number of new answers."""
+    result = extract_answers_from_transcript(transcript.transcript_text, app.name, app_id=app.id)
+    if result.get('error'):
+        raise RuntimeError(f"AI extraction failed: {result['error']}")
+
+    answer_count = 0
+    existing_questions = {
+        q for (q,) in session.query(TranscriptAnswer.question_text).filter_by(transcript_id=transcript.id).all()
+    }
+    # Save extracted answers (avoid duplicates)
+    for answer_data in result.get('answers', []):
+        if answer_data.get('answer') and answer_data.get('confidence', 0) > 0.3:
+            if answer_data['question'] in existing_questions:
+                continue
+            session.add(TranscriptAnswer(
+                id=str(uuid.uuid4()),
+                application_id=app.id,
+                transcript_id=transcript.id,
+                question_text=answer_data['question'],
+                answer_text=answer_data['answer'],
+                confidence_score=answer_data['confidence'],
+                synergy_block=answer_data.get('synergy_block', 'Unknown')
+            ))
+            existing_questions.add(answer_data['question'])
+            answer_count += 1
+
+    transcript.processed = True
+    session.commit()
+    return answer_count
+
+
+def process_transcripts(transcript_ids: List[str], recalculate_scores: bool = True,
+                        progress: ProgressCallback = None) -> Dict:
+    """
+    Extract answers from stored transcripts with AI, then recalculate the scores of the
+    affected applications. Already processed transcripts are skipped.
+
+    Returns:
+        Dict with per-file results and counts
+    """
+    progress = progress or _noop_progress
+    extraction_share = 0.8 if recalculate_scores else 1.0
+    files, affected_app_ids = [], []
+    processed = skipped = errors = 0
+
+    session = get_session()
+    try:
+        for idx, transcript_id in enumerate(transcript_ids):
+            transcript = session.get(MeetingTranscript, transcript_id)
+            if transcript is None:
+                continue
+            app = transcript.application
+            progress(idx / max(len(transcript_ids), 1) * extraction_share,
+                     f"AI analyzing {idx + 1}/{len(transcript_ids)}: {transcript.file_name}")
+
+            if transcript.processed:
+                skipped += 1
+                files.append({"file": transcript.file_name, "app": app.name, "status": "skipped"})
+                continue
+            try:
+                answer_count = extract_transcript_answers(session, transcript, app)
+                processed += 1
+                files.append({"file": transcript.file_name, "app": app.name, "status": "processed",
+                              "answers": answer_count})
+                if app.id not in affected_app_ids:
+                    affected_app_ids.append(app.id)
+            except Exception as e:
+                session.rollback()
+                errors += 1
+                files.append({"file": transcript.file_name, "app": app.name, "status": "error", "error": str(e)})
+    finally:
+        close_session(session)
+
+    if errors and not processed and not skipped:
+        raise RuntimeError(f"All {errors} transcript(s) failed: {files[0].get('error')}")
+
+    result = {"processed": processed, "skipped": skipped, "errors": errors, "files": files}
+
+    if recalculate_scores and affected_app_ids:
+        score_result = score_applications(
+            affected_app_ids, mode='combined',
+            progress=lambda fraction, message=None: progress(extraction_share + fraction * (1 - extraction_share), message)
+        )
+        result["scores_recalculated"] = score_result["scored"]
+
+    return result
+
+
+# ==================== EXPORTS ====================
+def export_portfolio_excel(custom_weights: Dict = None, with_cache_status: bool = False, cache_key: str = None):
+    """Portfolio workbook bytes (served from the export cache when nothing changed)"""
+    from excel_generator import generate_portfolio_excel
+    data, cached = export_cache.cached_export(
+        "xlsx", lambda: generate_portfolio_excel(custom_weights=custom_weights), custom_weights, key=cache_key
+    )
+    return (data, cached) if with_cache_status else data
+
+
+def export_portfolio_pptx(with_cache_status: bool = False, cache_key: str = None):
+    """Portfolio presentation bytes (served from the export cache when nothing changed)"""
+    from ppt_generator import generate_portfolio_pptx
+    data, cached = export_cache.cached_export("pptx", generate_portfolio_pptx, key=cache_key)
+    return (data, cached) if with_cache_status else data
+
+
+def enqueue_export(kind: str, custom_weights: Dict = None) -> str:
+    """Queue an export job ('xlsx' or 'pptx'); the same data, weights, template and generator
+    reuse the queued / running job, or the cached file once it has finished"""
+    job_type = EXPORT_JOB_TYPES[kind]
+    payload = {"custom_weights": custom_weights} if kind == "xlsx" else {}
+    return jobs.enqueue(job_type, payload,
+                        idempotency_key=f"{job_type}:{export_cache.export_key(kind, custom_weights)}")
+
+
+def schedule_export_pregeneration() -> List[str]:
+    """Queue the default-weight exports of the current data, so the next download is instant"""
+    if not EXPORT_PREGENERATE:
+        return []
+    try:
+        return [enqueue_export(kind) for kind in EXPORT_JOB_TYPES]
+    except Exception as e:
+        print(f"[PIPELINE] ⚠️  Could not schedule export pre-generation: {e}")
+        return []
+
+
+# ==================== JOB HANDLERS ====================
+@job_handler("score_applications")
+def _score_applications_job(payload: Dict, progress) -> Dict:
+    result = score_applications(payload.get("app_ids", []), mode=payload.get("mode", "combined"), progress=progress)
+    schedule_export_pregeneration()
+    return result
+
+
+@job_handler("process_transcripts")
+def _process_transcripts_job(payload: Dict, progress) -> Dict:
+    result = process_transcripts(payload.get("transcript_ids", []),
+                                 recalculate_scores=payload.get("recalculate_scores", True), progress=progress)
+    schedule_export_pregeneration()
+    return result
+
+
+@job_handler("export_excel")
+def _export_excel_job(payload: Dict, progress) -> Dict:
+    progress(0.1, "Generating Excel with all sheets...")
+    custom_weights = payload.get("custom_weights")
+    key = export_cache.export_key("xlsx", custom_weights)
+    xlsx_bytes, cached = export_portfolio_excel(custom_weights=custom_weights, with_cache_status=True, cache_key=key)
+    if not xlsx_bytes:
+        return {"empty": True}
+    return {
+        "artifact_file": export_cache.store_artifact(key, "xlsx", xlsx_bytes),
+        "artifact_name": f"Avangrid_Application_Portfolio_Management_{datetime.now().strftime('%Y%m%d')}.xlsx",
+        "size_bytes": len(xlsx_bytes),
+        "cached": cached
+    }
+
+
+@job_handler("export_pptx")
+def _export_pptx_job(payload: Dict, progress) -> Dict:
+    progress(0.1, "Generating PowerPoint with all application cards...")
+    key = export_cache.export_key("pptx")
+    pptx_bytes, cached = export_portfolio_pptx(with_cache_status=True, cache_key=key)
+    if not pptx_bytes:
+        return {"empty": True}
+    return {
+        "artifact_file": export_cache.store_artifact(key, "pptx", pptx_bytes),
+        "artifact_name": f"Avangrid_Portfolio_{datetime.now().strftime('%Y%m%d')}.pptx",
+        "size_bytes": len(pptx_bytes),
+        "cached": cached
+    }
@@ -7,17 +7,39 @@ from questionnaires, transcripts, and David's notes.
 import os
 import re
 import io
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from types import MappingProxyType
+from typing import Dict, Tuple
+from lxml import etree
 from pptx import Presentation
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import Part
+from pptx.opc.packuri import PackURI
+from pptx.oxml.ns import qn
+from pptx.oxml.slide import CT_Slide
+from pptx.parts.slide import SlidePart
+from pptx.text.text import TextFrame
 from pptx.util import Pt
 from database import (
     get_session, close_session,
-    Application, QuestionnaireAnswer, TranscriptAnswer, DavidNote, SynergyScore
+    Application, SynergyScore
 )
+from answer_matrix import get_answer_matrix, SOURCES
+from framework import ALL_QUESTIONS, normalize_question
 
 
 TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "template.pptx")
 
+# Processes rendering the slides (1 = in this process)
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "1"))
+
 
 # ============================================================
 # Text transformation helpers (from generator_production.py)
@@ -89,11 +111,15 @@ def extract_custom_or_market(answer):
     return answer[:50]
 
 
+_ACTIVE_USERS = re.compile(r'(\d+)\s*active')
+_NUMBER = re.compile(r'(\d[\d,]*)')
+
+
 def extract_active_users(answer):
-    match = re.search(r'(\d+)\s*active', answer.lower())
+    match = _ACTIVE_USERS.search(answer.lower())
     if match:
         return match.group(1) + " active users"
-    match2 = re.search(r'(\d[\d,]*)', answer)
+    match2 = _NUMBER.search(answer)
     if match2:
         return match2.group(1) + " users"
     return answer[:50]
@@ -111,160 +137,241 @@ def extract_owned_by(answer):
 # ============================================================
 # Question-to-field keyword mapping
 # ============================================================
+# The field of an answer depends only on its question: the keyword rules run once per canonical
+# question (master questions at import, any other wording on first use) and give the field and the
+# extractor that turns the answer into the slide value.
+
+def _keep(answer):
+    return answer
+
+
+def extract_security(answer):
+    if answer and answer.lower() not in ('no', 'none'):
+        return "Yes"
+    return "No"
+
+
+def extract_enhancements(answer):
+    al = answer.lower()
+    if 'itnow' in al or 'email' in al:
+        return "ITNow/email"
+    elif 'vendor' in al or 'it' in al:
+        return "IT, vendor, other"
+    return answer[:50]
 
-def map_question_to_field(question_text, answer_text):
-    """Map a question/answer pair to a PPT field using keyword matching.
-    Returns (field_name, transformed_value) or (None, None) if no match."""
-    q = question_text.lower()
-    a = clean_text(answer_text)
-    if not q or not a:
-        return None, None
+
+def _match_field(q):
+    """(field, extractor) for a canonical question, or None"""
+    if not q:
+        return None
 
     if "name of the application" in q:
-        return "NOME_DO_APP", a
+        return "NOME_DO_APP", _keep
     elif "utility domain" in q and "which" in q:
-        return "UTILITY_DOMAIN", a
+        return "UTILITY_DOMAIN", _keep
     elif "opco" in q and "which" in q:
-        return "OPCOS", a
+        return "OPCOS", _keep
     elif "business unit" in q or ("business area" in q and "which" in q):
-        return "BUSINESS_AREA", a
+        return "BUSINESS_AREA", _keep
     elif "owned" in q and ("it-owned" in q or "business-owned" in q):
-        return "OWNED_BY", extract_owned_by(a)
+        return "OWNED_BY", extract_owned_by
     elif "business-critical" in q or ("critical" in q and "application" in q):
-        return "BUSINESS_CRITICALITY", extract_criticality(a)
+        return "BUSINESS_CRITICALITY", extract_criticality
     elif "usage" in q and ("growing" in q or "stable" in q or "declining" in q):
-        return "USAGE", extract_usage_trend(a)
+        return "USAGE", extract_usage_trend
     elif "primary" in q and "purpose" in q:
-        return "BUSINESS_PURPOSE", a
+        return "BUSINESS_PURPOSE", _keep
     elif "core functionalities" in q or ("functionalities" in q and "provide" in q):
-        return "APPLICATION_FUNCTIONALITY", a
+        return "APPLICATION_FUNCTIONALITY", _keep
     elif "key business processes" in q and "support" in q:
-        return "BUSINESS_PROCESS_COVERAGE", a
+        return "BUSINESS_PROCESS_COVERAGE", _keep
     elif "user roles" in q or "personas" in q:
-        return "USER_PERSONAS", a
+        return "USER_PERSONAS", _keep
     elif "active users" in q and "how many" in q:
-        return "NO_USERS", extract_active_users(a)
+        return "NO_USERS", extract_active_users
     elif "user satisfaction" in q or ("level of" in q and "satisfaction" in q):
-        return "SATISFACTION", determine_satisfaction_emoji(a)
+        return "SATISFACTION", determine_satisfaction_emoji
     elif "regulatory" in q and "compliance" in q and "support" in q:
-        return "REGULATORY", extract_yes_no(a)
+        return "REGULATORY", extract_yes_no
     elif "custom or market" in q or ("type of" in q and "application" in q):
-        return "APP_CATEGORY", extract_custom_or_market(a)
+        return "APP_CATEGORY", extract_custom_or_market
     elif ("which systems" in q or "what systems" in q) and "integrate" in q:
-        return "INTEGRATIONS", a
+        return "INTEGRATIONS", _keep
     elif "programming" in q:
-        return "PROGRAMMING_LANGUAGE", a
+        return "PROGRAMMING_LANGUAGE", _keep
     elif "deployed" in q or ("cloud" in q and "on" in q):
-        return "DEPLOYMENT", extract_deployment(a)
+        return "DEPLOYMENT", extract_deployment
     elif "platforms" in q or ("device" in q and "run" in q):
-        return "COMPATIBILITY", a
+        return "COMPATIBILITY", _keep
     elif "monitored" in q or "apm" in q:
-        return "MONITORED", extract_yes_no(a)
+        return "MONITORED", extract_yes_no
     elif "security" in q and ("risks" in q or "audit" in q or "gaps" in q):
-        if a and a.lower() not in ('no', 'none'):
-            return "SECURITY", "Yes"
-        return "SECURITY", "No"
+        return "SECURITY", extract_security
     elif "planned upgrades" in q or "migrations" in q or "replacements" in q:
-        return "PLANNED_UPGRADES", a
+        return "PLANNED_UPGRADES", _keep
     elif "user management" in q or "access control" in q or "provisioning" in q:
-        return "USER_MANAGEMENT", a
+        return "USER_MANAGEMENT", _keep
     elif "bugs" in q or "incidents" in q or "issues" in q:
-        return "BUGS_INCIDENTS", a
+        return "BUGS_INCIDENTS", _keep
     elif "enhancements" in q or "improvements" in q:
-        al = a.lower()
-        if 'itnow' in al or 'email' in al:
-            return "ENHANCEMENTS", "ITNow/email"
-        elif 'vendor' in al or 'it' in al:
-            return "ENHANCEMENTS", "IT, vendor, other"
-        return "ENHANCEMENTS", a[:50]
+        return "ENHANCEMENTS", extract_enhancements
     elif "business owner" in q or "business sponsor" in q:
-        return "BUSINESS_OWNER", a
+        return "BUSINESS_OWNER", _keep
     elif "it owner" in q or "it manager" in q or "it lead" in q:
-        return "IT_OWNER", a
+        return "IT_OWNER", _keep
+
+    return None
+
 
-    return None, None
+# Canonical master question -> (field, extractor) or None
+QUESTION_FIELDS = MappingProxyType({
+    canonical: _match_field(canonical) for canonical in map(normalize_question, ALL_QUESTIONS)
+})
+
+
+@lru_cache(maxsize=4096)
+def question_field(question_text):
+    """(field, extractor) of a question (any wording), or None"""
+    canonical = normalize_question(question_text)
+    if canonical in QUESTION_FIELDS:
+        return QUESTION_FIELDS[canonical]
+    return _match_field(canonical)
+
+
+def map_question_to_field(question_text, answer_text):
+    """Map a question/answer pair to a PPT field using keyword matching.
+    Returns (field_name, transformed_value) or (None, None) if no match."""
+    rule = question_field(question_text or "")
+    a = clean_text(answer_text)
+    if rule is None or not a:
+        return None, None
+    field, extract = rule
+    return field, extract(a)
 
 
 # ============================================================
-# Data extraction from database
+# Application profiles (slide field maps)
 # ============================================================
 
+EMPTY_PROFILE = MappingProxyType({
+    "NOME_DO_APP": "",
+    "UTILITY_DOMAIN": "", "OPCOS": "", "BUSINESS_AREA": "",
+    "OWNED_BY": "", "BUSINESS_CRITICALITY": "", "USAGE": "",
+    "BUSINESS_PURPOSE": "", "APPLICATION_FUNCTIONALITY": "",
+    "BUSINESS_PROCESS_COVERAGE": "", "USER_PERSONAS": "",
+    "NO_USERS": "", "BUSINESS_OWNER": "", "IT_OWNER": "",
+    "SATISFACTION": "", "REGULATORY": "", "APP_CATEGORY": "",
+    "INTEGRATIONS": "", "PROGRAMMING_LANGUAGE": "", "DEPLOYMENT": "",
+    "COMPATIBILITY": "", "MONITORED": "", "SECURITY": "",
+    "PLANNED_UPGRADES": "", "USER_MANAGEMENT": "",
+    "BUGS_INCIDENTS": "", "ENHANCEMENTS": ""
+})
+
+_profile_lock = threading.Lock()
+_profile_cache: Dict = {"key": None, "database": None, "entries": {}}  # entries: app_id -> (fingerprint, profile)
+
+
+def build_app_profile(app_name, answers_by_source):
+    """Slide field map of one application from its {source: {question: answer}} layers.
+    Priority: DavidNote > TranscriptAnswer > QuestionnaireAnswer, and within a source the most
+    recent answer; the layers are read from the highest priority down, so each field's extractor
+    only runs on answers until one gives a value."""
+    data = dict(EMPTY_PROFILE, NOME_DO_APP=app_name)
+    settled = {"NOME_DO_APP"}  # Never overwrite NOME_DO_APP - we use the database app name
+
+    for source in reversed(SOURCES):
+        for question, answer in reversed(list(answers_by_source.get(source, {}).items())):
+            rule = question_field(question)
+            if rule is None or rule[0] in settled:
+                continue
+            a = clean_text(answer)
+            if not a:
+                continue
+            field, extract = rule
+            value = extract(a)
+            if value:
+                data[field] = value
+                settled.add(field)
+
+    # Also try to extract owner info from David's notes that may have
+    # different question patterns
+    for question, answer in answers_by_source.get('note', {}).items():
+        q = normalize_question(question)
+        a = clean_text(answer)
+        if not a:
+            continue
+        if "owner" in q and "business" in q and not data["BUSINESS_OWNER"]:
+            data["BUSINESS_OWNER"] = a
+        elif "owner" in q and "it" in q and not data["IT_OWNER"]:
+            data["IT_OWNER"] = a
+
+    return data
+
+
+def _profile_fingerprint(app_name, answers_by_source):
+    material = repr((app_name, [answers_by_source.get(source, {}) for source in SOURCES]))
+    return hashlib.blake2b(material.encode('utf-8'), digest_size=16).digest()
+
+
+def get_app_profiles(session):
+    """{app_id: slide field map} of every application, in application name order (do not modify).
+    Built from the answer matrix in one pass; after a data change only the applications whose
+    answers changed (per-application fingerprint) are mapped again."""
+    matrix = get_answer_matrix(session)
+    database = str(session.get_bind().url)
+    with _profile_lock:
+        if _profile_cache["key"] == (database, matrix.revision):
+            return _profile_cache["profiles"]
+
+        previous = _profile_cache["entries"] if _profile_cache["database"] == database else {}
+        entries = {}
+        for app_id, app_name in matrix.app_names.items():
+            answers = {source: matrix.answers(app_id, source) for source in SOURCES}
+            fingerprint = _profile_fingerprint(app_name, answers)
+            cached = previous.get(app_id)
+            if cached and cached[0] == fingerprint:
+                entries[app_id] = cached
+                continue
+            try:
+                entries[app_id] = (fingerprint, build_app_profile(app_name, answers))
+            except Exception as e:
+                print(f"[PPT_GENERATOR] Error extracting data for {app_name}: {e}")
+                entries[app_id] = (None, {"NOME_DO_APP": app_name})
+
+        _profile_cache.update(key=(database, matrix.revision), database=database, entries=entries,
+                              profiles={app_id: profile for app_id, (_, profile) in entries.items()})
+        return _profile_cache["profiles"]
+
+
 def extract_app_data_from_db(app_id, app_name, session=None):
-    """Extract all data for an application from all database sources.
-    Priority: DavidNote > TranscriptAnswer > QuestionnaireAnswer
-    (later sources overwrite earlier ones, so highest-priority is last)
+    """Extract all data for an application from all database sources (see build_app_profile).
+    Served from the cached profiles of the current data revision (no per-application queries).
 
     If session is provided, uses it instead of creating a new one (avoids SQLite locking).
     """
-    data = {
-        "NOME_DO_APP": app_name,
-        "UTILITY_DOMAIN": "", "OPCOS": "", "BUSINESS_AREA": "",
-        "OWNED_BY": "", "BUSINESS_CRITICALITY": "", "USAGE": "",
-        "BUSINESS_PURPOSE": "", "APPLICATION_FUNCTIONALITY": "",
-        "BUSINESS_PROCESS_COVERAGE": "", "USER_PERSONAS": "",
-        "NO_USERS": "", "BUSINESS_OWNER": "", "IT_OWNER": "",
-        "SATISFACTION": "", "REGULATORY": "", "APP_CATEGORY": "",
-        "INTEGRATIONS": "", "PROGRAMMING_LANGUAGE": "", "DEPLOYMENT": "",
-        "COMPATIBILITY": "", "MONITORED": "", "SECURITY": "",
-        "PLANNED_UPGRADES": "", "USER_MANAGEMENT": "",
-        "BUGS_INCIDENTS": "", "ENHANCEMENTS": ""
-    }
-
     own_session = session is None
     if own_session:
         session = get_session()
     try:
-        # 1. Questionnaire answers (lowest priority - overwritten by others)
-        qa_answers = session.query(QuestionnaireAnswer).filter_by(
-            application_id=app_id
-        ).all()
-        for qa in qa_answers:
-            field, value = map_question_to_field(qa.question_text or "", qa.answer_text or "")
-            if field and value and field != "NOME_DO_APP":
-                # Never overwrite NOME_DO_APP - we use the database app name
-                data[field] = value
-
-        # 2. Transcript answers (medium priority)
-        ta_answers = session.query(TranscriptAnswer).filter_by(
-            application_id=app_id
-        ).all()
-        for ta in ta_answers:
-            field, value = map_question_to_field(ta.question_text or "", ta.answer_text or "")
-            if field and value and field != "NOME_DO_APP":
-                data[field] = value
-
-        # 3. David's notes (highest priority - overwrites everything)
-        david_notes = session.query(DavidNote).filter_by(
-            application_id=app_id
-        ).all()
-        for dn in david_notes:
-            field, value = map_question_to_field(dn.question_text or "", dn.answer_text or "")
-            if field and value and field != "NOME_DO_APP":
-                data[field] = value
-
-        # Also try to extract owner info from David's notes that may have
-        # different question patterns
-        for dn in david_notes:
-            q = (dn.question_text or "").lower()
-            a = clean_text(dn.answer_text)
-            if not a:
-                continue
-            if "owner" in q and "business" in q and not data["BUSINESS_OWNER"]:
-                data["BUSINESS_OWNER"] = a
-            elif "owner" in q and "it" in q and not data["IT_OWNER"]:
-                data["IT_OWNER"] = a
-
+        profile = get_app_profiles(session).get(app_id)
     finally:
         if own_session:
             close_session(session)
 
-    return data
+    if profile is None:
+        # Not in the answer matrix (e.g. created since it was built)
+        return dict(EMPTY_PROFILE, NOME_DO_APP=app_name)
+    return dict(profile, NOME_DO_APP=app_name)
 
 
 # ============================================================
 # Slide filling logic
 # ============================================================
 
+_EMPLOYEE_ID = re.compile(r'\s*-?\s*U\d{5,}')
+_PARENTHETICAL = re.compile(r'\s*\([^)]*\)')
+
+
 def extract_primary_name(text):
     """Extract the first/primary person name from a multi-person string.
     Handles newlines, commas, and parenthetical details."""
@@ -281,14 +388,15 @@ def extract_primary_name(text):
         if parts:
             first_line = parts[0]
     # Remove employee IDs like "U495810"
-    first_line = re.sub(r'\s*-?\s*U\d{5,}', '', first_line).strip()
+    first_line = _EMPLOYEE_ID.sub('', first_line).strip()
     # Remove parenthetical details
-    first_line = re.sub(r'\s*\([^)]*\)', '', first_line).strip()
+    first_line = _PARENTHETICAL.sub('', first_line).strip()
     return first_line
 
 
-def auto_fit_text(text_frame, content, default_size=8, min_size=6, max_chars_per_size=None):
-    """Set text with auto-fitting font size based on content length."""
+def fit_font_size(content, default_size=8, min_size=6, max_chars_per_size=None):
+    """Font size for the content length (content truncated when even min_size overflows).
+    Returns (content, font_size)."""
     if max_chars_per_size is None:
         max_chars_per_size = {8: 150, 7: 200, 6: 280}
 
@@ -300,6 +408,12 @@ def auto_fit_text(text_frame, content, default_size=8, min_size=6, max_chars_per
     else:
         font_size = min_size
         content = content[:max_chars_per_size[min_size] - 3] + "..."
+    return content, font_size
+
+
+def auto_fit_text(text_frame, content, default_size=8, min_size=6, max_chars_per_size=None):
+    """Set text with auto-fitting font size based on content length."""
+    content, font_size = fit_font_size(content, default_size, min_size, max_chars_per_size)
 
     text_frame.clear()
     p = text_frame.paragraphs[0]
@@ -326,159 +440,267 @@ def set_text(text_frame, content, font_size=8, bold=False):
     text_frame.word_wrap = True
 
 
-def fill_slide(slide, data_map):
-    """Fill a single slide with application data (all 3 methods)."""
+# ============================================================
+# Compiled slide template
+# ============================================================
+# The template slide is analyzed once per process (again only when the file changes): its shapes
+# are kept with duplicate IDs already fixed and the emoji pictures removed, and each shape that
+# receives data becomes a FieldSlot (shape position, data field, size profile) whose text body is
+# pre-formatted. A slide is then a deep copy of the compiled shapes plus one text write per slot.
+
+# Emoji pictures of the template (not shown on the generated slides)
+EMOJI_PICTURES = {'Picture 46', 'Picture 43', 'Picture 39'}
+
+# {{FIELD}} placeholders with their own size profile
+# Tiny shapes (0.15" height): font 5pt, max ~20 chars, extract primary name
+TINY_FIELDS = {"BUSINESS_OWNER", "IT_OWNER"}
+# Small one-line shapes (0.33" height): font 6-7pt, max ~50 chars
+SMALL_FIELDS = {"USAGE", "BUSINESS_CRITICALITY", "OWNED_BY", "UTILITY_DOMAIN",
+                "BUSINESS_AREA", "OPCOS"}
+
+# Shapes recognized by their template text
+PLACEHOLDER_TEXTS = {
+    "<specify applications>": "INTEGRATIONS",
+    "cloud or on prem": "DEPLOYMENT",
+    "<per device type and os": "COMPATIBILITY",
+    "custom or market": "APP_CATEGORY",
+    "yes/no": None,  # handled by direct mapping
+    "version, planned migrations": "PLANNED_UPGRADES",
+}
+
+# Shapes recognized by their name (take precedence over the text rules)
+DIRECT_MAPPINGS = {
+    "Rectangle 19": "APPLICATION_FUNCTIONALITY",
+    "Rectangle 32": "BUSINESS_AREA",
+    "Rectangle 36": "USER_PERSONAS",
+    "Rectangle 142": "NO_USERS",
+    "Rectangle 90": "REGULATORY",
+    "Rectangle 64": "SATISFACTION",
+    "Rectangle 189": "SECURITY",
+    "Rectangle 174": "PROGRAMMING_LANGUAGE",
+    "Rectangle 178": "PLANNED_UPGRADES",
+    "Rectangle 182": "MONITORED",
+}
+# Small direct-mapped shapes that need smaller fonts (height < 0.3")
+SMALL_DIRECT = {"Rectangle 142", "Rectangle 189", "Rectangle 174",
+                "Rectangle 178", "Rectangle 182"}
+
+# Top-level shapes copied to every slide. graphicFrame (OLE objects) is excluded: it references
+# tags/oleObject parts that are slide-specific and cause PowerPoint repair errors when shared
+CLONABLE_TAGS = {qn('p:sp'), qn('p:pic'), qn('p:grpSp'), qn('p:cxnSp')}
+
+# cNvPr id of the shape tree of a slide added by python-pptx
+SLIDE_TREE_ID = 1
+
+_TXBODY, _PARAGRAPH, _RUN = qn('p:txBody'), qn('a:p'), qn('a:r')
+
+_compiled_lock = threading.Lock()
+_compiled_cache: Dict = {}  # absolute path -> ((mtime_ns, size), CompiledSlide)
+
+
+@dataclass(frozen=True)
+class FieldSlot:
+    """A template shape that receives one data field"""
+    index: int               # Position of the shape in CompiledSlide.tree
+    field: str
+    profile: str             # 'title', 'owner', 'line', 'fixed' or 'auto' (size from the length)
+    font_size: int = 8
+    bold: bool = False
+    max_chars: int = 280
+    optional: bool = True    # Only filled when the data map has the field
+
+    def content(self, value):
+        """(text, font size) for one application; text None leaves the shape empty"""
+        value = value or ""
+        if self.profile == 'auto':
+            return fit_font_size(value)
+        if self.profile == 'title' and not value:
+            return None, self.font_size
+        if self.profile == 'owner':
+            value = extract_primary_name(value)
+        elif self.profile == 'line':
+            # Clean newlines for single-line shapes
+            value = value.replace('\n', ', ')
+        if len(value) > self.max_chars:
+            value = value[:self.max_chars - 3] + "..."
+        return value, self.font_size
+
+
+def _field_slot(index, shape):
+    """Slot of a template shape (None when the shape receives no data); later rules win"""
+    if not shape.has_text_frame:
+        return None
+    slot = None
+    text = shape.text_frame.text.strip()
+
+    # {{FIELD_NAME}} placeholders
+    if text.startswith('{{') and text.endswith('}}'):
+        placeholder = text[2:-2]
+        if placeholder == "NOME_DO_APP":
+            slot = FieldSlot(index, placeholder, 'title', font_size=12, bold=True, optional=False)
+        elif placeholder in TINY_FIELDS:
+            slot = FieldSlot(index, placeholder, 'owner', font_size=5, max_chars=25, optional=False)
+        elif placeholder in SMALL_FIELDS:
+            slot = FieldSlot(index, placeholder, 'line', font_size=6, max_chars=60, optional=False)
+        else:
+            slot = FieldSlot(index, placeholder, 'auto')
+
+    # Text-based placeholders (small shapes, 0.25-0.69" height)
+    lowered = text.lower()
+    for placeholder_text, data_key in PLACEHOLDER_TEXTS.items():
+        if placeholder_text in lowered and data_key:
+            if shape.height / 914400 < 0.3:  # EMU to inches
+                slot = FieldSlot(index, data_key, 'line', font_size=6, max_chars=40)
+            else:
+                slot = FieldSlot(index, data_key, 'auto')
+            break
 
-    # Step 0: Delete emoji images
-    emoji_pictures = ['Picture 46', 'Picture 43', 'Picture 39']
-    shapes_to_delete = []
-    for shape in slide.shapes:
-        if shape.name in emoji_pictures:
-            shapes_to_delete.append(shape)
-    for shape in shapes_to_delete:
-        try:
-            sp = shape.element
-            sp.getparent().remove(sp)
-        except Exception:
-            pass
+    # Direct rectangle mapping
+    data_key = DIRECT_MAPPINGS.get(shape.name)
+    if data_key == "SATISFACTION":
+        slot = FieldSlot(index, data_key, 'fixed', font_size=16)
+    elif data_key and shape.name in SMALL_DIRECT:
+        slot = FieldSlot(index, data_key, 'line', font_size=6, max_chars=40)
+    elif data_key:
+        slot = FieldSlot(index, data_key, 'auto')
+    return slot
+
+
+@dataclass(frozen=True)
+class CompiledSlide:
+    """The template slide, ready to be stamped once per application"""
+    path: str
+    tree: object                 # Shape tree of the clonable shapes (IDs fixed, emoji pictures removed)
+    slots: Tuple[FieldSlot, ...]
+    template_bodies: Tuple       # Unformatted text body of each slot
+    referenced_rids: frozenset   # Relationships used by the shapes (image rIds to copy)
+
+    def clone(self):
+        """A copy of the shapes (a single deep copy of the tree)"""
+        return list(deepcopy(self.tree))
+
+    def prepare(self, shapes):
+        """Format the text body of every slot: a single empty Calibri run in the profile font"""
+        for slot in self.slots:
+            set_text(TextFrame(shapes[slot.index].txBody, None), "", font_size=slot.font_size, bold=slot.bold)
+
+    def fill(self, shapes, data_map):
+        """Write one application into prepared shapes (clone()), one pass"""
+        for slot, template_body in zip(self.slots, self.template_bodies):
+            if slot.optional and slot.field not in data_map:
+                # Field missing from the data: the shape keeps its template text
+                shape = shapes[slot.index]
+                shape.replace(shape.txBody, deepcopy(template_body))
+                continue
+            try:
+                text, font_size = slot.content(data_map.get(slot.field, ""))
+                paragraph = shapes[slot.index].find(_TXBODY).find(_PARAGRAPH)
+                run = paragraph.find(_RUN)
+                if text is None:
+                    paragraph.remove(run)
+                    continue
+                run.text = text
+                run.rPr.set('sz', str(font_size * 100))
+            except Exception as e:
+                print(f"[PPT_GENERATOR] Could not fill {slot.field}: {e}")
 
-    # Size profiles for different placeholder types
-    # Tiny shapes (0.15" height): font 5pt, max ~20 chars, extract primary name
-    TINY_FIELDS = {"BUSINESS_OWNER", "IT_OWNER"}
-    # Small one-line shapes (0.33" height): font 6-7pt, max ~50 chars
-    SMALL_FIELDS = {"USAGE", "BUSINESS_CRITICALITY", "OWNED_BY", "UTILITY_DOMAIN",
-                    "BUSINESS_AREA", "OPCOS"}
 
-    # Step 1: Replace {{FIELD_NAME}} placeholders
-    for shape in slide.shapes:
-        try:
-            if not shape.has_text_frame:
-                continue
-            text = shape.text_frame.text.strip()
-            if text.startswith('{{') and text.endswith('}}'):
-                placeholder = text[2:-2]
-                if placeholder == "NOME_DO_APP":
-                    val = data_map.get(placeholder, "")
-                    if val:
-                        set_text(shape.text_frame, val, font_size=12, bold=True)
-                    else:
-                        shape.text_frame.clear()
-                elif placeholder in TINY_FIELDS:
-                    val = data_map.get(placeholder, "")
-                    # Extract primary name for tiny owner shapes
-                    val = extract_primary_name(val) if val else ""
-                    if len(val) > 25:
-                        val = val[:22] + "..."
-                    set_text(shape.text_frame, val, font_size=5)
-                elif placeholder in SMALL_FIELDS:
-                    val = data_map.get(placeholder, "")
-                    # Clean newlines for single-line shapes
-                    val = val.replace('\n', ', ') if val else ""
-                    if len(val) > 60:
-                        val = val[:57] + "..."
-                    set_text(shape.text_frame, val, font_size=6)
-                elif placeholder in data_map:
-                    val = data_map.get(placeholder, "")
-                    auto_fit_text(shape.text_frame, val)
-        except Exception:
-            pass
+def _clonable_shapes(spTree):
+    return [child for child in spTree if child.tag in CLONABLE_TAGS]
 
-    # Step 2: Replace text-based placeholders
-    placeholder_texts = {
-        "<specify applications>": "INTEGRATIONS",
-        "cloud or on prem": "DEPLOYMENT",
-        "<per device type and os": "COMPATIBILITY",
-        "custom or market": "APP_CATEGORY",
-        "yes/no": None,  # handled by direct mapping
-        "version, planned migrations": "PLANNED_UPGRADES",
-    }
-    for shape in slide.shapes:
-        try:
-            if not shape.has_text_frame:
-                continue
-            text = shape.text_frame.text.strip().lower()
-            for placeholder_text, data_key in placeholder_texts.items():
-                if placeholder_text in text and data_key and data_key in data_map:
-                    val = data_map.get(data_key, "")
-                    # These text-based shapes are small (0.25-0.69" height)
-                    shape_h = shape.height / 914400  # EMU to inches
-                    if shape_h < 0.3:
-                        val = val.replace('\n', ', ') if val else ""
-                        if len(val) > 40:
-                            val = val[:37] + "..."
-                        set_text(shape.text_frame, val, font_size=6)
-                    else:
-                        auto_fit_text(shape.text_frame, val)
-                    break
-        except Exception:
-            pass
 
-    # Step 3: Direct rectangle mapping
-    direct_mappings = {
-        "Rectangle 19": "APPLICATION_FUNCTIONALITY",
-        "Rectangle 32": "BUSINESS_AREA",
-        "Rectangle 36": "USER_PERSONAS",
-        "Rectangle 142": "NO_USERS",
-        "Rectangle 90": "REGULATORY",
-        "Rectangle 64": "SATISFACTION",
-        "Rectangle 189": "SECURITY",
-        "Rectangle 174": "PROGRAMMING_LANGUAGE",
-        "Rectangle 178": "PLANNED_UPGRADES",
-        "Rectangle 182": "MONITORED",
-    }
-    # Small direct-mapped shapes that need smaller fonts (height < 0.3")
-    SMALL_DIRECT = {"Rectangle 142", "Rectangle 189", "Rectangle 174",
-                    "Rectangle 178", "Rectangle 182"}
-    for shape in slide.shapes:
-        try:
-            if shape.name in direct_mappings:
-                data_key = direct_mappings[shape.name]
-                if data_key in data_map and shape.has_text_frame:
-                    val = data_map.get(data_key, "")
-                    if data_key == "SATISFACTION":
-                        set_text(shape.text_frame, val, font_size=16)
-                    elif shape.name in SMALL_DIRECT:
-                        val = val.replace('\n', ', ') if val else ""
-                        if len(val) > 40:
-                            val = val[:37] + "..."
-                        set_text(shape.text_frame, val, font_size=6)
-                    else:
-                        auto_fit_text(shape.text_frame, val)
-        except Exception:
-            pass
+def compile_slide_template(path):
+    """Analyze the first slide of the template into a CompiledSlide"""
+    template_slide = Presentation(path).slides[0]
+    template_shapes = [shape for shape in template_slide.shapes if shape.element.tag in CLONABLE_TAGS]
+
+    # Duplicate IDs are fixed once, as they would be in the shape tree of a new slide
+    holder = OxmlElement('p:spTree')
+    holder.extend(deepcopy(shape.element) for shape in template_shapes)
+    _fix_duplicate_shape_ids(holder, taken_ids={SLIDE_TREE_ID})
+
+    shapes, slots = [], []
+    for template_shape, element in zip(template_shapes, list(holder)):
+        if template_shape.name in EMOJI_PICTURES:
+            holder.remove(element)
+            continue
+        slot = _field_slot(len(shapes), template_shape)
+        if slot:
+            slots.append(slot)
+        shapes.append(element)
+
+    rids = set()
+    for element in shapes:
+        rids.update(re.findall(r'r:(?:embed|link|id)="(rId\d+)"', etree.tostring(element, encoding='unicode')))
+    compiled = CompiledSlide(path=path, tree=holder, slots=tuple(slots),
+                             template_bodies=tuple(deepcopy(shapes[slot.index].txBody) for slot in slots),
+                             referenced_rids=frozenset(rids))
+    compiled.prepare(shapes)
+    return compiled
+
+
+def get_compiled_slide(path=TEMPLATE_PATH):
+    """The compiled template slide; recompiled when the template file changes"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _compiled_lock:
+        cached = _compiled_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        compiled = compile_slide_template(path)
+        _compiled_cache[path] = (signature, compiled)
+        return compiled
 
 
 # ============================================================
 # Slide cloning with preserved relationship IDs
 # ============================================================
 
-def _copy_image_rels(source_slide, new_slide, rids_needed):
-    """Copy only image relationships from source to new slide, preserving rIds.
+def _copy_image_rels(source_part, new_part, rids_needed):
+    """Copy only image relationships from source to new slide part, preserving rIds.
     Skip tags, oleObject, notesSlide - these are slide-specific and can't be shared."""
     from pptx.opc.package import _Relationship
 
-    for rId, rel in source_slide.part.rels.items():
+    for rId, rel in source_part.rels.items():
         if rId not in rids_needed:
             continue
         # Only copy image relationships
         if 'image' not in rel.reltype:
             continue
         try:
-            if rId in new_slide.part.rels:
+            if rId in new_part.rels:
                 continue
             new_rel = _Relationship(
                 rel._base_uri, rId, rel.reltype, rel._target_mode, rel._target
             )
-            new_slide.part.rels._rels[rId] = new_rel
+            new_part.rels._rels[rId] = new_rel
         except Exception:
             pass
 
 
-def _fix_duplicate_shape_ids(spTree):
+def _add_slide_part(prs, layout, slide_id, blob=None):
+    """prs.slides.add_slide without the layout placeholders (never used) and without its scans
+    of every existing slide (relationship reuse lookup, next slide id), which made decks O(n²).
+    blob: XML of a slide rendered by a worker (kept serialized), otherwise a blank slide."""
+    partname = PackURI("/ppt/slides/slide%d.xml" % (len(prs.slides) + 1))
+    if blob is None:
+        slide_part = SlidePart.new(partname, prs.part.package, layout.part)
+    else:
+        slide_part = Part(partname, CT.PML_SLIDE, prs.part.package, blob)  # python-pptx >= 1.0 order
+        slide_part.relate_to(layout.part, RT.SLIDE_LAYOUT)
+    # A new part: there is no existing relationship to reuse
+    rId = prs.part.rels._add_relationship(RT.SLIDE, slide_part)
+    prs.slides._sldIdLst._add_sldId(id=slide_id, rId=rId)
+    return slide_part
+
+
+def _fix_duplicate_shape_ids(spTree, taken_ids=()):
     """Fix duplicate cNvPr id attributes within a slide's spTree.
-    PowerPoint requires unique shape IDs per slide; duplicates cause repair errors."""
-    seen_ids = set()
-    max_id = 0
+    PowerPoint requires unique shape IDs per slide; duplicates cause repair errors.
+    taken_ids: IDs already used outside spTree."""
+    seen_ids = set(taken_ids)
+    max_id = max(seen_ids, default=0)
 
     # First pass: find all IDs and the max
     for elem in spTree.iter():
@@ -502,89 +724,90 @@ def _fix_duplicate_shape_ids(spTree):
 # Main generation function
 # ============================================================
 
-def generate_portfolio_pptx():
-    """Generate a single PPTX with one slide per application.
-    Returns bytes of the generated PPTX file."""
-    import re as _re
-    from lxml import etree
-
-    session = get_session()
+def _render_slide(template_path, data_map):
+    """Worker: (slide XML, error) of one application, serialized as the slide part is on save"""
     try:
-        apps = session.query(Application).order_by(Application.name).all()
-        if not apps:
-            return None
-
-        # Extract data for all applications (pass session to avoid nested sessions)
-        apps_data = []
-        for app in apps:
-            try:
-                data = extract_app_data_from_db(app.id, app.name, session=session)
-                apps_data.append(data)
-            except Exception as e:
-                print(f"[PPT_GENERATOR] Error extracting data for {app.name}: {e}")
-                apps_data.append({"NOME_DO_APP": app.name})
+        compiled = get_compiled_slide(template_path)
+        slide = CT_Slide.new()
+        shapes = compiled.clone()
+        slide.cSld.spTree.extend(shapes)
+        compiled.fill(shapes, data_map)
+        return serialize_part_xml(slide), None
+    except Exception as e:
+        return None, str(e)
 
-        if not apps_data:
-            return None
 
-        # Load template
-        prs = Presentation(TEMPLATE_PATH)
-
-        # Save original template shapes XML for cloning
-        # Exclude graphicFrame (OLE objects) - they reference tags/oleObject
-        # that are slide-specific and cannot be shared across slides
-        template_slide = prs.slides[0]
-        original_shapes = []
-        for child in template_slide.shapes._spTree:
-            tag_local = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-            if tag_local in ('sp', 'pic', 'grpSp', 'cxnSp'):
-                original_shapes.append(deepcopy(child))
-            # Skip graphicFrame entirely - these are OLE objects that cause
-            # PowerPoint repair errors when shared across slides
-
-        # Discover which rIds are referenced by clonable shapes only
-        clone_xml = ''.join(etree.tostring(s, encoding='unicode') for s in original_shapes)
-        referenced_rids = set(_re.findall(r'r:(?:embed|link|id)="(rId\d+)"', clone_xml))
-
-        # Fix duplicate shape IDs in template slide (template has dupes)
-        _fix_duplicate_shape_ids(template_slide.shapes._spTree)
-
-        # Fill first slide with first application
-        try:
-            fill_slide(template_slide, apps_data[0])
-        except Exception as e:
-            print(f"[PPT_GENERATOR] Error filling first slide ({apps_data[0].get('NOME_DO_APP', '?')}): {e}")
+def render_portfolio_deck(apps_data, template_path=TEMPLATE_PATH, workers=None):
+    """One slide per application data map (extract_app_data_from_db). Returns the PPTX bytes.
+    workers: processes rendering the slides (default EXPORT_WORKERS); slides are added in input
+    order, so the package parts are identical to a serial rendering."""
+    workers = EXPORT_WORKERS if workers is None else workers
+    compiled = get_compiled_slide(template_path)
+    prs = Presentation(template_path)
+    template_slide = prs.slides[0]
+    layout = template_slide.slide_layout
 
-        # For remaining applications, clone template and fill
+    # First application: the template slide itself (keeps its OLE objects)
+    try:
+        spTree = template_slide.shapes._spTree
+        _fix_duplicate_shape_ids(spTree)
+        for child in _clonable_shapes(spTree):
+            if child.xpath('string(./*[1]/p:cNvPr/@name)') in EMOJI_PICTURES:
+                spTree.remove(child)
+        shapes = _clonable_shapes(spTree)
+        compiled.prepare(shapes)
+        compiled.fill(shapes, apps_data[0])
+    except Exception as e:
+        print(f"[PPT_GENERATOR] Error filling first slide ({apps_data[0].get('NOME_DO_APP', '?')}): {e}")
+
+    # Remaining applications: a clone of the compiled shapes per slide
+    next_slide_id = prs.slides._sldIdLst._next_id
+    if workers > 1 and len(apps_data) > 2:
+        # Slides rendered to XML in a process pool, added here in order
+        workers = min(workers, len(apps_data) - 1)
+        chunksize = max(1, (len(apps_data) - 1) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rendered = executor.map(partial(_render_slide, template_path), apps_data[1:], chunksize=chunksize)
+            for i, (blob, error) in enumerate(rendered, start=1):
+                if error:
+                    print(f"[PPT_GENERATOR] Error creating slide {i} ({apps_data[i].get('NOME_DO_APP', '?')}): {error}")
+                    continue
+                slide_part = _add_slide_part(prs, layout, next_slide_id, blob)
+                next_slide_id += 1
+                _copy_image_rels(template_slide.part, slide_part, compiled.referenced_rids)
+    else:
         for i in range(1, len(apps_data)):
             try:
-                layout = template_slide.slide_layout
-                new_slide = prs.slides.add_slide(layout)
+                slide_part = _add_slide_part(prs, layout, next_slide_id)
+                next_slide_id += 1
 
-                # Remove default shapes from layout
-                for shape in list(new_slide.shapes):
-                    new_slide.shapes._spTree.remove(shape.element)
-
-                # Insert cloned original template shapes
-                for shape_elem in original_shapes:
-                    new_slide.shapes._spTree.append(deepcopy(shape_elem))
+                shapes = compiled.clone()
+                slide_part.slide.shapes._spTree.extend(shapes)
 
                 # Copy only image relationships (skip tags/oleObject/notes)
-                _copy_image_rels(template_slide, new_slide, referenced_rids)
-
-                # Fix duplicate shape IDs
-                _fix_duplicate_shape_ids(new_slide.shapes._spTree)
+                _copy_image_rels(template_slide.part, slide_part, compiled.referenced_rids)
 
-                # Fill with application data
-                fill_slide(new_slide, apps_data[i])
+                compiled.fill(shapes, apps_data[i])
             except Exception as e:
                 print(f"[PPT_GENERATOR] Error creating slide {i} ({apps_data[i].get('NOME_DO_APP', '?')}): {e}")
 
-        # Save to bytes buffer
-        buffer = io.BytesIO()
-        prs.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
+    # Save to bytes buffer
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_portfolio_pptx():
+    """Generate a single PPTX with one slide per application.
+    Returns bytes of the generated PPTX file."""
+    session = get_session()
+    try:
+        # Field maps of all applications, in name order (built in bulk, cached per application)
+        apps_data = list(get_app_profiles(session).values())
+        if not apps_data:
+            return None
+
+        return render_portfolio_deck(apps_data)
 
     except Exception as e:
         print(f"[PPT_GENERATOR] Critical error generating PPTX: {e}")
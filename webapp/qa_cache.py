@@ -0,0 +1,138 @@
+"""
+Semantic answer cache for the Q&A assistant
+Matches an incoming question against recent QAHistory entries using local TF-IDF vectors
+(word unigrams + bigrams, cosine similarity). A match is only served when it was answered
+against the current data revision, so any data change invalidates the cache. Answers served from
+the cache are recorded with a link to their source entry, which also receives their feedback.
+"""
+
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from database import QAHistory
+
+DEFAULT_THRESHOLD = float(os.getenv("QA_CACHE_THRESHOLD", "0.85"))
+MAX_CANDIDATES = 500
+
+# Negations and question words are kept: they change the meaning of a question
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "is", "are", "be", "been",
+    "do", "does", "did", "we", "our", "us", "i", "me", "my", "you", "your", "it", "its",
+    "this", "that", "these", "those", "there", "please", "can", "could", "would", "should",
+    "with", "about", "any", "some", "from", "by", "as", "at", "tell", "show", "list", "give"
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9&]+")
+
+_index_lock = threading.Lock()
+_index_cache: Dict = {"key": None, "index": None}
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def normalize_question(question: str) -> List[str]:
+    """Lowercase, tokenize, drop stopwords and apply light stemming ("apps" -> "app")"""
+    tokens = _TOKEN_RE.findall((question or "").lower())
+    tokens = [_stem(t) for t in tokens if t not in STOPWORDS]
+    # Common synonyms in this domain
+    return ["app" if t in ("application", "system") else t for t in tokens]
+
+
+def _features(tokens: List[str]) -> Counter:
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return features
+
+
+class _TfidfIndex:
+    """TF-IDF index over the candidate questions"""
+
+    def __init__(self, entries: List[Tuple[str, str]]):
+        # entries: [(history_id, question)]
+        self.ids = [entry_id for entry_id, _ in entries]
+        self.normalized = [" ".join(normalize_question(q)) for _, q in entries]
+        docs = [_features(normalize_question(q)) for _, q in entries]
+
+        document_frequency = Counter()
+        for doc in docs:
+            document_frequency.update(doc.keys())
+        self.n_docs = len(docs)
+        self.document_frequency = document_frequency
+        self.vectors = [self._vectorize(doc) for doc in docs]
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + self.n_docs) / (1 + self.document_frequency.get(term, 0))) + 1.0
+
+    def _vectorize(self, features: Counter) -> Dict[str, float]:
+        vector = {term: (1 + math.log(count)) * self._idf(term) for term, count in features.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {term: v / norm for term, v in vector.items()}
+
+    def best_match(self, question: str) -> Tuple[Optional[str], float]:
+        tokens = normalize_question(question)
+        if not tokens:
+            return None, 0.0
+        normalized = " ".join(tokens)
+        if normalized in self.normalized:
+            return self.ids[self.normalized.index(normalized)], 1.0
+
+        query = self._vectorize(_features(tokens))
+        best_id, best_score = None, 0.0
+        for entry_id, vector in zip(self.ids, self.vectors):
+            if len(vector) < len(query):
+                score = sum(weight * query.get(term, 0.0) for term, weight in vector.items())
+            else:
+                score = sum(weight * vector.get(term, 0.0) for term, weight in query.items())
+            if score > best_score:
+                best_id, best_score = entry_id, score
+        return best_id, best_score
+
+
+def _get_index(session, revision: int) -> _TfidfIndex:
+    candidates = session.query(QAHistory.id, QAHistory.user_question).filter(
+        QAHistory.data_revision == revision,
+        QAHistory.ai_response.isnot(None),
+        QAHistory.source_id.is_(None),  # Answers served from the cache point to their source
+        (QAHistory.user_feedback.is_(None)) | (QAHistory.user_feedback != 'not_helpful')
+    ).order_by(QAHistory.created_at.desc()).limit(MAX_CANDIDATES).all()
+
+    key = (revision, tuple(entry_id for entry_id, _ in candidates))
+    with _index_lock:
+        if _index_cache["key"] != key:
+            _index_cache["index"] = _TfidfIndex(candidates)
+            _index_cache["key"] = key
+        return _index_cache["index"]
+
+
+def find_cached_answer(session, question: str, revision: int,
+                       threshold: float = DEFAULT_THRESHOLD) -> Tuple[Optional[QAHistory], float]:
+    """
+    Find a previous answer to a semantically equivalent question.
+
+    Args:
+        session: Database session
+        question: Incoming user question
+        revision: Current data revision (see database.get_data_revision)
+        threshold: Minimum cosine similarity (0-1) to serve the cached answer
+
+    Returns:
+        Tuple of (QAHistory entry or None, similarity)
+    """
+    index = _get_index(session, revision)
+    if not index.ids:
+        return None, 0.0
+
+    entry_id, similarity = index.best_match(question)
+    if entry_id is None or similarity < threshold:
+        return None, similarity
+    return session.get(QAHistory, entry_id), similarity
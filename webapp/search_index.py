@@ -0,0 +1,216 @@
+"""
+Full-text search over transcripts, questionnaire answers, transcript answers, notes and insights
+The search_documents table is kept in sync by ORM events (database.py) and indexed by a contentless
+SQLite FTS5 table (BM25 ranking) or a PostgreSQL tsvector + GIN index (ts_rank_cd). Texts are not
+stored in the index: titles and snippets come from the source rows of the hits (transcripts
+decompressed from their blob). Used by the Search page and as the retrieval step of the Q&A assistant.
+"""
+
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+
+from database import SEARCH_SOURCES, rebuild_search_documents
+
+# Highlight markers around matched terms in snippets (rendered as <mark> by the UI)
+HIGHLIGHT_START = "⟦"
+HIGHLIGHT_END = "⟧"
+
+DOC_TYPE_LABELS = {
+    'transcript': "🎙️ Transcript",
+    'questionnaire': "📋 Questionnaire answer",
+    'transcript_answer': "🤖 Transcript answer",
+    'note': "📝 David's note",
+    'insight': "💡 Insight",
+}
+
+_TERM_RE = re.compile(r'"([^"]+)"|([\w&\-\.]+)')
+_WORD_RE = re.compile(r"\w+")
+
+# Words too common to help retrieval for natural-language questions
+_RETRIEVAL_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "is", "are", "be", "been", "was",
+    "do", "does", "did", "we", "our", "us", "i", "me", "my", "you", "your", "it", "its", "this",
+    "that", "these", "those", "there", "please", "can", "could", "would", "should", "with", "about",
+    "any", "some", "from", "by", "as", "at", "tell", "show", "list", "give", "what", "which", "who",
+    "how", "why", "when", "where", "have", "has", "app", "apps", "application", "applications",
+}
+
+
+@dataclass
+class SearchHit:
+    """One match; title (in full) and snippet carry HIGHLIGHT_START/END around matched terms"""
+    doc_type: str
+    doc_id: str
+    application_id: Optional[str]
+    application_name: Optional[str]
+    title: str
+    snippet: str
+    rank: float
+
+
+def _terms(query: str) -> List[str]:
+    """Quoted phrases and single words of a user query"""
+    terms = []
+    for phrase, word in _TERM_RE.findall(query or ""):
+        words = _WORD_RE.findall(phrase or word)
+        if words:
+            terms.append(" ".join(words))
+    return terms
+
+
+def _fts5_query(terms: Sequence[str], match_any: bool) -> str:
+    # Every term quoted: user input can never be read as FTS5 syntax; the last word also matches prefixes
+    parts = [f'"{term}"' for term in terms]
+    if not match_any and " " not in terms[-1]:
+        parts[-1] += "*"
+    return (" OR " if match_any else " ").join(parts)
+
+
+def _tsquery(terms: Sequence[str], match_any: bool) -> str:
+    parts = [" <-> ".join(term.split()) for term in terms]
+    if not match_any and " " not in terms[-1]:
+        parts[-1] += ":*"
+    return (" | " if match_any else " & ").join(f"({part})" for part in parts)
+
+
+def search(session, query: str, limit: int = 20, doc_types: Sequence[str] = None,
+           application_id: str = None, match_any: bool = False) -> List[SearchHit]:
+    """
+    Ranked full-text search with highlighted snippets.
+
+    Args:
+        query: Words (all must match, the last one as a prefix) and "quoted phrases"
+        doc_types: Restrict to these SEARCH_SOURCES types
+        application_id: Restrict to one application
+        match_any: Match documents containing any of the terms (retrieval for questions)
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    params: Dict = {'limit': limit}
+    filters = ""
+    if doc_types:
+        names = []
+        for idx, doc_type in enumerate(doc_types):
+            params[f'type_{idx}'] = doc_type
+            names.append(f':type_{idx}')
+        filters += f" AND d.doc_type IN ({', '.join(names)})"
+    if application_id:
+        params['application_id'] = application_id
+        filters += " AND d.application_id = :application_id"
+
+    if session.get_bind().dialect.name == 'postgresql':
+        params['query'] = _tsquery(terms, match_any)
+        sql = f"""
+            SELECT d.doc_type, d.doc_id, d.application_id, a.name, ts_rank_cd(d.search_vector, q) AS rank
+            FROM search_documents d
+            CROSS JOIN to_tsquery('english', :query) q
+            LEFT JOIN applications a ON a.id = d.application_id
+            WHERE d.search_vector @@ q{filters}
+            ORDER BY rank DESC
+            LIMIT :limit
+        """
+    else:
+        params['query'] = _fts5_query(terms, match_any)
+        # bm25: lower is better; a match in the title counts twice
+        sql = f"""
+            SELECT d.doc_type, d.doc_id, d.application_id, a.name, bm25(search_fts, 2.0, 1.0) AS rank
+            FROM search_fts
+            JOIN search_documents d ON d.id = search_fts.rowid
+            LEFT JOIN applications a ON a.id = d.application_id
+            WHERE search_fts MATCH :query{filters}
+            ORDER BY rank
+            LIMIT :limit
+        """
+    rows = session.execute(text(sql), params).fetchall()
+    texts = _document_texts(session, [(doc_type, doc_id) for doc_type, doc_id, *_ in rows])
+    pattern = _highlight_pattern(terms)
+    hits = []
+    for doc_type, doc_id, application_id, application_name, rank in rows:
+        title, body = texts.get((doc_type, doc_id), ('', ''))
+        hits.append(SearchHit(doc_type, doc_id, application_id, application_name,
+                              _highlight(title, pattern), _snippet(body, pattern), rank))
+    return hits
+
+
+# ==================== SNIPPETS ====================
+SNIPPET_WORDS = 24  # Words around the first match
+
+
+def _document_texts(session, docs) -> Dict:
+    """{(doc_type, doc_id): (title, body)} read from the source rows (one query per source type)"""
+    ids_by_type = defaultdict(list)
+    for doc_type, doc_id in docs:
+        ids_by_type[doc_type].append(doc_id)
+    texts = {}
+    for doc_type, ids in ids_by_type.items():
+        model, title_attr, body_attr = SEARCH_SOURCES[doc_type]
+        for obj in session.query(model).filter(model.id.in_(ids)):
+            texts[(doc_type, obj.id)] = (getattr(obj, title_attr) or '', getattr(obj, body_attr) or '')
+    return texts
+
+
+def _highlight_pattern(terms: Sequence[str]) -> re.Pattern:
+    # Words of the query as word prefixes (covers the last-word prefix and most stemmed forms)
+    words = sorted({word for term in terms for word in _WORD_RE.findall(term)}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + r")\w*", re.IGNORECASE)
+
+
+def _highlight(value: str, pattern: re.Pattern) -> str:
+    return pattern.sub(lambda m: f"{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_END}", value or "")
+
+
+def _snippet(body: str, pattern: re.Pattern) -> str:
+    """About SNIPPET_WORDS words of body around its first match, highlighted (the start when the
+    match only comes from stemming or from the title)"""
+    spans = [match.span() for match in re.finditer(r"\S+", body or "")]
+    if not spans:
+        return ""
+    match = pattern.search(body)
+    first = 0
+    if match:
+        first = next(idx for idx, (_, end) in enumerate(spans) if end > match.start())
+    start = max(0, min(first - SNIPPET_WORDS // 3, len(spans) - SNIPPET_WORDS))
+    end = min(len(spans), start + SNIPPET_WORDS)
+    snippet = _highlight(body[spans[start][0]:spans[end - 1][1]], pattern)
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(spans) else "")
+
+
+def strip_highlights(snippet: str) -> str:
+    return (snippet or "").replace(HIGHLIGHT_START, "").replace(HIGHLIGHT_END, "")
+
+
+def retrieve_passages(session, question: str, limit: int = 15) -> List[Dict]:
+    """
+    Passages relevant to a natural-language question (best first), for the Q&A assistant context.
+    Matches any significant word of the question; BM25 ranks documents matching more of them first.
+    """
+    words = [w for w in _WORD_RE.findall((question or "").lower()) if w not in _RETRIEVAL_STOPWORDS and len(w) > 1]
+    if not words:
+        return []
+    hits = search(session, " ".join(dict.fromkeys(words)), limit=limit, match_any=True)
+    return [{
+        'application': hit.application_name,
+        'source': DOC_TYPE_LABELS.get(hit.doc_type, hit.doc_type).split(" ", 1)[-1],
+        'title': strip_highlights(hit.title),
+        'passage': strip_highlights(hit.snippet),
+    } for hit in hits]
+
+
+def timed_search(session, query: str, **kwargs):
+    """search() plus its duration in milliseconds"""
+    start_time = time.perf_counter()
+    hits = search(session, query, **kwargs)
+    return hits, (time.perf_counter() - start_time) * 1000
+
+
+def rebuild(session) -> int:
+    """Re-index every transcript, answer, note and insight"""
+    return rebuild_search_documents(session)
+
@@ -0,0 +1,136 @@
+"""
+LLM call telemetry
+Records model, tokens, cost, latency, retries and cache status of every LLM call into the
+llm_calls table. Records are queued and written in batches by a background thread so the
+request path never waits on the database.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# USD per 1M tokens: (prompt, completion)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+FLUSH_INTERVAL_SECONDS = 2.0
+MAX_BATCH_SIZE = 100
+
+_queue: "queue.Queue[Dict]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+_flush_requested = threading.Event()
+_flushed = threading.Event()
+
+
+def is_enabled() -> bool:
+    return os.getenv("LLM_TELEMETRY", "1").lower() not in ("0", "false", "no", "off")
+
+
+def compute_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Compute the USD cost of a call from the price table (dated model names map to their base model)"""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        # e.g. "gpt-4o-mini-2024-07-18" -> longest matching prefix
+        candidates = [name for name in MODEL_PRICES if model and model.startswith(name)]
+        if not candidates:
+            return 0.0
+        prices = MODEL_PRICES[max(candidates, key=len)]
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def record_llm_call(feature: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                    latency_ms: int = None, retries: int = 0, cache_status: str = "miss",
+                    application_ids: List[str] = None, success: bool = True, error: str = None):
+    """Queue one LLM call record. Never raises."""
+    if not is_enabled():
+        return
+    try:
+        _queue.put({
+            "id": str(uuid.uuid4()),
+            "feature": feature,
+            "model": model,
+            "application_ids": [str(a) for a in application_ids] if application_ids else None,
+            "prompt_tokens": prompt_tokens or 0,
+            "completion_tokens": completion_tokens or 0,
+            "cost_usd": compute_cost(model, prompt_tokens or 0, completion_tokens or 0),
+            "latency_ms": latency_ms,
+            "retries": retries or 0,
+            "cache_status": cache_status,
+            "success": success,
+            "error": error[:1000] if error else None,
+            "created_at": datetime.now(timezone.utc),
+        })
+        _ensure_writer()
+    except Exception as e:
+        print(f"[TELEMETRY] ⚠️  Could not record LLM call: {e}")
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, name="llm-telemetry-writer", daemon=True)
+            _writer.start()
+
+
+def _drain(limit: int) -> List[Dict]:
+    rows = []
+    while len(rows) < limit:
+        try:
+            rows.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return rows
+
+
+def _write_rows(rows: List[Dict]):
+    from database import get_session, close_session, LLMCall
+
+    session = get_session()
+    try:
+        session.bulk_insert_mappings(LLMCall, rows)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"[TELEMETRY] ⚠️  Could not write {len(rows)} LLM call records: {e}")
+    finally:
+        close_session(session)
+
+
+def _writer_loop():
+    while True:
+        _flush_requested.wait(FLUSH_INTERVAL_SECONDS)
+        _flush_requested.clear()
+        while True:
+            rows = _drain(MAX_BATCH_SIZE)
+            if not rows:
+                break
+            _write_rows(rows)
+        _flushed.set()
+
+
+def flush(timeout: float = 10.0):
+    """Write all queued records now (blocks until written or timeout)"""
+    if _queue.empty() or _writer is None or not _writer.is_alive():
+        rows = _drain(10 ** 9)
+        if rows:
+            _write_rows(rows)
+        return
+    _flushed.clear()
+    _flush_requested.set()
+    _flushed.wait(timeout)
+
+
+atexit.register(flush)
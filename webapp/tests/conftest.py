@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Ensure webapp modules can be imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
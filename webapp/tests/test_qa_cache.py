@@ -0,0 +1,61 @@
+"""
+A failed Q&A call never becomes a cache candidate: answer_question raises instead of returning the
+error as an answer, and the history entry recorded for it has no data revision.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import llm_backend
+from ai_processor import answer_question
+from database import Base, QAHistory
+from qa_cache import find_cached_answer
+
+QUESTION = "Which applications are candidates for elimination?"
+REVISION = 7
+
+
+class _FailingBackend(llm_backend.LLMBackend):
+    name = "failing"
+
+    def _complete(self, messages, model, temperature, json_mode, feature):
+        raise RuntimeError("rate limit exceeded")
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'qa.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _record(session, answer, revision):
+    # Mirrors page_qa_assistant: failed calls are recorded without a data revision
+    entry = QAHistory(id=str(uuid.uuid4()), user_question=QUESTION, ai_response=answer,
+                      sources=[], data_revision=revision)
+    session.add(entry)
+    session.commit()
+    return entry
+
+
+def test_answer_question_raises_on_llm_failure(monkeypatch):
+    monkeypatch.setenv("LLM_TELEMETRY", "0")
+    monkeypatch.setattr(llm_backend, "_backend", _FailingBackend())
+    with pytest.raises(RuntimeError, match="rate limit"):
+        answer_question(QUESTION, {"applications": []})
+
+
+def test_failed_answer_is_not_a_cache_candidate(session):
+    _record(session, "Error processing question: rate limit exceeded", None)
+    assert find_cached_answer(session, QUESTION, REVISION) == (None, 0.0)
+
+    answered = _record(session, "Three applications are rated ELIMINATE.", REVISION)
+    entry, similarity = find_cached_answer(session, QUESTION, REVISION)
+    assert entry.id == answered.id
+    assert similarity == 1.0
@@ -0,0 +1,40 @@
+"""
+Spooled uploads keep memory bounded: a batch much larger than the allowed peak is spooled to disk,
+extracted one file at a time and released, without ever being held in memory as a whole.
+"""
+
+import tracemalloc
+
+import text_extraction
+from benchmark import _SyntheticUpload
+from upload_spool import UploadSpool
+
+FILE_SIZE = 4 * 1024 * 1024
+FILE_COUNT = 24  # 96 MB in total
+MAX_PEAK_BYTES = 32 * 1024 * 1024
+
+
+def test_spooled_extraction_has_bounded_peak(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_extraction, "CACHE_DIR", str(tmp_path / "cache"))
+    uploads = [_SyntheticUpload(f"Application {i} - Meeting.txt", FILE_SIZE, i) for i in range(FILE_COUNT)]
+
+    tracemalloc.start()
+    try:
+        with UploadSpool(str(tmp_path / "spool")) as spool:
+            spooled = spool.add_all(uploads)
+            extracted = 0
+            for f, extraction in zip(spooled, text_extraction.iter_extract(
+                    [(f.name, f.path) for f in spooled], hashes=[f.sha256 for f in spooled])):
+                f.release()
+                assert not extraction.error, extraction.error
+                assert len(extraction.text) == FILE_SIZE
+                extraction.text = ""
+                extracted += 1
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert extracted == FILE_COUNT
+    assert all(f.size_bytes == FILE_SIZE for f in spooled)
+    assert peak < MAX_PEAK_BYTES, f"peak {peak / 1024 / 1024:.1f} MB"
+    assert not list((tmp_path / "spool").iterdir())  # Spool directory removed on exit
@@ -0,0 +1,229 @@
+"""
+Transcript text extraction
+Reads TXT, PDF and DOCX content with a disk cache keyed by the SHA-256 of the file bytes
+(re-uploads and re-ingestions are free) and parses cache misses in a process pool, so a batch
+of PDFs scales with the available cores instead of running one file after another.
+
+Sources are either the file bytes or the path of a file holding them (spooled uploads,
+ingested directories); paths are parsed from memory-mapped / file-backed streams and are all
+that is sent to the worker processes.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import mmap
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple, Union
+
+# Bump when the extraction logic changes so that cached text is recomputed
+EXTRACTOR_VERSION = 1
+
+CACHE_DIR = os.getenv(
+    "TEXT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "text_cache")
+)
+CACHE_ENABLED = os.getenv("TEXT_CACHE", "1") != "0"
+
+# Formats whose parsing is worth sending to another process
+_SLOW_FORMATS = ('pdf', 'docx', 'doc')
+
+# File content, or the path of a file holding it
+Source = Union[bytes, str]
+
+
+@dataclass
+class ExtractionResult:
+    """Text of one file plus extraction statistics"""
+    file_name: str
+    text: str = ""
+    pages: int = 0
+    seconds: float = 0.0
+    cached: bool = False
+    size_bytes: int = 0
+    sha256: str = ""
+    error: Optional[str] = None
+
+
+def _extension(file_name: str) -> str:
+    return file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+
+
+def _source_size(source: Source) -> int:
+    return os.path.getsize(source) if isinstance(source, str) else len(source)
+
+
+def _source_sha256(source: Source) -> str:
+    if not isinstance(source, str):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse(file_name: str, source: Source) -> Tuple[str, int]:
+    """Return (text, pages); raises ValueError for unsupported formats"""
+    file_extension = _extension(file_name)
+
+    if file_extension == 'txt':
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as f:
+                return f.read(), 1
+        return source.decode('utf-8'), 1
+
+    elif file_extension == 'pdf':
+        from PyPDF2 import PdfReader
+        if not isinstance(source, str):
+            return _parse_pdf(PdfReader(io.BytesIO(source)))
+        # Memory-mapped: pages are read from the OS page cache, not copied into the heap
+        with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _parse_pdf(PdfReader(mapped))
+
+    elif file_extension in ['docx', 'doc']:
+        from docx import Document
+        doc = Document(source if isinstance(source, str) else io.BytesIO(source))
+        return "\n".join([para.text for para in doc.paragraphs]), 1
+
+    raise ValueError(f"Unsupported file format: {file_extension}")
+
+
+def _parse_pdf(pdf_reader) -> Tuple[str, int]:
+    # One join instead of repeated string concatenation (quadratic on long documents)
+    page_texts = [page.extract_text() or "" for page in pdf_reader.pages]
+    return "\n".join(page_texts) + ("\n" if page_texts else ""), len(page_texts)
+
+
+# ==================== DISK CACHE ====================
+def _cache_path(sha256: str) -> str:
+    return os.path.join(CACHE_DIR, sha256[:2], f"{sha256}.v{EXTRACTOR_VERSION}.json.gz")
+
+
+def _cache_get(sha256: str) -> Optional[Tuple[str, int]]:
+    if not CACHE_ENABLED:
+        return None
+    try:
+        with gzip.open(_cache_path(sha256), 'rt', encoding='utf-8') as f:
+            entry = json.load(f)
+        return entry['text'], entry['pages']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _cache_put(sha256: str, text: str, pages: int):
+    if not CACHE_ENABLED:
+        return
+    path = _cache_path(sha256)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename: concurrent writers never leave a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=5) as f:
+            f.write(json.dumps({'text': text, 'pages': pages}).encode('utf-8'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[TEXT] ⚠️  Could not write text cache entry: {e}")
+
+
+# ==================== EXTRACTION ====================
+def extract_text(file_name: str, source: Source, sha256: str = None) -> ExtractionResult:
+    """Extract the text of one file (cached). Raises ValueError for unsupported formats."""
+    start_time = time.perf_counter()
+    sha256 = sha256 or _source_sha256(source)
+    result = ExtractionResult(file_name=file_name, size_bytes=_source_size(source), sha256=sha256)
+
+    cached = _cache_get(sha256)
+    if cached is not None:
+        result.text, result.pages = cached
+        result.cached = True
+    else:
+        result.text, result.pages = _parse(file_name, source)
+        _cache_put(sha256, result.text, result.pages)
+
+    result.seconds = time.perf_counter() - start_time
+    return result
+
+
+def extract_text_safe(file_name: str, source: Source, sha256: str = None) -> ExtractionResult:
+    """Like extract_text, but errors are returned in result.error (for batch processing)"""
+    try:
+        return extract_text(file_name, source, sha256)
+    except Exception as e:
+        try:
+            size = _source_size(source)
+        except OSError:
+            size = 0
+        return ExtractionResult(file_name=file_name, size_bytes=size, sha256=sha256 or "",
+                                error=f"{type(e).__name__}: {e}")
+
+
+def _extract_item(item: Tuple[str, Source, str]) -> ExtractionResult:
+    return extract_text_safe(*item)
+
+
+def _cached_result(item: Tuple[str, Source, str]) -> Optional[ExtractionResult]:
+    """Cache hit for a file whose hash is known or cheap to get (in-memory bytes), else None"""
+    file_name, source, sha256 = item
+    if sha256 is None and isinstance(source, str):
+        return None
+    start_time = time.perf_counter()
+    sha256 = sha256 or _source_sha256(source)
+    cached = _cache_get(sha256)
+    if cached is None:
+        return None
+    return ExtractionResult(file_name=file_name, text=cached[0], pages=cached[1],
+                            seconds=time.perf_counter() - start_time, cached=True,
+                            size_bytes=_source_size(source), sha256=sha256)
+
+
+def iter_extract(files: List[Tuple[str, Source]], workers: int = None,
+                 hashes: List[str] = None) -> Iterator[ExtractionResult]:
+    """
+    Extract the text of several files, yielding results in input order.
+
+    Cache hits and plain-text files are read in this process; PDF/DOCX cache misses are parsed
+    in a process pool when there is more than one of them. At most ~2 files per worker are
+    parsed ahead of the consumer, so memory stays bounded however large the batch is.
+
+    Args:
+        files: (file_name, bytes or path) pairs
+        workers: Pool size (default: CPU count; 1 parses everything in this process)
+        hashes: Known SHA-256 of each file (e.g. computed while spooling), to skip re-hashing
+    """
+    items = [(file_name, source, hashes[idx] if hashes else None)
+             for idx, (file_name, source) in enumerate(files)]
+    slow_count = sum(1 for item in items if _extension(item[0]) in _SLOW_FORMATS)
+    if slow_count <= 1 or (workers is not None and workers <= 1):
+        for item in items:
+            yield _extract_item(item)
+        return
+
+    max_workers = min(workers or os.cpu_count() or 1, slow_count)
+    window = max_workers * 2
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        ahead = {}  # input index -> future of a PDF/DOCX cache miss, or its cached result
+        next_submit = 0
+        for idx, item in enumerate(items):
+            while next_submit < len(items) and len(ahead) < window:
+                ahead_item = items[next_submit]
+                if _extension(ahead_item[0]) in _SLOW_FORMATS:
+                    ahead[next_submit] = _cached_result(ahead_item) or executor.submit(_extract_item, ahead_item)
+                next_submit += 1
+
+            if idx in ahead:
+                result = ahead.pop(idx)
+                yield result if isinstance(result, ExtractionResult) else result.result()
+            else:
+                yield _extract_item(item)
+
+
+def extract_many(files: List[Tuple[str, Source]], workers: int = None,
+                 hashes: List[str] = None) -> List[ExtractionResult]:
+    """All results of iter_extract as a list (keeps every text in memory)"""
+    return list(iter_extract(files, workers=workers, hashes=hashes))
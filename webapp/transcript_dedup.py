@@ -0,0 +1,184 @@
+"""
+Transcript deduplication
+Identifies transcripts by the SHA-256 of their normalized text (exact duplicates, whatever the
+file name or format) and by MinHash signatures of word shingles (near duplicates such as
+re-exports of the same meeting with different timestamps, headers or line wrapping).
+Duplicates are never stored again, so they never trigger another AI extraction.
+"""
+
+import hashlib
+import os
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from database import MeetingTranscript
+
+NUM_PERMUTATIONS = 128
+SHINGLE_SIZE = 5
+# Locality-sensitive hashing: 32 bands of 4 rows finds pairs with similarity >= ~0.6
+LSH_BANDS = 32
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("TRANSCRIPT_NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_HASH_BLOCK = 8192
+_TIMESTAMP_RE = re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?\b")
+_TOKEN_RE = re.compile(r"\w+")
+
+_permutations = None
+
+
+def normalize_transcript_text(text: str) -> str:
+    """Lowercase words only: drops punctuation, line wrapping, timestamps and unicode variants"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _TIMESTAMP_RE.sub(" ", text)
+    return " ".join(_TOKEN_RE.findall(text))
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the normalized transcript text"""
+    return hashlib.sha256(normalize_transcript_text(text).encode("utf-8")).hexdigest()
+
+
+def _get_permutations():
+    global _permutations
+    if _permutations is None:
+        import numpy as np
+        rng = np.random.RandomState(20240501)  # fixed: signatures are stored in the database
+        _permutations = (
+            rng.randint(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64),
+            rng.randint(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64),
+        )
+    return _permutations
+
+
+def minhash_signature(text: str) -> bytes:
+    """MinHash signature (NUM_PERMUTATIONS uint64 values) of the word shingles of a transcript"""
+    import numpy as np
+
+    words = normalize_transcript_text(text).split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    a, b = _get_permutations()
+    signature = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # (a * h + b) mod p; a, h < 2^32 so the product fits in uint64. Blocks of shingles keep the
+    # NUM_PERMUTATIONS x block matrix small for very long transcripts.
+    for start in range(0, len(hashes), _HASH_BLOCK):
+        block = hashes[start:start + _HASH_BLOCK]
+        values = ((a[:, None] * block[None, :]) % _MERSENNE_PRIME + b[:, None]) % _MERSENNE_PRIME
+        np.minimum(signature, values.min(axis=1), out=signature)
+    return signature.astype("<u8").tobytes()
+
+
+def signature_similarity(sig_a: bytes, sig_b: bytes) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    import numpy as np
+    a = np.frombuffer(sig_a, dtype="<u8")
+    b = np.frombuffer(sig_b, dtype="<u8")
+    return float((a == b).mean())
+
+
+def _bands(signature: bytes) -> List[bytes]:
+    size = len(signature) // LSH_BANDS
+    return [signature[i * size:(i + 1) * size] for i in range(LSH_BANDS)]
+
+
+@dataclass
+class DuplicateMatch:
+    """Existing transcript a new one duplicates"""
+    kind: str  # 'exact' or 'near'
+    transcript_id: str
+    file_name: str
+    similarity: float
+
+
+class TranscriptDedupIndex:
+    """
+    In-memory index of the stored transcripts of every application (exact hashes + MinHash LSH).
+    Duplicates are only looked for within the same application: the same meeting can
+    legitimately be uploaded for two applications it covers.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._by_hash: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._by_name: Dict[Tuple[str, str], str] = {}
+        self._signatures: Dict[str, Tuple[str, str, bytes]] = {}
+        self._buckets: Dict[Tuple[str, int, bytes], List[str]] = {}
+
+    @classmethod
+    def load(cls, session, application_ids: List[str] = None, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        """Build the index from the database, computing hashes missing on older rows"""
+        index = cls(threshold)
+        query = session.query(MeetingTranscript)
+        if application_ids is not None:
+            query = query.filter(MeetingTranscript.application_id.in_(application_ids))
+
+        backfilled = 0
+        for transcript in query.all():
+            if not transcript.content_hash or not transcript.minhash_signature:
+                ensure_fingerprint(transcript)
+                backfilled += 1
+            index.add(transcript.id, transcript.application_id, transcript.file_name,
+                      transcript.content_hash, transcript.minhash_signature)
+        if backfilled:
+            session.commit()
+            print(f"[DEDUP] Fingerprinted {backfilled} existing transcript(s)")
+        return index
+
+    def add(self, transcript_id: str, application_id: str, file_name: str, text_hash: str, signature: bytes):
+        self._by_hash.setdefault((application_id, text_hash), (transcript_id, file_name))
+        self._by_name[(application_id, file_name)] = transcript_id
+        self._signatures[transcript_id] = (application_id, file_name, signature)
+        for band_idx, band in enumerate(_bands(signature)):
+            self._buckets.setdefault((application_id, band_idx, band), []).append(transcript_id)
+
+    def remove(self, transcript_id: str):
+        entry = self._signatures.pop(transcript_id, None)
+        if entry is None:
+            return
+        application_id, file_name, signature = entry
+        if self._by_name.get((application_id, file_name)) == transcript_id:
+            del self._by_name[(application_id, file_name)]
+        for band_idx, band in enumerate(_bands(signature)):
+            bucket = self._buckets.get((application_id, band_idx, band), [])
+            if transcript_id in bucket:
+                bucket.remove(transcript_id)
+        for key, (existing_id, _) in list(self._by_hash.items()):
+            if existing_id == transcript_id:
+                del self._by_hash[key]
+
+    def transcript_id_for_name(self, application_id: str, file_name: str) -> Optional[str]:
+        return self._by_name.get((application_id, file_name))
+
+    def find_duplicate(self, application_id: str, text_hash: str, signature: bytes,
+                       exclude_id: str = None) -> Optional[DuplicateMatch]:
+        """Exact match by content hash, else the most similar near duplicate above the threshold"""
+        exact = self._by_hash.get((application_id, text_hash))
+        if exact and exact[0] != exclude_id:
+            return DuplicateMatch('exact', exact[0], exact[1], 1.0)
+
+        candidates = set()
+        for band_idx, band in enumerate(_bands(signature)):
+            candidates.update(self._buckets.get((application_id, band_idx, band), ()))
+        candidates.discard(exclude_id)
+
+        best = None
+        for candidate_id in candidates:
+            _, file_name, candidate_signature = self._signatures[candidate_id]
+            similarity = signature_similarity(signature, candidate_signature)
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = DuplicateMatch('near', candidate_id, file_name, similarity)
+        return best
+
+
+def ensure_fingerprint(transcript: MeetingTranscript):
+    """Set content_hash / minhash_signature of a transcript from its text"""
+    transcript.content_hash = content_hash(transcript.transcript_text)
+    transcript.minhash_signature = minhash_signature(transcript.transcript_text)
@@ -0,0 +1,87 @@
+"""
+Upload spooling
+Streams uploaded files to a private temporary directory once, in fixed-size chunks, hashing them on
+the way. Parsers then read the spooled files from disk (memory-mapped PDFs, zip-backed DOCX/XLSX)
+instead of from extra in-memory copies, and each file is deleted as soon as its text is extracted.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import List
+
+SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None  # None: system temporary directory
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class SpooledFile:
+    """An uploaded file written to disk"""
+    name: str
+    path: str
+    size_bytes: int
+    sha256: str
+
+    def release(self):
+        """Delete the spooled copy (safe to call more than once)"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class UploadSpool:
+    """
+    Temporary directory holding the spooled uploads of one request; removed on exit.
+
+        with UploadSpool() as spool:
+            spooled = spool.add_all(uploaded_files)
+            ...
+    """
+
+    def __init__(self, directory: str = SPOOL_DIR):
+        self._parent = directory
+        self.directory = None
+        self.files: List[SpooledFile] = []
+
+    def __enter__(self):
+        if self._parent:
+            os.makedirs(self._parent, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="apm-upload-", dir=self._parent)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def add(self, uploaded_file, name: str = None) -> SpooledFile:
+        """Copy a file-like upload (e.g. Streamlit UploadedFile) to the spool in CHUNK_SIZE pieces"""
+        name = name or getattr(uploaded_file, "name", None) or f"upload_{len(self.files)}"
+        # Index prefix: two uploads may share a file name
+        path = os.path.join(self.directory, f"{len(self.files):05d}_{os.path.basename(name)}")
+        digest = hashlib.sha256()
+        size = 0
+
+        if hasattr(uploaded_file, "seek"):
+            uploaded_file.seek(0)
+        with open(path, "wb") as out:
+            while True:
+                chunk = uploaded_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+
+        spooled = SpooledFile(name=name, path=path, size_bytes=size, sha256=digest.hexdigest())
+        self.files.append(spooled)
+        return spooled
+
+    def add_all(self, uploaded_files) -> List[SpooledFile]:
+        return [self.add(uploaded_file) for uploaded_file in uploaded_files]
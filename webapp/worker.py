@@ -0,0 +1,124 @@
+"""
+Background job worker
+Executes queued jobs (AI scoring, transcript processing, exports) outside the Streamlit script.
+
+Usage:
+    python worker.py [--concurrency 2] [--once] [--types score_applications export_excel]
+
+The app also starts an embedded worker thread (disable with APM_EMBEDDED_WORKER=0 when
+running dedicated worker processes).
+"""
+
+import argparse
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import jobs
+import pipeline  # noqa: F401 - registers the job handlers
+
+POLL_INTERVAL_SECONDS = float(os.getenv("APM_WORKER_POLL_INTERVAL", "1.0"))
+
+
+class Worker:
+    """Polls the jobs table and runs claimed jobs in a thread pool"""
+
+    def __init__(self, concurrency: int = 2, job_types: List[str] = None,
+                 poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.concurrency = max(1, concurrency)
+        self.job_types = job_types or jobs.registered_job_types()
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stop = threading.Event()
+        self._slots = threading.Semaphore(self.concurrency)
+        self._active = 0
+        self._active_lock = threading.Lock()
+
+    def _run(self, job):
+        try:
+            jobs.run_job(job)
+        finally:
+            with self._active_lock:
+                self._active -= 1
+            self._slots.release()
+
+    def run_pending(self, executor: ThreadPoolExecutor) -> int:
+        """Claim and submit jobs while there are free slots; returns the number submitted"""
+        submitted = 0
+        while self._slots.acquire(blocking=False):
+            job = jobs.claim_job(self.worker_id, self.job_types)
+            if job is None:
+                self._slots.release()
+                break
+            print(f"[WORKER] ▶️  {job['job_type']} {job['id']} (attempt {job['attempts']})")
+            with self._active_lock:
+                self._active += 1
+            executor.submit(self._run, job)
+            submitted += 1
+        return submitted
+
+    def run_forever(self, once: bool = False):
+        print(f"[WORKER] Started {self.worker_id} (concurrency={self.concurrency}, types={', '.join(self.job_types)})")
+        last_stale_check = 0.0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="apm-job") as executor:
+            while not self._stop.is_set():
+                try:
+                    if time.time() - last_stale_check > 60:
+                        requeued = jobs.requeue_stale_jobs()
+                        if requeued:
+                            print(f"[WORKER] ♻️  Re-queued {requeued} abandoned job(s)")
+                        pruned = jobs.prune_finished_jobs()
+                        if pruned:
+                            print(f"[WORKER] 🧹 Deleted {pruned} job(s) finished over {jobs.RETENTION_DAYS:g} days ago")
+                        last_stale_check = time.time()
+
+                    submitted = self.run_pending(executor)
+                except Exception as e:
+                    print(f"[WORKER] ⚠️  Poll failed: {e}")
+                    submitted = 0
+
+                if once and not submitted and not self._active:
+                    break
+                self._stop.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+_embedded_worker = None
+_embedded_lock = threading.Lock()
+
+
+def start_embedded_worker(concurrency: int = None) -> Worker:
+    """Start (once per process) a daemon worker thread inside the app process"""
+    global _embedded_worker
+    with _embedded_lock:
+        if _embedded_worker is None:
+            concurrency = concurrency or int(os.getenv("APM_WORKER_CONCURRENCY", "2"))
+            _embedded_worker = Worker(concurrency=concurrency)
+            threading.Thread(target=_embedded_worker.run_forever, name="apm-worker", daemon=True).start()
+    return _embedded_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="APM Platform background job worker")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("APM_WORKER_CONCURRENCY", "2")),
+                        help="Jobs executed in parallel")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    parser.add_argument("--types", nargs="*", choices=jobs.registered_job_types(),
+                        help="Only run these job types")
+    args = parser.parse_args()
+
+    worker = Worker(concurrency=args.concurrency, job_types=args.types)
+    try:
+        worker.run_forever(once=args.once)
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Compiled Excel template sheets
+A template workbook is parsed once per process (and again only when the file changes) into a
+compact representation: cell values with ids into a table of distinct styles, merged ranges,
+column widths, row heights and image bytes. Replaying a sheet registers each distinct style once
+in the target workbook and shares it between cells, instead of reloading the template and copying
+every style object cell by cell on each export.
+Used by the portfolio Excel export (excel_generator.py) and the root generator app.
+"""
+
+import io
+import os
+import threading
+from copy import copy
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.worksheet.worksheet import Worksheet
+
+_cache_lock = threading.Lock()
+_cache: Dict = {}  # absolute path -> ((mtime_ns, size), CompiledTemplate)
+
+
+@dataclass(frozen=True)
+class CellStyle:
+    font: object
+    border: object
+    fill: object
+    number_format: str
+    protection: object
+    alignment: object
+
+
+@dataclass(frozen=True)
+class TemplateImage:
+    data: bytes
+    anchor: object
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class CompiledSheet:
+    """One template sheet; cells are (row, column, value, style id or None)"""
+    title: str
+    cells: Tuple[Tuple[int, int, object, Optional[int]], ...]
+    styles: Tuple[CellStyle, ...]
+    merged_ranges: Tuple[str, ...]
+    column_widths: Tuple[Tuple[str, float], ...]
+    row_heights: Tuple[Tuple[int, float], ...]
+    images: Tuple[TemplateImage, ...]
+
+    def replay(self, ws):
+        """Write the sheet into ws (an empty regular worksheet or an excel_generator.SheetWriter)"""
+        # Each distinct style is registered once in the target workbook, then shared by its cells
+        style_arrays = [_style_array(ws, style) for style in self.styles]
+        if isinstance(ws, Worksheet):
+            # Regular worksheet: cells are created in bulk
+            for row, column, value, style_id in self.cells:
+                ws._cells[(row, column)] = Cell(
+                    ws, row=row, column=column, value=value,
+                    style_array=copy(style_arrays[style_id]) if style_id is not None else None
+                )
+        else:
+            for row, column, value, style_id in self.cells:
+                cell = ws.cell(row=row, column=column, value=value)
+                if style_id is not None:
+                    cell._style = copy(style_arrays[style_id])
+
+        for merged_range in self.merged_ranges:
+            ws.merge_cells(merged_range)
+        for column_letter, width in self.column_widths:
+            ws.column_dimensions[column_letter].width = width
+        for row, height in self.row_heights:
+            ws.row_dimensions[row].height = height
+
+        try:
+            from openpyxl.drawing.image import Image as XLImage
+            for image in self.images:
+                new_image = XLImage(io.BytesIO(image.data))
+                new_image.anchor = copy(image.anchor)
+                new_image.width, new_image.height = image.width, image.height
+                ws.add_image(new_image)
+        except Exception as e:
+            print(f"[XLSX] ⚠️  Could not copy the images of template sheet '{self.title}': {e}")
+        return ws
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    path: str
+    sheets: Dict[str, CompiledSheet]
+
+    @property
+    def sheetnames(self):
+        return list(self.sheets)
+
+    def __contains__(self, title):
+        return title in self.sheets
+
+    def __getitem__(self, title) -> CompiledSheet:
+        return self.sheets[title]
+
+
+def _style_array(ws, style: CellStyle):
+    # A detached cell of the target sheet registers the style objects in its workbook
+    cell = WriteOnlyCell(ws)
+    cell.font = style.font
+    cell.border = style.border
+    cell.fill = style.fill
+    cell.number_format = style.number_format
+    cell.protection = style.protection
+    cell.alignment = style.alignment
+    return cell._style
+
+
+def _compile_sheet(source_ws) -> CompiledSheet:
+    styles, style_ids, cells = [], {}, []
+    for row in source_ws.iter_rows():
+        for cell in row:
+            if not cell.has_style:
+                if cell.value is not None:
+                    cells.append((cell.row, cell.column, cell.value, None))
+                continue
+            # Cells of the same style share one entry (keyed by the source style indexes)
+            key = tuple(cell._style)
+            style_id = style_ids.get(key)
+            if style_id is None:
+                style_id = style_ids[key] = len(styles)
+                styles.append(CellStyle(copy(cell.font), copy(cell.border), copy(cell.fill),
+                                        cell.number_format, copy(cell.protection), copy(cell.alignment)))
+            cells.append((cell.row, cell.column, cell.value, style_id))
+
+    images = []
+    for img in getattr(source_ws, '_images', []):
+        try:
+            images.append(TemplateImage(img._data(), copy(img.anchor), img.width, img.height))
+        except Exception as e:
+            print(f"[XLSX] ⚠️  Skipping an unreadable image of template sheet '{source_ws.title}': {e}")
+
+    return CompiledSheet(
+        title=source_ws.title,
+        cells=tuple(cells),
+        styles=tuple(styles),
+        merged_ranges=tuple(str(merged_range) for merged_range in source_ws.merged_cells.ranges),
+        column_widths=tuple((letter, dim.width) for letter, dim in source_ws.column_dimensions.items()),
+        row_heights=tuple((row, dim.height) for row, dim in source_ws.row_dimensions.items()),
+        images=tuple(images),
+    )
+
+
+def compile_template(path: str, sheetnames=None) -> CompiledTemplate:
+    """Parse the template workbook (or only the given sheets) into replayable sheets"""
+    wb = load_workbook(path)
+    try:
+        names = [name for name in (sheetnames or wb.sheetnames) if name in wb.sheetnames]
+        return CompiledTemplate(path=path, sheets={name: _compile_sheet(wb[name]) for name in names})
+    finally:
+        wb.close()
+
+
+def get_compiled_template(path: str) -> Optional[CompiledTemplate]:
+    """The compiled template at path (None when it does not exist); recompiled when the file changes"""
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        compiled = compile_template(path)
+        _cache[path] = (signature, compiled)
+        return compiled